@@ -0,0 +1,138 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import asyncio
+import threading
+from typing import AsyncIterator, Dict, Optional
+
+import gpiozero
+from gpiozero import GPIOZeroError
+
+from endrpi.model.action_result import ActionResult, error_action_result, success_action_result
+from endrpi.model.adc import AdcConfiguration, AdcSamples, AdcStatus
+from endrpi.model.message import AdcMessage
+from endrpi.utils.adc import AdcSampler
+
+# Sampler of the sampled ADC, replaced whenever sampling is restarted
+adc_sampler: Optional[AdcSampler] = None
+adc_sampler_lock = threading.Lock()
+
+
+def start_adc(adc_configuration: AdcConfiguration) -> ActionResult[AdcStatus]:
+    """
+    Returns the result of (re)starting sampling of the channels of a given :class:`~endrpi.model.adc.AdcConfiguration`,
+    replacing the sampled ADC and its samples.
+
+    .. note::
+        Channels are read through gpiozero's MCP3xxx devices, which use the SPI device of the kernel when available
+        and fall back to software SPI otherwise.
+    """
+
+    global adc_sampler
+
+    with adc_sampler_lock:
+        if adc_sampler:
+            adc_sampler.stop()
+            adc_sampler = None
+
+        chip_class = getattr(gpiozero, adc_configuration.chip.value)
+        channel_devices: Dict[int, gpiozero.AnalogInputDevice] = {}
+        try:
+            for channel in adc_configuration.channels:
+                channel_devices[channel] = chip_class(channel=channel,
+                                                      port=adc_configuration.port,
+                                                      device=adc_configuration.device,
+                                                      max_voltage=adc_configuration.referenceVoltage)
+        except (GPIOZeroError, OSError):
+            for channel_device in channel_devices.values():
+                channel_device.close()
+            return error_action_result(AdcMessage.ERROR_SPI__CHIP__.format(chip=adc_configuration.chip.value))
+
+        adc_sampler = AdcSampler(adc_configuration, channel_devices)
+        adc_sampler.start()
+        return success_action_result(adc_sampler.status())
+
+
+def read_adc_status() -> ActionResult[AdcStatus]:
+    """Returns the result of reading the :class:`~endrpi.model.adc.AdcStatus` of the sampled ADC."""
+
+    sampler = adc_sampler
+    if not sampler:
+        return error_action_result(AdcMessage.ERROR_NOT_RUNNING)
+
+    return success_action_result(sampler.status())
+
+
+def stop_adc() -> ActionResult[AdcStatus]:
+    """Returns the result of stopping sampling, the samples taken are discarded."""
+
+    global adc_sampler
+
+    with adc_sampler_lock:
+        if not adc_sampler:
+            return error_action_result(AdcMessage.ERROR_NOT_RUNNING)
+
+        adc_sampler.stop()
+        adc_status = adc_sampler.status()
+        adc_sampler = None
+
+    return success_action_result(adc_status)
+
+
+def read_adc_samples(channel: int,
+                     count: Optional[int] = None,
+                     since: Optional[int] = None) -> ActionResult[AdcSamples]:
+    """
+    Returns the result of reading up to count :class:`~endrpi.model.adc.AdcSamples` of a given channel starting at
+    sample index since, or the latest count samples when since is none.
+    """
+
+    sampler = adc_sampler
+    if not sampler:
+        return error_action_result(AdcMessage.ERROR_NOT_RUNNING)
+
+    try:
+        return success_action_result(sampler.read(channel, count, since))
+    except KeyError:
+        return error_action_result(AdcMessage.ERROR_CHANNEL_NOT_SAMPLED__CHANNEL__.format(channel=channel))
+
+
+async def stream_adc_samples(channel: int, interval: float) -> AsyncIterator[ActionResult[AdcSamples]]:
+    """
+    Yields the result of reading the decimated :class:`~endrpi.model.adc.AdcSamples` of a given channel taken since
+    the previous result, once per interval (seconds) until the stream is closed.
+
+    .. note:: The stream ends when sampling is stopped or restarted.
+    """
+
+    sampler = adc_sampler
+    if not sampler:
+        yield error_action_result(AdcMessage.ERROR_NOT_RUNNING)
+        return
+
+    since = None
+    while sampler is adc_sampler:
+        try:
+            adc_samples = sampler.read_decimated(channel, since)
+        except KeyError:
+            yield error_action_result(AdcMessage.ERROR_CHANNEL_NOT_SAMPLED__CHANNEL__.format(channel=channel))
+            return
+
+        if adc_samples.values:
+            since = adc_samples.firstSample + len(adc_samples.values)
+            yield success_action_result(adc_samples)
+        elif since is None:
+            since = adc_samples.firstSample
+        await asyncio.sleep(interval)
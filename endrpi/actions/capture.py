@@ -0,0 +1,164 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Union
+
+from gpiozero import Pin, PinUnsupported
+
+from endrpi.actions.pin import pin_cache, unknown_pin_result
+from endrpi.config.pin_factory import get_bulk_pin_access
+from endrpi.model.action_result import ActionResult, error_action_result, success_action_result
+from endrpi.model.capture import CaptureConfiguration, CaptureFormat, CaptureStatus
+from endrpi.model.message import CaptureMessage, PinMessage
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.utils.capture import CaptureSession, capture_vcd
+from endrpi.utils.gpio_registers import GPIO_BANK_PIN_COUNT
+
+# Number of finished captures whose samples are kept after they finish
+CAPTURE_HISTORY_SIZE = 4
+
+# Seconds a cancel waits for the capture thread to stop
+CAPTURE_CANCEL_TIMEOUT = 1.0
+
+# Capture sessions by capture id, in the order they were started
+capture_sessions: Dict[int, CaptureSession] = OrderedDict()
+capture_ids = itertools.count(1)
+capture_sessions_lock = threading.Lock()
+
+
+def start_capture(capture_configuration: CaptureConfiguration) -> ActionResult[CaptureStatus]:
+    """
+    Returns the result of starting a capture of the levels of the pins of a given
+    :class:`~endrpi.model.capture.CaptureConfiguration`.
+
+    .. note::
+        Every sample is a single level register read when the GPIO registers are mapped, otherwise the state of
+        every pin is read through the pin factory. Pin configurations are left unchanged, so outputs can be captured.
+
+    .. note::
+        Only one capture runs at a time since the capture thread busy waits between samples.
+    """
+
+    with capture_sessions_lock:
+        if any(session.running for session in capture_sessions.values()):
+            return error_action_result(CaptureMessage.ERROR_RUNNING)
+
+        pin_ids = list(capture_configuration.pins)
+        if capture_configuration.trigger and capture_configuration.trigger.pin not in pin_ids:
+            pin_ids.append(capture_configuration.trigger.pin)
+        unknown_pin_action_result = unknown_pin_result(pin_ids)
+        if unknown_pin_action_result:
+            return unknown_pin_action_result
+
+        # Pins beyond the first bank aren't covered by the registers
+        bulk_pin_access = get_bulk_pin_access()
+        if bulk_pin_access and all(pin_id.bcm_number < GPIO_BANK_PIN_COUNT for pin_id in pin_ids):
+            read_levels = bulk_pin_access.read_levels
+        else:
+            gpiozero_pins: Dict[RaspberryPiPinIds, Pin] = {}
+            for pin_id in pin_ids:
+                try:
+                    gpiozero_pins[pin_id] = pin_cache.pin(pin_id)
+                except PinUnsupported:
+                    return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+            read_levels = __pin_levels_reader(gpiozero_pins)
+
+        session = CaptureSession(next(capture_ids), capture_configuration, read_levels)
+        __add_capture_session(session)
+        session.start()
+
+    return success_action_result(session.status())
+
+
+def read_capture_statuses() -> ActionResult[List[CaptureStatus]]:
+    """Returns the result of reading the :class:`~endrpi.model.capture.CaptureStatus` of every known capture."""
+    return success_action_result([session.status() for session in list(capture_sessions.values())])
+
+
+def read_capture_status(capture_id: int) -> ActionResult[CaptureStatus]:
+    """Returns the result of reading the :class:`~endrpi.model.capture.CaptureStatus` of a given capture."""
+
+    session = capture_sessions.get(capture_id)
+    if not session:
+        return error_action_result(CaptureMessage.ERROR_NOT_FOUND__CAPTURE_ID__.format(capture_id=capture_id))
+
+    return success_action_result(session.status())
+
+
+def cancel_capture(capture_id: int) -> ActionResult[CaptureStatus]:
+    """
+    Returns the result of cancelling a given capture, samples taken so far are kept.
+
+    .. note::
+        Cancelling a finished capture returns its status unchanged. The capture thread is waited on for at most
+        :data:`CAPTURE_CANCEL_TIMEOUT`.
+    """
+
+    session = capture_sessions.get(capture_id)
+    if not session:
+        return error_action_result(CaptureMessage.ERROR_NOT_FOUND__CAPTURE_ID__.format(capture_id=capture_id))
+
+    session.cancel(CAPTURE_CANCEL_TIMEOUT)
+    return success_action_result(session.status())
+
+
+def read_capture_data(capture_id: int, capture_format: CaptureFormat) -> ActionResult[Union[bytes, str]]:
+    """
+    Returns the result of reading the samples of a given finished capture, from oldest to newest.
+
+    .. note::
+        BINARY samples are packed bits, bit j of sample i is bit i * (number of pins) + j of the data (least
+        significant bit first) and holds the level of the j-th pin of the capture. VCD samples are a value change
+        dump with a 1ns timescale.
+
+    .. note::
+        Encoding up to :data:`~endrpi.model.capture.CAPTURE_MAX_SAMPLES` samples takes a while, run it off the event
+        loop.
+    """
+
+    session = capture_sessions.get(capture_id)
+    if not session:
+        return error_action_result(CaptureMessage.ERROR_NOT_FOUND__CAPTURE_ID__.format(capture_id=capture_id))
+    if session.running:
+        return error_action_result(CaptureMessage.ERROR_NOT_FINISHED__CAPTURE_ID__.format(capture_id=capture_id))
+
+    if capture_format is CaptureFormat.VCD:
+        configuration = session.configuration
+        return success_action_result(capture_vcd(configuration.pins, configuration.rate, session.samples,
+                                                 session.trigger_sample))
+    return success_action_result(session.samples.to_bytes())
+
+
+def __pin_levels_reader(gpiozero_pins: Dict[RaspberryPiPinIds, Pin]) -> Callable[[], int]:
+    pins = [(gpiozero_pin, pin_id.bcm_number) for pin_id, gpiozero_pin in gpiozero_pins.items()]
+
+    def read_levels() -> int:
+        levels = 0
+        for gpiozero_pin, bcm_number in pins:
+            if gpiozero_pin.state:
+                levels |= 1 << bcm_number
+        return levels
+    return read_levels
+
+
+def __add_capture_session(session: CaptureSession) -> None:
+    capture_sessions[session.capture_id] = session
+
+    # Forget the oldest finished captures beyond the history size, running captures are always kept
+    finished_ids = [capture_id for capture_id, session in capture_sessions.items() if not session.running]
+    for capture_id in finished_ids[:max(0, len(finished_ids) - CAPTURE_HISTORY_SIZE)]:
+        del capture_sessions[capture_id]
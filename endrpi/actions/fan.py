@@ -0,0 +1,157 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import threading
+from functools import partial
+from typing import Optional
+
+from gpiozero import PinError
+
+from endrpi.actions.pin import pin_owners, pwm_outputs, update_pwm, stop_pwm, unknown_pin_result
+from endrpi.config.sensors import get_sensor_reader
+from endrpi.model.action_result import ActionResult, error_action_result, success_action_result
+from endrpi.model.fan import FanConfiguration, FanStatus
+from endrpi.model.message import FanMessage, PinMessage
+from endrpi.model.pin import PwmConfiguration
+from endrpi.model.sensors import SensorKind
+from endrpi.utils.fan import FanController
+from endrpi.utils.pin_owner import PinInUse
+
+# Controller of the fan, replaced whenever the fan is reconfigured onto another pin
+fan_controller: Optional[FanController] = None
+fan_controller_lock = threading.Lock()
+
+# Owner of the fan pin while the controller runs
+FAN_PIN_OWNER = 'the fan controller'
+
+
+def start_fan(fan_configuration: FanConfiguration) -> ActionResult[FanStatus]:
+    """
+    Returns the result of starting (or retuning) the fan controller with a given
+    :class:`~endrpi.model.fan.FanConfiguration`.
+
+    .. note::
+        A running controller of the same pin and frequency is retuned without interrupting PWM, otherwise PWM of the
+        previous pin is stopped and PWM of the new pin starts at the failsafe duty cycle until the first evaluation.
+
+    .. note::
+        The fan pin is owned by the controller while it runs, pins owned by a sequence or a PID loop are refused.
+    """
+
+    global fan_controller
+
+    pin_id = fan_configuration.pinId
+    unknown_pin_action_result = unknown_pin_result([pin_id])
+    if unknown_pin_action_result:
+        return unknown_pin_action_result
+
+    try:
+        pin_owners.check(pin_id, FAN_PIN_OWNER)
+    except PinInUse as error:
+        return error_action_result(PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=error.pin_id,
+                                                                                   owner=error.owner))
+
+    sensor_inputs = {sensor_input.id: sensor_input for sensor_input in get_sensor_reader().sensor_inputs}
+    sensor_input = sensor_inputs.get(fan_configuration.sensorId)
+    if not sensor_input:
+        return error_action_result(FanMessage.ERROR_SENSOR_NOT_FOUND__SENSOR_ID__.format(
+            sensor_id=fan_configuration.sensorId))
+    if sensor_input.kind is not SensorKind.TEMPERATURE:
+        return error_action_result(FanMessage.ERROR_NOT_TEMPERATURE__SENSOR_ID__.format(
+            sensor_id=fan_configuration.sensorId))
+
+    with fan_controller_lock:
+        if fan_controller and fan_controller.running:
+            previous_configuration = fan_controller.configuration
+            if (previous_configuration.pinId, previous_configuration.frequency) == \
+                    (fan_configuration.pinId, fan_configuration.frequency):
+                fan_controller.configuration = fan_configuration
+                return success_action_result(fan_controller.status())
+
+        __stop_fan_controller()
+
+        try:
+            pin_owners.claim(FAN_PIN_OWNER, [pin_id])
+        except PinInUse as error:
+            return error_action_result(PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=error.pin_id,
+                                                                                       owner=error.owner))
+
+        pwm_configuration = PwmConfiguration(frequency=fan_configuration.frequency,
+                                             dutyCycle=fan_configuration.failsafeDutyCycle)
+        pwm_action_result = update_pwm(pin_id, pwm_configuration, FAN_PIN_OWNER)
+        if not pwm_action_result.success:
+            pin_owners.release(FAN_PIN_OWNER, [pin_id])
+            return error_action_result(pwm_action_result.error.message)
+
+        controller = FanController(fan_configuration,
+                                   __read_fan_temperature,
+                                   partial(pwm_outputs.write_duty_cycle, pin_id))
+        try:
+            controller.start()
+        except (KeyError, PinError, OSError):
+            stop_pwm(pin_id, FAN_PIN_OWNER)
+            pin_owners.release(FAN_PIN_OWNER, [pin_id])
+            return error_action_result(PinMessage.ERROR_PWM__PIN_ID__.format(pin_id=pin_id))
+
+        # The pin is released once the controller ends on its own (i.e. a failed duty cycle write)
+        pin_owners.claim(FAN_PIN_OWNER, [pin_id], lambda: controller.running)
+        fan_controller = controller
+        return success_action_result(fan_controller.status())
+
+
+def read_fan() -> ActionResult[FanStatus]:
+    """Returns the result of reading the :class:`~endrpi.model.fan.FanStatus` of the fan controller."""
+
+    controller = fan_controller
+    if not controller:
+        return error_action_result(FanMessage.ERROR_NOT_RUNNING)
+
+    return success_action_result(controller.status())
+
+
+def stop_fan() -> ActionResult[FanStatus]:
+    """Returns the result of stopping the fan controller along with PWM of its pin."""
+
+    global fan_controller
+
+    with fan_controller_lock:
+        if not fan_controller:
+            return error_action_result(FanMessage.ERROR_NOT_RUNNING)
+
+        fan_status = __stop_fan_controller()
+
+    return success_action_result(fan_status)
+
+
+def __stop_fan_controller() -> Optional[FanStatus]:
+    global fan_controller
+
+    if not fan_controller:
+        return None
+
+    fan_controller.stop()
+    fan_status = fan_controller.status()
+    fan_controller = None
+    # PWM may have been stopped already, which is why the controller ended
+    stop_pwm(fan_status.configuration.pinId, FAN_PIN_OWNER)
+    pin_owners.release(FAN_PIN_OWNER, [fan_status.configuration.pinId])
+    return fan_status
+
+
+def __read_fan_temperature(sensor_id: str) -> float:
+    sensor = get_sensor_reader().read_sensor(sensor_id)
+    if sensor.value is None:
+        raise OSError(sensor.error)
+    return sensor.value.quantity
@@ -0,0 +1,114 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import threading
+from typing import List, Optional, Union
+
+from endrpi.model.action_result import ActionResult, error_action_result, success_action_result
+from endrpi.model.i2c import I2cBlock, I2cBlockReads, I2cBlockWrites, I2cPollConfiguration, \
+    I2cPollStatus
+from endrpi.model.message import I2cMessage, MessageData
+from endrpi.utils.i2c import I2cBuses, I2cBusUnavailable, I2cPoller, I2cTransferError
+
+# I2C buses shared by every action and the poll set, opened on first use
+i2c_buses = I2cBuses()
+
+# Running poll set, replaced whenever the poll set is updated
+i2c_poller: Optional[I2cPoller] = None
+i2c_poller_lock = threading.Lock()
+
+
+def read_i2c_blocks(block_reads: I2cBlockReads) -> ActionResult[List[I2cBlock]]:
+    """
+    Returns the result of reading every block of a batch of block reads, in the order of the reads.
+
+    .. note:: Reads of the same bus are combined into a single transfer, a device that doesn't respond fails the batch.
+    """
+
+    try:
+        return success_action_result(i2c_buses.read_blocks(block_reads.reads))
+    except (I2cBusUnavailable, I2cTransferError) as error:
+        return __i2c_error_result(error)
+
+
+def write_i2c_blocks(block_writes: I2cBlockWrites) -> ActionResult[MessageData]:
+    """
+    Returns the result of writing every block of a batch of block writes.
+
+    .. note::
+        Writes of the same bus are combined into a single transfer, blocks already written when a device doesn't
+        respond stay written.
+    """
+
+    try:
+        i2c_buses.write_blocks(block_writes.writes)
+    except (I2cBusUnavailable, I2cTransferError) as error:
+        return __i2c_error_result(error)
+
+    return success_action_result(MessageData(message=I2cMessage.SUCCESS_WRITTEN))
+
+
+def read_i2c_poll() -> ActionResult[I2cPollStatus]:
+    """Returns the result of reading the :class:`~endrpi.model.i2c.I2cPollStatus` of the running poll set."""
+
+    poller = i2c_poller
+    if not poller:
+        return error_action_result(I2cMessage.ERROR_POLL_NOT_RUNNING)
+
+    return success_action_result(poller.status())
+
+
+def update_i2c_poll(poll_configuration: I2cPollConfiguration) -> ActionResult[I2cPollStatus]:
+    """
+    Returns the result of replacing the poll set with a given :class:`~endrpi.model.i2c.I2cPollConfiguration`.
+
+    .. note::
+        The first poll is read before the result is returned, so the status holds blocks (or the error of the first
+        poll) right away.
+    """
+
+    global i2c_poller
+
+    with i2c_poller_lock:
+        if i2c_poller:
+            i2c_poller.stop()
+
+        i2c_poller = I2cPoller(poll_configuration, i2c_buses.read_blocks)
+        i2c_poller.poll()
+        i2c_poller.start()
+
+        return success_action_result(i2c_poller.status())
+
+
+def stop_i2c_poll() -> ActionResult[MessageData]:
+    """Returns the result of stopping the running poll set."""
+
+    global i2c_poller
+
+    with i2c_poller_lock:
+        if not i2c_poller:
+            return error_action_result(I2cMessage.ERROR_POLL_NOT_RUNNING)
+
+        i2c_poller.stop()
+        i2c_poller = None
+
+    return success_action_result(MessageData(message=I2cMessage.SUCCESS_POLL_STOPPED))
+
+
+def __i2c_error_result(error: Union[I2cBusUnavailable, I2cTransferError]) -> ActionResult:
+    if isinstance(error, I2cBusUnavailable):
+        return error_action_result(I2cMessage.ERROR_BUS__BUS__.format(bus=error.bus))
+    address = f'0x{error.address:02x}'
+    return error_action_result(I2cMessage.ERROR_TRANSFER__BUS__ADDRESS__.format(bus=error.bus, address=address))
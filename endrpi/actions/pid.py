@@ -0,0 +1,216 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import itertools
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from gpiozero import PinError, PinUnsupported
+
+import endrpi.actions.adc
+from endrpi.actions.pin import pin_cache, pin_locks, pin_owners, pulse_counters, pwm_outputs, update_pwm, stop_pwm, \
+    unknown_pin_result
+from endrpi.config.sensors import get_sensor_reader
+from endrpi.model.action_result import ActionResult, error_action_result, success_action_result
+from endrpi.model.message import AdcMessage, PidMessage, PinMessage
+from endrpi.model.pid import PidConfiguration, PidOutputMode, PidSource, PidSourceType, PidStatus, PidTuning
+from endrpi.model.pin import PwmConfiguration, RaspberryPiPinIds
+from endrpi.utils.pid import PidLoop
+from endrpi.utils.pin_owner import PinInUse
+
+# PID loops by loop id, in the order they were started
+pid_loops: Dict[int, PidLoop] = OrderedDict()
+pid_loop_ids = itertools.count(1)
+pid_loops_lock = threading.Lock()
+
+
+def start_pid_loop(pid_configuration: PidConfiguration) -> ActionResult[PidStatus]:
+    """
+    Returns the result of starting a PID loop of a given :class:`~endrpi.model.pid.PidConfiguration`.
+
+    .. note::
+        PWM outputs start at outputMin and DIGITAL outputs start low. ADC and pulse counter sources are read as they
+        are when the loop runs, iterations are skipped with an error while they aren't running.
+
+    .. note::
+        The output pin is owned by the loop while it runs, pins owned by the fan controller, a sequence or another
+        PID loop are refused.
+    """
+
+    pin_id = pid_configuration.output.pinId
+    unknown_pin_action_result = unknown_pin_result([pin_id])
+    if unknown_pin_action_result:
+        return unknown_pin_action_result
+
+    with pid_loops_lock:
+        source = pid_configuration.source
+        if source.type is PidSourceType.SENSOR and \
+                source.sensorId not in {sensor_input.id for sensor_input in get_sensor_reader().sensor_inputs}:
+            return error_action_result(PidMessage.ERROR_SENSOR_NOT_FOUND__SENSOR_ID__.format(sensor_id=source.sensorId))
+
+        loop_id = next(pid_loop_ids)
+        owner = __pid_loop_owner(loop_id)
+        try:
+            pin_owners.claim(owner, [pin_id])
+        except PinInUse as error:
+            return error_action_result(PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=error.pin_id,
+                                                                                       owner=error.owner))
+
+        if pid_configuration.output.mode is PidOutputMode.PWM:
+            pwm_configuration = PwmConfiguration(frequency=pid_configuration.output.frequency,
+                                                 dutyCycle=pid_configuration.outputMin)
+            pwm_action_result = update_pwm(pin_id, pwm_configuration, owner)
+            if not pwm_action_result.success:
+                pin_owners.release(owner, [pin_id])
+                return error_action_result(pwm_action_result.error.message)
+            write_output = partial(pwm_outputs.write_duty_cycle, pin_id)
+        else:
+            with pin_locks.write(pin_id):
+                try:
+                    gpiozero_pin = pin_cache.pin(pin_id)
+                except PinUnsupported:
+                    pin_owners.release(owner, [pin_id])
+                    return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+                if pwm_outputs.status(pin_id):
+                    pin_owners.release(owner, [pin_id])
+                    return error_action_result(PinMessage.ERROR_PWM_RUNNING__PIN_ID__.format(pin_id=pin_id))
+                gpiozero_pin.function = 'output'
+                gpiozero_pin.state = 0
+                pin_cache.invalidate(pin_id)
+            threshold = (pid_configuration.outputMin + pid_configuration.outputMax) / 2
+            write_output = __digital_output_writer(pin_id, threshold)
+
+        pid_loop = PidLoop(loop_id, pid_configuration, __process_variable_reader(source), write_output)
+        pid_loops[pid_loop.id] = pid_loop
+        pid_loop.start()
+        # The pin is released once the loop ends on its own (i.e. a failed output write)
+        pin_owners.claim(owner, [pin_id], lambda: pid_loop.running)
+
+    return success_action_result(pid_loop.status())
+
+
+def read_pid_loops() -> ActionResult[List[PidStatus]]:
+    """Returns the result of reading the :class:`~endrpi.model.pid.PidStatus` of every PID loop."""
+    return success_action_result([pid_loop.status() for pid_loop in list(pid_loops.values())])
+
+
+def read_pid_loop(loop_id: int) -> ActionResult[PidStatus]:
+    """Returns the result of reading the :class:`~endrpi.model.pid.PidStatus` of a given PID loop."""
+
+    pid_loop = pid_loops.get(loop_id)
+    if not pid_loop:
+        return error_action_result(PidMessage.ERROR_NOT_FOUND__LOOP_ID__.format(loop_id=loop_id))
+
+    return success_action_result(pid_loop.status())
+
+
+def tune_pid_loop(loop_id: int, pid_tuning: PidTuning) -> ActionResult[PidStatus]:
+    """Returns the result of replacing the setpoint and gains of a given PID loop while it runs."""
+
+    pid_loop = pid_loops.get(loop_id)
+    if not pid_loop:
+        return error_action_result(PidMessage.ERROR_NOT_FOUND__LOOP_ID__.format(loop_id=loop_id))
+
+    pid_loop.tune(pid_tuning)
+    return success_action_result(pid_loop.status())
+
+
+def stop_pid_loop(loop_id: int) -> ActionResult[PidStatus]:
+    """
+    Returns the result of stopping and removing a given PID loop along with its final status, PWM of its output pin
+    is stopped and DIGITAL outputs are driven low.
+    """
+
+    with pid_loops_lock:
+        pid_loop = pid_loops.pop(loop_id, None)
+        if not pid_loop:
+            return error_action_result(PidMessage.ERROR_NOT_FOUND__LOOP_ID__.format(loop_id=loop_id))
+
+        pid_loop.stop()
+        owner = __pid_loop_owner(loop_id)
+        output = pid_loop.configuration.output
+        if output.mode is PidOutputMode.PWM:
+            # PWM may have been stopped already, which is why the loop ended
+            stop_pwm(output.pinId, owner)
+        elif pin_owners.owner(output.pinId) is None:
+            # Loops that ended on their own may have lost their pin to another owner
+            with pin_locks.write(output.pinId):
+                try:
+                    pin_cache.pin(output.pinId).state = 0
+                except PinError:
+                    pass
+                pin_cache.invalidate(output.pinId)
+        pin_owners.release(owner, [output.pinId])
+
+    return success_action_result(pid_loop.status())
+
+
+def __pid_loop_owner(loop_id: int) -> str:
+    return f'PID loop `{loop_id}`'
+
+
+def __process_variable_reader(source: PidSource) -> Callable[[], float]:
+    if source.type is PidSourceType.SENSOR:
+        return partial(__read_sensor, source.sensorId)
+    if source.type is PidSourceType.ADC:
+        return partial(__read_adc_channel, source.channel)
+    return partial(__read_pulse_counter, source.pinId)
+
+
+def __read_sensor(sensor_id: str) -> float:
+    sensor = get_sensor_reader().read_sensor(sensor_id)
+    if sensor.value is None:
+        raise OSError(sensor.error)
+    return sensor.value.quantity
+
+
+def __read_adc_channel(channel: int) -> float:
+    # The sampler is looked up on every read since it is replaced when sampling restarts
+    adc_sampler = endrpi.actions.adc.adc_sampler
+    if not adc_sampler:
+        raise RuntimeError(AdcMessage.ERROR_NOT_RUNNING.value)
+    try:
+        values = adc_sampler.read(channel, count=1).values
+    except KeyError:
+        raise RuntimeError(AdcMessage.ERROR_CHANNEL_NOT_SAMPLED__CHANNEL__.format(channel=channel))
+    if not values:
+        raise RuntimeError(AdcMessage.ERROR_NOT_RUNNING.value)
+    return values[-1]
+
+
+def __read_pulse_counter(pin_id: RaspberryPiPinIds) -> float:
+    pulse_counter_status = pulse_counters.status(pin_id)
+    if not pulse_counter_status:
+        raise RuntimeError(PinMessage.ERROR_COUNTER_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id))
+    # Stopped pins have no frequency
+    return pulse_counter_status.frequency or 0.0
+
+
+def __digital_output_writer(pin_id: RaspberryPiPinIds, threshold: float) -> Callable[[float], None]:
+    gpiozero_pin = pin_cache.pin(pin_id)
+    state: Optional[bool] = None
+
+    def write_output(output: float) -> None:
+        nonlocal state
+        if (output >= threshold) is state:
+            return
+        state = output >= threshold
+        with pin_locks.write(pin_id):
+            gpiozero_pin.state = state
+            pin_cache.invalidate(pin_id)
+
+    return write_output
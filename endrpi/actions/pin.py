@@ -12,22 +12,83 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from typing import Dict, List
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 
-from gpiozero import Device, PinUnsupported
+from gpiozero import Device, Pin, PinUnsupported, PinError
 from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 
+from endrpi.config.board import get_board
+from endrpi.config.logging import get_logger
+from endrpi.config.pin_factory import get_bulk_pin_access, get_function_registers
+from endrpi.config.pin_snapshot import get_pin_snapshot
 from endrpi.model.action_result import ActionResult, error_action_result, success_action_result
 from endrpi.model.message import MessageData, PinMessage
-from endrpi.model.pin import PinConfiguration, RaspberryPiPinIds, PinIo, PinPull, PinConfigurationMap
+from endrpi.model.pin import PinConfiguration, RaspberryPiPinIds, PinIo, PinPull, PinConfigurationMap, PinEdge, \
+    PinEdgeEvent, PinUpdateErrorData, PinUpdateOutcome, PinUpdateOutcomeMap, PinUpdateStatus, PwmConfiguration, \
+    PwmStatus, PwmStatusMap, PulseCounterConfiguration, PulseCounterStatus, PulseCounterStatusMap, \
+    PinEdgeFilterConfiguration, PinEdgeFilterStatus, PinEdgeFilterStatusMap
+from endrpi.utils.gpio_registers import BulkPinAccess, GPIO_BANK_PIN_COUNT, GPIO_FUNCTION_INPUT, GPIO_FUNCTION_OUTPUT, \
+    GPIO_PULL_FLOATING, GPIO_PULL_UP, GPIO_PULL_DOWN
+from endrpi.utils.pin_cache import PinCache
+from endrpi.utils.pin_edge import PinEdgeListener, PinEdgeMonitor
+from endrpi.utils.pin_lock import PinLocks
+from endrpi.utils.pin_owner import PinInUse, PinOwners
+from endrpi.utils.pulse_counter import PulseCounters
+from endrpi.utils.pwm import PwmOutputs, PwmChannelInUse
+
+# Pin handles and configuration shadows shared by every pin action
+pin_cache = PinCache(lambda: Device.pin_factory)
+
+# Readers/writer lock of every pin, operations on the same pin are serialized while different pins run in parallel
+pin_locks = PinLocks()
+
+# Owners of the pins driven from background threads (i.e. running sequences), which no other operation may change
+pin_owners = PinOwners()
+
+# Edge callbacks of every pin shared by every edge event stream and pulse counter
+pin_edge_monitor = PinEdgeMonitor(pin_locks)
+
+# Pulse counters of every pin, edges are timed with the ticks of the current pin factory
+pulse_counters = PulseCounters(pin_edge_monitor,
+                               lambda later, earlier: Device.pin_factory.ticks_diff(later, earlier),
+                               lambda: Device.pin_factory.ticks())
+
+# PWM signals of every pin, software PWM pins are driven through the cached pin handles
+pwm_outputs = PwmOutputs(pin_cache.pin, gpio_registers=get_function_registers)
+
+# Pin io and pull of GPIO register values
+REGISTER_PIN_IOS = {GPIO_FUNCTION_INPUT: PinIo.INPUT, GPIO_FUNCTION_OUTPUT: PinIo.OUTPUT}
+REGISTER_PIN_PULLS = {GPIO_PULL_FLOATING: PinPull.FLOATING, GPIO_PULL_UP: PinPull.UP, GPIO_PULL_DOWN: PinPull.DOWN}
+
+
+def unknown_pin_result(pin_ids: Iterable[RaspberryPiPinIds]) -> Optional[ActionResult]:
+    """Returns an error result for the first given pin the board doesn't expose, or none if it exposes every pin."""
+
+    board_pins = get_board().pins
+    for pin_id in pin_ids:
+        if pin_id not in board_pins:
+            return error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=pin_id))
+
+    return None
 
 
 def read_pin_configurations(pin_ids: List[RaspberryPiPinIds]) -> ActionResult[PinConfigurationMap]:
     """Returns the result of attempting to read the :class:`~endrpi.model.pin.PinConfiguration` of every pin.
 
     .. note:: A read error on a single pin will cause an error result.
+
+    .. note:: Every pin is read from a single snapshot when the pin backend has bulk pin access.
     """
 
+    unknown_pin_action_result = unknown_pin_result(pin_ids)
+    if unknown_pin_action_result:
+        return unknown_pin_action_result
+
+    bulk_pin_access = get_bulk_pin_access()
+    if bulk_pin_access:
+        return read_register_pin_configurations(bulk_pin_access, pin_ids)
+
     pin_state_map: Dict[RaspberryPiPinIds, PinConfiguration] = {}
 
     for pin_id in pin_ids:
@@ -40,27 +101,99 @@ def read_pin_configurations(pin_ids: List[RaspberryPiPinIds]) -> ActionResult[Pi
     return success_action_result(pin_state_map)
 
 
+def read_register_pin_configurations(bulk_pin_access: BulkPinAccess,
+                                     pin_ids: List[RaspberryPiPinIds]) -> ActionResult[PinConfigurationMap]:
+    """
+    Returns the result of reading the :class:`~endrpi.model.pin.PinConfiguration` of every pin from a single
+    :class:`~endrpi.utils.gpio_registers.GpioBank` snapshot.
+
+    .. note:: Pulls are read from gpiozero on chips whose pull registers can't be read.
+
+    .. note:: The snapshot is taken holding the read lock of every pin, so no pin is read halfway through an update.
+    """
+
+    with pin_locks.read(*pin_ids):
+        gpio_bank = bulk_pin_access.read_bank()
+        pin_configuration_map: Dict[RaspberryPiPinIds, PinConfiguration] = {}
+
+        for pin_id in pin_ids:
+            pin_number = pin_id.bcm_number
+
+            # Pins beyond the first bank (i.e. on Compute Modules) aren't covered by the registers
+            if pin_number >= GPIO_BANK_PIN_COUNT:
+                pin_configuration_action_result = read_pin_configuration(pin_id)
+                if not pin_configuration_action_result.success:
+                    return pin_configuration_action_result
+                pin_configuration_map[pin_id] = pin_configuration_action_result.data
+                continue
+
+            # Hardware PWM pins are set to an alternate function, so every PWM pin is read from its PWM status
+            pwm_status = pwm_outputs.status(pin_id)
+            if pwm_status:
+                pin_configuration_map[pin_id] = __pwm_pin_configuration(pwm_status)
+                continue
+
+            pin_io = REGISTER_PIN_IOS.get(gpio_bank.function(pin_number))
+            if pin_io is None:
+                return error_action_result(PinMessage.ERROR_ALTERNATE_FUNCTION__PIN_ID__.format(pin_id=pin_id))
+
+            register_pull = gpio_bank.pull(pin_number)
+            if register_pull is None:
+                pin_pull = PinPull(Device.pin_factory.pin(pin_id).pull.upper())
+            else:
+                pin_pull = REGISTER_PIN_PULLS.get(register_pull)
+
+            pin_configuration_map[pin_id] = PinConfiguration(io=pin_io,
+                                                             state=gpio_bank.level(pin_number),
+                                                             pull=pin_pull)
+
+    return success_action_result(pin_configuration_map)
+
+
 def read_pin_configuration(pin_id: RaspberryPiPinIds) -> ActionResult[PinConfiguration]:
-    """Returns the result of attempting to read the :class:`~endrpi.model.pin.PinConfiguration` of a given pin."""
+    """
+    Returns the result of attempting to read the :class:`~endrpi.model.pin.PinConfiguration` of a given pin.
 
-    try:
-        gpiozero_pin = Device.pin_factory.pin(pin_id)
-    except PinUnsupported:
-        return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+    .. note::
+        Pins with a known configuration are answered from the :class:`~endrpi.utils.pin_cache.PinCache` shadow, only
+        the state of input pins is read from the pin. The state of PWM pins is their duty cycle.
+    """
 
-    # Uppercase both gpiozero string values because pin enumerations are uppercase
-    gpiozero_pin_function = gpiozero_pin.function.upper()
-    gpiozero_pin_pull = gpiozero_pin.pull.upper()
+    unknown_pin_action_result = unknown_pin_result([pin_id])
+    if unknown_pin_action_result:
+        return unknown_pin_action_result
 
-    pin_io = PinIo(gpiozero_pin_function)
-    pin_state = gpiozero_pin.state
-    pin_pull = PinPull(gpiozero_pin_pull)
+    with pin_locks.read(pin_id):
+        pwm_status = pwm_outputs.status(pin_id)
+        if pwm_status:
+            return success_action_result(__pwm_pin_configuration(pwm_status))
 
-    try:
-        pin_configuration = PinConfiguration(io=pin_io, state=pin_state, pull=pin_pull)
+        try:
+            gpiozero_pin = pin_cache.pin(pin_id)
+        except PinUnsupported:
+            return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+
+        shadow_configuration = pin_cache.shadow(pin_id)
+        if shadow_configuration:
+            if shadow_configuration.io is PinIo.OUTPUT:
+                return success_action_result(shadow_configuration)
+            return success_action_result(shadow_configuration.copy(update={'state': gpiozero_pin.state}))
+
+        # Uppercase both gpiozero string values because pin enumerations are uppercase
+        gpiozero_pin_function = gpiozero_pin.function.upper()
+        gpiozero_pin_pull = gpiozero_pin.pull.upper()
+
+        pin_io = PinIo(gpiozero_pin_function)
+        pin_state = gpiozero_pin.state
+        pin_pull = PinPull(gpiozero_pin_pull)
+
+        try:
+            pin_configuration = PinConfiguration(io=pin_io, state=pin_state, pull=pin_pull)
+        except ValidationError:
+            return error_action_result(PinMessage.ERROR_VALIDATION)
+
+        pin_cache.update_shadow(pin_id, pin_configuration)
         return success_action_result(pin_configuration)
-    except ValidationError:
-        return error_action_result(PinMessage.ERROR_VALIDATION)
 
 
 def update_pin_configuration(pin_id: RaspberryPiPinIds,
@@ -75,23 +208,496 @@ def update_pin_configuration(pin_id: RaspberryPiPinIds,
         Ignores 'pull' when 'io' is set to OUTPUT.
     """
 
-    try:
-        gpiozero_pin = Device.pin_factory.pin(pin_id)
-    except PinUnsupported:
-        return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+    unknown_pin_action_result = unknown_pin_result([pin_id])
+    if unknown_pin_action_result:
+        return unknown_pin_action_result
+
+    with pin_locks.write(pin_id):
+        try:
+            gpiozero_pin = pin_cache.pin(pin_id)
+        except PinUnsupported:
+            return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+
+        try:
+            pin_owners.check(pin_id)
+        except PinInUse as error:
+            return __pin_in_use_result(error)
+
+        if pwm_outputs.status(pin_id):
+            return error_action_result(PinMessage.ERROR_PWM_RUNNING__PIN_ID__.format(pin_id=pin_id))
+
+        if pin_configuration.io is PinIo.INPUT:
+            if not pin_configuration.pull:
+                return error_action_result(PinMessage.ERROR_NO_INPUT_PULL)
+            # Don't set pin output state on an input pin
+            gpiozero_pin.function = pin_configuration.io.lower()
+            gpiozero_pin.pull = pin_configuration.pull.lower()
+        else:
+            if pin_configuration.state is None:
+                return error_action_result(PinMessage.ERROR_NO_OUTPUT_STATE)
+            # Don't set pin pull on an output pin
+            gpiozero_pin.function = pin_configuration.io.lower()
+            gpiozero_pin.state = pin_configuration.state
+
+        __update_pin_shadow(pin_id, pin_configuration, gpiozero_pin.state)
+        __persist_pin_configurations({pin_id: pin_configuration})
+
+    message_data = MessageData(message=PinMessage.SUCCESS_UPDATED__PIN_ID__.format(pin_id=pin_id))
+    return success_action_result(message_data)
 
+
+def __update_pin_shadow(pin_id: RaspberryPiPinIds, pin_configuration: PinConfiguration, pin_state: float) -> None:
+    # Output pins keep their previous pull, which is only known from an earlier shadow
     if pin_configuration.io is PinIo.INPUT:
-        if not pin_configuration.pull:
-            return error_action_result(PinMessage.ERROR_NO_INPUT_PULL)
-        # Don't set pin output state on an input pin
-        gpiozero_pin.function = pin_configuration.io.lower()
-        gpiozero_pin.pull = pin_configuration.pull.lower()
+        pin_cache.update_shadow(pin_id, PinConfiguration(io=PinIo.INPUT, pull=pin_configuration.pull))
+        return
+
+    shadow_configuration = pin_cache.shadow(pin_id)
+    if shadow_configuration:
+        pin_cache.update_shadow(pin_id, PinConfiguration(io=PinIo.OUTPUT,
+                                                         state=pin_state,
+                                                         pull=shadow_configuration.pull))
     else:
-        if pin_configuration.state is None:
-            return error_action_result(PinMessage.ERROR_NO_OUTPUT_STATE)
-        # Don't set pin pull on an output pin
+        pin_cache.invalidate(pin_id)
+
+
+def update_pin_configurations(pin_configuration_map: PinConfigurationMap) -> ActionResult[PinUpdateOutcomeMap]:
+    """
+    Returns the result of updating the :class:`~endrpi.model.pin.PinConfiguration` of every pin in a given map along
+    with the :class:`~endrpi.model.pin.PinUpdateOutcome` of every pin.
+
+    .. note::
+        Every configuration is validated before any pin is updated, a single invalid configuration results in an
+        error without updating any pin. Once validated, an update error on a single pin doesn't stop the remaining
+        updates.
+
+    .. note::
+        When the pin backend has bulk pin access the output states are written together
+        (see: :func:`update_register_pin_configurations`).
+    """
+
+    with pin_locks.write(*pin_configuration_map):
+        gpiozero_pins = {}
+        outcomes: PinUpdateOutcomeMap = {}
+        board_pins = set(get_board().pins)
+        for pin_id, pin_configuration in pin_configuration_map.items():
+            error_message = __validate_pin_configuration(pin_configuration)
+            if not error_message and pin_id not in board_pins:
+                error_message = PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=pin_id)
+            owner = pin_owners.owner(pin_id)
+            if not error_message and owner:
+                error_message = PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=pin_id, owner=owner)
+            if not error_message and pwm_outputs.status(pin_id):
+                error_message = PinMessage.ERROR_PWM_RUNNING__PIN_ID__.format(pin_id=pin_id)
+            if not error_message:
+                try:
+                    gpiozero_pins[pin_id] = pin_cache.pin(pin_id)
+                except PinUnsupported:
+                    error_message = PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id)
+            if error_message:
+                outcomes[pin_id] = PinUpdateOutcome(status=PinUpdateStatus.INVALID, message=error_message)
+
+        if outcomes:
+            for pin_id in pin_configuration_map:
+                if pin_id not in outcomes:
+                    message = PinMessage.SKIPPED_UPDATE__PIN_ID__.format(pin_id=pin_id)
+                    outcomes[pin_id] = PinUpdateOutcome(status=PinUpdateStatus.SKIPPED, message=message)
+            return __pin_update_error_result(PinMessage.ERROR_INVALID_CONFIGURATIONS, outcomes)
+
+        bulk_pin_access = get_bulk_pin_access()
+        if bulk_pin_access and all(pin_id.bcm_number < GPIO_BANK_PIN_COUNT for pin_id in pin_configuration_map):
+            outcomes = update_register_pin_configurations(bulk_pin_access, gpiozero_pins, pin_configuration_map)
+        else:
+            for pin_id, pin_configuration in pin_configuration_map.items():
+                outcomes[pin_id] = __apply_pin_configuration(pin_id, gpiozero_pins[pin_id], pin_configuration)
+
+        __persist_pin_configurations({pin_id: pin_configuration
+                                      for pin_id, pin_configuration in pin_configuration_map.items()
+                                      if outcomes[pin_id].status is PinUpdateStatus.UPDATED})
+
+    if any(outcome.status is not PinUpdateStatus.UPDATED for outcome in outcomes.values()):
+        return __pin_update_error_result(PinMessage.ERROR_UPDATES_FAILED, outcomes)
+
+    return success_action_result(outcomes)
+
+
+def update_register_pin_configurations(bulk_pin_access: BulkPinAccess,
+                                       gpiozero_pins: Dict[RaspberryPiPinIds, Pin],
+                                       pin_configuration_map: PinConfigurationMap) -> PinUpdateOutcomeMap:
+    """
+    Returns the outcome of updating every pin of an already validated pin configuration map with the output states of
+    every pin grouped into a single bulk level write.
+
+    .. note::
+        Output latches are written before input pins are switched to outputs so they never glitch to a stale state.
+    """
+
+    set_mask = 0
+    clear_mask = 0
+    for pin_id, pin_configuration in pin_configuration_map.items():
+        if pin_configuration.io is PinIo.OUTPUT:
+            if pin_configuration.state:
+                set_mask |= 1 << pin_id.bcm_number
+            else:
+                clear_mask |= 1 << pin_id.bcm_number
+
+    bulk_pin_access.write_levels(set_mask, clear_mask)
+
+    outcomes: PinUpdateOutcomeMap = {}
+    for pin_id, pin_configuration in pin_configuration_map.items():
+        # The output state is already latched, only the function (and pull) is left to update
+        function_configuration = pin_configuration.copy(update={'state': None})
+        outcomes[pin_id] = __apply_pin_configuration(pin_id, gpiozero_pins[pin_id], function_configuration)
+        if pin_configuration.io is PinIo.OUTPUT and outcomes[pin_id].status is PinUpdateStatus.UPDATED:
+            __update_pin_shadow(pin_id, pin_configuration, float(bool(pin_configuration.state)))
+
+    return outcomes
+
+
+def __validate_pin_configuration(pin_configuration: PinConfiguration) -> Optional[str]:
+    # Input configurations must specify a pin pull, output configurations must specify a state
+    if pin_configuration.io is PinIo.INPUT and not pin_configuration.pull:
+        return PinMessage.ERROR_NO_INPUT_PULL
+    if pin_configuration.io is PinIo.OUTPUT and pin_configuration.state is None:
+        return PinMessage.ERROR_NO_OUTPUT_STATE
+    return None
+
+
+def __apply_pin_configuration(pin_id: RaspberryPiPinIds,
+                              gpiozero_pin: Pin,
+                              pin_configuration: PinConfiguration) -> PinUpdateOutcome:
+    # Output configurations without a state only update the pin function (i.e. after a latch register write)
+    try:
         gpiozero_pin.function = pin_configuration.io.lower()
-        gpiozero_pin.state = pin_configuration.state
+        if pin_configuration.io is PinIo.INPUT:
+            gpiozero_pin.pull = pin_configuration.pull.lower()
+        elif pin_configuration.state is not None:
+            gpiozero_pin.state = pin_configuration.state
+    except PinError:
+        pin_cache.invalidate(pin_id)
+        message = PinMessage.ERROR_UPDATE__PIN_ID__.format(pin_id=pin_id)
+        return PinUpdateOutcome(status=PinUpdateStatus.FAILED, message=message)
 
-    message_data = MessageData(message=PinMessage.SUCCESS_UPDATED__PIN_ID__.format(pin_id=pin_id))
+    if pin_configuration.state is not None or pin_configuration.io is PinIo.INPUT:
+        __update_pin_shadow(pin_id, pin_configuration, gpiozero_pin.state)
+
+    message = PinMessage.SUCCESS_UPDATED__PIN_ID__.format(pin_id=pin_id)
+    return PinUpdateOutcome(status=PinUpdateStatus.UPDATED, message=message)
+
+
+def __pin_update_error_result(message: str, outcomes: PinUpdateOutcomeMap) -> ActionResult:
+    return ActionResult(success=False, data=None, error=PinUpdateErrorData(message=message, pins=outcomes))
+
+
+def __persist_pin_configurations(pin_configuration_map: PinConfigurationMap) -> None:
+    # Pins are already updated, so a snapshot write error is logged rather than failing the update
+    pin_snapshot = get_pin_snapshot()
+    if not pin_snapshot or not pin_configuration_map:
+        return
+    try:
+        pin_snapshot.update(pin_configuration_map)
+    except OSError as error:
+        get_logger().warning(f'Failed to write the pin configuration snapshot: {error}')
+
+
+def restore_pin_configurations() -> ActionResult[PinUpdateOutcomeMap]:
+    """
+    Returns the result of updating every pin to the configuration persisted in the pin configuration snapshot along
+    with the :class:`~endrpi.model.pin.PinUpdateOutcome` of every restored pin.
+
+    .. note::
+        Meant to run once the pin factory is configured and before any client connects, pins are updated together
+        the same way as :func:`update_pin_configurations`.
+    """
+
+    pin_snapshot = get_pin_snapshot()
+    if not pin_snapshot:
+        return success_action_result({})
+
+    try:
+        pin_configuration_map = pin_snapshot.load()
+    except (OSError, ValueError):
+        return error_action_result(PinMessage.ERROR_SNAPSHOT_READ__PATH__.format(path=pin_snapshot.path))
+
+    if not pin_configuration_map:
+        return success_action_result({})
+
+    return update_pin_configurations(pin_configuration_map)
+
+
+def read_pwm_statuses(pin_ids: List[RaspberryPiPinIds]) -> ActionResult[PwmStatusMap]:
+    """Returns the result of reading the :class:`~endrpi.model.pin.PwmStatus` of every given pin with PWM running."""
+
+    pwm_statuses = pwm_outputs.statuses()
+    return success_action_result({pin_id: pwm_statuses[pin_id] for pin_id in pin_ids if pin_id in pwm_statuses})
+
+
+def read_pwm_status(pin_id: RaspberryPiPinIds) -> ActionResult[PwmStatus]:
+    """Returns the result of reading the :class:`~endrpi.model.pin.PwmStatus` of a given pin."""
+
+    pwm_status = pwm_outputs.status(pin_id)
+    if not pwm_status:
+        return error_action_result(PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id))
+
+    return success_action_result(pwm_status)
+
+
+def update_pwm(pin_id: RaspberryPiPinIds,
+               pwm_configuration: PwmConfiguration,
+               owner: Optional[str] = None) -> ActionResult[PwmStatus]:
+    """
+    Returns the result of starting (or reconfiguring) PWM on a given pin with a given
+    :class:`~endrpi.model.pin.PwmConfiguration`, on behalf of a pin owner (i.e. the fan controller) or a client when
+    the owner is none.
+
+    .. note::
+        GPIO12/13/18/19 use hardware PWM when the sysfs PWM chip is available and the GPIO registers are mapped to
+        route the pin to its channel, every other pin uses software PWM.
+    """
+
+    unknown_pin_action_result = unknown_pin_result([pin_id])
+    if unknown_pin_action_result:
+        return unknown_pin_action_result
+
+    with pin_locks.write(pin_id):
+        try:
+            pin_owners.check(pin_id, owner)
+        except PinInUse as error:
+            return __pin_in_use_result(error)
+
+        try:
+            pwm_status = pwm_outputs.start(pin_id, pwm_configuration.frequency, pwm_configuration.dutyCycle)
+        except PinUnsupported:
+            return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+        except PwmChannelInUse:
+            return error_action_result(PinMessage.ERROR_PWM_CHANNEL_IN_USE__PIN_ID__.format(pin_id=pin_id))
+        except ValueError:
+            return error_action_result(PinMessage.ERROR_PWM_FREQUENCY__PIN_ID__.format(pin_id=pin_id))
+        except (PinError, OSError):
+            return error_action_result(PinMessage.ERROR_PWM__PIN_ID__.format(pin_id=pin_id))
+        finally:
+            pin_cache.invalidate(pin_id)
+
+    return success_action_result(pwm_status)
+
+
+def write_pwm_duty_cycles(duty_cycles: Dict[RaspberryPiPinIds, float]) -> ActionResult:
+    """
+    Returns the result of changing the duty cycle of every given pin with PWM running, without changing frequencies.
+
+    .. note::
+        Meant for high rate control loops (i.e. servos and LED dimming), every pin is checked for running PWM before
+        any duty cycle is written.
+    """
+
+    with pwm_outputs.lock:
+        for pin_id in duty_cycles:
+            if not pwm_outputs.status(pin_id):
+                return error_action_result(PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id))
+            try:
+                pin_owners.check(pin_id)
+            except PinInUse as error:
+                return __pin_in_use_result(error)
+
+        for pin_id, duty_cycle in duty_cycles.items():
+            try:
+                pwm_outputs.write_duty_cycle(pin_id, duty_cycle)
+            except (PinError, OSError):
+                return error_action_result(PinMessage.ERROR_PWM__PIN_ID__.format(pin_id=pin_id))
+
+    return success_action_result()
+
+
+def stop_pwm(pin_id: RaspberryPiPinIds, owner: Optional[str] = None) -> ActionResult[MessageData]:
+    """
+    Returns the result of stopping PWM on a given pin on behalf of a pin owner or a client when the owner is none,
+    software PWM pins are left as low outputs.
+    """
+
+    with pin_locks.write(pin_id):
+        try:
+            pin_owners.check(pin_id, owner)
+        except PinInUse as error:
+            return __pin_in_use_result(error)
+
+        try:
+            pwm_outputs.stop(pin_id)
+        except KeyError:
+            return error_action_result(PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id))
+        except (PinError, OSError):
+            return error_action_result(PinMessage.ERROR_PWM__PIN_ID__.format(pin_id=pin_id))
+        finally:
+            pin_cache.invalidate(pin_id)
+
+    message_data = MessageData(message=PinMessage.SUCCESS_PWM_STOPPED__PIN_ID__.format(pin_id=pin_id))
     return success_action_result(message_data)
+
+
+def __pwm_pin_configuration(pwm_status: PwmStatus) -> PinConfiguration:
+    return PinConfiguration(io=PinIo.OUTPUT, state=pwm_status.dutyCycle)
+
+
+def __pin_in_use_result(error: PinInUse) -> ActionResult:
+    return error_action_result(PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=error.pin_id, owner=error.owner))
+
+
+async def stream_pin_edge_events(pin_id: RaspberryPiPinIds,
+                                 edge: PinEdge,
+                                 queue_size: int) -> AsyncIterator[ActionResult[PinEdgeEvent]]:
+    """
+    Yields the result of every detected :class:`~endrpi.model.pin.PinEdgeEvent` of a given pin and edge until the
+    stream is closed.
+
+    .. note::
+        At most ``queue_size`` events are held while the consumer is busy, older events are dropped and counted by
+        the next event.
+    """
+
+    unknown_pin_action_result = unknown_pin_result([pin_id])
+    if unknown_pin_action_result:
+        yield unknown_pin_action_result
+        return
+
+    listener = PinEdgeListener(edge, queue_size)
+    try:
+        await run_in_threadpool(pin_edge_monitor.add_listener, pin_id, listener)
+    except PinUnsupported:
+        yield error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+        return
+    except (PinError, RuntimeError):
+        yield error_action_result(PinMessage.ERROR_EDGE_DETECTION__PIN_ID__.format(pin_id=pin_id))
+        return
+
+    try:
+        while True:
+            samples, dropped_samples = await listener.next_samples()
+            for sample in samples:
+                pin_edge_event = PinEdgeEvent(pin=pin_id,
+                                              edge=sample.edge,
+                                              state=sample.state,
+                                              timestamp=sample.timestamp,
+                                              droppedEvents=dropped_samples)
+                dropped_samples = 0
+                yield success_action_result(pin_edge_event)
+    finally:
+        await run_in_threadpool(pin_edge_monitor.remove_listener, pin_id, listener)
+
+
+def read_pulse_counters(pin_ids: List[RaspberryPiPinIds],
+                        reset: bool = False) -> ActionResult[PulseCounterStatusMap]:
+    """
+    Returns the result of reading the :class:`~endrpi.model.pin.PulseCounterStatus` of every given pin with a running
+    pulse counter, every counter is reset in the same step when requested.
+    """
+
+    with pulse_counters.lock:
+        pulse_counter_statuses = {pin_id: pulse_counters.status(pin_id, reset) for pin_id in pin_ids}
+    return success_action_result({pin_id: pulse_counter_status
+                                  for pin_id, pulse_counter_status in pulse_counter_statuses.items()
+                                  if pulse_counter_status})
+
+
+def read_pulse_counter(pin_id: RaspberryPiPinIds, reset: bool = False) -> ActionResult[PulseCounterStatus]:
+    """
+    Returns the result of reading the :class:`~endrpi.model.pin.PulseCounterStatus` of a given pin, the counter is
+    reset in the same step when requested so no pulse is lost between the read and the reset.
+    """
+
+    pulse_counter_status = pulse_counters.status(pin_id, reset)
+    if not pulse_counter_status:
+        return error_action_result(PinMessage.ERROR_COUNTER_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id))
+
+    return success_action_result(pulse_counter_status)
+
+
+def start_pulse_counter(pin_id: RaspberryPiPinIds,
+                        pulse_counter_configuration: PulseCounterConfiguration) -> ActionResult[PulseCounterStatus]:
+    """
+    Returns the result of starting (or restarting) the pulse counter of a given pin.
+
+    .. note::
+        The pin configuration is left unchanged, pulses are counted from edges detected by the pin factory.
+    """
+
+    unknown_pin_action_result = unknown_pin_result([pin_id])
+    if unknown_pin_action_result:
+        return unknown_pin_action_result
+
+    try:
+        with pin_locks.write(pin_id):
+            pulse_counter_status = pulse_counters.start(pin_id,
+                                                        pulse_counter_configuration.edge,
+                                                        pulse_counter_configuration.timeout)
+    except PinUnsupported:
+        return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+    except (PinError, RuntimeError):
+        return error_action_result(PinMessage.ERROR_EDGE_DETECTION__PIN_ID__.format(pin_id=pin_id))
+
+    return success_action_result(pulse_counter_status)
+
+
+def stop_pulse_counter(pin_id: RaspberryPiPinIds) -> ActionResult[PulseCounterStatus]:
+    """Returns the result of stopping the pulse counter of a given pin along with its final status."""
+
+    try:
+        with pin_locks.write(pin_id):
+            pulse_counter_status = pulse_counters.stop(pin_id)
+    except KeyError:
+        return error_action_result(PinMessage.ERROR_COUNTER_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id))
+
+    return success_action_result(pulse_counter_status)
+
+
+def read_pin_edge_filters() -> ActionResult[PinEdgeFilterStatusMap]:
+    """Returns the result of reading the :class:`~endrpi.model.pin.PinEdgeFilterStatus` of every filtered pin."""
+    return success_action_result(pin_edge_monitor.filter_statuses())
+
+
+def read_pin_edge_filter(pin_id: RaspberryPiPinIds) -> ActionResult[PinEdgeFilterStatus]:
+    """Returns the result of reading the :class:`~endrpi.model.pin.PinEdgeFilterStatus` of a given pin."""
+
+    pin_edge_filter_status = pin_edge_monitor.filter_status(pin_id)
+    if not pin_edge_filter_status:
+        return error_action_result(PinMessage.ERROR_FILTER_NOT_SET__PIN_ID__.format(pin_id=pin_id))
+
+    return success_action_result(pin_edge_filter_status)
+
+
+def update_pin_edge_filter(pin_id: RaspberryPiPinIds,
+                           configuration: PinEdgeFilterConfiguration) -> ActionResult[PinEdgeFilterStatus]:
+    """
+    Returns the result of setting (or replacing) the edge filter of a given pin.
+
+    .. note::
+        The filter applies to every edge event stream and pulse counter of the pin, including ones started later.
+    """
+
+    unknown_pin_action_result = unknown_pin_result([pin_id])
+    if unknown_pin_action_result:
+        return unknown_pin_action_result
+
+    try:
+        with pin_locks.write(pin_id):
+            pin_edge_monitor.set_filter(pin_id, configuration)
+    except PinUnsupported:
+        return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+    except (PinError, RuntimeError):
+        return error_action_result(PinMessage.ERROR_EDGE_DETECTION__PIN_ID__.format(pin_id=pin_id))
+
+    return success_action_result(pin_edge_monitor.filter_status(pin_id))
+
+
+def remove_pin_edge_filter(pin_id: RaspberryPiPinIds) -> ActionResult[PinEdgeFilterStatus]:
+    """Returns the result of removing the edge filter of a given pin along with its final status."""
+
+    with pin_locks.write(pin_id):
+        pin_edge_filter_status = pin_edge_monitor.filter_status(pin_id)
+        if not pin_edge_filter_status:
+            return error_action_result(PinMessage.ERROR_FILTER_NOT_SET__PIN_ID__.format(pin_id=pin_id))
+
+        try:
+            pin_edge_monitor.set_filter(pin_id, None)
+        except (PinError, RuntimeError):
+            return error_action_result(PinMessage.ERROR_EDGE_DETECTION__PIN_ID__.format(pin_id=pin_id))
+
+    return success_action_result(pin_edge_filter_status)
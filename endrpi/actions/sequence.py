@@ -0,0 +1,175 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gpiozero import Pin, PinError, PinUnsupported
+
+from endrpi.actions.pin import pin_cache, pin_locks, pin_owners, pwm_outputs, unknown_pin_result
+from endrpi.config.pin_factory import get_bulk_pin_access
+from endrpi.model.action_result import ActionResult, error_action_result, success_action_result
+from endrpi.model.message import PinMessage, SequenceMessage
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.model.sequence import Sequence, SequenceStatus
+from endrpi.utils.gpio_registers import BulkPinAccess, GPIO_BANK_PIN_COUNT
+from endrpi.utils.pin_owner import PinInUse
+from endrpi.utils.sequence import SequencePlayer, SequenceWrite, NANOSECONDS_PER_MICROSECOND
+
+# Number of finished sequences whose status is kept after they finish
+SEQUENCE_HISTORY_SIZE = 16
+
+# Seconds a cancel waits for the playback thread to stop, the sequence keeps its pins until it does
+SEQUENCE_CANCEL_TIMEOUT = 1.0
+
+# Sequence players by sequence id, in the order they were started
+sequence_players: Dict[int, SequencePlayer] = OrderedDict()
+sequence_ids = itertools.count(1)
+sequence_players_lock = threading.Lock()
+
+
+def start_sequence(sequence: Sequence) -> ActionResult[SequenceStatus]:
+    """
+    Returns the result of setting every pin of a given :class:`~endrpi.model.sequence.Sequence` as an output and
+    starting its playback on a dedicated thread.
+
+    .. note::
+        Steps of pins in the same bank are written through the set and clear registers when the GPIO registers are
+        mapped, steps with a delay of 0 are then written together in a single register write.
+
+    .. note::
+        Pins are owned by the sequence while it plays, so no other operation can change them until it finishes or is
+        cancelled.
+    """
+
+    pin_ids = list(dict.fromkeys(step.pin for step in sequence.steps))
+    unknown_pin_action_result = unknown_pin_result(pin_ids)
+    if unknown_pin_action_result:
+        return unknown_pin_action_result
+
+    with pin_locks.write(*pin_ids), sequence_players_lock:
+        for pin_id in pin_ids:
+            try:
+                pin_owners.check(pin_id)
+            except PinInUse as error:
+                message = PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=error.pin_id, owner=error.owner)
+                return error_action_result(message)
+            if pwm_outputs.status(pin_id):
+                return error_action_result(PinMessage.ERROR_PWM_RUNNING__PIN_ID__.format(pin_id=pin_id))
+
+        gpiozero_pins: Dict[RaspberryPiPinIds, Pin] = {}
+        for pin_id in pin_ids:
+            try:
+                gpiozero_pins[pin_id] = pin_cache.pin(pin_id)
+                gpiozero_pins[pin_id].function = 'output'
+            except PinUnsupported:
+                return error_action_result(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id))
+            except PinError:
+                return error_action_result(SequenceMessage.ERROR_OUTPUT__PIN_ID__.format(pin_id=pin_id))
+            # Output states change on the playback thread, so the pin is read from the pin from now on
+            pin_cache.invalidate(pin_id)
+
+        # Pins beyond the first bank aren't covered by the registers
+        bulk_pin_access = get_bulk_pin_access()
+        if any(pin_id.bcm_number >= GPIO_BANK_PIN_COUNT for pin_id in pin_ids):
+            bulk_pin_access = None
+
+        writes, loop_duration = __schedule_sequence_writes(sequence, gpiozero_pins, bulk_pin_access)
+        player = SequencePlayer(next(sequence_ids), pin_ids, writes, loop_duration, sequence.loops)
+        pin_owners.claim(f'sequence `{player.sequence_id}`', pin_ids, lambda: player.running)
+        __add_sequence_player(player)
+        player.start()
+
+    return success_action_result(player.status())
+
+
+def read_sequence_statuses() -> ActionResult[List[SequenceStatus]]:
+    """Returns the result of reading the :class:`~endrpi.model.sequence.SequenceStatus` of every known sequence."""
+    return success_action_result([player.status() for player in list(sequence_players.values())])
+
+
+def read_sequence_status(sequence_id: int) -> ActionResult[SequenceStatus]:
+    """Returns the result of reading the :class:`~endrpi.model.sequence.SequenceStatus` of a given sequence."""
+
+    player = sequence_players.get(sequence_id)
+    if not player:
+        return error_action_result(SequenceMessage.ERROR_NOT_FOUND__SEQUENCE_ID__.format(sequence_id=sequence_id))
+
+    return success_action_result(player.status())
+
+
+def cancel_sequence(sequence_id: int) -> ActionResult[SequenceStatus]:
+    """
+    Returns the result of cancelling a given sequence, pins keep the last state written by the sequence.
+
+    .. note::
+        Cancelling a finished sequence returns its status unchanged. The playback thread is waited on for at most
+        :data:`SEQUENCE_CANCEL_TIMEOUT`, a sequence that hasn't stopped by then is still RUNNING in the status.
+    """
+
+    player = sequence_players.get(sequence_id)
+    if not player:
+        return error_action_result(SequenceMessage.ERROR_NOT_FOUND__SEQUENCE_ID__.format(sequence_id=sequence_id))
+
+    player.cancel(SEQUENCE_CANCEL_TIMEOUT)
+    return success_action_result(player.status())
+
+
+def __schedule_sequence_writes(sequence: Sequence,
+                               gpiozero_pins: Dict[RaspberryPiPinIds, Pin],
+                               bulk_pin_access: Optional[BulkPinAccess]) -> Tuple[List[SequenceWrite], int]:
+    # Steps are grouped by their offset from the start of the loop, every group is a single write
+    groups: List[Tuple[int, Dict[RaspberryPiPinIds, int]]] = []
+    offset = 0
+    for step in sequence.steps:
+        if not groups or groups[-1][0] != offset:
+            groups.append((offset, {}))
+        groups[-1][1][step.pin] = step.state
+        offset += step.delay * NANOSECONDS_PER_MICROSECOND
+
+    writes = []
+    for group_offset, pin_states in groups:
+        if bulk_pin_access:
+            set_mask = sum(1 << pin_id.bcm_number for pin_id, state in pin_states.items() if state)
+            clear_mask = sum(1 << pin_id.bcm_number for pin_id, state in pin_states.items() if not state)
+            writes.append(SequenceWrite(group_offset, __register_write(bulk_pin_access, set_mask, clear_mask)))
+        else:
+            pin_writes = tuple((gpiozero_pins[pin_id], state) for pin_id, state in pin_states.items())
+            writes.append(SequenceWrite(group_offset, __pin_write(pin_writes)))
+
+    return writes, offset
+
+
+def __register_write(bulk_pin_access: BulkPinAccess, set_mask: int, clear_mask: int) -> Callable[[], None]:
+    def write() -> None:
+        bulk_pin_access.write_levels(set_mask, clear_mask)
+    return write
+
+
+def __pin_write(pin_writes: Tuple[Tuple[Pin, int], ...]) -> Callable[[], None]:
+    def write() -> None:
+        for gpiozero_pin, state in pin_writes:
+            gpiozero_pin.state = state
+    return write
+
+
+def __add_sequence_player(player: SequencePlayer) -> None:
+    sequence_players[player.sequence_id] = player
+
+    # Forget the oldest finished sequences beyond the history size, running sequences are always kept
+    finished_ids = [sequence_id for sequence_id, player in sequence_players.items() if not player.running]
+    for sequence_id in finished_ids[:max(0, len(finished_ids) - SEQUENCE_HISTORY_SIZE)]:
+        del sequence_players[sequence_id]
@@ -15,19 +15,22 @@
 import datetime
 import platform as system_platform
 import re
-from typing import Dict, Callable, Union
+from typing import Dict, Callable, List, Union
 
 from pydantic import ValidationError
 
+from endrpi.config.one_wire import get_one_wire_poller
+from endrpi.config.sensors import get_sensor_reader
 from endrpi.model.action_result import ActionResult, error_action_result, success_action_result
 from endrpi.model.frequency import Frequency
 from endrpi.model.measurement import Measurement, TemperatureUnit, UnitPrefix, InformationUnit, FrequencyUnit
 from endrpi.model.memory import Memory
 from endrpi.model.message import PlatformMessage, TemperatureMessage, \
-    ThrottleMessage, UpTimeMessage, FrequencyMessage, MemoryMessage, SystemMessage
+    ThrottleMessage, UpTimeMessage, FrequencyMessage, MemoryMessage, SystemMessage, SensorsMessage
 from endrpi.model.platform import Platform, OperatingSystem
+from endrpi.model.sensors import SensorKind, Sensors
 from endrpi.model.system import System
-from endrpi.model.temperature import Temperature
+from endrpi.model.temperature import OneWireTemperature, Temperature
 from endrpi.model.throttle import Throttle
 from endrpi.model.up_time import UpTime
 from endrpi.utils.bitwise import is_bit_set
@@ -102,13 +105,62 @@ def read_temperature() -> ActionResult[Temperature]:
     temperature_celsius = temperature_number / 1000
     system_on_chip_temperature = Measurement(quantity=temperature_celsius, unitOfMeasurement=TemperatureUnit.CELSIUS)
 
+    # 1-Wire sensors are only read from the cache of the poller, a conversion takes too long to wait for
+    one_wire_poller = get_one_wire_poller()
+    one_wire_temperatures = one_wire_poller.temperatures() if one_wire_poller else []
+    sensors = get_sensor_reader().read(SensorKind.TEMPERATURE).sensors
+
     try:
-        temperature = Temperature(systemOnChip=system_on_chip_temperature)
+        temperature = Temperature(systemOnChip=system_on_chip_temperature,
+                                  oneWire=one_wire_temperatures,
+                                  sensors=sensors)
         return success_action_result(temperature)
     except ValidationError:
         return error_action_result(TemperatureMessage.ERROR_VALIDATION)
 
 
+def read_one_wire_temperatures() -> ActionResult[List[OneWireTemperature]]:
+    """
+    Returns the result of reading the cached :class:`endrpi.model.temperature.OneWireTemperature` of every 1-Wire
+    sensor.
+    """
+
+    one_wire_poller = get_one_wire_poller()
+    if not one_wire_poller:
+        return error_action_result(TemperatureMessage.ERROR_ONE_WIRE_DISABLED)
+
+    return success_action_result(one_wire_poller.temperatures())
+
+
+def read_one_wire_temperature(sensor_id: str) -> ActionResult[OneWireTemperature]:
+    """
+    Returns the result of reading the cached :class:`endrpi.model.temperature.OneWireTemperature` of a given 1-Wire
+    sensor.
+    """
+
+    one_wire_poller = get_one_wire_poller()
+    if not one_wire_poller:
+        return error_action_result(TemperatureMessage.ERROR_ONE_WIRE_DISABLED)
+
+    one_wire_temperature = one_wire_poller.temperature(sensor_id)
+    if not one_wire_temperature:
+        return error_action_result(TemperatureMessage.ERROR_ONE_WIRE_NOT_FOUND__SENSOR_ID__.format(sensor_id=sensor_id))
+
+    return success_action_result(one_wire_temperature)
+
+
+def read_sensors() -> ActionResult[Sensors]:
+    """
+    Returns the result of reading the :class:`endrpi.model.sensors.Sensors` of every hwmon input and thermal zone
+    discovered on startup in a single batch.
+    """
+
+    try:
+        return success_action_result(get_sensor_reader().read())
+    except ValidationError:
+        return error_action_result(SensorsMessage.ERROR_VALIDATION)
+
+
 def read_throttle() -> ActionResult[Throttle]:
     """Returns the result of attempting to read :class:`endrpi.model.throttle.Throttle` data."""
 
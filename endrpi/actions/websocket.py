@@ -0,0 +1,697 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from enum import Enum
+from functools import lru_cache, partial
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from endrpi.actions.pin import read_pin_configurations, update_pin_configurations, stream_pin_edge_events, \
+    read_pwm_statuses, update_pwm, stop_pwm, write_pwm_duty_cycles, read_pulse_counters, start_pulse_counter, \
+    stop_pulse_counter, read_pin_edge_filters, update_pin_edge_filter, remove_pin_edge_filter
+from endrpi.actions.adc import start_adc, read_adc_status, stop_adc, read_adc_samples, stream_adc_samples
+from endrpi.actions.capture import start_capture, read_capture_statuses, cancel_capture
+from endrpi.actions.fan import start_fan, read_fan, stop_fan
+from endrpi.actions.i2c import read_i2c_blocks, write_i2c_blocks, read_i2c_poll, update_i2c_poll, stop_i2c_poll
+from endrpi.actions.pid import start_pid_loop, read_pid_loops, tune_pid_loop, stop_pid_loop
+from endrpi.actions.sequence import start_sequence, read_sequence_statuses, cancel_sequence
+from endrpi.actions.system import read_temperature, read_throttle, read_uptime, read_frequency, read_memory, \
+    read_one_wire_temperatures, read_one_wire_temperature, read_sensors
+from endrpi.model.action_result import ActionResult, error_action_result, success_action_result
+from endrpi.model.adc import AdcChip, AdcConfiguration, AdcSamples, ADC_CHIP_CHANNELS
+from endrpi.model.capture import CaptureConfiguration, CaptureState, CaptureTriggerCondition
+from endrpi.model.fan import FanConfiguration
+from endrpi.model.i2c import I2cBlockReads, I2cBlockWrites, I2cPollConfiguration
+from endrpi.model.message import WebSocketMessage
+from endrpi.model.measurement import UnitPrefix, FrequencyUnit, InformationUnit, TemperatureUnit, SensorUnit
+from endrpi.model.pid import PidConfiguration, PidOutputMode, PidSourceType, PidTuning
+from endrpi.model.pin import PinConfigurationMap, RaspberryPiPinIds, PinIo, PinPull, PinEdge, PinEdgeEvent, PwmMode, \
+    PwmStatusMap, PulseCounterStatusMap, PinEdgeFilterPolicy, PinEdgeFilterStatusMap
+from endrpi.model.sensors import SensorKind
+from endrpi.model.sequence import Sequence, SequenceState
+from endrpi.model.websocket import ReadPinConfigurationsParams, UpdatePinConfigurationsParams, \
+    WebSocketActionConcurrency, SubscriptionParams, WebSocketConnectionStatus, WebSocketOverflowPolicy, \
+    WebSocketFrameFormat, WEBSOCKET_SUBPROTOCOLS, WebSocketCapacity, ReadPwmParams, UpdatePwmParams, StopPwmParams, \
+    WritePwmDutyCyclesParams, CancelSequenceParams, CancelCaptureParams, ReadPulseCountersParams, \
+    StartPulseCountersParams, StopPulseCountersParams, UpdatePinEdgeFiltersParams, RemovePinEdgeFiltersParams, \
+    ReadAdcSamplesParams, ReadOneWireTemperatureParams, TunePidLoopParams, StopPidLoopParams
+from endrpi.config.websocket import WebSocketSettings, get_websocket_settings
+from endrpi.utils.broadcast import BroadcastTopic
+from endrpi.utils.websocket import WebSocketConnection, count_client_connections
+
+
+class WebSocketActionDefinition(NamedTuple):
+    """
+    Describes how a websocket action is executed.
+
+    .. note::
+        When :attr:`params_model` is set, the handler is called with the validated params model instance,
+        otherwise the handler is called without arguments.
+
+    .. note::
+        When :attr:`connection_handler` is set, the handler is given the
+        :class:`~endrpi.utils.websocket.WebSocketConnection` as its first argument.
+
+    .. note::
+        Only successful results of actions without params are cached.
+
+    .. note::
+        Actions without params marked :attr:`subscribable` are published as broadcast topics of the same name.
+
+    .. note::
+        Actions that aren't :attr:`acknowledged` only respond with errors (i.e. high rate streams).
+    """
+    handler: Callable[..., ActionResult]
+    description: str
+    params_model: Optional[Type[BaseModel]] = None
+    concurrency: WebSocketActionConcurrency = WebSocketActionConcurrency.EVENT_LOOP
+    cache_seconds: float = 0
+    connection_handler: bool = False
+    subscribable: bool = False
+    acknowledged: bool = True
+
+
+def read_pin_configurations_action(params: ReadPinConfigurationsParams) -> ActionResult:
+    """Returns the result of reading the pin configurations of the pins requested by websocket params."""
+    return read_pin_configurations(params.pins)
+
+
+def update_pin_configurations_action(params: UpdatePinConfigurationsParams) -> ActionResult:
+    """
+    Returns the result of updating the pin configurations requested by websocket params.
+
+    .. note::
+        Every pin configuration is validated before any pin is updated, errors carry the outcome of every pin.
+    """
+
+    pin_configuration_map: PinConfigurationMap = params.pins
+    if not pin_configuration_map or len(pin_configuration_map) <= 0:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_PIN_ID)
+
+    action_result = update_pin_configurations(pin_configuration_map)
+    if not action_result.success:
+        return action_result
+
+    return success_action_result(WebSocketMessage.SUCCESS_PIN_CONFIGS_UPDATED)
+
+
+def read_pwm_action(params: ReadPwmParams) -> ActionResult:
+    """Returns the result of reading the PWM statuses of the pins requested by websocket params."""
+    return read_pwm_statuses(params.pins)
+
+
+def update_pwm_action(params: UpdatePwmParams) -> ActionResult:
+    """
+    Returns the result of starting (or reconfiguring) PWM on the pins requested by websocket params.
+
+    .. note:: A PWM error on a single pin will stop the remaining pins.
+    """
+
+    if not params.pins:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_PIN_ID)
+
+    pwm_statuses: PwmStatusMap = {}
+    for pin_id, pwm_configuration in params.pins.items():
+        action_result = update_pwm(pin_id, pwm_configuration)
+        if not action_result.success:
+            return action_result
+        pwm_statuses[pin_id] = action_result.data
+
+    return success_action_result(pwm_statuses)
+
+
+def stop_pwm_action(params: StopPwmParams) -> ActionResult:
+    """Returns the result of stopping PWM on the pins requested by websocket params."""
+
+    if not params.pins:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_PIN_ID)
+
+    for pin_id in params.pins:
+        action_result = stop_pwm(pin_id)
+        if not action_result.success:
+            return action_result
+
+    return success_action_result(WebSocketMessage.SUCCESS_PWM_STOPPED)
+
+
+def write_pwm_duty_cycles_action(params: WritePwmDutyCyclesParams) -> ActionResult:
+    """Returns the result of changing the PWM duty cycles requested by websocket params."""
+
+    if not params.dutyCycles:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_PIN_ID)
+
+    return write_pwm_duty_cycles(params.dutyCycles)
+
+
+def cancel_sequence_action(params: CancelSequenceParams) -> ActionResult:
+    """Returns the result of cancelling the sequence requested by websocket params."""
+    return cancel_sequence(params.id)
+
+
+def cancel_capture_action(params: CancelCaptureParams) -> ActionResult:
+    """Returns the result of cancelling the capture requested by websocket params."""
+    return cancel_capture(params.id)
+
+
+def read_pulse_counters_action(params: ReadPulseCountersParams) -> ActionResult:
+    """Returns the result of reading (and optionally resetting) the pulse counters requested by websocket params."""
+    return read_pulse_counters(params.pins, params.reset)
+
+
+def start_pulse_counters_action(params: StartPulseCountersParams) -> ActionResult:
+    """
+    Returns the result of starting the pulse counters requested by websocket params.
+
+    .. note:: An error on a single pin will stop the remaining pins.
+    """
+
+    if not params.pins:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_PIN_ID)
+
+    pulse_counter_statuses: PulseCounterStatusMap = {}
+    for pin_id, pulse_counter_configuration in params.pins.items():
+        action_result = start_pulse_counter(pin_id, pulse_counter_configuration)
+        if not action_result.success:
+            return action_result
+        pulse_counter_statuses[pin_id] = action_result.data
+
+    return success_action_result(pulse_counter_statuses)
+
+
+def stop_pulse_counters_action(params: StopPulseCountersParams) -> ActionResult:
+    """Returns the result of stopping the pulse counters requested by websocket params along with their final status."""
+
+    if not params.pins:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_PIN_ID)
+
+    pulse_counter_statuses: PulseCounterStatusMap = {}
+    for pin_id in params.pins:
+        action_result = stop_pulse_counter(pin_id)
+        if not action_result.success:
+            return action_result
+        pulse_counter_statuses[pin_id] = action_result.data
+
+    return success_action_result(pulse_counter_statuses)
+
+
+def update_pin_edge_filters_action(params: UpdatePinEdgeFiltersParams) -> ActionResult:
+    """
+    Returns the result of setting the edge filters requested by websocket params.
+
+    .. note:: An error on a single pin will stop the remaining pins.
+    """
+
+    if not params.pins:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_PIN_ID)
+
+    pin_edge_filter_statuses: PinEdgeFilterStatusMap = {}
+    for pin_id, pin_edge_filter_configuration in params.pins.items():
+        action_result = update_pin_edge_filter(pin_id, pin_edge_filter_configuration)
+        if not action_result.success:
+            return action_result
+        pin_edge_filter_statuses[pin_id] = action_result.data
+
+    return success_action_result(pin_edge_filter_statuses)
+
+
+def remove_pin_edge_filters_action(params: RemovePinEdgeFiltersParams) -> ActionResult:
+    """Returns the result of removing the edge filters requested by websocket params along with their final status."""
+
+    if not params.pins:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_PIN_ID)
+
+    pin_edge_filter_statuses: PinEdgeFilterStatusMap = {}
+    for pin_id in params.pins:
+        action_result = remove_pin_edge_filter(pin_id)
+        if not action_result.success:
+            return action_result
+        pin_edge_filter_statuses[pin_id] = action_result.data
+
+    return success_action_result(pin_edge_filter_statuses)
+
+
+def read_adc_samples_action(params: ReadAdcSamplesParams) -> ActionResult:
+    """Returns the result of reading the ADC samples of the channel requested by websocket params."""
+    return read_adc_samples(params.channel, params.count, params.since)
+
+
+def tune_pid_loop_action(params: TunePidLoopParams) -> ActionResult:
+    """Returns the result of tuning the PID loop requested by websocket params."""
+    return tune_pid_loop(params.id, PidTuning(**params.dict(exclude={'id'})))
+
+
+def stop_pid_loop_action(params: StopPidLoopParams) -> ActionResult:
+    """Returns the result of stopping the PID loop requested by websocket params."""
+    return stop_pid_loop(params.id)
+
+
+def read_one_wire_temperature_action(params: ReadOneWireTemperatureParams) -> ActionResult:
+    """Returns the result of reading the cached temperature of the 1-Wire sensor requested by websocket params."""
+    return read_one_wire_temperature(params.sensorId)
+
+
+def subscribe_action(connection: WebSocketConnection, params: SubscriptionParams) -> ActionResult:
+    """
+    Returns the result of subscribing a websocket connection to the broadcast topics requested by websocket params.
+
+    .. note:: Every topic is validated before subscribing to any of them.
+    """
+
+    if not params.topics:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_TOPIC)
+
+    for topic_name in params.topics:
+        if topic_name not in connection.broadcast_hub.topics:
+            return error_action_result(WebSocketMessage.ERROR_UNKNOWN_TOPIC__TOPIC__.format(topic=topic_name))
+
+    for topic_name in params.topics:
+        connection.broadcast_hub.subscribe(topic_name, connection)
+
+    return success_action_result(WebSocketMessage.SUCCESS_SUBSCRIBED)
+
+
+def unsubscribe_action(connection: WebSocketConnection, params: SubscriptionParams) -> ActionResult:
+    """Returns the result of unsubscribing a websocket connection from the broadcast topics in websocket params."""
+
+    if not params.topics:
+        return error_action_result(WebSocketMessage.ERROR_MISSING_TOPIC)
+
+    for topic_name in params.topics:
+        connection.broadcast_hub.unsubscribe(topic_name, connection)
+
+    return success_action_result(WebSocketMessage.SUCCESS_UNSUBSCRIBED)
+
+
+def ping_action() -> ActionResult:
+    """Returns the result of an application level heartbeat (i.e. for clients that can't send ping frames)."""
+    return success_action_result(WebSocketMessage.SUCCESS_PONG)
+
+
+def stream_pin_edge_topic(pin_id: RaspberryPiPinIds, edge: PinEdge) -> AsyncIterator[ActionResult[PinEdgeEvent]]:
+    """Returns the edge event stream of a pin edge broadcast topic using the configured event queue size."""
+    return stream_pin_edge_events(pin_id, edge, queue_size=get_websocket_settings().edge_event_queue_size)
+
+
+def stream_adc_topic(channel: int) -> AsyncIterator[ActionResult[AdcSamples]]:
+    """Returns the decimated sample stream of an ADC channel broadcast topic, pushed once per broadcast interval."""
+    return stream_adc_samples(channel, interval=get_websocket_settings().broadcast_interval)
+
+
+def read_websocket_connections(connections: List[WebSocketConnection]) -> ActionResult[List[WebSocketConnectionStatus]]:
+    """
+    Returns the result of reading the :class:`~endrpi.model.websocket.WebSocketConnectionStatus` of every given
+    connection, ordered by connection id.
+    """
+
+    connection_statuses = [connection.status() for connection in sorted(connections, key=lambda c: c.id)]
+    return success_action_result(connection_statuses)
+
+
+def read_websocket_capacity(connections: List[WebSocketConnection],
+                            settings: WebSocketSettings,
+                            rejected_connections: int,
+                            evicted_connections: int) -> ActionResult[WebSocketCapacity]:
+    """
+    Returns the result of reading the :class:`~endrpi.model.websocket.WebSocketCapacity` of the given open
+    connections and connection limits.
+    """
+
+    websocket_capacity = WebSocketCapacity(
+        connections=len(connections),
+        maxConnections=settings.max_connections,
+        maxConnectionsPerClient=settings.max_connections_per_client,
+        clients=count_client_connections(connections),
+        rejectedConnections=rejected_connections,
+        evictedConnections=evicted_connections
+    )
+    return success_action_result(websocket_capacity)
+
+
+# Registry of every websocket action, the websocket action enumeration and documentation are generated from it
+# Note: Only append actions, their order is the index of compact frame formats
+# Note: System reads spawn processes so they are run in the thread pool to avoid blocking the event loop, as are pin
+# configuration, PWM and sequence actions which wait on the pin locks (or the PWM lock held during sysfs writes)
+WEBSOCKET_ACTIONS: Dict[str, WebSocketActionDefinition] = {
+    'READ_TEMPERATURE': WebSocketActionDefinition(
+        handler=read_temperature,
+        description='Reads the system on chip temperature along with the cached temperatures of 1-Wire sensors.',
+        concurrency=WebSocketActionConcurrency.THREAD_POOL,
+        subscribable=True
+    ),
+    'READ_THROTTLE': WebSocketActionDefinition(
+        handler=read_throttle,
+        description='Reads past and present throttling.',
+        concurrency=WebSocketActionConcurrency.THREAD_POOL,
+        cache_seconds=1,
+        subscribable=True
+    ),
+    'READ_UPTIME': WebSocketActionDefinition(
+        handler=read_uptime,
+        description='Reads the system uptime.',
+        concurrency=WebSocketActionConcurrency.THREAD_POOL,
+        subscribable=True
+    ),
+    'READ_FREQUENCY': WebSocketActionDefinition(
+        handler=read_frequency,
+        description='Reads the chip clock frequencies.',
+        concurrency=WebSocketActionConcurrency.THREAD_POOL,
+        cache_seconds=1,
+        subscribable=True
+    ),
+    'READ_MEMORY': WebSocketActionDefinition(
+        handler=read_memory,
+        description='Reads the memory usage.',
+        concurrency=WebSocketActionConcurrency.THREAD_POOL,
+        subscribable=True
+    ),
+    'READ_PIN_CONFIGURATIONS': WebSocketActionDefinition(
+        handler=read_pin_configurations_action,
+        description='Reads the pin configurations of the given pins.',
+        params_model=ReadPinConfigurationsParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'UPDATE_PIN_CONFIGURATIONS': WebSocketActionDefinition(
+        handler=update_pin_configurations_action,
+        description='Updates the pin configurations of the given pins.',
+        params_model=UpdatePinConfigurationsParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'SUBSCRIBE': WebSocketActionDefinition(
+        handler=subscribe_action,
+        description='Subscribes to broadcast topics, each topic is pushed once per broadcast interval.',
+        params_model=SubscriptionParams,
+        connection_handler=True
+    ),
+    'UNSUBSCRIBE': WebSocketActionDefinition(
+        handler=unsubscribe_action,
+        description='Unsubscribes from broadcast topics.',
+        params_model=SubscriptionParams,
+        connection_handler=True
+    ),
+    'PING': WebSocketActionDefinition(
+        handler=ping_action,
+        description='Replies with a pong, any received message resets the idle timeout of the connection.'
+    ),
+    'READ_PWM': WebSocketActionDefinition(
+        handler=read_pwm_action,
+        description='Reads the PWM statuses of the given pins with PWM running.',
+        params_model=ReadPwmParams
+    ),
+    'UPDATE_PWM': WebSocketActionDefinition(
+        handler=update_pwm_action,
+        description='Starts (or reconfigures) PWM on the given pins, GPIO12/13/18/19 use hardware PWM when available.',
+        params_model=UpdatePwmParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'STOP_PWM': WebSocketActionDefinition(
+        handler=stop_pwm_action,
+        description='Stops PWM on the given pins.',
+        params_model=StopPwmParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'WRITE_PWM_DUTY_CYCLES': WebSocketActionDefinition(
+        handler=write_pwm_duty_cycles_action,
+        description='Changes the duty cycles of pins with PWM running, only errors are responded to so duty cycles '
+                    'can be streamed (i.e. servo and LED dimming control loops).',
+        params_model=WritePwmDutyCyclesParams,
+        acknowledged=False,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'START_SEQUENCE': WebSocketActionDefinition(
+        handler=start_sequence,
+        description='Plays a sequence of (pin, state, delay) steps on the server, each state is held for its delay in '
+                    'microseconds. Responds with the sequence status, including its id.',
+        params_model=Sequence,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'READ_SEQUENCES': WebSocketActionDefinition(
+        handler=read_sequence_statuses,
+        description='Reads the playback state and timing of every running and recently finished sequence.'
+    ),
+    'CANCEL_SEQUENCE': WebSocketActionDefinition(
+        handler=cancel_sequence_action,
+        description='Cancels the sequence with the given id.',
+        params_model=CancelSequenceParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'START_CAPTURE': WebSocketActionDefinition(
+        handler=start_capture,
+        description='Starts sampling the levels of the given pins at a given rate, samples of finished captures are '
+                    'downloaded from the REST API.',
+        params_model=CaptureConfiguration
+    ),
+    'READ_CAPTURES': WebSocketActionDefinition(
+        handler=read_capture_statuses,
+        description='Reads the state of every running and recently finished capture.'
+    ),
+    'CANCEL_CAPTURE': WebSocketActionDefinition(
+        handler=cancel_capture_action,
+        description='Cancels the capture with the given id.',
+        params_model=CancelCaptureParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'READ_PULSE_COUNTERS': WebSocketActionDefinition(
+        handler=read_pulse_counters_action,
+        description='Reads the pulse count, frequency, and pulse timing of the given pins with a running pulse '
+                    'counter, every counter is reset in the same step when reset is true.',
+        params_model=ReadPulseCountersParams
+    ),
+    'START_PULSE_COUNTERS': WebSocketActionDefinition(
+        handler=start_pulse_counters_action,
+        description='Starts (or restarts) counting the pulses of the given pins.',
+        params_model=StartPulseCountersParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'STOP_PULSE_COUNTERS': WebSocketActionDefinition(
+        handler=stop_pulse_counters_action,
+        description='Stops counting the pulses of the given pins.',
+        params_model=StopPulseCountersParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'READ_PIN_EDGE_FILTERS': WebSocketActionDefinition(
+        handler=read_pin_edge_filters,
+        description='Reads the edge filter and the number of passed and filtered edges of every filtered pin.'
+    ),
+    'UPDATE_PIN_EDGE_FILTERS': WebSocketActionDefinition(
+        handler=update_pin_edge_filters_action,
+        description='Sets (or replaces) the edge filters that debounce edges of the given pins before they reach '
+                    'edge event streams and pulse counters.',
+        params_model=UpdatePinEdgeFiltersParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'REMOVE_PIN_EDGE_FILTERS': WebSocketActionDefinition(
+        handler=remove_pin_edge_filters_action,
+        description='Removes the edge filters of the given pins.',
+        params_model=RemovePinEdgeFiltersParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'READ_I2C_BLOCKS': WebSocketActionDefinition(
+        handler=read_i2c_blocks,
+        description='Reads consecutive registers of the given devices, reads of the same bus are combined into a '
+                    'single bus transfer.',
+        params_model=I2cBlockReads,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'WRITE_I2C_BLOCKS': WebSocketActionDefinition(
+        handler=write_i2c_blocks,
+        description='Writes consecutive registers of the given devices, writes of the same bus are combined into a '
+                    'single bus transfer.',
+        params_model=I2cBlockWrites,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'READ_I2C_POLL': WebSocketActionDefinition(
+        handler=read_i2c_poll,
+        description='Reads the latest blocks read by the I2C poll set without a bus transfer.',
+        subscribable=True
+    ),
+    'UPDATE_I2C_POLL': WebSocketActionDefinition(
+        handler=update_i2c_poll,
+        description='Replaces the I2C poll set, the given blocks are read every interval (seconds) by the server.',
+        params_model=I2cPollConfiguration,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'STOP_I2C_POLL': WebSocketActionDefinition(
+        handler=stop_i2c_poll,
+        description='Stops the I2C poll set.',
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'START_ADC': WebSocketActionDefinition(
+        handler=start_adc,
+        description='Starts (or restarts) sampling the given channels of an MCP3xxx ADC at a given rate into a ring '
+                    'buffer per channel.',
+        params_model=AdcConfiguration,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'READ_ADC': WebSocketActionDefinition(
+        handler=read_adc_status,
+        description='Reads the configuration and measured sample rate of the sampled ADC.'
+    ),
+    'STOP_ADC': WebSocketActionDefinition(
+        handler=stop_adc,
+        description='Stops sampling the ADC.',
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'READ_ADC_SAMPLES': WebSocketActionDefinition(
+        handler=read_adc_samples_action,
+        description='Reads up to count samples of an ADC channel starting at sample index since, or the latest count '
+                    'samples when since is omitted.',
+        params_model=ReadAdcSamplesParams
+    ),
+    'READ_ONE_WIRE_TEMPERATURES': WebSocketActionDefinition(
+        handler=read_one_wire_temperatures,
+        description='Reads the cached temperature of every 1-Wire sensor, sensors are polled in the background.',
+        subscribable=True
+    ),
+    'READ_ONE_WIRE_TEMPERATURE': WebSocketActionDefinition(
+        handler=read_one_wire_temperature_action,
+        description='Reads the cached temperature of a 1-Wire sensor.',
+        params_model=ReadOneWireTemperatureParams
+    ),
+    'READ_SENSORS': WebSocketActionDefinition(
+        handler=read_sensors,
+        description='Reads every hwmon input and thermal zone discovered on startup in a single batch.',
+        concurrency=WebSocketActionConcurrency.THREAD_POOL,
+        subscribable=True
+    ),
+    'START_FAN': WebSocketActionDefinition(
+        handler=start_fan,
+        description='Starts (or retunes) the fan controller, which drives PWM on a pin following a curve of the '
+                    'temperature of a sensor.',
+        params_model=FanConfiguration,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'READ_FAN': WebSocketActionDefinition(
+        handler=read_fan,
+        description='Reads the configuration of the fan controller along with the latest temperature and duty cycle.',
+        subscribable=True
+    ),
+    'STOP_FAN': WebSocketActionDefinition(
+        handler=stop_fan,
+        description='Stops the fan controller along with PWM of its pin.',
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'START_PID_LOOP': WebSocketActionDefinition(
+        handler=start_pid_loop,
+        description='Starts a PID loop driving an output pin from a sensor, ADC channel or pulse counter at a given '
+                    'rate on a dedicated thread.',
+        params_model=PidConfiguration,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    ),
+    'READ_PID_LOOPS': WebSocketActionDefinition(
+        handler=read_pid_loops,
+        description='Reads the state of every PID loop along with the jitter of its loop period.',
+        subscribable=True
+    ),
+    'TUNE_PID_LOOP': WebSocketActionDefinition(
+        handler=tune_pid_loop_action,
+        description='Replaces the setpoint and gains of the PID loop with the given id.',
+        params_model=TunePidLoopParams
+    ),
+    'STOP_PID_LOOP': WebSocketActionDefinition(
+        handler=stop_pid_loop_action,
+        description='Stops and removes the PID loop with the given id.',
+        params_model=StopPidLoopParams,
+        concurrency=WebSocketActionConcurrency.THREAD_POOL
+    )
+}
+
+# Enumerations for all websocket actions (i.e. WebSocketAction.READ_TEMPERATURE = 'READ_TEMPERATURE')
+WebSocketAction = Enum('WebSocketAction', [(name, name) for name in WEBSOCKET_ACTIONS], type=str, module=__name__)
+WebSocketAction.__doc__ = 'Enumerations for all web socket actions.'
+
+# Enumerations sent as their index by compact frame formats (i.e. PinIo.OUTPUT is sent as 1)
+# Note: Only append members to these enumerations, reordering members changes their index
+COMPACT_ENUMERATIONS = (WebSocketAction, RaspberryPiPinIds, PinIo, PinPull, UnitPrefix, FrequencyUnit,
+                        InformationUnit, TemperatureUnit, WebSocketOverflowPolicy, WebSocketFrameFormat, PinEdge,
+                        PwmMode, SequenceState, CaptureState, CaptureTriggerCondition, PinEdgeFilterPolicy, AdcChip,
+                        SensorKind, SensorUnit, PidSourceType, PidOutputMode)
+
+# Label of pin edge event frames, which aren't the response of any action
+PIN_EDGE_EVENT = 'PIN_EDGE_EVENT'
+
+# Label of decimated ADC sample frames, which are labelled like the samples read of a channel
+ADC_SAMPLES = 'READ_ADC_SAMPLES'
+
+
+@lru_cache(maxsize=None)
+def broadcast_topics(pin_ids: Tuple[RaspberryPiPinIds, ...]) -> Dict[str, BroadcastTopic]:
+    """
+    Returns the broadcast topics of every subscribable action (i.e. 'READ_TEMPERATURE'), every given pin (i.e.
+    'GPIO17'), every edge of every given pin (i.e. 'GPIO17.RISING') and every ADC channel (i.e. 'ADC.0').
+
+    .. note::
+        Pin topic frames are labelled as pin configuration reads of a single pin, read in the thread pool since they
+        wait on the pin locks.
+
+    .. note:: Topics are built once per set of pins (i.e. the pins of the detected board).
+    """
+
+    return {
+        **{
+            name: BroadcastTopic(
+                action=name,
+                producer=definition.handler,
+                blocking=definition.concurrency is WebSocketActionConcurrency.THREAD_POOL
+            )
+            for name, definition in WEBSOCKET_ACTIONS.items() if definition.subscribable
+        },
+        **{
+            pin_id.value: BroadcastTopic(
+                action='READ_PIN_CONFIGURATIONS',
+                producer=partial(read_pin_configurations, [pin_id]),
+                blocking=True
+            )
+            for pin_id in pin_ids
+        },
+        **{
+            f'{pin_id.value}.{edge.value}': BroadcastTopic(
+                action=PIN_EDGE_EVENT,
+                stream=partial(stream_pin_edge_topic, pin_id, edge)
+            )
+            for pin_id in pin_ids for edge in PinEdge
+        },
+        **{
+            f'ADC.{channel}': BroadcastTopic(
+                action=ADC_SAMPLES,
+                stream=partial(stream_adc_topic, channel)
+            )
+            for channel in range(max(ADC_CHIP_CHANNELS.values()))
+        }
+    }
+
+
+def websocket_action_documentation() -> str:
+    """Returns a markdown table describing every registered websocket action and its params."""
+
+    lines = ['| Action | Params | Description |', '| --- | --- | --- |']
+    for name, definition in WEBSOCKET_ACTIONS.items():
+        params_name = definition.params_model.__name__ if definition.params_model else '-'
+        lines.append(f'| `{name}` | {params_name} | {definition.description} |')
+
+    topic_names = ', '.join(f'`{name}`' for name, definition in WEBSOCKET_ACTIONS.items() if definition.subscribable)
+    edge_names = '/'.join(edge.value for edge in PinEdge)
+    lines.extend(['', f'Broadcast topics: {topic_names}, the configuration of each pin (i.e. `GPIO17`), the '
+                      f'`{PIN_EDGE_EVENT}` frames of each pin edge (i.e. `GPIO17.{edge_names}`) and the decimated '
+                      f'`{ADC_SAMPLES}` frames of each ADC channel (i.e. `ADC.0`)'])
+
+    subprotocol_names = ', '.join(f'`{name}` ({frame_format.value})' for name, frame_format in
+                                  WEBSOCKET_SUBPROTOCOLS.items())
+    lines.extend(['', f'Binary subprotocols: {subprotocol_names}, enumerations are sent as their compact index and '
+                      f'params may use either indexes or values:', ''])
+    for enumeration in COMPACT_ENUMERATIONS:
+        indexes = ', '.join(f'{index}={member.value}' for index, member in enumerate(enumeration))
+        lines.append(f'* {enumeration.__name__}: {indexes}')
+
+    return '\n'.join(lines)
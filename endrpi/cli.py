@@ -17,12 +17,23 @@ import sys
 import uvicorn
 import argparse
 
+from pydantic import ValidationError
+
 # Fix endrpi module not found error
 sys.path.append(os.path.abspath('.'))
 
 from endrpi.config.logging import configure_logger, get_logging_configuration, get_logger
-from endrpi.config.pin_factory import configure_pin_factory
+from endrpi.actions.pin import restore_pin_configurations
+from endrpi.config.board import configure_board
+from endrpi.config.one_wire import configure_one_wire
+from endrpi.config.pin_factory import configure_pin_factory, PinFactoryType
+from endrpi.config.pin_snapshot import configure_pin_snapshot, PIN_SNAPSHOT_PATH
+from endrpi.config.sensors import configure_sensors
+from endrpi.config.websocket import configure_websocket, get_websocket_settings
+from endrpi.model.websocket import WebSocketOverflowPolicy
 from endrpi.server import app
+from endrpi.utils.gpiochip import GPIOCHIP_PATH
+from endrpi.utils.one_wire import ONE_WIRE_DEVICES_PATH
 
 
 def main():
@@ -38,18 +49,158 @@ def main():
                         type=str,
                         default='0.0.0.0',
                         help='set the host to start the server on')
+    parser.add_argument('--broadcast-interval',
+                        dest='broadcast_interval',
+                        type=float,
+                        default=1.0,
+                        help='set the seconds between pushes of each subscribed websocket topic')
+    parser.add_argument('--websocket-queue-size',
+                        dest='outbound_queue_size',
+                        type=int,
+                        default=64,
+                        help='set the maximum number of frames queued for each websocket connection')
+    parser.add_argument('--websocket-overflow-policy',
+                        dest='overflow_policy',
+                        type=str,
+                        choices=[policy.value for policy in WebSocketOverflowPolicy],
+                        default=WebSocketOverflowPolicy.COALESCE.value,
+                        help='set what happens to frames of websocket connections with a full queue')
+    parser.add_argument('--websocket-ping-interval',
+                        dest='ping_interval',
+                        type=float,
+                        default=20.0,
+                        help='set the seconds between ping frames sent to each websocket connection')
+    parser.add_argument('--websocket-ping-timeout',
+                        dest='ping_timeout',
+                        type=float,
+                        default=20.0,
+                        help='set the seconds to wait for a pong frame before closing a websocket connection')
+    parser.add_argument('--websocket-idle-timeout',
+                        dest='idle_timeout',
+                        type=float,
+                        default=None,
+                        help='set the seconds a websocket connection may go without sending a message before it is '
+                             'closed, disabled by default')
+    parser.add_argument('--max-websocket-connections',
+                        dest='max_connections',
+                        type=int,
+                        default=None,
+                        help='set the maximum number of open websocket connections, unlimited by default')
+    parser.add_argument('--max-websocket-connections-per-client',
+                        dest='max_connections_per_client',
+                        type=int,
+                        default=None,
+                        help='set the maximum number of open websocket connections of each client ip address, '
+                             'unlimited by default')
+    parser.add_argument('--edge-event-queue-size',
+                        dest='edge_event_queue_size',
+                        type=int,
+                        default=256,
+                        help='set the maximum number of pin edge events held for each pin edge topic')
+    parser.add_argument('--pin-snapshot-path',
+                        dest='pin_snapshot_path',
+                        type=str,
+                        default=PIN_SNAPSHOT_PATH,
+                        help='set the file applied pin configurations are persisted to and restored from on startup')
+    parser.add_argument('--no-pin-snapshot',
+                        dest='no_pin_snapshot',
+                        action='store_true',
+                        help='disable persisting and restoring pin configurations')
+    parser.add_argument('--board-root',
+                        dest='board_root',
+                        type=str,
+                        default='/',
+                        help='set the root directory the board model is detected under (i.e. a fake root)')
+    parser.add_argument('--pin-factory',
+                        dest='pin_factory',
+                        type=str,
+                        choices=[pin_factory_type.value for pin_factory_type in PinFactoryType],
+                        default=PinFactoryType.AUTO.value,
+                        help='set the backend pins are driven with, automatic selection falls back to mocked pins')
+    parser.add_argument('--gpiochip',
+                        dest='gpiochip_path',
+                        type=str,
+                        default=GPIOCHIP_PATH,
+                        help='set the GPIO character device used by the gpiochip pin backend')
+    parser.add_argument('--one-wire-path',
+                        dest='one_wire_path',
+                        type=str,
+                        default=ONE_WIRE_DEVICES_PATH,
+                        help='set the directory 1-Wire temperature sensors are discovered in')
+    parser.add_argument('--one-wire-interval',
+                        dest='one_wire_interval',
+                        type=float,
+                        default=5.0,
+                        help='set the seconds between reads of each 1-Wire temperature sensor')
+    parser.add_argument('--no-one-wire',
+                        dest='no_one_wire',
+                        action='store_true',
+                        help='disable polling 1-Wire temperature sensors')
+    parser.add_argument('--sensor-root',
+                        dest='sensor_root',
+                        type=str,
+                        default='/',
+                        help='set the root directory hwmon inputs and thermal zones are discovered under')
     args = parser.parse_args()
 
     # Initialize the custom log format and set both the endrpi logger and uvicorn logger to use it
     configure_logger()
     uvicorn_logging_config = get_logging_configuration()
 
-    # Initialize the raspberry pi pin factory if possible, otherwise initialize a mock factory
-    configure_pin_factory()
+    # Apply the websocket settings shared by every connection, invalid settings exit before any pin is touched
+    try:
+        configure_websocket(broadcast_interval=args.broadcast_interval,
+                            outbound_queue_size=args.outbound_queue_size,
+                            overflow_policy=args.overflow_policy,
+                            ping_interval=args.ping_interval,
+                            ping_timeout=args.ping_timeout,
+                            idle_timeout=args.idle_timeout,
+                            max_connections=args.max_connections,
+                            max_connections_per_client=args.max_connections_per_client,
+                            edge_event_queue_size=args.edge_event_queue_size)
+    except ValidationError as error:
+        # Settings are named by the option they are passed with (i.e. --websocket-queue-size)
+        options = {action.dest: action.option_strings[-1] for action in parser._actions if action.option_strings}
+        for setting_error in error.errors():
+            setting = setting_error['loc'][0]
+            get_logger().error(f'Invalid {options.get(setting, setting)}: {setting_error["msg"]}')
+        sys.exit(1)
+
+    # Detect the board model so only the pins of the board are exposed
+    configure_board(args.board_root)
+
+    # Initialize the selected pin factory, automatic selection falls back to a mock factory
+    try:
+        configure_pin_factory(PinFactoryType(args.pin_factory), args.gpiochip_path)
+    except Exception as exception:
+        get_logger().error(f'Failed {args.pin_factory} pin backend initialization: {exception}')
+        sys.exit(1)
+
+    # Restore the persisted pin configurations before the server accepts any connection
+    configure_pin_snapshot(None if args.no_pin_snapshot else args.pin_snapshot_path)
+    restore_action_result = restore_pin_configurations()
+    if not restore_action_result.success:
+        get_logger().warning(restore_action_result.error.message)
+    elif restore_action_result.data:
+        get_logger().info(f'Restored {len(restore_action_result.data)} pin configurations.')
+
+    # Discover the hwmon inputs and thermal zones once so every read is a batch of cached files
+    configure_sensors(args.sensor_root)
+
+    # Poll the 1-Wire temperature sensors in the background so reads are served from a cache
+    configure_one_wire(None if args.no_one_wire else args.one_wire_path, args.one_wire_interval)
+
+    # Ping frames of every websocket connection are sent by uvicorn
+    websocket_settings = get_websocket_settings()
 
     try:
         # Run the endrpi server programmatically (see: https://www.uvicorn.org/deployment)
-        uvicorn.run(app, host=args.host, port=args.port, log_config=uvicorn_logging_config)
+        uvicorn.run(app,
+                    host=args.host,
+                    port=args.port,
+                    log_config=uvicorn_logging_config,
+                    ws_ping_interval=websocket_settings.ping_interval,
+                    ws_ping_timeout=websocket_settings.ping_timeout)
     except Exception as exception:
         get_logger().error(exception)
 
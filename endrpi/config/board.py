@@ -0,0 +1,36 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from endrpi.config.logging import get_logger
+from endrpi.utils.board import Board, HEADER_40_PIN_TABLE, detect_board
+
+# Board the server runs on, replaced by :func:`configure_board`
+board = Board(None, HEADER_40_PIN_TABLE)
+
+
+def configure_board(root: str = '/') -> None:
+    """Detects the board model from the device tree under a given root and configures the pins it exposes."""
+
+    global board
+    board = detect_board(root)
+    if board.model:
+        get_logger().info(f'Detected {board.model} ({board.pin_table.name}).')
+    else:
+        get_logger().warning(f'Failed board model detection, the pins of the {board.pin_table.name} are used.')
+
+
+def get_board() -> Board:
+    """Returns the board the server runs on."""
+    return board
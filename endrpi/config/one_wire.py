@@ -0,0 +1,42 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from typing import Optional
+
+from endrpi.utils.one_wire import OneWirePoller
+
+# Poller of the 1-Wire temperature sensors, sensors aren't polled when it is unset
+one_wire_poller: Optional[OneWirePoller] = None
+
+
+def configure_one_wire(devices_path: Optional[str], interval: float = 5.0) -> None:
+    """
+    Starts polling the 1-Wire temperature sensors under a given devices path once per interval (seconds), polling is
+    disabled when the path is none.
+    """
+
+    global one_wire_poller
+    if one_wire_poller:
+        one_wire_poller.stop()
+    one_wire_poller = None
+
+    if devices_path:
+        one_wire_poller = OneWirePoller(devices_path, interval)
+        one_wire_poller.start()
+
+
+def get_one_wire_poller() -> Optional[OneWirePoller]:
+    """Returns the poller of the 1-Wire temperature sensors or none if sensors aren't polled."""
+    return one_wire_poller
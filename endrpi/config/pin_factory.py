@@ -12,26 +12,93 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+from enum import Enum
+from typing import Optional
+
 from gpiozero import Device
-from gpiozero.pins.local import LocalPiFactory
 from gpiozero.pins.mock import MockFactory
 from gpiozero.pins.native import NativeFactory
 
+from endrpi.config.board import get_board
 from endrpi.config.logging import get_logger
+from endrpi.utils.gpio_registers import BulkPinAccess, GpioRegisters
+from endrpi.utils.gpiochip import GPIOCHIP_PATH
+from endrpi.utils.gpiochip_factory import GpiochipFactory
+
+
+class PinFactoryType(str, Enum):
+    """Enumerations for the pin backends pins can be driven with."""
+    AUTO = 'auto'
+    NATIVE = 'native'
+    GPIOCHIP = 'gpiochip'
+    MOCK = 'mock'
+
 
+# Bulk level access of the pin backend used to read every pin at once, only set when the backend supports it
+bulk_pin_access: Optional[BulkPinAccess] = None
 
-def configure_pin_factory() -> None:
+# Mapped GPIO registers that can set pin functions (i.e. route hardware PWM pins), only set with the native backend
+function_registers: Optional[GpioRegisters] = None
+
+
+def configure_pin_factory(pin_factory_type: PinFactoryType = PinFactoryType.AUTO,
+                          gpiochip_path: str = GPIOCHIP_PATH) -> None:
     """
-    Configures GPIOZero to use the :class:`NativeFactory` if possible, otherwise falls back to :class:`MockFactory`.
+    Configures GPIOZero to use the pin backend of a given type.
+
+    Automatic selection tries the :class:`NativeFactory`, then the :class:`GpiochipFactory` of the GPIO character
+    device, and falls back to :class:`MockFactory`, logging the backend that is used.
+
+    .. note::
+        The GPIO registers are mapped alongside the :class:`NativeFactory`, the :class:`GpiochipFactory` reads and
+        writes every pin with a single ioctl instead, mock pins are never read in bulk.
+
+    :raises Exception: If an explicitly selected backend can't be initialized (i.e. :class:`OSError` when the GPIO
+        character device can't be opened).
     """
 
+    global bulk_pin_access, function_registers
     logger = get_logger()
 
-    # noinspection PyBroadException
-    try:
-        pin_factory: LocalPiFactory = NativeFactory()
-    except Exception:
-        pin_factory: LocalPiFactory = MockFactory()
+    if pin_factory_type is PinFactoryType.AUTO:
+        for automatic_pin_factory_type in (PinFactoryType.NATIVE, PinFactoryType.GPIOCHIP):
+            # noinspection PyBroadException
+            try:
+                configure_pin_factory(automatic_pin_factory_type, gpiochip_path)
+                return
+            except Exception as error:
+                logger.debug(f'Failed {automatic_pin_factory_type.value} pin backend initialization: {error}')
         logger.warning('Failed Raspberry Pi GPIO initialization, all pin interactions will be mocked.')
+        pin_factory_type = PinFactoryType.MOCK
+
+    if pin_factory_type is PinFactoryType.NATIVE:
+        pin_factory = NativeFactory()
+    elif pin_factory_type is PinFactoryType.GPIOCHIP:
+        pin_factory = GpiochipFactory(gpiochip_path, get_board().pins)
+    else:
+        pin_factory = MockFactory()
 
     Device.pin_factory = pin_factory
+    bulk_pin_access = None
+    function_registers = None
+
+    if pin_factory_type is PinFactoryType.NATIVE:
+        try:
+            bulk_pin_access = function_registers = GpioRegisters()
+        except OSError:
+            logger.warning('Failed GPIO register mapping, pins will be read one at a time.')
+    elif pin_factory_type is PinFactoryType.GPIOCHIP:
+        bulk_pin_access = pin_factory
+
+    if pin_factory_type is not PinFactoryType.MOCK:
+        logger.info(f'Using the {pin_factory_type.value} pin backend.')
+
+
+def get_bulk_pin_access() -> Optional[BulkPinAccess]:
+    """Returns the bulk level access of the pin backend or none if pins are accessed one at a time."""
+    return bulk_pin_access
+
+
+def get_function_registers() -> Optional[GpioRegisters]:
+    """Returns the mapped GPIO registers that can set pin functions or none if pin functions can't be set."""
+    return function_registers
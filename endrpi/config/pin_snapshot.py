@@ -0,0 +1,37 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+from typing import Optional
+
+from endrpi.utils.pin_snapshot import PinSnapshot
+
+# Default path of the pin configuration snapshot
+PIN_SNAPSHOT_PATH = os.path.join(os.path.expanduser('~'), '.endrpi', 'pins.json')
+
+# Snapshot the applied pin configurations are persisted to, pin configurations aren't persisted when it is unset
+pin_snapshot: Optional[PinSnapshot] = None
+
+
+def configure_pin_snapshot(path: Optional[str]) -> None:
+    """Configures the path of the pin configuration snapshot, persistence is disabled when the path is none."""
+
+    global pin_snapshot
+    pin_snapshot = PinSnapshot(path) if path else None
+
+
+def get_pin_snapshot() -> Optional[PinSnapshot]:
+    """Returns the pin configuration snapshot or none if pin configurations aren't persisted."""
+    return pin_snapshot
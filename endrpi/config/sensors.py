@@ -0,0 +1,34 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from endrpi.config.logging import get_logger
+from endrpi.utils.sensors import SensorReader, discover_sensor_inputs
+
+# Reader of the sensor inputs discovered on startup, replaced by :func:`configure_sensors`
+sensor_reader = SensorReader([])
+
+
+def configure_sensors(root: str = '/') -> None:
+    """Discovers the hwmon inputs and thermal zones under a given root, sensors aren't discovered again later."""
+
+    global sensor_reader
+    sensor_reader.close()
+    sensor_reader = SensorReader(discover_sensor_inputs(root))
+    get_logger().info(f'Discovered {len(sensor_reader.sensor_inputs)} sensor inputs.')
+
+
+def get_sensor_reader() -> SensorReader:
+    """Returns the reader of the sensor inputs discovered on startup."""
+    return sensor_reader
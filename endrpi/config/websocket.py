@@ -0,0 +1,58 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from typing import Optional
+
+from pydantic import BaseModel, conint, confloat
+
+from endrpi.model.websocket import WebSocketOverflowPolicy
+
+
+class WebSocketSettings(BaseModel):
+    """
+    Settings shared by every websocket connection.
+
+    .. note::
+        Ping frames are sent by the server (uvicorn), :attr:`ping_interval` and :attr:`ping_timeout` are passed to it
+        when the server is started. Optional limits and timeouts are disabled when unset.
+    """
+    broadcast_interval: float = 1.0
+    outbound_queue_size: conint(ge=1) = 64
+    overflow_policy: WebSocketOverflowPolicy = WebSocketOverflowPolicy.COALESCE
+    ping_interval: Optional[confloat(gt=0)] = 20.0
+    ping_timeout: Optional[confloat(gt=0)] = 20.0
+    idle_timeout: Optional[confloat(gt=0)] = None
+    max_connections: Optional[conint(ge=1)] = None
+    max_connections_per_client: Optional[conint(ge=1)] = None
+    edge_event_queue_size: conint(ge=1) = 256
+
+
+# Settings used by the websocket route, replaced by :func:`configure_websocket`
+websocket_settings = WebSocketSettings()
+
+
+def configure_websocket(**settings) -> None:
+    """
+    Configures the websocket settings shared by every connection, unspecified settings keep their defaults.
+
+    :raises ValidationError: If a setting is invalid (i.e. a queue size of 0).
+    """
+
+    global websocket_settings
+    websocket_settings = WebSocketSettings(**settings)
+
+
+def get_websocket_settings() -> WebSocketSettings:
+    """Returns the websocket settings shared by every connection."""
+    return websocket_settings
@@ -0,0 +1,106 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from enum import Enum
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, confloat, conint, conlist, validator
+
+
+class AdcChip(str, Enum):
+    """Enumerations for the MCP3xxx SPI analog to digital converters that can be sampled."""
+    MCP3002 = 'MCP3002'
+    MCP3004 = 'MCP3004'
+    MCP3008 = 'MCP3008'
+    MCP3202 = 'MCP3202'
+    MCP3204 = 'MCP3204'
+    MCP3208 = 'MCP3208'
+
+
+# Number of single ended channels of each chip
+ADC_CHIP_CHANNELS: Dict[AdcChip, int] = {
+    AdcChip.MCP3002: 2,
+    AdcChip.MCP3004: 4,
+    AdcChip.MCP3008: 8,
+    AdcChip.MCP3202: 2,
+    AdcChip.MCP3204: 4,
+    AdcChip.MCP3208: 8
+}
+
+# Highest sample rate (Hz) of every channel, samples are taken by a Python thread
+ADC_MAX_RATE = 10_000
+
+# Most samples held for each channel
+ADC_MAX_BUFFER_SIZE = 1_000_000
+
+
+class AdcConfiguration(BaseModel):
+    """
+    Interface for the channels of an ADC sampled at a fixed rate (Hz) into a ring buffer of bufferSize samples per
+    channel.
+
+    .. note::
+        port and device select the SPI bus and chip select (i.e. port 0 device 1 is CE1 of SPI0). Streamed samples
+        are the average of every decimation samples.
+    """
+    chip: AdcChip = AdcChip.MCP3008
+    port: conint(ge=0) = 0
+    device: conint(ge=0) = 0
+    channels: conlist(conint(ge=0), min_items=1)
+    rate: confloat(gt=0, le=ADC_MAX_RATE)
+    bufferSize: conint(ge=1, le=ADC_MAX_BUFFER_SIZE) = 10_000
+    decimation: conint(ge=1) = 1
+    referenceVoltage: confloat(gt=0) = 3.3
+
+    @validator('channels')
+    def unique_channels_of_chip(cls, channels: List[int], values: dict) -> List[int]:
+        if len(set(channels)) != len(channels):
+            raise ValueError('Channels must be unique')
+        chip = values.get('chip')
+        if chip and any(channel >= ADC_CHIP_CHANNELS[chip] for channel in channels):
+            raise ValueError(f'{chip.value} channels range from 0 to {ADC_CHIP_CHANNELS[chip] - 1}')
+        return channels
+
+
+class AdcStatus(BaseModel):
+    """
+    Interface for the state of the sampled ADC.
+
+    .. note::
+        samples is the number of samples taken of every channel. actualRate is the measured sample rate (Hz) and
+        lateSamples is the number of samples taken more than a sample period after their requested time.
+    """
+    configuration: AdcConfiguration
+    running: bool
+    samples: int
+    lateSamples: int
+    actualRate: Optional[float]
+    error: Optional[str]
+
+
+class AdcSamples(BaseModel):
+    """
+    Interface for consecutive samples (volts) of a channel, from oldest to newest.
+
+    .. note::
+        firstSample is the index of the first sample since sampling started, so sample i was taken i / rate seconds
+        after the first. Decimated samples are averages of consecutive samples and have the decimated rate.
+        droppedSamples is the number of requested samples that were overwritten before they were read.
+    """
+    channel: int
+    firstSample: int
+    rate: float
+    values: List[float]
+    droppedSamples: int = 0
@@ -0,0 +1,106 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel, confloat, conint, conlist, validator
+
+from endrpi.model.pin import RaspberryPiPinIds
+
+# Highest sample rate (Hz) of a capture, the rate a Python thread sustains with a single level register read per sample
+CAPTURE_MAX_RATE = 20_000
+
+# Highest number of samples of a single capture
+CAPTURE_MAX_SAMPLES = 1_000_000
+
+
+class CaptureTriggerCondition(str, Enum):
+    """Enumerations for the condition of a pin that triggers a capture."""
+    RISING = 'RISING'
+    FALLING = 'FALLING'
+    HIGH = 'HIGH'
+    LOW = 'LOW'
+
+
+class CaptureTrigger(BaseModel):
+    """Interface for the pin and condition that triggers a capture."""
+    pin: RaspberryPiPinIds
+    condition: CaptureTriggerCondition
+
+
+class CaptureConfiguration(BaseModel):
+    """
+    Interface for the pins, sample rate (Hz), and number of samples of a capture.
+
+    .. note::
+        Captures without a trigger start immediately. Triggered captures keep up to preTrigger samples taken before
+        the trigger and give up after timeout seconds without a trigger.
+    """
+    pins: conlist(RaspberryPiPinIds, min_items=1)
+    rate: confloat(gt=0, le=CAPTURE_MAX_RATE)
+    samples: conint(ge=1, le=CAPTURE_MAX_SAMPLES)
+    trigger: Optional[CaptureTrigger]
+    preTrigger: conint(ge=0) = 0
+    timeout: confloat(gt=0) = 10.0
+
+    @validator('pins')
+    def unique_pins(cls, pins: List[RaspberryPiPinIds]) -> List[RaspberryPiPinIds]:
+        if len(set(pins)) != len(pins):
+            raise ValueError('Pins must be unique')
+        return pins
+
+    @validator('preTrigger')
+    def pre_trigger_within_samples(cls, pre_trigger: int, values: dict) -> int:
+        if 'samples' in values and pre_trigger >= values['samples']:
+            raise ValueError('Pre-trigger samples must be fewer than samples')
+        return pre_trigger
+
+
+class CaptureState(str, Enum):
+    """Enumerations for the state of a capture."""
+    ARMED = 'ARMED'
+    CAPTURING = 'CAPTURING'
+    COMPLETED = 'COMPLETED'
+    CANCELLED = 'CANCELLED'
+    TIMED_OUT = 'TIMED_OUT'
+    FAILED = 'FAILED'
+
+
+class CaptureFormat(str, Enum):
+    """Enumerations for the download formats of captured samples."""
+    BINARY = 'BINARY'
+    VCD = 'VCD'
+
+
+class CaptureStatus(BaseModel):
+    """
+    Interface for the state of a capture.
+
+    .. note::
+        triggerSample is the index of the triggering sample in the captured samples. actualRate is the measured
+        sample rate (Hz) and lateSamples is the number of samples taken more than a sample period after their
+        requested time.
+    """
+    id: int
+    state: CaptureState
+    pins: List[RaspberryPiPinIds]
+    rate: float
+    samples: int
+    capturedSamples: int
+    triggerSample: Optional[int]
+    actualRate: Optional[float]
+    lateSamples: int
+    realtime: bool
+    error: Optional[str]
@@ -0,0 +1,68 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from typing import List, Optional
+
+from pydantic import BaseModel, confloat, conlist, validator
+
+from endrpi.model.pin import RaspberryPiPinIds
+
+
+class FanCurvePoint(BaseModel):
+    """Interface for the duty cycle (0 to 1) of a fan at a temperature (celsius)."""
+    temperature: float
+    dutyCycle: confloat(ge=0, le=1)
+
+
+class FanConfiguration(BaseModel):
+    """
+    Interface for a fan driven by PWM on pinId following a curve of the temperature of a sensor, evaluated every
+    interval (seconds).
+
+    .. note::
+        The duty cycle is interpolated between the points of the curve and held at the first and last point outside
+        of it. The fan only slows down once the temperature fell hysteresis (celsius) below the temperature that set
+        its speed, so temperatures hovering around a point don't toggle the fan. sensorId is a sensor discovered on
+        startup (i.e. 'thermal_zone0' or 'hwmon0.temp1'), failsafeDutyCycle is driven while it can't be read.
+    """
+    pinId: RaspberryPiPinIds
+    frequency: confloat(gt=0) = 1000
+    curve: conlist(FanCurvePoint, min_items=1)
+    hysteresis: confloat(ge=0) = 2.0
+    interval: confloat(gt=0) = 1.0
+    sensorId: str = 'thermal_zone0'
+    failsafeDutyCycle: confloat(ge=0, le=1) = 1.0
+
+    @validator('curve')
+    def ascending_temperatures(cls, curve: List[FanCurvePoint]) -> List[FanCurvePoint]:
+        if any(later.temperature <= earlier.temperature for earlier, later in zip(curve, curve[1:])):
+            raise ValueError('Curve temperatures must be ascending')
+        return curve
+
+
+class FanStatus(BaseModel):
+    """
+    Interface for the state of the fan controller.
+
+    .. note::
+        temperature (celsius) and dutyCycle are the latest read and driven values, updates is the number of
+        evaluations of the curve. error is the latest error reading the sensor or driving the pin.
+    """
+    configuration: FanConfiguration
+    running: bool
+    temperature: Optional[float]
+    dutyCycle: Optional[float]
+    updates: int
+    error: Optional[str]
@@ -0,0 +1,100 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from typing import List, Optional
+
+from pydantic import BaseModel, confloat, conint, conlist
+
+# I2C bus of the Raspberry Pi header pins GPIO2 (SDA) and GPIO3 (SCL)
+I2C_DEFAULT_BUS = 1
+
+# Longest register block of a single read or write (bytes)
+I2C_MAX_BLOCK_LENGTH = 256
+
+# Most blocks of a single batch or poll set
+I2C_MAX_BLOCKS = 128
+
+# Shortest interval (seconds) between polls of a poll set
+I2C_MIN_POLL_INTERVAL = 0.01
+
+# 7 bit device address, excluding the addresses reserved by the I2C specification
+I2cAddress = conint(ge=0x03, le=0x77)
+I2cRegister = conint(ge=0x00, le=0xFF)
+I2cByte = conint(ge=0x00, le=0xFF)
+
+
+class I2cBlockRead(BaseModel):
+    """Interface for a read of length consecutive registers of a device, starting at startRegister."""
+    bus: conint(ge=0) = I2C_DEFAULT_BUS
+    address: I2cAddress
+    startRegister: I2cRegister
+    length: conint(ge=1, le=I2C_MAX_BLOCK_LENGTH)
+
+
+class I2cBlockWrite(BaseModel):
+    """Interface for a write of consecutive registers of a device, starting at startRegister."""
+    bus: conint(ge=0) = I2C_DEFAULT_BUS
+    address: I2cAddress
+    startRegister: I2cRegister
+    data: conlist(I2cByte, min_items=1, max_items=I2C_MAX_BLOCK_LENGTH)
+
+
+class I2cBlock(BaseModel):
+    """Interface for the bytes of consecutive registers of a device, starting at startRegister."""
+    bus: int
+    address: int
+    startRegister: int
+    data: List[int]
+
+
+class I2cBlockReads(BaseModel):
+    """
+    Interface for a batch of block reads.
+
+    .. note:: Reads of the same bus are combined into as few bus transfers as possible, in order.
+    """
+    reads: conlist(I2cBlockRead, min_items=1, max_items=I2C_MAX_BLOCKS)
+
+
+class I2cBlockWrites(BaseModel):
+    """
+    Interface for a batch of block writes.
+
+    .. note:: Writes of the same bus are combined into as few bus transfers as possible, in order.
+    """
+    writes: conlist(I2cBlockWrite, min_items=1, max_items=I2C_MAX_BLOCKS)
+
+
+class I2cPollConfiguration(BaseModel):
+    """Interface for the block reads polled by the server every interval (seconds)."""
+    interval: confloat(ge=I2C_MIN_POLL_INTERVAL)
+    reads: conlist(I2cBlockRead, min_items=1, max_items=I2C_MAX_BLOCKS)
+
+
+class I2cPollStatus(BaseModel):
+    """
+    Interface for the latest blocks of a poll set.
+
+    .. note::
+        timestamp is the seconds since the epoch when the blocks were read, blocks are empty until the first
+        successful poll. error is the error of the latest poll, whose blocks are kept from the last successful poll.
+    """
+    interval: float
+    reads: List[I2cBlockRead]
+    blocks: List[I2cBlock]
+    timestamp: Optional[float]
+    polls: int
+    failedPolls: int
+    error: Optional[str]
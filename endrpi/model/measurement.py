@@ -50,6 +50,15 @@ class TemperatureUnit(str, Enum):
     FAHRENHEIT = 'FAHRENHEIT'
 
 
+class SensorUnit(str, Enum):
+    """Enumerations for units of hardware monitoring sensors."""
+    CELSIUS = 'CELSIUS'
+    VOLT = 'VOLT'
+    AMPERE = 'AMPERE'
+    WATT = 'WATT'
+    REVOLUTIONS_PER_MINUTE = 'REVOLUTIONS_PER_MINUTE'
+
+
 class Measurement(GenericModel, Generic[T]):
     """Interface for standardized measurements using quantity and unit."""
     quantity: float
@@ -25,7 +25,13 @@ class WebSocketMessage(str, Enum):
     ERROR_MISSING_PARAMS_FIELD = 'Received message with missing \'params\' field'
     ERROR_INVALID_PARAMS_FIELD = 'Received message with invalid \'params\' field'
     ERROR_MISSING_PIN_ID = 'At least one pin id and pin configuration must be supplied'
+    ERROR_MISSING_TOPIC = 'At least one topic must be supplied'
+    ERROR_UNKNOWN_TOPIC__TOPIC__ = 'Topic `{topic}` not found'
     SUCCESS_PIN_CONFIGS_UPDATED = 'Pin configurations updated'
+    SUCCESS_SUBSCRIBED = 'Subscribed to topics'
+    SUCCESS_UNSUBSCRIBED = 'Unsubscribed from topics'
+    SUCCESS_PONG = 'Pong'
+    SUCCESS_PWM_STOPPED = 'PWM stopped'
 
 
 class SystemMessage(str, Enum):
@@ -40,6 +46,12 @@ class TemperatureMessage(str, Enum):
     ERROR_SOC_QUERY = 'Failed to query system on chip temperature'
     ERROR_SOC_PARSE = 'Failed to parse system on chip temperature query'
     ERROR_VALIDATION = 'Failed to validate system temperature'
+    ERROR_ONE_WIRE_DISABLED = '1-Wire temperature sensors are not polled'
+    ERROR_ONE_WIRE_NOT_FOUND__SENSOR_ID__ = '1-Wire temperature sensor `{sensor_id}` not found'
+
+
+class SensorsMessage(str, Enum):
+    ERROR_VALIDATION = 'Failed to validate sensors'
 
 
 class ThrottleMessage(str, Enum):
@@ -73,7 +85,59 @@ class PinMessage(str, Enum):
     ERROR_NO_INPUT_PULL = 'No pull specified for input pin configuration'
     ERROR_NO_OUTPUT_STATE = 'No state specified for output pin configuration'
     ERROR_NOT_FOUND__PIN_ID__ = 'Pin with BCM pin number `{pin_id}` not found'
+    ERROR_EDGE_DETECTION__PIN_ID__ = 'Failed to detect edges of pin `{pin_id}`'
+    ERROR_ALTERNATE_FUNCTION__PIN_ID__ = 'Failed to read pin `{pin_id}` set to an alternate function'
+    ERROR_UPDATE__PIN_ID__ = 'Failed to update pin configuration for pin `{pin_id}`'
+    ERROR_INVALID_CONFIGURATIONS = 'No pin was updated because at least one pin configuration is invalid'
+    ERROR_UPDATES_FAILED = 'Failed to update at least one pin configuration'
+    ERROR_PWM_RUNNING__PIN_ID__ = 'PWM is running on pin `{pin_id}`, stop PWM before updating its configuration'
+    ERROR_IN_USE__PIN_ID__OWNER__ = 'Pin `{pin_id}` is in use by {owner}'
+    ERROR_PWM_NOT_RUNNING__PIN_ID__ = 'PWM is not running on pin `{pin_id}`'
+    ERROR_PWM_CHANNEL_IN_USE__PIN_ID__ = 'The hardware PWM channel of pin `{pin_id}` is driving another pin'
+    ERROR_PWM_FREQUENCY__PIN_ID__ = 'PWM frequency of pin `{pin_id}` exceeds the software PWM limit'
+    ERROR_PWM__PIN_ID__ = 'Failed to generate PWM on pin `{pin_id}`'
+    ERROR_COUNTER_NOT_RUNNING__PIN_ID__ = 'Pulse counter is not running on pin `{pin_id}`'
+    ERROR_FILTER_NOT_SET__PIN_ID__ = 'No edge filter is set on pin `{pin_id}`'
+    ERROR_SNAPSHOT_READ__PATH__ = 'Failed to read the pin configuration snapshot `{path}`'
+    SKIPPED_UPDATE__PIN_ID__ = 'Pin configuration for pin `{pin_id}` was not updated'
     SUCCESS_UPDATED__PIN_ID__ = 'Pin configuration for pin `{pin_id}` was updated successfully'
+    SUCCESS_PWM_STOPPED__PIN_ID__ = 'PWM on pin `{pin_id}` was stopped'
+
+
+class SequenceMessage(str, Enum):
+    ERROR_NOT_FOUND__SEQUENCE_ID__ = 'Sequence `{sequence_id}` not found'
+    ERROR_OUTPUT__PIN_ID__ = 'Failed to set pin `{pin_id}` as a sequence output'
+
+
+class CaptureMessage(str, Enum):
+    ERROR_NOT_FOUND__CAPTURE_ID__ = 'Capture `{capture_id}` not found'
+    ERROR_RUNNING = 'Another capture is running, cancel it before starting a capture'
+    ERROR_NOT_FINISHED__CAPTURE_ID__ = 'Capture `{capture_id}` has not finished'
+
+
+class I2cMessage(str, Enum):
+    ERROR_BUS__BUS__ = 'Failed to open I2C bus `{bus}`'
+    ERROR_TRANSFER__BUS__ADDRESS__ = 'Device `{address}` of I2C bus `{bus}` did not respond'
+    ERROR_POLL_NOT_RUNNING = 'No I2C poll set is running'
+    SUCCESS_WRITTEN = 'I2C blocks were written successfully'
+    SUCCESS_POLL_STOPPED = 'I2C poll set was stopped'
+
+
+class AdcMessage(str, Enum):
+    ERROR_NOT_RUNNING = 'No ADC is sampled'
+    ERROR_SPI__CHIP__ = 'Failed to open the SPI device of ADC `{chip}`'
+    ERROR_CHANNEL_NOT_SAMPLED__CHANNEL__ = 'ADC channel `{channel}` is not sampled'
+
+
+class FanMessage(str, Enum):
+    ERROR_NOT_RUNNING = 'The fan controller is not running'
+    ERROR_SENSOR_NOT_FOUND__SENSOR_ID__ = 'Sensor `{sensor_id}` was not discovered'
+    ERROR_NOT_TEMPERATURE__SENSOR_ID__ = 'Sensor `{sensor_id}` does not measure temperature'
+
+
+class PidMessage(str, Enum):
+    ERROR_NOT_FOUND__LOOP_ID__ = 'PID loop `{loop_id}` not found'
+    ERROR_SENSOR_NOT_FOUND__SENSOR_ID__ = 'Sensor `{sensor_id}` was not discovered'
 
 
 class MessageData(BaseModel):
@@ -0,0 +1,140 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, confloat, conint, validator
+
+from endrpi.model.pin import PulseStatistics, RaspberryPiPinIds
+
+# Highest loop rate (Hz), loops are run by Python threads
+PID_MAX_RATE = 1000
+
+
+class PidSourceType(str, Enum):
+    """Enumerations for the process variables a PID loop can control."""
+    SENSOR = 'SENSOR'
+    ADC = 'ADC'
+    PULSE_COUNTER = 'PULSE_COUNTER'
+
+
+class PidOutputMode(str, Enum):
+    """Enumerations for how a PID loop drives its output pin."""
+    PWM = 'PWM'
+    DIGITAL = 'DIGITAL'
+
+
+class PidSource(BaseModel):
+    """
+    Interface for the process variable of a PID loop.
+
+    .. note::
+        SENSOR reads the sensor discovered on startup with sensorId (i.e. 'thermal_zone0'), ADC reads the latest
+        sample (volts) of channel of the sampled ADC and PULSE_COUNTER reads the frequency (Hz) of the running pulse
+        counter of pinId.
+    """
+    type: PidSourceType
+    sensorId: Optional[str]
+    channel: Optional[conint(ge=0)]
+    pinId: Optional[RaspberryPiPinIds]
+
+    @validator('pinId', always=True)
+    def source_of_type(cls, pin_id: Optional[RaspberryPiPinIds], values: dict) -> Optional[RaspberryPiPinIds]:
+        source_type = values.get('type')
+        required_field = {
+            PidSourceType.SENSOR: 'sensorId',
+            PidSourceType.ADC: 'channel',
+            PidSourceType.PULSE_COUNTER: 'pinId'
+        }.get(source_type)
+        if required_field and {**values, 'pinId': pin_id}.get(required_field) is None:
+            raise ValueError(f'{source_type.value} sources require {required_field}')
+        return pin_id
+
+
+class PidOutput(BaseModel):
+    """
+    Interface for the output pin of a PID loop.
+
+    .. note::
+        PWM drives the output as the duty cycle at frequency (Hz), DIGITAL drives the pin high while the output is at
+        least halfway between the output limits.
+    """
+    pinId: RaspberryPiPinIds
+    mode: PidOutputMode = PidOutputMode.PWM
+    frequency: confloat(gt=0) = 1000
+
+
+class PidTuning(BaseModel):
+    """Interface for the setpoint and the proportional, integral (per second) and derivative (seconds) gains."""
+    setpoint: float
+    kp: float = 0
+    ki: float = 0
+    kd: float = 0
+
+
+class PidConfiguration(PidTuning):
+    """
+    Interface for a PID loop driving an output from a source at a fixed rate (Hz).
+
+    .. note::
+        The output is clamped between outputMin and outputMax (0 to 1), the integral term is clamped to the same
+        limits so it doesn't wind up while the output is saturated. The derivative term is taken on the process
+        variable so setpoint changes don't kick the output.
+    """
+    source: PidSource
+    output: PidOutput
+    rate: confloat(gt=0, le=PID_MAX_RATE) = 10
+    outputMin: confloat(ge=0, le=1) = 0
+    outputMax: confloat(ge=0, le=1) = 1
+
+    @validator('outputMax')
+    def ascending_output_limits(cls, output_max: float, values: dict) -> float:
+        if 'outputMin' in values and output_max <= values['outputMin']:
+            raise ValueError('outputMax must be greater than outputMin')
+        return output_max
+
+
+class PidJitter(BaseModel):
+    """
+    Interface for the timing of the iterations of a PID loop.
+
+    .. note::
+        period holds the measured periods (µs) between iterations, standardDeviation is their standard deviation
+        (µs) and maxDeviation the largest difference (µs) from the configured period. overruns is the number of
+        iterations that started more than a period late.
+    """
+    period: PulseStatistics
+    standardDeviation: Optional[float]
+    maxDeviation: Optional[float]
+    overruns: int
+
+
+class PidStatus(BaseModel):
+    """
+    Interface for the state of a PID loop.
+
+    .. note::
+        processVariable and output are the latest read and driven values, error is the latest error reading the
+        source or driving the output.
+    """
+    id: int
+    configuration: PidConfiguration
+    running: bool
+    processVariable: Optional[float]
+    output: Optional[float]
+    iterations: int
+    jitter: PidJitter
+    error: Optional[str]
@@ -15,11 +15,20 @@
 from enum import Enum
 from typing import Union, Dict, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, confloat, conint
+
+from endrpi.model.message import MessageData
 
 
 class RaspberryPiPinIds(str, Enum):
-    """Enumerations for pin ids on the Raspberry Pi."""
+    """
+    Enumerations for pin ids on the Raspberry Pi.
+
+    .. note::
+        Members cover every BCM pin of every board, the pins of the detected board are listed by
+        :class:`~endrpi.utils.board.Board`. Members are only ever appended since compact websocket frames encode pins
+        by their index.
+    """
     GPIO2 = 'GPIO2'
     GPIO3 = 'GPIO3'
     GPIO4 = 'GPIO4'
@@ -45,14 +54,48 @@ class RaspberryPiPinIds(str, Enum):
     GPIO26 = 'GPIO26'
     GPIO20 = 'GPIO20'
     GPIO21 = 'GPIO21'
+    GPIO8 = 'GPIO8'
+    GPIO0 = 'GPIO0'
+    GPIO1 = 'GPIO1'
+    GPIO28 = 'GPIO28'
+    GPIO29 = 'GPIO29'
+    GPIO30 = 'GPIO30'
+    GPIO31 = 'GPIO31'
+    GPIO32 = 'GPIO32'
+    GPIO33 = 'GPIO33'
+    GPIO34 = 'GPIO34'
+    GPIO35 = 'GPIO35'
+    GPIO36 = 'GPIO36'
+    GPIO37 = 'GPIO37'
+    GPIO38 = 'GPIO38'
+    GPIO39 = 'GPIO39'
+    GPIO40 = 'GPIO40'
+    GPIO41 = 'GPIO41'
+    GPIO42 = 'GPIO42'
+    GPIO43 = 'GPIO43'
+    GPIO44 = 'GPIO44'
+    GPIO45 = 'GPIO45'
+
+    @property
+    def bcm_number(self) -> int:
+        """Returns the BCM number of the pin (i.e. 17 for GPIO17)."""
+        return PIN_ID_BCM_NUMBERS[self]
 
     @classmethod
     def from_bcm_id(cls, pin_id: str) -> Union['RaspberryPiPinIds', None]:
-        # Attempt to instantiate a raspberry pi pin id from a string and return the pin id
-        try:
-            return cls[pin_id]
-        except KeyError:
-            return None
+        """Returns the pin id of a BCM alias (i.e. 'GPIO17', 'BCM17', or '17') or none if no pin has the alias."""
+        return PIN_ID_ALIASES.get(pin_id.upper())
+
+
+# BCM numbers and aliases of every pin id, precomputed since pin ids are looked up on every request
+PIN_ID_BCM_NUMBERS: Dict[RaspberryPiPinIds, int] = {
+    pin_id: int(pin_id.value[len('GPIO'):]) for pin_id in RaspberryPiPinIds
+}
+PIN_ID_ALIASES: Dict[str, RaspberryPiPinIds] = {
+    alias: pin_id
+    for pin_id, bcm_number in PIN_ID_BCM_NUMBERS.items()
+    for alias in (pin_id.value, f'BCM{bcm_number}', str(bcm_number))
+}
 
 
 class PinPull(str, Enum):
@@ -76,3 +119,144 @@ class PinConfiguration(BaseModel):
 
 
 PinConfigurationMap = Dict[RaspberryPiPinIds, PinConfiguration]
+
+
+class PinUpdateStatus(str, Enum):
+    """Enumerations for the outcome of updating a single pin of a pin configuration map."""
+    UPDATED = 'UPDATED'
+    INVALID = 'INVALID'
+    SKIPPED = 'SKIPPED'
+    FAILED = 'FAILED'
+
+
+class PinUpdateOutcome(BaseModel):
+    """
+    Interface for the outcome of updating a single pin of a pin configuration map.
+
+    .. note::
+        Pins are SKIPPED when another pin configuration of the map is INVALID, in which case no pin is updated.
+    """
+    status: PinUpdateStatus
+    message: str
+
+
+PinUpdateOutcomeMap = Dict[RaspberryPiPinIds, PinUpdateOutcome]
+
+
+class PinUpdateErrorData(MessageData):
+    """Interface for the error of updating a pin configuration map along with the outcome of every pin."""
+    pins: PinUpdateOutcomeMap
+
+
+class PinEdge(str, Enum):
+    """Enumerations for the state changes (edges) of a GPIO input pin."""
+    RISING = 'RISING'
+    FALLING = 'FALLING'
+    BOTH = 'BOTH'
+
+
+class PinEdgeEvent(BaseModel):
+    """
+    Interface for a detected GPIO pin edge.
+
+    .. note::
+        The timestamp is the seconds since the epoch when the edge was detected, droppedEvents is the number of
+        earlier events that were dropped because the event queue was full.
+    """
+    pin: RaspberryPiPinIds
+    edge: PinEdge
+    state: float
+    timestamp: float
+    droppedEvents: int = 0
+
+
+class PinEdgeFilterPolicy(str, Enum):
+    """Enumerations for how bursts of edges (i.e. switch bounce) of a GPIO input pin are coalesced."""
+    LEADING = 'LEADING'
+    TRAILING = 'TRAILING'
+    RATE_LIMIT = 'RATE_LIMIT'
+
+
+class PinEdgeFilterConfiguration(BaseModel):
+    """
+    Interface for the edge filter of a GPIO input pin, applied before edges reach event streams and pulse counters.
+
+    .. note::
+        LEADING passes the first edge of a burst and ignores edges for window µs after it, TRAILING passes the
+        settled state once the pin has been stable for window µs, RATE_LIMIT passes at most rate edges per second.
+    """
+    policy: PinEdgeFilterPolicy
+    window: conint(gt=0) = 5000
+    rate: confloat(gt=0) = 100.0
+
+
+class PinEdgeFilterStatus(PinEdgeFilterConfiguration):
+    """Interface for the edge filter of a GPIO input pin along with the number of edges it passed and filtered."""
+    passedEdges: int
+    filteredEdges: int
+
+
+PinEdgeFilterStatusMap = Dict[RaspberryPiPinIds, PinEdgeFilterStatus]
+
+
+class PwmMode(str, Enum):
+    """Enumerations for how the PWM signal of a GPIO pin is generated."""
+    HARDWARE = 'HARDWARE'
+    SOFTWARE = 'SOFTWARE'
+
+
+class PwmConfiguration(BaseModel):
+    """Interface for the PWM frequency (Hz) and duty cycle (0 to 1) of a GPIO pin."""
+    frequency: confloat(gt=0)
+    dutyCycle: confloat(ge=0, le=1)
+
+
+class PwmStatus(PwmConfiguration):
+    """Interface for the PWM of a GPIO pin along with how its signal is generated."""
+    mode: PwmMode
+
+
+PwmStatusMap = Dict[RaspberryPiPinIds, PwmStatus]
+
+
+class PulseStatistics(BaseModel):
+    """Interface for the number, minimum, mean, and maximum of the periods or pulse widths (µs) of a pin."""
+    count: int = 0
+    min: Optional[float]
+    mean: Optional[float]
+    max: Optional[float]
+
+
+class PulseCounterConfiguration(BaseModel):
+    """
+    Interface for the edge counted as a pulse by the pulse counter of a GPIO input pin and the seconds without a
+    counted edge after which the pin is considered stopped.
+
+    .. note::
+        Periods are measured between counted edges, so counting BOTH edges measures half periods. Without a timeout
+        the pin is considered stopped once no edge was counted for longer than the last period.
+    """
+    edge: PinEdge = PinEdge.RISING
+    timeout: Optional[confloat(gt=0)] = None
+
+
+class PulseCounterStatus(PulseCounterConfiguration):
+    """
+    Interface for the pulse count, frequency (Hz), and pulse timing (µs) of a GPIO input pin.
+
+    .. note::
+        The frequency is measured from the last period and is none once the pin is considered stopped, the mean
+        frequency is measured from every period since the counter was reset. Since is the seconds since the epoch
+        when the counter was started or last reset.
+    """
+    count: int
+    frequency: Optional[float]
+    meanFrequency: Optional[float]
+    lastPeriod: Optional[float]
+    period: PulseStatistics
+    highWidth: PulseStatistics
+    lowWidth: PulseStatistics
+    since: float
+
+
+PulseCounterStatusMap = Dict[RaspberryPiPinIds, PulseCounterStatus]
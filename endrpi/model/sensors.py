@@ -0,0 +1,52 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from endrpi.model.measurement import Measurement, SensorUnit
+
+
+class SensorKind(str, Enum):
+    """Enumerations for the kinds of hardware monitoring sensor inputs."""
+    TEMPERATURE = 'TEMPERATURE'
+    VOLTAGE = 'VOLTAGE'
+    CURRENT = 'CURRENT'
+    POWER = 'POWER'
+    FAN = 'FAN'
+
+
+class Sensor(BaseModel):
+    """
+    Interface for a reading of a hwmon or thermal zone sensor input (i.e. id 'hwmon0.temp1' or 'thermal_zone0').
+
+    .. note::
+        name is the name of the device exposing the input (i.e. 'cpu_thermal' or 'rpi_volt') and label is the label
+        of the input when the driver provides one. value is none when the read failed, with the error set.
+    """
+    id: str
+    name: str
+    label: Optional[str]
+    kind: SensorKind
+    value: Optional[Measurement[SensorUnit]]
+    error: Optional[str]
+
+
+class Sensors(BaseModel):
+    """Interface for a batch of readings of every sensor input, read at timestamp (seconds since the epoch)."""
+    timestamp: float
+    sensors: List[Sensor]
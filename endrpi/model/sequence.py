@@ -0,0 +1,100 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel, conint, conlist, validator
+
+from endrpi.model.pin import RaspberryPiPinIds
+
+# Highest number of steps of a single sequence
+SEQUENCE_MAX_STEPS = 10_000
+
+# Shortest loop (µs) of a sequence played until it is cancelled, shorter loops would keep the playback thread busy
+SEQUENCE_MIN_ENDLESS_LOOP_DURATION = 1_000
+
+
+class SequenceStep(BaseModel):
+    """
+    Interface for a single step of a sequence, the output state (0 or 1) of a GPIO pin held for a delay (µs).
+
+    .. note::
+        Steps with a delay of 0 are written together with the following step.
+    """
+    pin: RaspberryPiPinIds
+    state: conint(ge=0, le=1)
+    delay: conint(ge=0)
+
+
+class Sequence(BaseModel):
+    """
+    Interface for the steps of a sequence and the number of times they are played.
+
+    .. note::
+        A loop count of 0 plays the sequence until it is cancelled, the delays of its steps must then add up to at
+        least :data:`SEQUENCE_MIN_ENDLESS_LOOP_DURATION`.
+    """
+    steps: conlist(SequenceStep, min_items=1, max_items=SEQUENCE_MAX_STEPS)
+    loops: conint(ge=0) = 1
+
+    @validator('loops')
+    def endless_loop_duration(cls, loops: int, values: dict) -> int:
+        if not loops and 'steps' in values and \
+                sum(step.delay for step in values['steps']) < SEQUENCE_MIN_ENDLESS_LOOP_DURATION:
+            raise ValueError(f'Endless sequence loops must last at least {SEQUENCE_MIN_ENDLESS_LOOP_DURATION} '
+                             f'microseconds')
+        return loops
+
+
+class SequenceState(str, Enum):
+    """Enumerations for the playback state of a sequence."""
+    RUNNING = 'RUNNING'
+    COMPLETED = 'COMPLETED'
+    CANCELLED = 'CANCELLED'
+    FAILED = 'FAILED'
+
+
+class SequenceTiming(BaseModel):
+    """
+    Interface for the actual timing of a sequence compared to its requested timing.
+
+    .. note::
+        Latencies are the microseconds each write happened after its requested time, jitter is their standard
+        deviation. Durations are the microseconds from the first write to the last write.
+    """
+    writes: int = 0
+    minLatency: Optional[float]
+    meanLatency: Optional[float]
+    maxLatency: Optional[float]
+    jitter: Optional[float]
+    requestedDuration: Optional[float]
+    actualDuration: Optional[float]
+
+
+class SequenceStatus(BaseModel):
+    """
+    Interface for the playback of an uploaded sequence.
+
+    .. note::
+        Realtime is true when the playback thread runs with the SCHED_FIFO scheduling policy.
+    """
+    id: int
+    state: SequenceState
+    pins: List[RaspberryPiPinIds]
+    loops: int
+    completedLoops: int
+    realtime: bool
+    timing: SequenceTiming
+    error: Optional[str]
@@ -12,11 +12,34 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 from endrpi.model.measurement import Measurement, TemperatureUnit
+from endrpi.model.sensors import Sensor
+
+
+class OneWireTemperature(BaseModel):
+    """
+    Interface for the cached temperature of a 1-Wire sensor (i.e. id '28-0316a2799bff').
+
+    .. note::
+        timestamp is the seconds since the epoch of the last successful read, error is the error of the latest read
+        if it failed. Both temperature and timestamp are none until the first successful read.
+    """
+    id: str
+    temperature: Optional[Measurement[TemperatureUnit]]
+    timestamp: Optional[float]
+    error: Optional[str]
 
 
 class Temperature(BaseModel):
-    """Interface for system temperatures."""
+    """
+    Interface for system temperatures.
+
+    .. note:: sensors holds every hwmon and thermal zone temperature input discovered on startup.
+    """
     systemOnChip: Measurement[TemperatureUnit]
+    oneWire: List[OneWireTemperature] = []
+    sensors: List[Sensor] = []
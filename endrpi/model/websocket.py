@@ -13,12 +13,14 @@
 #  limitations under the License.
 
 from enum import Enum
-from typing import TypeVar, Generic, List, Optional
+from typing import TypeVar, Generic, List, Optional, Dict
 
-from pydantic import BaseModel
+from pydantic import BaseModel, confloat, conint
 from pydantic.generics import GenericModel
 
-from endrpi.model.pin import RaspberryPiPinIds, PinConfigurationMap
+from endrpi.model.pid import PidTuning
+from endrpi.model.pin import RaspberryPiPinIds, PinConfigurationMap, PwmConfiguration, PulseCounterConfiguration, \
+    PinEdgeFilterConfiguration
 
 # Pydantic generics
 T = TypeVar('T')
@@ -31,15 +33,70 @@ class WebSocketInput(GenericModel, Generic[T, S]):
     params: Optional[S]
 
 
-class WebSocketAction(str, Enum):
-    """Enumerations for all web socket actions."""
-    READ_TEMPERATURE = 'READ_TEMPERATURE'
-    READ_THROTTLE = 'READ_THROTTLE'
-    READ_UPTIME = 'READ_UPTIME'
-    READ_FREQUENCY = 'READ_FREQUENCY'
-    READ_MEMORY = 'READ_MEMORY'
-    READ_PIN_CONFIGURATIONS = 'READ_PIN_CONFIGURATIONS'
-    UPDATE_PIN_CONFIGURATIONS = 'UPDATE_PIN_CONFIGURATIONS'
+class WebSocketActionConcurrency(str, Enum):
+    """
+    Enumerations for where a websocket action is executed.
+
+    .. note::
+        Blocking actions (i.e. actions that spawn processes) should be run in the thread pool
+        so they don't stall every other websocket connection.
+    """
+    EVENT_LOOP = 'EVENT_LOOP'
+    THREAD_POOL = 'THREAD_POOL'
+
+
+class WebSocketFrameFormat(str, Enum):
+    """
+    Enumerations for the encoding of websocket frames.
+
+    JSON: Text frames of JSON, the default when no subprotocol is negotiated.
+    MESSAGEPACK: Binary frames of MessagePack negotiated with the `endrpi.msgpack` subprotocol, enumerations are
+    sent as their index in the enumeration (i.e. PinIo.OUTPUT is sent as 1). Received actions and params may use
+    either indexes or values.
+    """
+    JSON = 'JSON'
+    MESSAGEPACK = 'MESSAGEPACK'
+
+
+# Websocket subprotocol (Sec-WebSocket-Protocol) names of the binary frame formats
+WEBSOCKET_SUBPROTOCOLS = {
+    'endrpi.msgpack': WebSocketFrameFormat.MESSAGEPACK
+}
+
+
+class WebSocketOverflowPolicy(str, Enum):
+    """
+    Enumerations for what happens when a websocket connection's outbound queue is full.
+
+    DROP_OLDEST: The oldest queued frame is dropped to make room for the new frame.
+    COALESCE: A queued frame of the same topic is replaced by the new frame, otherwise the oldest frame is dropped.
+    DISCONNECT: The connection is closed.
+    """
+    DROP_OLDEST = 'DROP_OLDEST'
+    COALESCE = 'COALESCE'
+    DISCONNECT = 'DISCONNECT'
+
+
+class WebSocketConnectionStatus(BaseModel):
+    """Interface for the outbound queue status of a websocket connection."""
+    id: int
+    client: Optional[str]
+    frameFormat: WebSocketFrameFormat
+    overflowPolicy: WebSocketOverflowPolicy
+    queueCapacity: int
+    queueDepth: int
+    sentFrames: int
+    droppedFrames: int
+
+
+class WebSocketCapacity(BaseModel):
+    """Interface for the number of open websocket connections and the connection limits."""
+    connections: int
+    maxConnections: Optional[int]
+    maxConnectionsPerClient: Optional[int]
+    clients: Dict[str, int]
+    rejectedConnections: int
+    evictedConnections: int
 
 
 class ReadPinConfigurationsParams(BaseModel):
@@ -48,3 +105,70 @@ class ReadPinConfigurationsParams(BaseModel):
 
 class UpdatePinConfigurationsParams(BaseModel):
     pins: PinConfigurationMap
+
+
+class SubscriptionParams(BaseModel):
+    topics: List[str]
+
+
+class ReadPwmParams(BaseModel):
+    pins: List[RaspberryPiPinIds]
+
+
+class UpdatePwmParams(BaseModel):
+    pins: Dict[RaspberryPiPinIds, PwmConfiguration]
+
+
+class StopPwmParams(BaseModel):
+    pins: List[RaspberryPiPinIds]
+
+
+class WritePwmDutyCyclesParams(BaseModel):
+    dutyCycles: Dict[RaspberryPiPinIds, confloat(ge=0, le=1)]
+
+
+class CancelSequenceParams(BaseModel):
+    id: int
+
+
+class CancelCaptureParams(BaseModel):
+    id: int
+
+
+class ReadPulseCountersParams(BaseModel):
+    pins: List[RaspberryPiPinIds]
+    reset: bool = False
+
+
+class StartPulseCountersParams(BaseModel):
+    pins: Dict[RaspberryPiPinIds, PulseCounterConfiguration]
+
+
+class StopPulseCountersParams(BaseModel):
+    pins: List[RaspberryPiPinIds]
+
+
+class UpdatePinEdgeFiltersParams(BaseModel):
+    pins: Dict[RaspberryPiPinIds, PinEdgeFilterConfiguration]
+
+
+class RemovePinEdgeFiltersParams(BaseModel):
+    pins: List[RaspberryPiPinIds]
+
+
+class ReadAdcSamplesParams(BaseModel):
+    channel: int
+    count: Optional[conint(ge=1)]
+    since: Optional[conint(ge=0)]
+
+
+class ReadOneWireTemperatureParams(BaseModel):
+    sensorId: str
+
+
+class TunePidLoopParams(PidTuning):
+    id: int
+
+
+class StopPidLoopParams(BaseModel):
+    id: int
@@ -0,0 +1,114 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from typing import Optional
+
+from fastapi import APIRouter, Query, status
+from starlette.concurrency import run_in_threadpool
+
+from endrpi.actions.adc import start_adc, read_adc_status, stop_adc, read_adc_samples
+from endrpi.model.adc import AdcConfiguration, AdcSamples, AdcStatus
+from endrpi.model.message import AdcMessage, MessageData
+from endrpi.utils.api import http_response
+
+# Router that is exported to the server
+router = APIRouter()
+
+
+@router.put(
+    '/adc',
+    description='Starts (or restarts) sampling the given channels of an MCP3xxx ADC at a given rate (Hz) into a ring '
+                'buffer per channel, samples of a previously sampled ADC are discarded.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': AdcStatus
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': AdcMessage.ERROR_SPI__CHIP__,
+        }
+    }
+)
+async def put_adc_route(adc_configuration: AdcConfiguration):
+    # Restarting waits for the running sampler to stop and opens the SPI device
+    action_result = await run_in_threadpool(start_adc, adc_configuration)
+    return http_response(action_result)
+
+
+@router.get(
+    '/adc',
+    name='ADC status.',
+    description='Gets the configuration of the sampled ADC along with its measured sample rate.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': AdcStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': AdcMessage.ERROR_NOT_RUNNING,
+        }
+    }
+)
+async def get_adc_route():
+    action_result = read_adc_status()
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.delete(
+    '/adc',
+    description='Stops sampling and discards the samples taken.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': AdcStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': AdcMessage.ERROR_NOT_RUNNING,
+        }
+    }
+)
+async def delete_adc_route():
+    # Stopping waits for the sampling thread to finish
+    action_result = await run_in_threadpool(stop_adc)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.get(
+    '/adc/channels/{channel}/samples',
+    name='ADC channel samples.',
+    description='Gets up to count samples (volts) of a channel starting at sample index since, or the latest count '
+                'samples when since is omitted. Pass the index after the last sample as since to fetch consecutive '
+                'blocks.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': AdcSamples
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': AdcMessage.ERROR_CHANNEL_NOT_SAMPLED__CHANNEL__,
+        }
+    }
+)
+async def get_adc_samples_route(channel: int,
+                                count: Optional[int] = Query(None, ge=1),
+                                since: Optional[int] = Query(None, ge=0)):
+    action_result = read_adc_samples(channel, count, since)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
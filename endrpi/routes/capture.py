@@ -0,0 +1,159 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from typing import List
+
+from fastapi import APIRouter, Query, status
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+
+from endrpi.actions.capture import start_capture, read_capture_statuses, read_capture_status, cancel_capture, \
+    read_capture_data
+from endrpi.model.capture import CaptureConfiguration, CaptureFormat, CaptureStatus
+from endrpi.model.message import CaptureMessage, MessageData
+from endrpi.utils.api import http_response
+
+# Router that is exported to the server
+router = APIRouter()
+
+# Media type and file extension of each capture download format
+CAPTURE_MEDIA_TYPES = {
+    CaptureFormat.BINARY: ('application/octet-stream', 'bin'),
+    CaptureFormat.VCD: ('text/plain', 'vcd')
+}
+
+
+@router.post(
+    '/captures',
+    description='Starts sampling the levels of the given pins at a given rate (Hz), immediately or once the trigger '
+                'condition is met, keeping up to preTrigger samples taken before the trigger.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': CaptureStatus
+        },
+        status.HTTP_409_CONFLICT: {
+            'model': MessageData,
+            'description': CaptureMessage.ERROR_RUNNING,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def post_capture_route(capture_configuration: CaptureConfiguration):
+    action_result = start_capture(capture_configuration)
+    if not action_result.success and action_result.error.message == CaptureMessage.ERROR_RUNNING:
+        return http_response(action_result, status.HTTP_409_CONFLICT)
+    return http_response(action_result)
+
+
+@router.get(
+    '/captures',
+    name='All capture statuses.',
+    description='Gets the state of every running and recently finished capture.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': List[CaptureStatus]
+        }
+    }
+)
+async def get_capture_statuses_route():
+    action_result = read_capture_statuses()
+    return http_response(action_result)
+
+
+@router.get(
+    '/captures/{capture_id}',
+    name='Capture status.',
+    description='Gets the state of a specific capture along with its measured sample rate.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': CaptureStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': CaptureMessage.ERROR_NOT_FOUND__CAPTURE_ID__,
+        }
+    }
+)
+async def get_capture_status_route(capture_id: int):
+    action_result = read_capture_status(capture_id)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.delete(
+    '/captures/{capture_id}',
+    description='Cancels a specific capture, samples taken so far can still be downloaded.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': CaptureStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': CaptureMessage.ERROR_NOT_FOUND__CAPTURE_ID__,
+        }
+    }
+)
+async def delete_capture_route(capture_id: int):
+    # Cancelling waits for the capture thread to stop
+    action_result = await run_in_threadpool(cancel_capture, capture_id)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.get(
+    '/captures/{capture_id}/data',
+    name='Capture samples.',
+    description='Downloads the samples of a specific finished capture from oldest to newest. BINARY samples are '
+                'packed bits, bit j of sample i is bit i * (number of pins) + j (least significant bit first) and '
+                'holds the level of the j-th pin of the X-Capture-Pins header. VCD samples are a value change dump.',
+    responses={
+        status.HTTP_200_OK: {
+            'content': {media_type: {} for media_type, _ in CAPTURE_MEDIA_TYPES.values()}
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': CaptureMessage.ERROR_NOT_FOUND__CAPTURE_ID__,
+        },
+        status.HTTP_409_CONFLICT: {
+            'model': MessageData,
+            'description': CaptureMessage.ERROR_NOT_FINISHED__CAPTURE_ID__,
+        }
+    }
+)
+async def get_capture_data_route(capture_id: int,
+                                 capture_format: CaptureFormat = Query(CaptureFormat.BINARY, alias='format')):
+    status_action_result = read_capture_status(capture_id)
+    if not status_action_result.success:
+        return http_response(status_action_result, status.HTTP_404_NOT_FOUND)
+
+    action_result = await run_in_threadpool(read_capture_data, capture_id, capture_format)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_409_CONFLICT)
+
+    capture_status = status_action_result.data
+    media_type, extension = CAPTURE_MEDIA_TYPES[capture_format]
+    headers = {
+        'Content-Disposition': f'attachment; filename="capture-{capture_id}.{extension}"',
+        'X-Capture-Pins': ','.join(pin_id.value for pin_id in capture_status.pins),
+        'X-Capture-Rate': str(capture_status.rate),
+        'X-Capture-Samples': str(capture_status.capturedSamples)
+    }
+    if capture_status.triggerSample is not None:
+        headers['X-Capture-Trigger-Sample'] = str(capture_status.triggerSample)
+    return Response(content=action_result.data, media_type=media_type, headers=headers)
@@ -0,0 +1,96 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from fastapi import APIRouter, status
+from starlette.concurrency import run_in_threadpool
+
+from endrpi.actions.fan import start_fan, read_fan, stop_fan
+from endrpi.actions.pin import pin_owners
+from endrpi.model.fan import FanConfiguration, FanStatus
+from endrpi.model.message import FanMessage, MessageData, PinMessage
+from endrpi.utils.api import http_response
+
+# Router that is exported to the server
+# Note: Starting and stopping the fan waits on the lock of its pin, so they are run in the thread pool
+router = APIRouter()
+
+
+@router.put(
+    '/fan',
+    description='Starts (or retunes) the fan controller, which drives PWM on a pin following a curve of the '
+                'temperature of a sensor discovered on startup, read in-process every interval.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': FanStatus
+        },
+        status.HTTP_409_CONFLICT: {
+            'model': MessageData,
+            'description': PinMessage.ERROR_IN_USE__PIN_ID__OWNER__,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': FanMessage.ERROR_SENSOR_NOT_FOUND__SENSOR_ID__,
+        }
+    }
+)
+async def put_fan_route(fan_configuration: FanConfiguration):
+    action_result = await run_in_threadpool(start_fan, fan_configuration)
+    # Pins owned by a sequence or a PID loop are a conflict rather than a failure
+    owner = pin_owners.owner(fan_configuration.pinId)
+    in_use_message = PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=fan_configuration.pinId, owner=owner)
+    if not action_result.success and owner and action_result.error.message == in_use_message:
+        return http_response(action_result, status.HTTP_409_CONFLICT)
+    return http_response(action_result)
+
+
+@router.get(
+    '/fan',
+    name='Fan controller status.',
+    description='Gets the configuration of the fan controller along with the latest temperature and duty cycle.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': FanStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': FanMessage.ERROR_NOT_RUNNING,
+        }
+    }
+)
+async def get_fan_route():
+    action_result = read_fan()
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.delete(
+    '/fan',
+    description='Stops the fan controller along with PWM of its pin.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': FanStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': FanMessage.ERROR_NOT_RUNNING,
+        }
+    }
+)
+async def delete_fan_route():
+    action_result = await run_in_threadpool(stop_fan)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
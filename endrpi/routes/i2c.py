@@ -0,0 +1,125 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from typing import List
+
+from fastapi import APIRouter, status
+from starlette.concurrency import run_in_threadpool
+
+from endrpi.actions.i2c import read_i2c_blocks, write_i2c_blocks, read_i2c_poll, update_i2c_poll, stop_i2c_poll
+from endrpi.model.i2c import I2cBlock, I2cBlockReads, I2cBlockWrites, I2cPollConfiguration, I2cPollStatus
+from endrpi.model.message import I2cMessage, MessageData
+from endrpi.utils.api import http_response
+
+# Router that is exported to the server
+router = APIRouter()
+
+
+@router.post(
+    '/i2c/read',
+    name='I2C block reads.',
+    description='Reads consecutive registers of the given devices, reads of the same bus are combined into a single '
+                'bus transfer and blocks are returned in the order of the reads.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': List[I2cBlock]
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': I2cMessage.ERROR_TRANSFER__BUS__ADDRESS__,
+        }
+    }
+)
+async def post_i2c_read_route(block_reads: I2cBlockReads):
+    # Bus transfers block until every read of the bus is done
+    action_result = await run_in_threadpool(read_i2c_blocks, block_reads)
+    return http_response(action_result)
+
+
+@router.post(
+    '/i2c/write',
+    description='Writes consecutive registers of the given devices, writes of the same bus are combined into a single '
+                'bus transfer.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': MessageData
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': I2cMessage.ERROR_TRANSFER__BUS__ADDRESS__,
+        }
+    }
+)
+async def post_i2c_write_route(block_writes: I2cBlockWrites):
+    # Bus transfers block until every write of the bus is done
+    action_result = await run_in_threadpool(write_i2c_blocks, block_writes)
+    return http_response(action_result)
+
+
+@router.get(
+    '/i2c/poll',
+    name='I2C poll set.',
+    description='Gets the latest blocks read by the poll set without a bus transfer.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': I2cPollStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': I2cMessage.ERROR_POLL_NOT_RUNNING,
+        }
+    }
+)
+async def get_i2c_poll_route():
+    action_result = read_i2c_poll()
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.put(
+    '/i2c/poll',
+    description='Replaces the poll set, the given blocks are read every interval (seconds) and cached by the server.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': I2cPollStatus
+        }
+    }
+)
+async def put_i2c_poll_route(poll_configuration: I2cPollConfiguration):
+    # Replacing the poll set stops the running poll and reads the first poll on the bus
+    action_result = await run_in_threadpool(update_i2c_poll, poll_configuration)
+    return http_response(action_result)
+
+
+@router.delete(
+    '/i2c/poll',
+    description='Stops the poll set.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': MessageData
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': I2cMessage.ERROR_POLL_NOT_RUNNING,
+        }
+    }
+)
+async def delete_i2c_poll_route():
+    # Stopping waits for the running poll to stop
+    action_result = await run_in_threadpool(stop_i2c_poll)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
@@ -0,0 +1,135 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from typing import List
+
+from fastapi import APIRouter, status
+from starlette.concurrency import run_in_threadpool
+
+from endrpi.actions.pid import start_pid_loop, read_pid_loops, read_pid_loop, tune_pid_loop, stop_pid_loop
+from endrpi.actions.pin import pin_owners
+from endrpi.model.message import MessageData, PidMessage, PinMessage
+from endrpi.model.pid import PidConfiguration, PidStatus, PidTuning
+from endrpi.utils.api import http_response
+
+# Router that is exported to the server
+# Note: Starting and stopping loops waits on the lock of their output pin, so they are run in the thread pool
+router = APIRouter()
+
+
+@router.post(
+    '/pid',
+    description='Starts a PID loop driving an output pin from a sensor, ADC channel or pulse counter at a given rate '
+                '(Hz) on a dedicated thread.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PidStatus
+        },
+        status.HTTP_409_CONFLICT: {
+            'model': MessageData,
+            'description': PinMessage.ERROR_IN_USE__PIN_ID__OWNER__,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def post_pid_loop_route(pid_configuration: PidConfiguration):
+    action_result = await run_in_threadpool(start_pid_loop, pid_configuration)
+    # Output pins owned by the fan controller, a sequence or another PID loop are a conflict rather than a failure
+    pin_id = pid_configuration.output.pinId
+    owner = pin_owners.owner(pin_id)
+    in_use_message = PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=pin_id, owner=owner)
+    if not action_result.success and owner and action_result.error.message == in_use_message:
+        return http_response(action_result, status.HTTP_409_CONFLICT)
+    return http_response(action_result)
+
+
+@router.get(
+    '/pid',
+    name='All PID loop statuses.',
+    description='Gets the state of every PID loop.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': List[PidStatus]
+        }
+    }
+)
+async def get_pid_loops_route():
+    action_result = read_pid_loops()
+    return http_response(action_result)
+
+
+@router.get(
+    '/pid/{loop_id}',
+    name='PID loop status.',
+    description='Gets the state of a specific PID loop along with the jitter of its loop period.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PidStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': PidMessage.ERROR_NOT_FOUND__LOOP_ID__,
+        }
+    }
+)
+async def get_pid_loop_route(loop_id: int):
+    action_result = read_pid_loop(loop_id)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.put(
+    '/pid/{loop_id}/tuning',
+    description='Replaces the setpoint and gains of a specific PID loop from its next iteration on.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PidStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': PidMessage.ERROR_NOT_FOUND__LOOP_ID__,
+        }
+    }
+)
+async def put_pid_loop_tuning_route(loop_id: int, pid_tuning: PidTuning):
+    action_result = tune_pid_loop(loop_id, pid_tuning)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.delete(
+    '/pid/{loop_id}',
+    description='Stops and removes a specific PID loop, PWM of its output pin is stopped and digital outputs are '
+                'driven low.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PidStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': PidMessage.ERROR_NOT_FOUND__LOOP_ID__,
+        }
+    }
+)
+async def delete_pid_loop_route(loop_id: int):
+    action_result = await run_in_threadpool(stop_pid_loop, loop_id)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
@@ -15,14 +15,23 @@
 from typing import Dict, Union
 
 from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
-from endrpi.actions.pin import read_pin_configurations, read_pin_configuration, update_pin_configuration
+from endrpi.actions.pin import read_pin_configurations, read_pin_configuration, update_pin_configuration, \
+    update_pin_configurations, read_pwm_statuses, read_pwm_status, update_pwm, stop_pwm, read_pulse_counters, \
+    read_pulse_counter, start_pulse_counter, stop_pulse_counter, read_pin_edge_filters, read_pin_edge_filter, \
+    update_pin_edge_filter, remove_pin_edge_filter, pin_owners
+from endrpi.config.board import get_board
 from endrpi.model.action_result import ActionResult, error_action_result
 from endrpi.model.message import MessageData, PinMessage
-from endrpi.model.pin import PinConfiguration, RaspberryPiPinIds, PinIo
+from endrpi.model.pin import RaspberryPiPinIds, PinConfiguration, PinIo, PinConfigurationMap, PinUpdateOutcomeMap, \
+    PinUpdateErrorData, PinUpdateStatus, PwmConfiguration, PwmStatus, PwmStatusMap, PulseCounterConfiguration, \
+    PulseCounterStatus, PulseCounterStatusMap, PinEdgeFilterConfiguration, PinEdgeFilterStatus, PinEdgeFilterStatusMap
 from endrpi.utils.api import http_response
 
 # Router that is exported to the server
+# Note: Pin configuration and PWM actions wait on the pin locks, so they are run in the thread pool
 router = APIRouter()
 
 
@@ -41,11 +50,40 @@ router = APIRouter()
     }
 )
 async def get_pin_configurations_route():
-    pin_ids = list(RaspberryPiPinIds)
-    pin_states_action_result = read_pin_configurations(pin_ids)
+    pin_ids = list(get_board().pins)
+    pin_states_action_result = await run_in_threadpool(read_pin_configurations, pin_ids)
     return http_response(pin_states_action_result)
 
 
+@router.put(
+    '/pins',
+    description='Updates the pin configurations of multiple pins at once using their BCM numbers (i.e. \'GPIO17\'). '
+                'Every pin configuration is validated before any pin is updated.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PinUpdateOutcomeMap
+        },
+        status.HTTP_400_BAD_REQUEST: {
+            'model': PinUpdateErrorData,
+            'description': PinMessage.ERROR_INVALID_CONFIGURATIONS,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': PinUpdateErrorData,
+            'description': PinMessage.ERROR_UPDATES_FAILED,
+        }
+    }
+)
+async def put_pin_configurations_route(pin_configuration_map: PinConfigurationMap):
+    action_result = await run_in_threadpool(update_pin_configurations, pin_configuration_map)
+    if not action_result.success:
+        # Invalid configurations are a client error, no pin was updated
+        outcomes = action_result.error.pins.values()
+        if any(outcome.status is PinUpdateStatus.INVALID for outcome in outcomes):
+            return http_response(action_result, status.HTTP_400_BAD_REQUEST)
+
+    return http_response(action_result)
+
+
 @router.get(
     '/pins/{bcm_id}',
     name='Pin configuration.',
@@ -65,9 +103,9 @@ async def get_pin_configurations_route():
     }
 )
 async def get_pin_configuration_route(bcm_id: str):
-    valid_pin_id = RaspberryPiPinIds.from_bcm_id(bcm_id)
+    valid_pin_id = get_board().find_pin(bcm_id)
     if valid_pin_id:
-        pin_action_result = read_pin_configuration(valid_pin_id)
+        pin_action_result = await run_in_threadpool(read_pin_configuration, valid_pin_id)
         return http_response(pin_action_result)
     else:
         action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
@@ -85,6 +123,10 @@ async def get_pin_configuration_route(bcm_id: str):
             'model': MessageData,
             'description': PinMessage.ERROR_NOT_FOUND__PIN_ID__,
         },
+        status.HTTP_409_CONFLICT: {
+            'model': MessageData,
+            'description': PinMessage.ERROR_IN_USE__PIN_ID__OWNER__,
+        },
         status.HTTP_500_INTERNAL_SERVER_ERROR: {
             'model': MessageData,
             'description': 'An error occurred',
@@ -92,7 +134,7 @@ async def get_pin_configuration_route(bcm_id: str):
     }
 )
 async def put_pin_state_param_route(bcm_id: str, pin_configuration: PinConfiguration):
-    valid_pin_id = RaspberryPiPinIds.from_bcm_id(bcm_id)
+    valid_pin_id = get_board().find_pin(bcm_id)
     if valid_pin_id:
         # Input configurations must specify a pin pull, output configurations must specify a state
         if pin_configuration.io is PinIo.INPUT and not pin_configuration.pull:
@@ -102,8 +144,335 @@ async def put_pin_state_param_route(bcm_id: str, pin_configuration: PinConfigura
             action_result = error_action_result(PinMessage.ERROR_NO_OUTPUT_STATE)
             return http_response(action_result, status.HTTP_400_BAD_REQUEST)
 
-        action_result = update_pin_configuration(valid_pin_id, pin_configuration)
-        return http_response(action_result)
+        action_result = await run_in_threadpool(update_pin_configuration, valid_pin_id, pin_configuration)
+        return __pin_action_response(valid_pin_id, action_result)
+    else:
+        action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+
+@router.get(
+    '/pwm',
+    name='All PWM statuses.',
+    description='Gets the PWM frequency, duty cycle, and mode of every pin with PWM running.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PwmStatusMap
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def get_pwm_statuses_route():
+    pwm_statuses_action_result = read_pwm_statuses(list(get_board().pins))
+    return http_response(pwm_statuses_action_result)
+
+
+@router.get(
+    '/pins/{bcm_id}/pwm',
+    name='PWM status.',
+    description='Gets the PWM frequency, duty cycle, and mode of a specific pin using its BCM number (i.e. '
+                '\'GPIO18\').',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PwmStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': f'{PinMessage.ERROR_NOT_FOUND__PIN_ID__} or {PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__}',
+        }
+    }
+)
+async def get_pwm_status_route(bcm_id: str):
+    valid_pin_id = get_board().find_pin(bcm_id)
+    if valid_pin_id:
+        pwm_action_result = read_pwm_status(valid_pin_id)
+        if not pwm_action_result.success:
+            return http_response(pwm_action_result, status.HTTP_404_NOT_FOUND)
+        return http_response(pwm_action_result)
+    else:
+        action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+
+@router.put(
+    '/pins/{bcm_id}/pwm',
+    description='Starts (or reconfigures) PWM on a specific pin using its BCM number (i.e. \'GPIO18\'). GPIO12, '
+                'GPIO13, GPIO18, and GPIO19 use hardware PWM when the PWM overlay is enabled and the native pin '
+                'backend is used, every other pin uses software PWM.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PwmStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': PinMessage.ERROR_NOT_FOUND__PIN_ID__,
+        },
+        status.HTTP_409_CONFLICT: {
+            'model': MessageData,
+            'description': PinMessage.ERROR_IN_USE__PIN_ID__OWNER__,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def put_pwm_route(bcm_id: str, pwm_configuration: PwmConfiguration):
+    valid_pin_id = get_board().find_pin(bcm_id)
+    if valid_pin_id:
+        action_result = await run_in_threadpool(update_pwm, valid_pin_id, pwm_configuration)
+        return __pin_action_response(valid_pin_id, action_result)
     else:
         action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
         return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+
+@router.delete(
+    '/pins/{bcm_id}/pwm',
+    description='Stops PWM on a specific pin using its BCM number (i.e. \'GPIO18\').',
+    responses={
+        status.HTTP_200_OK: {
+            'model': MessageData
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': f'{PinMessage.ERROR_NOT_FOUND__PIN_ID__} or {PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__}',
+        },
+        status.HTTP_409_CONFLICT: {
+            'model': MessageData,
+            'description': PinMessage.ERROR_IN_USE__PIN_ID__OWNER__,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def delete_pwm_route(bcm_id: str):
+    valid_pin_id = get_board().find_pin(bcm_id)
+    if not valid_pin_id:
+        action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+    if not read_pwm_status(valid_pin_id).success:
+        action_result = error_action_result(PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__.format(pin_id=valid_pin_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+    action_result = await run_in_threadpool(stop_pwm, valid_pin_id)
+    return __pin_action_response(valid_pin_id, action_result)
+
+
+@router.get(
+    '/counters',
+    name='All pulse counter statuses.',
+    description='Gets the pulse count, frequency, and pulse timing of every pin with a running pulse counter. Every '
+                'counter is reset in the same step when reset is true.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PulseCounterStatusMap
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def get_pulse_counters_route(reset: bool = False):
+    pulse_counters_action_result = read_pulse_counters(list(get_board().pins), reset)
+    return http_response(pulse_counters_action_result)
+
+
+@router.get(
+    '/pins/{bcm_id}/counter',
+    name='Pulse counter status.',
+    description='Gets the pulse count, frequency, and pulse timing of a specific pin using its BCM number (i.e. '
+                '\'GPIO17\'). The counter is reset in the same step when reset is true, so no pulse is lost between '
+                'the read and the reset.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PulseCounterStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': f'{PinMessage.ERROR_NOT_FOUND__PIN_ID__} or '
+                           f'{PinMessage.ERROR_COUNTER_NOT_RUNNING__PIN_ID__}',
+        }
+    }
+)
+async def get_pulse_counter_route(bcm_id: str, reset: bool = False):
+    valid_pin_id = get_board().find_pin(bcm_id)
+    if not valid_pin_id:
+        action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+    action_result = read_pulse_counter(valid_pin_id, reset)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.put(
+    '/pins/{bcm_id}/counter',
+    description='Starts (or restarts) counting the pulses of a specific pin using its BCM number (i.e. \'GPIO17\'), '
+                'periods are measured between counted edges.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PulseCounterStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': PinMessage.ERROR_NOT_FOUND__PIN_ID__,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def put_pulse_counter_route(bcm_id: str, pulse_counter_configuration: PulseCounterConfiguration):
+    valid_pin_id = get_board().find_pin(bcm_id)
+    if not valid_pin_id:
+        action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+    action_result = await run_in_threadpool(start_pulse_counter, valid_pin_id, pulse_counter_configuration)
+    return http_response(action_result)
+
+
+@router.delete(
+    '/pins/{bcm_id}/counter',
+    description='Stops counting the pulses of a specific pin using its BCM number (i.e. \'GPIO17\') and gets its '
+                'final status.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PulseCounterStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': f'{PinMessage.ERROR_NOT_FOUND__PIN_ID__} or '
+                           f'{PinMessage.ERROR_COUNTER_NOT_RUNNING__PIN_ID__}',
+        }
+    }
+)
+async def delete_pulse_counter_route(bcm_id: str):
+    valid_pin_id = get_board().find_pin(bcm_id)
+    if not valid_pin_id:
+        action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+    action_result = await run_in_threadpool(stop_pulse_counter, valid_pin_id)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.get(
+    '/filters',
+    name='All edge filter statuses.',
+    description='Gets the edge filter and the number of passed and filtered edges of every filtered pin.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PinEdgeFilterStatusMap
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def get_pin_edge_filters_route():
+    pin_edge_filters_action_result = read_pin_edge_filters()
+    return http_response(pin_edge_filters_action_result)
+
+
+@router.get(
+    '/pins/{bcm_id}/filter',
+    name='Edge filter status.',
+    description='Gets the edge filter and the number of passed and filtered edges of a specific pin using its BCM '
+                'number (i.e. \'GPIO17\').',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PinEdgeFilterStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': f'{PinMessage.ERROR_NOT_FOUND__PIN_ID__} or {PinMessage.ERROR_FILTER_NOT_SET__PIN_ID__}',
+        }
+    }
+)
+async def get_pin_edge_filter_route(bcm_id: str):
+    valid_pin_id = get_board().find_pin(bcm_id)
+    if not valid_pin_id:
+        action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+    action_result = read_pin_edge_filter(valid_pin_id)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.put(
+    '/pins/{bcm_id}/filter',
+    description='Sets (or replaces) the edge filter of a specific pin using its BCM number (i.e. \'GPIO17\'). The '
+                'filter debounces edges before they reach edge event streams and pulse counters of the pin, keeping '
+                'the leading edge, the trailing edge once the pin is stable for the window, or at most rate edges '
+                'per second.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PinEdgeFilterStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': PinMessage.ERROR_NOT_FOUND__PIN_ID__,
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def put_pin_edge_filter_route(bcm_id: str, pin_edge_filter_configuration: PinEdgeFilterConfiguration):
+    valid_pin_id = get_board().find_pin(bcm_id)
+    if not valid_pin_id:
+        action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+    action_result = await run_in_threadpool(update_pin_edge_filter, valid_pin_id, pin_edge_filter_configuration)
+    return http_response(action_result)
+
+
+@router.delete(
+    '/pins/{bcm_id}/filter',
+    description='Removes the edge filter of a specific pin using its BCM number (i.e. \'GPIO17\') and gets its final '
+                'status.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': PinEdgeFilterStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': f'{PinMessage.ERROR_NOT_FOUND__PIN_ID__} or {PinMessage.ERROR_FILTER_NOT_SET__PIN_ID__}',
+        }
+    }
+)
+async def delete_pin_edge_filter_route(bcm_id: str):
+    valid_pin_id = get_board().find_pin(bcm_id)
+    if not valid_pin_id:
+        action_result = error_action_result(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=bcm_id))
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+
+    action_result = await run_in_threadpool(remove_pin_edge_filter, valid_pin_id)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+def __pin_action_response(pin_id: RaspberryPiPinIds, action_result: ActionResult) -> JSONResponse:
+    # Pins owned by the fan controller, a sequence or a PID loop are a conflict rather than a failure
+    if not action_result.success and pin_owners.owner(pin_id):
+        return http_response(action_result, status.HTTP_409_CONFLICT)
+    return http_response(action_result)
@@ -0,0 +1,105 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from typing import List
+
+from fastapi import APIRouter, status
+from starlette.concurrency import run_in_threadpool
+
+from endrpi.actions.sequence import start_sequence, read_sequence_statuses, read_sequence_status, cancel_sequence
+from endrpi.model.message import MessageData, SequenceMessage
+from endrpi.model.sequence import Sequence, SequenceStatus
+from endrpi.utils.api import http_response
+
+# Router that is exported to the server
+router = APIRouter()
+
+
+@router.post(
+    '/sequences',
+    description='Uploads a sequence of (pin, state, delay) steps and plays it on the server, each state is held for '
+                'its delay in microseconds before the next step. The sequence is played loops times, or until it is '
+                'cancelled when loops is 0.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': SequenceStatus
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def post_sequence_route(sequence: Sequence):
+    # Starting waits on the locks of the sequence pins
+    action_result = await run_in_threadpool(start_sequence, sequence)
+    return http_response(action_result)
+
+
+@router.get(
+    '/sequences',
+    name='All sequence statuses.',
+    description='Gets the playback state and timing of every running and recently finished sequence.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': List[SequenceStatus]
+        }
+    }
+)
+async def get_sequence_statuses_route():
+    action_result = read_sequence_statuses()
+    return http_response(action_result)
+
+
+@router.get(
+    '/sequences/{sequence_id}',
+    name='Sequence status.',
+    description='Gets the playback state of a specific sequence along with its actual timing compared to its '
+                'requested timing.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': SequenceStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': SequenceMessage.ERROR_NOT_FOUND__SEQUENCE_ID__,
+        }
+    }
+)
+async def get_sequence_status_route(sequence_id: int):
+    action_result = read_sequence_status(sequence_id)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
+
+
+@router.delete(
+    '/sequences/{sequence_id}',
+    description='Cancels a specific sequence, its pins keep the last state written by the sequence.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': SequenceStatus
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': SequenceMessage.ERROR_NOT_FOUND__SEQUENCE_ID__,
+        }
+    }
+)
+async def delete_sequence_route(sequence_id: int):
+    # Cancelling waits for the playback thread to stop
+    action_result = await run_in_threadpool(cancel_sequence, sequence_id)
+    if not action_result.success:
+        return http_response(action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(action_result)
@@ -12,16 +12,19 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+from typing import List
+
 from fastapi import APIRouter, status
 
 from endrpi.actions.system import read_platform, read_temperature, read_throttle, read_uptime, read_frequency, \
-    read_memory, read_system
+    read_memory, read_system, read_one_wire_temperatures, read_one_wire_temperature, read_sensors
 from endrpi.model.frequency import Frequency
 from endrpi.model.memory import Memory
-from endrpi.model.message import MessageData
+from endrpi.model.message import MessageData, TemperatureMessage
 from endrpi.model.platform import Platform
+from endrpi.model.sensors import Sensors
 from endrpi.model.system import System
-from endrpi.model.temperature import Temperature
+from endrpi.model.temperature import OneWireTemperature, Temperature
 from endrpi.model.throttle import Throttle
 from endrpi.model.up_time import UpTime
 from endrpi.utils.api import http_response
@@ -70,6 +73,7 @@ async def get_platform_route():
 @router.get(
     '/system/temperature',
     name='System on chip temperature',
+    description='Returns the system on chip temperature along with the cached temperatures of 1-Wire sensors.',
     responses={
         status.HTTP_200_OK: {
             'model': Temperature
@@ -84,6 +88,65 @@ async def get_temperature_route():
     return http_response(temperature_action_result)
 
 
+@router.get(
+    '/system/temperature/one-wire',
+    name='1-Wire sensor temperatures',
+    description='Returns the cached temperature of every 1-Wire sensor, sensors are polled in the background.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': List[OneWireTemperature]
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': TemperatureMessage.ERROR_ONE_WIRE_DISABLED,
+        }
+    })
+async def get_one_wire_temperatures_route():
+    one_wire_action_result = read_one_wire_temperatures()
+    if not one_wire_action_result.success:
+        return http_response(one_wire_action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(one_wire_action_result)
+
+
+@router.get(
+    '/system/temperature/one-wire/{sensor_id}',
+    name='1-Wire sensor temperature',
+    description='Returns the cached temperature of a 1-Wire sensor (i.e. 28-0316a2799bff).',
+    responses={
+        status.HTTP_200_OK: {
+            'model': OneWireTemperature
+        },
+        status.HTTP_404_NOT_FOUND: {
+            'model': MessageData,
+            'description': TemperatureMessage.ERROR_ONE_WIRE_NOT_FOUND__SENSOR_ID__,
+        }
+    })
+async def get_one_wire_temperature_route(sensor_id: str):
+    one_wire_action_result = read_one_wire_temperature(sensor_id)
+    if not one_wire_action_result.success:
+        return http_response(one_wire_action_result, status.HTTP_404_NOT_FOUND)
+    return http_response(one_wire_action_result)
+
+
+@router.get(
+    '/system/sensors',
+    name='Hardware monitoring sensors',
+    description='Returns every temperature, voltage, current, power and fan input of the hwmon devices and thermal '
+                'zones discovered on startup, read in a single batch.',
+    responses={
+        status.HTTP_200_OK: {
+            'model': Sensors
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    })
+async def get_sensors_route():
+    sensors_action_result = read_sensors()
+    return http_response(sensors_action_result)
+
+
 @router.get(
     '/system/throttle',
     name='Past and present throttling',
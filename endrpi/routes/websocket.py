@@ -12,107 +12,210 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from json.decoder import JSONDecodeError
-
-from fastapi import APIRouter
-from fastapi.websockets import WebSocket, WebSocketDisconnect
-
-from endrpi.actions.pin import read_pin_configurations, update_pin_configuration
-from endrpi.actions.system import read_temperature, read_throttle, read_uptime, read_frequency, read_memory
-from endrpi.model.action_result import error_action_result, success_action_result
-from endrpi.model.message import WebSocketMessage
-from endrpi.model.pin import PinConfigurationMap
-from endrpi.model.websocket import WebSocketAction, ReadPinConfigurationsParams, \
-    UpdatePinConfigurationsParams
-from endrpi.utils.api import parse_websocket_action, \
-    validate_websocket_action, websocket_response, validate_websocket_params, parse_websocket_params
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, status
+from fastapi.websockets import WebSocket
+from starlette.concurrency import run_in_threadpool
+
+from endrpi.actions.websocket import WEBSOCKET_ACTIONS, WebSocketActionDefinition, broadcast_topics, \
+    read_websocket_connections, read_websocket_capacity
+from endrpi.config.board import get_board
+from endrpi.config.websocket import get_websocket_settings
+from endrpi.model.action_result import ActionResult, error_action_result
+from endrpi.model.message import MessageData, WebSocketMessage
+from endrpi.model.websocket import WebSocketActionConcurrency, WebSocketConnectionStatus, WebSocketFrameFormat, \
+    WEBSOCKET_SUBPROTOCOLS, WebSocketCapacity
+from endrpi.utils.api import parse_websocket_action, validate_websocket_action, validate_websocket_params, \
+    parse_websocket_params, websocket_frame, http_response, decode_websocket_message
+from endrpi.utils.broadcast import BroadcastHub
+from endrpi.utils.websocket import WebSocketConnection, connection_limit_close_code
 
 # Router that is exported to the server
 router = APIRouter()
 
+# Successful results of cacheable actions keyed by action name, shared between every websocket connection
+action_result_cache: Dict[str, Tuple[float, ActionResult]] = {}
+
+# Hub that samples each subscribed topic once per interval and pushes it to every subscribed connection
+# Note: Pin topics are only published for the pins of the detected board
+broadcast_hub = BroadcastHub(lambda: broadcast_topics(get_board().pins),
+                             interval=lambda: get_websocket_settings().broadcast_interval,
+                             encode=websocket_frame)
+
+# Every open websocket connection
+connections: Set[WebSocketConnection] = set()
+
+# Number of connections rejected by the connection limits and evicted by the idle timeout
+connection_counts: Counter = Counter(rejected=0, evicted=0)
+
 
 @router.websocket('/')
 async def websocket_route(websocket: WebSocket):
+    # Use the first requested subprotocol with a known frame format, otherwise fall back to JSON without a subprotocol
+    requested_subprotocols = websocket.scope.get('subprotocols') or []
+    subprotocol = next((name for name in requested_subprotocols if name in WEBSOCKET_SUBPROTOCOLS), None)
+    frame_format = WEBSOCKET_SUBPROTOCOLS[subprotocol] if subprotocol else WebSocketFrameFormat.JSON
+
     # Wait for the websocket to finish connecting
-    await websocket.accept()
+    # Note: Rejected connections are accepted first so the client receives the close code
+    await websocket.accept(subprotocol=subprotocol)
+
+    settings = get_websocket_settings()
+    connection = WebSocketConnection(websocket,
+                                     broadcast_hub,
+                                     queue_size=settings.outbound_queue_size,
+                                     overflow_policy=settings.overflow_policy,
+                                     frame_format=frame_format)
+
+    close_code = connection_limit_close_code(connections, connection.client_host, settings)
+    if close_code is not None:
+        connection_counts['rejected'] += 1
+        await connection.disconnect(close_code)
+        return
+
+    connections.add(connection)
+    try:
+        await __receive_messages(connection, idle_timeout=settings.idle_timeout)
+    finally:
+        connections.discard(connection)
+        connection.close()
+
+
+@router.get(
+    '/websocket/connections',
+    name='Websocket connections',
+    description='Gets the outbound queue depth and dropped frame count of every open websocket connection.',
+    tags=['websocket'],
+    responses={
+        status.HTTP_200_OK: {
+            'model': List[WebSocketConnectionStatus]
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def get_websocket_connections_route():
+    connections_action_result = read_websocket_connections(list(connections))
+    return http_response(connections_action_result)
+
+
+@router.get(
+    '/websocket/capacity',
+    name='Websocket capacity',
+    description='Gets the number of open websocket connections in total and per client along with the connection '
+                'limits.',
+    tags=['websocket'],
+    responses={
+        status.HTTP_200_OK: {
+            'model': WebSocketCapacity
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            'model': MessageData,
+            'description': 'An error occurred',
+        }
+    }
+)
+async def get_websocket_capacity_route():
+    capacity_action_result = read_websocket_capacity(list(connections),
+                                                     get_websocket_settings(),
+                                                     rejected_connections=connection_counts['rejected'],
+                                                     evicted_connections=connection_counts['evicted'])
+    return http_response(capacity_action_result)
+
+
+async def __receive_messages(connection: WebSocketConnection, idle_timeout: Optional[float]):
+    websocket = connection.websocket
 
     while True:
 
         try:
-            received_message = await websocket.receive_json()
-        except JSONDecodeError:
+            message = await asyncio.wait_for(websocket.receive(), timeout=idle_timeout)
+        except asyncio.TimeoutError:
+            # Evict connections that haven't sent a message within the idle timeout
+            connection_counts['evicted'] += 1
+            await connection.disconnect(status.WS_1001_GOING_AWAY)
+            break
+
+        if message['type'] == 'websocket.disconnect':
+            break
+
+        try:
+            received_message = decode_websocket_message(message, connection.frame_format)
+        except ValueError:
             error_result = error_action_result(WebSocketMessage.ERROR_INVALID_DATA)
-            error_response = websocket_response(action=None, action_result=error_result)
-            await websocket.send_json(error_response)
+            await __send_response(connection, action=None, action_result=error_result)
             continue
-        except WebSocketDisconnect:
-            break
 
         action = parse_websocket_action(received_message)
         if not action:
             action_result = error_action_result(WebSocketMessage.ERROR_MISSING_ACTION_FIELD)
-            response = websocket_response(action=None, action_result=action_result)
-            await websocket.send_json(response)
+            await __send_response(connection, action=None, action_result=action_result)
             continue
 
         validated_action = validate_websocket_action(action)
         if not validated_action:
             action_result = error_action_result(WebSocketMessage.ERROR_INVALID_ACTION_FIELD)
-            response = websocket_response(action=None, action_result=action_result)
-            await websocket.send_json(response)
+            await __send_response(connection, action=None, action_result=action_result)
             continue
 
         params = parse_websocket_params(received_message)
 
-        if validated_action is WebSocketAction.READ_TEMPERATURE:
-            action_result = read_temperature()
-        elif validated_action is WebSocketAction.READ_THROTTLE:
-            action_result = read_throttle()
-        elif validated_action is WebSocketAction.READ_UPTIME:
-            action_result = read_uptime()
-        elif validated_action is WebSocketAction.READ_FREQUENCY:
-            action_result = read_frequency()
-        elif validated_action is WebSocketAction.READ_MEMORY:
-            action_result = read_memory()
-        elif validated_action is WebSocketAction.READ_PIN_CONFIGURATIONS:
-            action_result = __read_pin_configurations(params)
-        elif validated_action is WebSocketAction.UPDATE_PIN_CONFIGURATIONS:
-            action_result = __update_pin_configurations(params)
+        action_definition = WEBSOCKET_ACTIONS.get(validated_action.value)
+        if action_definition:
+            action_result = await run_websocket_action(validated_action.value, action_definition, params, connection)
+            if action_result.success and not action_definition.acknowledged:
+                continue
         else:
             action_result = error_action_result(WebSocketMessage.ERROR_UNKNOWN_ACTION_VALUE)
 
-        response = websocket_response(action=validated_action.value, action_result=action_result)
-        await websocket.send_json(response)
+        await __send_response(connection, action=validated_action.value, action_result=action_result)
         continue
 
 
-def __read_pin_configurations(params):
-    if not params:
-        return error_action_result(WebSocketMessage.ERROR_MISSING_PARAMS_FIELD)
+async def __send_response(connection: WebSocketConnection, action: Optional[str], action_result: ActionResult):
+    frame = websocket_frame(action=action, action_result=action_result, frame_format=connection.frame_format)
+    await connection.send_frame(frame)
 
-    validated_params = validate_websocket_params(params, ReadPinConfigurationsParams)
-    if not validated_params:
-        return error_action_result(WebSocketMessage.ERROR_INVALID_PARAMS_FIELD)
 
-    return read_pin_configurations(validated_params.pins)
+async def run_websocket_action(action_name: str,
+                               action_definition: WebSocketActionDefinition,
+                               params: Optional[any],
+                               connection: WebSocketConnection) -> ActionResult:
+    """
+    Returns the result of validating the params of a websocket action and running its handler according to the
+    concurrency and caching policy of its :class:`~endrpi.actions.websocket.WebSocketActionDefinition`.
+    """
 
+    handler_args = [connection] if action_definition.connection_handler else []
+    if action_definition.params_model:
+        if not params:
+            return error_action_result(WebSocketMessage.ERROR_MISSING_PARAMS_FIELD)
 
-def __update_pin_configurations(params):
-    if not params:
-        return error_action_result(WebSocketMessage.ERROR_MISSING_PARAMS_FIELD)
+        validated_params = validate_websocket_params(params, action_definition.params_model)
+        if not validated_params:
+            return error_action_result(WebSocketMessage.ERROR_INVALID_PARAMS_FIELD)
 
-    validated_params = validate_websocket_params(params, UpdatePinConfigurationsParams)
-    if not validated_params:
-        return error_action_result(WebSocketMessage.ERROR_INVALID_PARAMS_FIELD)
+        handler_args.append(validated_params)
 
-    pin_configuration_map: PinConfigurationMap = validated_params.pins
-    if not pin_configuration_map or len(pin_configuration_map) <= 0:
-        return error_action_result(WebSocketMessage.ERROR_MISSING_PIN_ID)
+    # Results depending on params are never cached because the cache is keyed by action name only
+    cacheable = action_definition.cache_seconds > 0 and not action_definition.params_model
+    if cacheable:
+        cached_entry = action_result_cache.get(action_name)
+        if cached_entry and time.monotonic() - cached_entry[0] < action_definition.cache_seconds:
+            return cached_entry[1]
 
-    for pin_id, pin_configuration in pin_configuration_map.items():
-        action_result = update_pin_configuration(pin_id, pin_configuration)
+    if action_definition.concurrency is WebSocketActionConcurrency.THREAD_POOL:
+        action_result = await run_in_threadpool(action_definition.handler, *handler_args)
+    else:
+        action_result = action_definition.handler(*handler_args)
 
-        if not action_result.success:
-            return action_result
+    if cacheable and action_result.success:
+        action_result_cache[action_name] = (time.monotonic(), action_result)
 
-    return success_action_result(WebSocketMessage.SUCCESS_PIN_CONFIGS_UPDATED)
+    return action_result
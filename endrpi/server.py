@@ -24,14 +24,23 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.requests import Request
 from fastapi.responses import FileResponse, Response
 
+from endrpi.actions.websocket import websocket_action_documentation
 from endrpi.model.message import MessageData
+from endrpi.routes.adc import router as adc_router
+from endrpi.routes.capture import router as capture_router
+from endrpi.routes.fan import router as fan_router
+from endrpi.routes.i2c import router as i2c_router
+from endrpi.routes.pid import router as pid_router
 from endrpi.routes.pin import router as pin_router
+from endrpi.routes.sequence import router as sequence_router
 from endrpi.routes.system import router as system_router
 from endrpi.routes.websocket import router as websocket_router
 
 app = FastAPI(
     title='Endrpi REST API',
-    description='Interactive documentation for the Endrpi REST API.',
+    description='Interactive documentation for the Endrpi REST API.\n\n'
+                '### Websocket actions\n\n'
+                f'{websocket_action_documentation()}',
     version='0.1.0',
     docs_url=None,
     redoc_url=None
@@ -40,6 +49,12 @@ app = FastAPI(
 app.include_router(websocket_router)
 app.include_router(system_router, tags=['system'])
 app.include_router(pin_router, tags=['pins'])
+app.include_router(sequence_router, tags=['sequences'])
+app.include_router(capture_router, tags=['captures'])
+app.include_router(i2c_router, tags=['i2c'])
+app.include_router(adc_router, tags=['adc'])
+app.include_router(fan_router, tags=['fan'])
+app.include_router(pid_router, tags=['pid'])
 
 public_path = os.path.join(Path(__file__).parent, '_public')
 app.mount('/public', StaticFiles(directory=public_path, html=True, check_dir=True), name='public')
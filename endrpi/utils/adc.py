@@ -0,0 +1,195 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from endrpi.model.adc import AdcConfiguration, AdcSamples, AdcStatus
+
+
+class AdcRingBuffer:
+    """
+    Preallocated ring buffer of the latest samples of a single channel.
+
+    .. note::
+        Samples are addressed by their index since sampling started, samples older than the buffer size are
+        overwritten. The buffer isn't thread safe, :class:`AdcSampler` guards every buffer with its lock.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.written = 0
+        self._values = array('d', bytes(8 * size))
+
+    def append(self, value: float) -> None:
+        """Appends a sample, overwriting the oldest sample once the buffer is full."""
+        self._values[self.written % self.size] = value
+        self.written += 1
+
+    def oldest(self) -> int:
+        """Returns the index of the oldest sample held."""
+        return max(0, self.written - self.size)
+
+    def read(self, start: int, stop: int) -> List[float]:
+        """Returns the samples from index start up to (excluding) index stop, both must be held by the buffer."""
+
+        if start >= stop:
+            return []
+        start_position = start % self.size
+        stop_position = start_position + stop - start
+        if stop_position <= self.size:
+            return self._values[start_position:stop_position].tolist()
+        return self._values[start_position:].tolist() + self._values[:stop_position - self.size].tolist()
+
+
+class AdcSampler:
+    """
+    Daemon thread sampling the channels of an :class:`~endrpi.model.adc.AdcConfiguration` at a fixed rate into a
+    :class:`AdcRingBuffer` per channel.
+
+    .. note::
+        Channels are read through objects with a ``voltage`` attribute and a ``close`` method (i.e. gpiozero's
+        MCP3008 devices), which are closed once sampling stops. Samples are scheduled from the start of sampling so
+        sample indexes stay on the time base of the rate, a thread that falls behind catches up and counts its
+        late samples.
+    """
+
+    def __init__(self, configuration: AdcConfiguration, channel_devices: Dict[int, any]):
+        self.configuration = configuration
+        self.lock = threading.Lock()
+        self.late_samples = 0
+        self.error: Optional[str] = None
+        self._channel_devices = channel_devices
+        self._buffers = {channel: AdcRingBuffer(configuration.bufferSize) for channel in channel_devices}
+        self._first_time: Optional[float] = None
+        self._last_time: Optional[float] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='adc', daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    @property
+    def samples(self) -> int:
+        """Returns the number of samples taken of every channel."""
+        return next(iter(self._buffers.values())).written
+
+    def start(self) -> None:
+        """Starts sampling."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling and closes the channel devices, samples stay readable."""
+
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        for channel_device in self._channel_devices.values():
+            channel_device.close()
+
+    def status(self) -> AdcStatus:
+        """Returns the :class:`~endrpi.model.adc.AdcStatus` of the sampler."""
+
+        with self.lock:
+            samples = self.samples
+            actual_rate = None
+            if samples > 1 and self._last_time > self._first_time:
+                actual_rate = (samples - 1) / (self._last_time - self._first_time)
+
+        return AdcStatus(configuration=self.configuration,
+                         running=self.running,
+                         samples=samples,
+                         lateSamples=self.late_samples,
+                         actualRate=actual_rate,
+                         error=self.error)
+
+    def read(self, channel: int, count: Optional[int] = None, since: Optional[int] = None) -> AdcSamples:
+        """
+        Returns up to count samples of a channel starting at sample index since, or the latest count samples when
+        since is none.
+
+        :raises KeyError: If the channel isn't sampled.
+        """
+
+        buffer = self._buffers[channel]
+        with self.lock:
+            start, dropped_samples = self._start(buffer.oldest(), buffer.written - (count or buffer.size), since)
+            stop = buffer.written if count is None else min(buffer.written, start + count)
+            values = buffer.read(start, stop)
+
+        return AdcSamples(channel=channel, firstSample=start, rate=self.configuration.rate, values=values,
+                          droppedSamples=dropped_samples)
+
+    def read_decimated(self, channel: int, since: Optional[int] = None) -> AdcSamples:
+        """
+        Returns every complete decimated sample of a channel starting at decimated sample index since, or the latest
+        decimated sample when since is none.
+
+        .. note:: Decimated sample k is the average of samples k * decimation up to (k + 1) * decimation.
+
+        :raises KeyError: If the channel isn't sampled.
+        """
+
+        decimation = self.configuration.decimation
+        buffer = self._buffers[channel]
+        with self.lock:
+            oldest = -(-buffer.oldest() // decimation)
+            latest = buffer.written // decimation
+            start, dropped_samples = self._start(oldest, latest - 1, since)
+            values = buffer.read(start * decimation, latest * decimation)
+
+        decimated_values = [sum(values[index:index + decimation]) / decimation
+                            for index in range(0, len(values), decimation)]
+        return AdcSamples(channel=channel, firstSample=start, rate=self.configuration.rate / decimation,
+                          values=decimated_values, droppedSamples=dropped_samples)
+
+    @staticmethod
+    def _start(oldest: int, latest: int, since: Optional[int]) -> Tuple[int, int]:
+        if since is None:
+            return max(oldest, latest, 0), 0
+        return max(since, oldest), max(0, oldest - since)
+
+    def _run(self) -> None:
+        period = 1 / self.configuration.rate
+        channel_devices = list(self._channel_devices.items())
+        start_time = time.monotonic()
+        sample_index = 0
+
+        while not self._stopped.is_set():
+            delay = start_time + sample_index * period - time.monotonic()
+            if delay > 0:
+                if self._stopped.wait(delay):
+                    return
+            elif delay < -period:
+                self.late_samples += 1
+
+            try:
+                values = [(channel, channel_device.voltage) for channel, channel_device in channel_devices]
+            except Exception as error:
+                # Keep the samples taken so far, a failed read (i.e. a disconnected SPI device) ends sampling
+                self.error = str(error)
+                return
+
+            sample_time = time.monotonic()
+            with self.lock:
+                for channel, value in values:
+                    self._buffers[channel].append(value)
+                if self._first_time is None:
+                    self._first_time = sample_time
+                self._last_time = sample_time
+            sample_index += 1
@@ -12,19 +12,37 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import json
+from enum import Enum
 from typing import Union, TypeVar, Optional, Dict, Type
 
+import msgpack
 from fastapi import status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
-from pydantic import ValidationError
+from pydantic import BaseModel, ValidationError
 
+from endrpi.actions.websocket import WebSocketAction, COMPACT_ENUMERATIONS, WEBSOCKET_ACTIONS
 from endrpi.model.action_result import ActionResult
-from endrpi.model.websocket import WebSocketAction
+from endrpi.model.websocket import WebSocketFrameFormat
+
+# Type of None, which is an argument of Optional annotations
+NoneType = type(None)
 
 # Generic type used in generic function parameters
 T = TypeVar('T')
 
+# Index of every member of every compact enumeration (i.e. {PinIo: {PinIo.INPUT: 0, PinIo.OUTPUT: 1}})
+COMPACT_ENUMERATION_INDEXES = {
+    enumeration: {member: index for index, member in enumerate(enumeration)} for enumeration in COMPACT_ENUMERATIONS
+}
+
+# Members of every compact enumeration ordered by their index (i.e. {PinIo: [PinIo.INPUT, PinIo.OUTPUT]})
+COMPACT_ENUMERATION_MEMBERS = {enumeration: list(enumeration) for enumeration in COMPACT_ENUMERATIONS}
+
+# Websocket actions ordered by their compact index
+COMPACT_WEBSOCKET_ACTIONS = COMPACT_ENUMERATION_MEMBERS[WebSocketAction]
+
 
 def websocket_response(action: Optional[str], action_result: ActionResult) -> Dict[str, any]:
     """
@@ -34,6 +52,118 @@ def websocket_response(action: Optional[str], action_result: ActionResult) -> Di
     return jsonable_encoder({'action': action, **action_result.__dict__})
 
 
+def compact_encodable(value: any) -> any:
+    """
+    Returns a value converted to primitives that can be encoded by compact frame formats, members of compact
+    enumerations are converted to their index and members of other enumerations to their value.
+    """
+
+    if isinstance(value, Enum):
+        indexes = COMPACT_ENUMERATION_INDEXES.get(type(value))
+        return indexes[value] if indexes else value.value
+    if isinstance(value, BaseModel):
+        return {field_name: compact_encodable(field_value) for field_name, field_value in value}
+    if isinstance(value, dict):
+        return {compact_encodable(key): compact_encodable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [compact_encodable(item) for item in value]
+    return value
+
+
+def compact_decodable(value: any, annotation: any) -> any:
+    """
+    Returns a value received in a compact frame format converted back to the primitives of a JSON frame for a given
+    type annotation, the indexes of compact enumerations (including dictionary keys) are converted to their value.
+
+    .. note::
+        Values that aren't a known index are returned unchanged and left to the validation of the params model.
+    """
+
+    members = COMPACT_ENUMERATION_MEMBERS.get(annotation)
+    if members:
+        if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < len(members):
+            return members[value].value
+        return value
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if not isinstance(value, dict):
+            return value
+        fields = annotation.__fields__
+        return {key: compact_decodable(item, fields[key].outer_type_) if key in fields else item
+                for key, item in value.items()}
+
+    # Constrained lists (i.e. conlist) keep their item type aside from typing generics
+    item_type = getattr(annotation, 'item_type', None)
+    origin = getattr(annotation, '__origin__', None)
+    arguments = getattr(annotation, '__args__', None) or ()
+    if origin is Union:
+        # Optional values are decoded as their only other type
+        types = [argument for argument in arguments if argument is not NoneType]
+        return compact_decodable(value, types[0]) if len(types) == 1 else value
+    if origin in (list, tuple, set) and isinstance(value, list) and (item_type or arguments):
+        return [compact_decodable(item, item_type or arguments[0]) for item in value]
+    if origin is dict and isinstance(value, dict) and len(arguments) == 2:
+        return {compact_decodable(key, arguments[0]): compact_decodable(item, arguments[1])
+                for key, item in value.items()}
+    return value
+
+
+def websocket_frame(action: Optional[str],
+                    action_result: ActionResult,
+                    frame_format: WebSocketFrameFormat = WebSocketFrameFormat.JSON) -> Union[str, bytes]:
+    """
+    Returns the frame of a :func:`websocket_response` for a given action result and websocket action, encoded as JSON
+    text or as compact MessagePack bytes.
+    """
+
+    if frame_format is WebSocketFrameFormat.MESSAGEPACK:
+        # Labels that aren't actions (i.e. pin edge events) are sent as is
+        compact_action = COMPACT_ENUMERATION_INDEXES[WebSocketAction].get(action, action) if action else None
+        compact_response = {'action': compact_action, **compact_encodable(action_result)}
+        return msgpack.packb(compact_response)
+
+    return json.dumps(websocket_response(action, action_result))
+
+
+def decode_websocket_message(message: Dict[str, any], frame_format: WebSocketFrameFormat) -> any:
+    """
+    Returns the data of a received ASGI websocket message decoded according to the frame format of the connection.
+
+    .. note::
+        Compact action indexes are converted back to their action name (i.e. 0 -> 'READ_TEMPERATURE') and the params
+        of the action are decoded with :func:`compact_decodable` against its params model, so enumerations (i.e. pin
+        ids) can be sent as their index in both directions.
+
+    :raises ValueError: If the message can't be decoded.
+    """
+
+    text = message.get('text')
+    data = message.get('bytes')
+
+    if frame_format is WebSocketFrameFormat.MESSAGEPACK:
+        if data is None:
+            raise ValueError('MessagePack messages must be binary')
+        try:
+            decoded_message = msgpack.unpackb(data, raw=False, strict_map_key=False)
+        except Exception as exception:
+            raise ValueError(exception)
+
+        if isinstance(decoded_message, dict):
+            action = decoded_message.get('action')
+            if isinstance(action, int) and not isinstance(action, bool) and \
+                    0 <= action < len(COMPACT_WEBSOCKET_ACTIONS):
+                decoded_message['action'] = COMPACT_WEBSOCKET_ACTIONS[action].value
+
+            action = decoded_message.get('action')
+            action_definition = WEBSOCKET_ACTIONS.get(action) if isinstance(action, str) else None
+            if action_definition and action_definition.params_model and 'params' in decoded_message:
+                decoded_message['params'] = compact_decodable(decoded_message['params'],
+                                                              action_definition.params_model)
+
+        return decoded_message
+
+    return json.loads(text if text is not None else data.decode('utf-8'))
+
+
 def http_response(action_result: ActionResult, status_code: status = None) -> JSONResponse:
     """Returns a :class:`~fastapi.responses.JSONResponse` for a given status code and action result."""
 
@@ -77,7 +207,7 @@ def parse_websocket_params(data: Dict[str, any]) -> Union[any, None]:
 
 
 def validate_websocket_action(action: str) -> Optional[Type[WebSocketAction]]:
-    """Returns a :class:`~endrpi.routes.websocket_route.WebSocketActions` if valid, otherwise returns None."""
+    """Returns a :class:`~endrpi.actions.websocket.WebSocketAction` if valid, otherwise returns None."""
 
     if action and isinstance(action, str):
 
@@ -0,0 +1,131 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import re
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from endrpi.model.pin import RaspberryPiPinIds, PIN_ID_BCM_NUMBERS
+
+# Device tree file holding the board model (i.e. 'Raspberry Pi 4 Model B Rev 1.4'), relative to the root
+DEVICE_TREE_MODEL_PATH = os.path.join('proc', 'device-tree', 'model')
+
+
+class PinTable(NamedTuple):
+    """
+    GPIO pins exposed by a board model, in physical order, along with the physical header pin of each header pin.
+
+    .. note::
+        Pins without a physical header pin (i.e. on Compute Module connectors) are only addressed by BCM number.
+    """
+    name: str
+    header: Optional[str]
+    pins: Tuple[RaspberryPiPinIds, ...]
+    physical_pins: Dict[int, RaspberryPiPinIds]
+
+
+def __bcm_pins(*bcm_numbers: int) -> Tuple[RaspberryPiPinIds, ...]:
+    return tuple(RaspberryPiPinIds(f'GPIO{bcm_number}') for bcm_number in bcm_numbers)
+
+
+def __header_pin_table(name: str, header: str, physical_numbers: Dict[int, int]) -> PinTable:
+    physical_pins = {physical_number: RaspberryPiPinIds(f'GPIO{bcm_number}')
+                     for physical_number, bcm_number in sorted(physical_numbers.items())}
+    return PinTable(name=name, header=header, pins=tuple(physical_pins.values()), physical_pins=physical_pins)
+
+
+# 40 pin header of every model since the Model B+ (GPIO0/1 on pins 27/28 are reserved for HAT ID EEPROMs)
+HEADER_40_PIN_TABLE = __header_pin_table('40 pin header', 'J8', {
+    3: 2, 5: 3, 7: 4, 8: 14, 10: 15, 11: 17, 12: 18, 13: 27, 15: 22, 16: 23, 18: 24, 19: 10, 21: 9, 22: 25, 23: 11,
+    24: 8, 26: 7, 29: 5, 31: 6, 32: 12, 33: 13, 35: 19, 36: 16, 37: 26, 38: 20, 40: 21
+})
+
+# 26 pin header of the first Model B revision and of later Model A/B revisions
+HEADER_26_REVISION_1_PIN_TABLE = __header_pin_table('26 pin header (revision 1)', 'P1', {
+    3: 0, 5: 1, 7: 4, 8: 14, 10: 15, 11: 17, 12: 18, 13: 21, 15: 22, 16: 23, 18: 24, 19: 10, 21: 9, 22: 25, 23: 11,
+    24: 8, 26: 7
+})
+HEADER_26_REVISION_2_PIN_TABLE = __header_pin_table('26 pin header (revision 2)', 'P1', {
+    3: 2, 5: 3, 7: 4, 8: 14, 10: 15, 11: 17, 12: 18, 13: 27, 15: 22, 16: 23, 18: 24, 19: 10, 21: 9, 22: 25, 23: 11,
+    24: 8, 26: 7
+})
+
+# Compute Module connectors, the first modules expose every GPIO of the chip and later modules GPIO0 to GPIO27
+COMPUTE_MODULE_PIN_TABLE = PinTable(name='Compute Module', header=None, pins=__bcm_pins(*range(46)), physical_pins={})
+COMPUTE_MODULE_4_PIN_TABLE = PinTable(name='Compute Module 4', header=None, pins=__bcm_pins(*range(28)),
+                                      physical_pins={})
+
+# Pin table of each board model pattern, the first matching pattern is used and unknown models use the 40 pin header
+BOARD_PIN_TABLES: Tuple[Tuple[str, PinTable], ...] = (
+    (r'Compute Module [45]', COMPUTE_MODULE_4_PIN_TABLE),
+    (r'Compute Module', COMPUTE_MODULE_PIN_TABLE),
+    (r'Model [AB] Rev 1$', HEADER_26_REVISION_1_PIN_TABLE),
+    (r'Model [AB] Rev 2$', HEADER_26_REVISION_2_PIN_TABLE),
+    (r'Raspberry Pi', HEADER_40_PIN_TABLE)
+)
+
+
+class Board:
+    """
+    Detected Raspberry Pi board model and the pins it exposes, with every alias of every pin indexed up front.
+
+    .. note::
+        Pins are found by BCM id (i.e. 'GPIO17'), BCM number ('BCM17' or '17'), and physical header pin ('BOARD11' or
+        'J8:11'), aliases are case insensitive. Pins the board doesn't expose are never found.
+    """
+
+    def __init__(self, model: Optional[str], pin_table: PinTable):
+        self.model = model
+        self.pin_table = pin_table
+        self.pins = pin_table.pins
+
+        self._aliases: Dict[str, RaspberryPiPinIds] = {}
+        for pin_id in self.pins:
+            bcm_number = PIN_ID_BCM_NUMBERS[pin_id]
+            for alias in (pin_id.value, f'BCM{bcm_number}', str(bcm_number)):
+                self._aliases[alias] = pin_id
+        for physical_number, pin_id in pin_table.physical_pins.items():
+            self._aliases[f'BOARD{physical_number}'] = pin_id
+            self._aliases[f'{pin_table.header}:{physical_number}'] = pin_id
+
+    def find_pin(self, alias: str) -> Optional[RaspberryPiPinIds]:
+        """Returns the pin id of a given pin alias or none if the board doesn't expose the pin."""
+        return self._aliases.get(alias.upper())
+
+
+def find_pin_table(model: Optional[str]) -> PinTable:
+    """Returns the pin table of a given board model, unknown models use :data:`HEADER_40_PIN_TABLE`."""
+
+    if model:
+        for pattern, pin_table in BOARD_PIN_TABLES:
+            if re.search(pattern, model):
+                return pin_table
+    return HEADER_40_PIN_TABLE
+
+
+def detect_board(root: str = '/') -> Board:
+    """
+    Returns the :class:`Board` of the model read from the device tree under a given root (i.e. a fake root when
+    testing), boards without a readable model use :data:`HEADER_40_PIN_TABLE`.
+    """
+
+    try:
+        with open(os.path.join(root, DEVICE_TREE_MODEL_PATH)) as file:
+            # Device tree strings are null terminated
+            model = file.read().rstrip('\x00\n').strip() or None
+    except (OSError, UnicodeDecodeError):
+        model = None
+
+    return Board(model, find_pin_table(model))
@@ -0,0 +1,154 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+from typing import AsyncIterator, Callable, Dict, NamedTuple, Optional, Set, Union
+
+from starlette.concurrency import run_in_threadpool
+
+from endrpi.config.logging import get_logger
+from endrpi.model.action_result import ActionResult
+from endrpi.model.websocket import WebSocketFrameFormat
+
+
+class BroadcastTopic(NamedTuple):
+    """
+    Describes how the frames of a broadcast topic are produced.
+
+    .. note::
+        Frames are labelled with :attr:`action` so subscribers can handle them like the response of that action.
+
+    .. note::
+        Topics are either sampled from :attr:`producer` once per interval or pushed from :attr:`stream` as soon as
+        the stream yields. Streamed frames are never coalesced (i.e. edge events).
+    """
+    action: str
+    producer: Optional[Callable[[], ActionResult]] = None
+    blocking: bool = False
+    stream: Optional[Callable[[], AsyncIterator[ActionResult]]] = None
+
+
+class BroadcastHub:
+    """
+    Publishes topic frames to every subscriber of the topic.
+
+    Each topic with at least one subscriber has a single producer task that samples the topic once per tick (or
+    iterates the topic stream) and encodes each frame once per frame format, no matter how many subscribers there are.
+    Subscribers only need a ``frame_format`` and an awaitable ``send_frame(frame, coalesce_key)`` method which is
+    given the topic name as the coalesce key of sampled frames, subscribers that fail to send are unsubscribed.
+
+    .. note:: Topics are looked up on every use, so they may depend on configuration applied after the hub is created.
+    """
+
+    def __init__(self,
+                 topics: Callable[[], Dict[str, BroadcastTopic]],
+                 interval: Callable[[], float],
+                 encode: Callable[[str, ActionResult, WebSocketFrameFormat], Union[str, bytes]]):
+        self._topics = topics
+        self._interval = interval
+        self._encode = encode
+        self._subscribers: Dict[str, Set[any]] = {}
+        self._producers: Dict[str, asyncio.Future] = {}
+
+    @property
+    def topics(self) -> Dict[str, BroadcastTopic]:
+        """Returns every topic that can be subscribed to keyed by topic name."""
+        return self._topics()
+
+    def subscribe(self, topic_name: str, subscriber: any) -> None:
+        """Subscribes to a topic and starts the topic producer if it isn't already running."""
+
+        self._subscribers.setdefault(topic_name, set()).add(subscriber)
+        if topic_name not in self._producers:
+            self._producers[topic_name] = asyncio.ensure_future(self._produce(topic_name))
+
+    def unsubscribe(self, topic_name: str, subscriber: any) -> None:
+        """Unsubscribes from a topic and stops the topic producer once the topic has no subscribers."""
+
+        subscribers = self._subscribers.get(topic_name)
+        if subscribers is None:
+            return
+
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[topic_name]
+            producer = self._producers.pop(topic_name, None)
+            if producer:
+                producer.cancel()
+
+    def unsubscribe_all(self, subscriber: any) -> None:
+        """Unsubscribes from every topic (i.e. when a websocket disconnects)."""
+        for topic_name in list(self._subscribers):
+            self.unsubscribe(topic_name, subscriber)
+
+    def subscriber_count(self, topic_name: str) -> int:
+        """Returns the number of subscribers of a topic."""
+        return len(self._subscribers.get(topic_name, ()))
+
+    async def publish(self, topic_name: str) -> Dict[WebSocketFrameFormat, Union[str, bytes]]:
+        """Samples a topic once and sends the encoded frame to every subscriber of the topic."""
+
+        topic = self.topics[topic_name]
+        if topic.blocking:
+            action_result = await run_in_threadpool(topic.producer)
+        else:
+            action_result = topic.producer()
+
+        return await self.send(topic_name, action_result, coalesce_key=topic_name)
+
+    async def send(self,
+                   topic_name: str,
+                   action_result: ActionResult,
+                   coalesce_key: Optional[str] = None) -> Dict[WebSocketFrameFormat, Union[str, bytes]]:
+        """Sends an action result of a topic to every subscriber of the topic."""
+
+        topic = self.topics[topic_name]
+
+        # Encode once per frame format, every subscriber using the same format is sent the same frame
+        frames: Dict[WebSocketFrameFormat, Union[str, bytes]] = {}
+        subscribers = list(self._subscribers.get(topic_name, ()))
+        for subscriber in subscribers:
+            if subscriber.frame_format not in frames:
+                frames[subscriber.frame_format] = self._encode(topic.action, action_result, subscriber.frame_format)
+
+        sends = [subscriber.send_frame(frames[subscriber.frame_format], coalesce_key) for subscriber in subscribers]
+        send_results = await asyncio.gather(*sends, return_exceptions=True)
+        for subscriber, send_result in zip(subscribers, send_results):
+            if isinstance(send_result, Exception):
+                self.unsubscribe(topic_name, subscriber)
+
+        return frames
+
+    async def _produce(self, topic_name: str) -> None:
+        topic = self.topics[topic_name]
+        while topic_name in self._subscribers:
+            try:
+                if topic.stream:
+                    await self._send_stream(topic_name, topic.stream())
+                else:
+                    await self.publish(topic_name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                # Keep producing, a single failed sample (or stream) shouldn't end the topic for every subscriber
+                get_logger().exception(exception)
+            await asyncio.sleep(self._interval())
+
+    async def _send_stream(self, topic_name: str, stream: AsyncIterator[ActionResult]) -> None:
+        try:
+            async for action_result in stream:
+                await self.send(topic_name, action_result)
+        finally:
+            # Close the stream right away (i.e. on cancel) so it can release what it holds
+            await stream.aclose()
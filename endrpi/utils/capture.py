@@ -0,0 +1,255 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+
+from endrpi.model.capture import CaptureConfiguration, CaptureState, CaptureStatus, CaptureTriggerCondition
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.utils.sequence import wait_until, request_realtime_priority, SEQUENCE_SPIN_NANOSECONDS
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+
+
+class PackedSamples:
+    """
+    Preallocated ring of samples packed as bits, bit j of a sample is the level of its j-th pin.
+
+    .. note::
+        Sample i of the ring starts at bit i * pin_count of the buffer (least significant bit first), once the ring
+        is full the oldest samples are overwritten.
+    """
+
+    def __init__(self, pin_count: int, capacity: int):
+        self.pin_count = pin_count
+        self.capacity = capacity
+        self.count = 0
+        self._next = 0
+        self._mask = (1 << pin_count) - 1
+        self._bits = bytearray((pin_count * capacity + 7) // 8)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, sample: int) -> None:
+        """Writes a sample over the oldest sample once the ring is full."""
+
+        bit = self._next * self.pin_count
+        byte = bit >> 3
+        shift = bit & 7
+        value = sample << shift
+        mask = self._mask << shift
+        for offset in range((self.pin_count + shift + 7) >> 3):
+            self._bits[byte + offset] = (self._bits[byte + offset] & ~mask & 0xFF) | (value & 0xFF)
+            value >>= 8
+            mask >>= 8
+
+        self.count += 1
+        self._next += 1
+        if self._next == self.capacity:
+            self._next = 0
+
+    def sample(self, index: int) -> int:
+        """Returns the sample at a given index of the ring."""
+
+        bit = index * self.pin_count
+        byte = bit >> 3
+        value = int.from_bytes(self._bits[byte:byte + ((self.pin_count + (bit & 7) + 7) >> 3)], 'little')
+        return (value >> (bit & 7)) & self._mask
+
+    def samples(self) -> Iterator[int]:
+        """Yields every sample held by the ring from oldest to newest."""
+        start = self._next if self.count > self.capacity else 0
+        for index in range(len(self)):
+            yield self.sample((start + index) % self.capacity)
+
+    def to_bytes(self) -> bytes:
+        """Returns every sample held by the ring from oldest to newest, packed from bit 0 of the first byte."""
+
+        if self.count <= self.capacity:
+            return bytes(self._bits[:(self.count * self.pin_count + 7) // 8])
+
+        ordered_samples = PackedSamples(self.pin_count, self.capacity)
+        for sample in self.samples():
+            ordered_samples.append(sample)
+        return bytes(ordered_samples._bits)
+
+
+class CaptureSession:
+    """
+    Samples the levels of pins at a fixed rate on a dedicated thread into :class:`PackedSamples`.
+
+    .. note::
+        Each sample is taken from a single call of the given levels reader, which returns a bit mask of pin levels
+        (bit n is GPIOn) so every pin of a sample is read at the same time when the reader reads the level register.
+        Samples are scheduled on absolute deadlines like sequence writes, late samples are counted but never skipped.
+
+    .. note::
+        Sample periods within the busy wait of :func:`~endrpi.utils.sequence.wait_until` never sleep, so those
+        captures run without realtime priority and the spinning thread can still be preempted.
+    """
+
+    def __init__(self,
+                 capture_id: int,
+                 configuration: CaptureConfiguration,
+                 read_levels: Callable[[], int]):
+        self.capture_id = capture_id
+        self.configuration = configuration
+        self.state = CaptureState.ARMED if configuration.trigger else CaptureState.CAPTURING
+        self.realtime = False
+        self.trigger_sample: Optional[int] = None
+        self.late_samples = 0
+        self.error: Optional[str] = None
+        self.samples = PackedSamples(len(configuration.pins), configuration.samples)
+        self._read_levels = read_levels
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'capture-{capture_id}', daemon=True)
+        self._first_sample: Optional[int] = None
+        self._last_sample: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        """Returns true while the capture is armed or capturing."""
+        return self.state in (CaptureState.ARMED, CaptureState.CAPTURING)
+
+    def start(self) -> None:
+        """Starts the capture thread."""
+        self._thread.start()
+
+    def cancel(self, timeout: Optional[float] = None) -> None:
+        """Cancels the capture and waits for the thread to stop, samples taken so far are kept."""
+        self._cancelled.set()
+        self._thread.join(timeout)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Waits for the capture to finish."""
+        self._thread.join(timeout)
+
+    def status(self) -> CaptureStatus:
+        """Returns the current :class:`~endrpi.model.capture.CaptureStatus` of the capture."""
+
+        actual_rate = None
+        if self.samples.count > 1 and self._last_sample > self._first_sample:
+            actual_rate = (self.samples.count - 1) * NANOSECONDS_PER_SECOND / (self._last_sample - self._first_sample)
+
+        return CaptureStatus(id=self.capture_id,
+                             state=self.state,
+                             pins=self.configuration.pins,
+                             rate=self.configuration.rate,
+                             samples=self.configuration.samples,
+                             capturedSamples=len(self.samples),
+                             triggerSample=self.trigger_sample,
+                             actualRate=actual_rate,
+                             lateSamples=self.late_samples,
+                             realtime=self.realtime,
+                             error=self.error)
+
+    def _run(self) -> None:
+        if NANOSECONDS_PER_SECOND / self.configuration.rate > SEQUENCE_SPIN_NANOSECONDS:
+            self.realtime = request_realtime_priority()
+        try:
+            self.state = self._capture()
+        except Exception as exception:
+            self.error = str(exception)
+            self.state = CaptureState.FAILED
+
+    def _capture(self) -> CaptureState:
+        configuration = self.configuration
+        trigger = configuration.trigger
+        bcm_numbers = [pin_id.bcm_number for pin_id in configuration.pins]
+        period = round(NANOSECONDS_PER_SECOND / configuration.rate)
+
+        # Samples left to take, unknown until triggered
+        remaining = None if trigger else configuration.samples
+        previous_level = None
+        start = time.monotonic_ns()
+        timeout = start + round(configuration.timeout * NANOSECONDS_PER_SECOND)
+
+        index = 0
+        while True:
+            target = start + index * period
+            if wait_until(target, self._cancelled):
+                return CaptureState.CANCELLED
+            levels = self._read_levels()
+            sampled = time.monotonic_ns()
+
+            sample = 0
+            for bit, bcm_number in enumerate(bcm_numbers):
+                sample |= ((levels >> bcm_number) & 1) << bit
+            self.samples.append(sample)
+            if self._first_sample is None:
+                self._first_sample = sampled
+            self._last_sample = sampled
+            if sampled - target > period:
+                self.late_samples += 1
+
+            if remaining is None:
+                level = (levels >> trigger.pin.bcm_number) & 1
+                if is_triggered(trigger.condition, level, previous_level):
+                    # The ring keeps at most preTrigger samples taken before the triggering sample, samples after the
+                    # trigger fill the rest
+                    self.trigger_sample = min(self.samples.count - 1, configuration.preTrigger)
+                    remaining = configuration.samples - self.trigger_sample
+                    self.state = CaptureState.CAPTURING
+                elif sampled > timeout:
+                    return CaptureState.TIMED_OUT
+                previous_level = level
+
+            if remaining is not None:
+                remaining -= 1
+                if not remaining:
+                    return CaptureState.COMPLETED
+            index += 1
+
+
+def is_triggered(condition: CaptureTriggerCondition, level: int, previous_level: Optional[int]) -> bool:
+    """Returns true when the level (and previous level) of a pin meet a given trigger condition."""
+
+    if condition is CaptureTriggerCondition.HIGH:
+        return level == 1
+    if condition is CaptureTriggerCondition.LOW:
+        return level == 0
+    if previous_level is None or previous_level == level:
+        return False
+    return (level == 1) == (condition is CaptureTriggerCondition.RISING)
+
+
+def capture_vcd(pin_ids: List[RaspberryPiPinIds], rate: float, samples: PackedSamples,
+                trigger_sample: Optional[int] = None) -> str:
+    """
+    Returns a value change dump (IEEE 1364) of captured samples with a 1ns timescale, every pin is a single bit wire
+    named after the pin and only level changes are dumped.
+    """
+
+    identifiers = [chr(ord('!') + index) for index in range(len(pin_ids))]
+    lines = ['$version Endrpi capture $end', '$timescale 1 ns $end']
+    if trigger_sample is not None:
+        lines.append(f'$comment Triggered at sample {trigger_sample} $end')
+    lines.append('$scope module capture $end')
+    lines.extend(f'$var wire 1 {identifier} {pin_id.value} $end' for identifier, pin_id in zip(identifiers, pin_ids))
+    lines.extend(['$upscope $end', '$enddefinitions $end'])
+
+    previous_sample = None
+    for index, sample in enumerate(samples.samples()):
+        if sample == previous_sample:
+            continue
+        lines.append(f'#{round(index * NANOSECONDS_PER_SECOND / rate)}')
+        for bit, identifier in enumerate(identifiers):
+            level = (sample >> bit) & 1
+            if previous_sample is None or level != (previous_sample >> bit) & 1:
+                lines.append(f'{level}{identifier}')
+        previous_sample = sample
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,127 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import threading
+from typing import Callable, List, Optional
+
+from endrpi.model.fan import FanConfiguration, FanCurvePoint, FanStatus
+
+
+def fan_curve_duty_cycle(curve: List[FanCurvePoint], temperature: float) -> float:
+    """Returns the duty cycle of a curve at a temperature, interpolated between the points of the curve."""
+
+    if temperature <= curve[0].temperature:
+        return curve[0].dutyCycle
+    for earlier, later in zip(curve, curve[1:]):
+        if temperature <= later.temperature:
+            position = (temperature - earlier.temperature) / (later.temperature - earlier.temperature)
+            return earlier.dutyCycle + position * (later.dutyCycle - earlier.dutyCycle)
+    return curve[-1].dutyCycle
+
+
+class FanController:
+    """
+    Daemon thread driving a fan on the curve of a :class:`~endrpi.model.fan.FanConfiguration`.
+
+    .. note::
+        The temperature of the configured sensor id is read and the duty cycle written through callables so the
+        controller doesn't depend on the sensors or the pin backend. A failed read drives the failsafe duty cycle
+        and the controller keeps running, a failed write (i.e. PWM stopped on the pin) stops the controller. The
+        configuration can be replaced while running, the next evaluation uses it.
+    """
+
+    def __init__(self,
+                 configuration: FanConfiguration,
+                 read_temperature: Callable[[str], float],
+                 write_duty_cycle: Callable[[float], None]):
+        self.configuration = configuration
+        self.temperature: Optional[float] = None
+        self.duty_cycle: Optional[float] = None
+        self.updates = 0
+        self.error: Optional[str] = None
+        self._read_temperature = read_temperature
+        self._write_duty_cycle = write_duty_cycle
+        # Temperature the duty cycle is evaluated at, trails falling temperatures by the hysteresis
+        self._reference_temperature: Optional[float] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='fan', daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Evaluates the curve once and starts controlling the fan, the thread evaluates it again every interval.
+
+        :raises Exception: Any error of writing the first duty cycle.
+        """
+        self.update()
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops controlling the fan, the last duty cycle keeps being driven."""
+        self._stopped.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def status(self) -> FanStatus:
+        """Returns the :class:`~endrpi.model.fan.FanStatus` of the controller."""
+        return FanStatus(configuration=self.configuration,
+                         running=self.running,
+                         temperature=self.temperature,
+                         dutyCycle=self.duty_cycle,
+                         updates=self.updates,
+                         error=self.error)
+
+    def control(self, temperature: float) -> float:
+        """Returns the duty cycle of the curve for a newly read temperature, applying the hysteresis."""
+
+        hysteresis = self.configuration.hysteresis
+        if self._reference_temperature is None or temperature > self._reference_temperature:
+            self._reference_temperature = temperature
+        elif temperature < self._reference_temperature - hysteresis:
+            self._reference_temperature = temperature + hysteresis
+        return fan_curve_duty_cycle(self.configuration.curve, self._reference_temperature)
+
+    def update(self) -> None:
+        """
+        Reads the temperature and writes the duty cycle of the curve once.
+
+        :raises Exception: Any error of writing the duty cycle.
+        """
+
+        try:
+            self.temperature = self._read_temperature(self.configuration.sensorId)
+            duty_cycle = self.control(self.temperature)
+            self.error = None
+        except Exception as error:
+            self.temperature = None
+            self._reference_temperature = None
+            duty_cycle = self.configuration.failsafeDutyCycle
+            self.error = str(error)
+
+        if duty_cycle != self.duty_cycle:
+            self._write_duty_cycle(duty_cycle)
+            self.duty_cycle = duty_cycle
+        self.updates += 1
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.configuration.interval):
+            try:
+                self.update()
+            except Exception as error:
+                self.error = str(error)
+                return
@@ -0,0 +1,176 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import mmap
+import os
+import threading
+from typing import NamedTuple, Optional, Tuple
+
+# Note: typing only provides protocols from Python 3.8, typing_extensions is installed along with pydantic
+try:
+    from typing import Protocol, runtime_checkable
+except ImportError:  # pragma: no cover
+    from typing_extensions import Protocol, runtime_checkable
+
+from endrpi.utils.bitwise import is_bit_set
+
+# Memory mapped GPIO registers that are accessible without root
+GPIO_REGISTERS_PATH = '/dev/gpiomem'
+
+# Size of the mapped register block, up to and including the last BCM2711 pull register
+GPIO_REGISTERS_SIZE = 0xF4
+
+# Word index of each register used (see: BCM2835/BCM2711 ARM Peripherals, GPIO register map)
+GPFSEL0 = 0x00 // 4
+GPSET0 = 0x1C // 4
+GPCLR0 = 0x28 // 4
+GPLEV0 = 0x34 // 4
+GPIO_PUP_PDN_CNTRL_REG0 = 0xE4 // 4
+
+# Number of pins of the first GPIO bank (GPIO0 to GPIO31), the only bank covered by the mapped registers
+GPIO_BANK_PIN_COUNT = 32
+
+# Number of function select and pull registers covering GPIO0 to GPIO31
+FUNCTION_REGISTER_COUNT = 4
+PULL_REGISTER_COUNT = 2
+
+# Value read from the BCM2711 pull registers on earlier chips, whose pull registers are write only ('gpio')
+LEGACY_PULL_REGISTER_VALUE = 0x6770696f
+
+# Function select values (3 bits per pin)
+GPIO_FUNCTION_INPUT = 0b000
+GPIO_FUNCTION_OUTPUT = 0b001
+GPIO_FUNCTION_ALT0 = 0b100
+GPIO_FUNCTION_ALT5 = 0b010
+
+# BCM2711 pull values (2 bits per pin)
+GPIO_PULL_FLOATING = 0b00
+GPIO_PULL_UP = 0b01
+GPIO_PULL_DOWN = 0b10
+
+
+class GpioBank(NamedTuple):
+    """
+    Snapshot of the function, level, and pull registers of GPIO0 to GPIO31.
+
+    .. note::
+        The levels of every pin come from a single register read so they're consistent with each other, pulls are
+        none on chips whose pull registers can't be read.
+    """
+    functions: Tuple[int, ...]
+    levels: int
+    pulls: Optional[Tuple[int, ...]]
+
+    def function(self, number: int) -> int:
+        """Returns the function select value of a given BCM pin number."""
+        return (self.functions[number // 10] >> ((number % 10) * 3)) & 0b111
+
+    def level(self, number: int) -> int:
+        """Returns the level (0 or 1) of a given BCM pin number."""
+        return int(is_bit_set(self.levels, number))
+
+    def pull(self, number: int) -> Optional[int]:
+        """Returns the pull value of a given BCM pin number or none if pulls can't be read."""
+        if self.pulls is None:
+            return None
+        return (self.pulls[number // 16] >> ((number % 16) * 2)) & 0b11
+
+
+@runtime_checkable
+class BulkPinAccess(Protocol):
+    """
+    Interface of pin backends that read and write GPIO0 to GPIO31 at once, implemented by :class:`GpioRegisters` and
+    the :class:`~endrpi.utils.gpiochip_factory.GpiochipFactory`.
+    """
+
+    def read_bank(self) -> GpioBank:
+        """Returns a :class:`GpioBank` snapshot of GPIO0 to GPIO31."""
+
+    def read_levels(self) -> int:
+        """Returns the levels of GPIO0 to GPIO31, bit n is the level of GPIOn."""
+
+    def write_levels(self, set_mask: int, clear_mask: int) -> None:
+        """Drives the pins of the set mask high and the pins of the clear mask low in a single write."""
+
+
+class GpioRegisters:
+    """
+    Memory mapped GPIO registers of the Raspberry Pi, read as aligned 32 bit words.
+
+    .. note::
+        Any file of at least :data:`GPIO_REGISTERS_SIZE` bytes can be mapped in place of :data:`GPIO_REGISTERS_PATH`
+        (i.e. a fake register map in tests).
+
+    :raises OSError: If the registers can't be mapped.
+    """
+
+    def __init__(self, path: str = GPIO_REGISTERS_PATH):
+        file_descriptor = os.open(path, os.O_RDWR | os.O_SYNC)
+        try:
+            self._map = mmap.mmap(file_descriptor, GPIO_REGISTERS_SIZE, mmap.MAP_SHARED,
+                                  mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(file_descriptor)
+        self._words = memoryview(self._map).cast('I')
+        self._function_lock = threading.Lock()
+        self.pulls_readable = self._words[GPIO_PUP_PDN_CNTRL_REG0 + 3] != LEGACY_PULL_REGISTER_VALUE
+
+    def read_bank(self) -> GpioBank:
+        """Returns a :class:`GpioBank` snapshot of GPIO0 to GPIO31 read in a single pass."""
+
+        words = self._words
+        levels = words[GPLEV0]
+        functions = tuple(words[GPFSEL0 + index] for index in range(FUNCTION_REGISTER_COUNT))
+        pulls = None
+        if self.pulls_readable:
+            pulls = tuple(words[GPIO_PUP_PDN_CNTRL_REG0 + index] for index in range(PULL_REGISTER_COUNT))
+
+        return GpioBank(functions=functions, levels=levels, pulls=pulls)
+
+    def read_levels(self) -> int:
+        """Returns the levels of GPIO0 to GPIO31 as a bit mask (bit n is GPIOn) read with a single register read."""
+        return self._words[GPLEV0]
+
+    def write_function(self, number: int, function: int) -> None:
+        """
+        Sets the function select value of a given BCM pin number (i.e. to route the pin to a peripheral).
+
+        .. note::
+            The function select register is shared by ten pins, so this is a read-modify-write of the register held
+            under a lock of the registers rather than the lock of the pin.
+        """
+
+        index = GPFSEL0 + number // 10
+        shift = (number % 10) * 3
+        with self._function_lock:
+            self._words[index] = (self._words[index] & ~(0b111 << shift)) | (function << shift)
+
+    def write_levels(self, set_mask: int, clear_mask: int) -> None:
+        """
+        Drives the output latches of every pin in the set mask high and every pin in the clear mask low.
+
+        .. note::
+            Each mask is a single register write so the pins of a mask switch together, the latches of input pins
+            are driven once they become outputs.
+        """
+
+        if set_mask:
+            self._words[GPSET0] = set_mask
+        if clear_mask:
+            self._words[GPCLR0] = clear_mask
+
+    def close(self) -> None:
+        """Unmaps the registers."""
+        self._words.release()
+        self._map.close()
@@ -0,0 +1,256 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import fcntl
+import os
+import struct
+from collections import Counter
+from typing import Callable, List, NamedTuple, Sequence
+
+# GPIO character device of the Raspberry Pi GPIO controller (GPIO0 to GPIO53/57)
+GPIOCHIP_PATH = '/dev/gpiochip0'
+
+# Limits of the GPIO character device uAPI v2 (see: include/uapi/linux/gpio.h)
+GPIO_MAX_NAME_SIZE = 32
+GPIO_V2_LINES_MAX = 64
+GPIO_V2_LINE_NUM_ATTRS_MAX = 10
+
+# Line flags
+GPIO_V2_LINE_FLAG_USED = 1 << 0
+GPIO_V2_LINE_FLAG_ACTIVE_LOW = 1 << 1
+GPIO_V2_LINE_FLAG_INPUT = 1 << 2
+GPIO_V2_LINE_FLAG_OUTPUT = 1 << 3
+GPIO_V2_LINE_FLAG_EDGE_RISING = 1 << 4
+GPIO_V2_LINE_FLAG_EDGE_FALLING = 1 << 5
+GPIO_V2_LINE_FLAG_OPEN_DRAIN = 1 << 6
+GPIO_V2_LINE_FLAG_OPEN_SOURCE = 1 << 7
+GPIO_V2_LINE_FLAG_BIAS_PULL_UP = 1 << 8
+GPIO_V2_LINE_FLAG_BIAS_PULL_DOWN = 1 << 9
+GPIO_V2_LINE_FLAG_BIAS_DISABLED = 1 << 10
+GPIO_V2_LINE_FLAG_EVENT_CLOCK_REALTIME = 1 << 11
+
+GPIO_V2_LINE_DIRECTION_FLAGS = GPIO_V2_LINE_FLAG_INPUT | GPIO_V2_LINE_FLAG_OUTPUT
+GPIO_V2_LINE_EDGE_FLAGS = GPIO_V2_LINE_FLAG_EDGE_RISING | GPIO_V2_LINE_FLAG_EDGE_FALLING
+GPIO_V2_LINE_BIAS_FLAGS = GPIO_V2_LINE_FLAG_BIAS_PULL_UP | GPIO_V2_LINE_FLAG_BIAS_PULL_DOWN | \
+    GPIO_V2_LINE_FLAG_BIAS_DISABLED
+
+# Line attribute ids
+GPIO_V2_LINE_ATTR_ID_FLAGS = 1
+GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES = 2
+GPIO_V2_LINE_ATTR_ID_DEBOUNCE = 3
+
+# Line event ids
+GPIO_V2_LINE_EVENT_RISING_EDGE = 1
+GPIO_V2_LINE_EVENT_FALLING_EDGE = 2
+
+# Packed uAPI structs, every 64 bit member is naturally aligned so no struct has implicit padding
+GPIOCHIP_INFO = struct.Struct(f'={GPIO_MAX_NAME_SIZE}s{GPIO_MAX_NAME_SIZE}sI')
+GPIO_V2_LINE_ATTRIBUTE_FORMAT = 'IIQ'
+GPIO_V2_LINE_CONFIG_ATTRIBUTE_FORMAT = GPIO_V2_LINE_ATTRIBUTE_FORMAT + 'Q'
+GPIO_V2_LINE_CONFIG_FORMAT = 'QI5I' + GPIO_V2_LINE_CONFIG_ATTRIBUTE_FORMAT * GPIO_V2_LINE_NUM_ATTRS_MAX
+GPIO_V2_LINE_CONFIG = struct.Struct('=' + GPIO_V2_LINE_CONFIG_FORMAT)
+GPIO_V2_LINE_REQUEST = struct.Struct(f'={GPIO_V2_LINES_MAX}I{GPIO_MAX_NAME_SIZE}s{GPIO_V2_LINE_CONFIG_FORMAT}II5Ii')
+GPIO_V2_LINE_INFO = struct.Struct(f'={GPIO_MAX_NAME_SIZE}s{GPIO_MAX_NAME_SIZE}sIIQ'
+                                  f'{GPIO_V2_LINE_ATTRIBUTE_FORMAT * GPIO_V2_LINE_NUM_ATTRS_MAX}4I')
+GPIO_V2_LINE_VALUES = struct.Struct('=QQ')
+GPIO_V2_LINE_EVENT = struct.Struct('=QIIII6I')
+
+
+def __ioc(direction: int, number: int, size: int) -> int:
+    return (direction << 30) | (size << 16) | (0xB4 << 8) | number
+
+
+# Ioctl request numbers (_IOR is direction 2, _IOWR is direction 3)
+GPIO_GET_CHIPINFO_IOCTL = __ioc(2, 0x01, GPIOCHIP_INFO.size)
+GPIO_V2_GET_LINEINFO_IOCTL = __ioc(3, 0x05, GPIO_V2_LINE_INFO.size)
+GPIO_V2_GET_LINE_IOCTL = __ioc(3, 0x07, GPIO_V2_LINE_REQUEST.size)
+GPIO_V2_LINE_SET_CONFIG_IOCTL = __ioc(3, 0x0D, GPIO_V2_LINE_CONFIG.size)
+GPIO_V2_LINE_GET_VALUES_IOCTL = __ioc(3, 0x0E, GPIO_V2_LINE_VALUES.size)
+GPIO_V2_LINE_SET_VALUES_IOCTL = __ioc(3, 0x0F, GPIO_V2_LINE_VALUES.size)
+
+# Ioctl of a file descriptor, replaceable by an in-process fake of the kernel
+Ioctl = Callable[[int, int, bytearray, bool], int]
+
+
+class GpioLineInfo(NamedTuple):
+    """Name, consumer, and flags of a line of a GPIO chip."""
+    offset: int
+    name: str
+    consumer: str
+    flags: int
+
+
+class GpioLineEvent(NamedTuple):
+    """
+    Edge of a requested line, timestamped by the kernel when the edge was detected.
+
+    .. note::
+        The timestamp is in nanoseconds of the monotonic clock (i.e. :func:`time.monotonic_ns`), the index is the
+        index of the line within its request.
+    """
+    timestamp: int
+    rising: bool
+    index: int
+    offset: int
+    sequence_number: int
+
+
+def pack_line_config(flags: Sequence[int], values: int) -> List[int]:
+    """
+    Returns the fields of a ``gpio_v2_line_config`` applying the given flags to each line of a request and the given
+    output values (bit n is the n-th line) to the output lines.
+
+    .. note::
+        The most common flags are the config's default flags, every other set of flags is an attribute with a mask of
+        its lines, followed by a single output values attribute.
+
+    :raises ValueError: If the lines need more attributes than a line config holds.
+    """
+
+    default_flags = Counter(flags).most_common(1)[0][0] if flags else 0
+    attributes = []
+    for attribute_flags in dict.fromkeys(line_flags for line_flags in flags if line_flags != default_flags):
+        mask = sum(1 << index for index, line_flags in enumerate(flags) if line_flags == attribute_flags)
+        attributes.append((GPIO_V2_LINE_ATTR_ID_FLAGS, 0, attribute_flags, mask))
+
+    output_mask = sum(1 << index for index, line_flags in enumerate(flags) if line_flags & GPIO_V2_LINE_FLAG_OUTPUT)
+    if output_mask:
+        attributes.append((GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES, 0, values & output_mask, output_mask))
+
+    if len(attributes) > GPIO_V2_LINE_NUM_ATTRS_MAX:
+        raise ValueError(f'Line config needs {len(attributes)} attributes, at most {GPIO_V2_LINE_NUM_ATTRS_MAX} fit')
+
+    fields = [default_flags, len(attributes)] + [0] * 5
+    for attribute in attributes:
+        fields.extend(attribute)
+    fields.extend([0] * (len(GPIO_V2_LINE_CONFIG_ATTRIBUTE_FORMAT) * (GPIO_V2_LINE_NUM_ATTRS_MAX - len(attributes))))
+    return fields
+
+
+class GpioLineRequest:
+    """
+    Lines of a GPIO chip requested together, every line of the request is read or written with a single ioctl.
+
+    .. note::
+        Values and masks are bit masks of the lines by their index within the request (bit n is the n-th line).
+    """
+
+    def __init__(self, file_descriptor: int, offsets: Sequence[int], ioctl: Ioctl):
+        self.file_descriptor = file_descriptor
+        self.offsets = tuple(offsets)
+        self._ioctl = ioctl
+
+    def get_values(self, mask: int) -> int:
+        """Returns the values of the lines of a given mask."""
+        buffer = bytearray(GPIO_V2_LINE_VALUES.pack(0, mask))
+        self._ioctl(self.file_descriptor, GPIO_V2_LINE_GET_VALUES_IOCTL, buffer, True)
+        return GPIO_V2_LINE_VALUES.unpack(buffer)[0]
+
+    def set_values(self, values: int, mask: int) -> None:
+        """Sets the values of the output lines of a given mask."""
+        buffer = bytearray(GPIO_V2_LINE_VALUES.pack(values, mask))
+        self._ioctl(self.file_descriptor, GPIO_V2_LINE_SET_VALUES_IOCTL, buffer, True)
+
+    def set_config(self, flags: Sequence[int], values: int) -> None:
+        """Reconfigures every line of the request (see: :func:`pack_line_config`) without releasing them."""
+        buffer = bytearray(GPIO_V2_LINE_CONFIG.pack(*pack_line_config(flags, values)))
+        self._ioctl(self.file_descriptor, GPIO_V2_LINE_SET_CONFIG_IOCTL, buffer, True)
+
+    def read_events(self) -> List[GpioLineEvent]:
+        """Waits for edges of the lines with edge detection and returns every edge queued by the kernel."""
+
+        data = os.read(self.file_descriptor, GPIO_V2_LINE_EVENT.size * 16)
+        events = []
+        for event_offset in range(0, len(data) - GPIO_V2_LINE_EVENT.size + 1, GPIO_V2_LINE_EVENT.size):
+            timestamp, event_id, offset, sequence_number, _, *_ = GPIO_V2_LINE_EVENT.unpack_from(data, event_offset)
+            rising = event_id == GPIO_V2_LINE_EVENT_RISING_EDGE
+            events.append(GpioLineEvent(timestamp, rising, self.offsets.index(offset), offset, sequence_number))
+        return events
+
+    def close(self) -> None:
+        """Releases every line of the request."""
+        os.close(self.file_descriptor)
+
+
+class GpioChip:
+    """
+    GPIO chip of the Linux GPIO character device uAPI v2.
+
+    .. note::
+        Any ioctl function with the signature of :func:`fcntl.ioctl` can be used in place of the kernel's (i.e. an
+        in-process fake in tests), in which case any file can be opened in place of the chip.
+
+    :raises OSError: If the chip can't be opened or isn't a GPIO chip.
+    """
+
+    def __init__(self, path: str = GPIOCHIP_PATH, ioctl: Ioctl = fcntl.ioctl):
+        self.path = path
+        self._ioctl = ioctl
+        self._file_descriptor = os.open(path, os.O_RDWR | os.O_CLOEXEC)
+        try:
+            buffer = bytearray(GPIOCHIP_INFO.size)
+            self._ioctl(self._file_descriptor, GPIO_GET_CHIPINFO_IOCTL, buffer, True)
+        except OSError:
+            os.close(self._file_descriptor)
+            raise
+
+        name, label, self.lines = GPIOCHIP_INFO.unpack(buffer)
+        self.name = self.__decode(name)
+        self.label = self.__decode(label)
+
+    def line_info(self, offset: int) -> GpioLineInfo:
+        """Returns the :class:`GpioLineInfo` of the line at a given offset."""
+
+        buffer = bytearray(GPIO_V2_LINE_INFO.size)
+        GPIO_V2_LINE_INFO.pack_into(buffer, 0, b'', b'', offset, 0, 0, *[0] * (3 * GPIO_V2_LINE_NUM_ATTRS_MAX + 4))
+        self._ioctl(self._file_descriptor, GPIO_V2_GET_LINEINFO_IOCTL, buffer, True)
+        name, consumer, offset, _, flags = GPIO_V2_LINE_INFO.unpack(buffer)[:5]
+        return GpioLineInfo(offset=offset, name=self.__decode(name), consumer=self.__decode(consumer), flags=flags)
+
+    def request_lines(self,
+                      offsets: Sequence[int],
+                      flags: Sequence[int],
+                      values: int = 0,
+                      consumer: str = 'endrpi',
+                      event_buffer_size: int = 0) -> GpioLineRequest:
+        """
+        Requests the lines at the given offsets with the given flags of each line and returns the request.
+
+        .. note::
+            Lines without a direction flag keep their current direction and output value.
+
+        :raises OSError: If a line is already requested (i.e. by a kernel driver).
+        """
+
+        if len(offsets) > GPIO_V2_LINES_MAX:
+            raise ValueError(f'At most {GPIO_V2_LINES_MAX} lines can be requested together')
+
+        request_fields = list(offsets) + [0] * (GPIO_V2_LINES_MAX - len(offsets))
+        request_fields.append(consumer.encode()[:GPIO_MAX_NAME_SIZE - 1])
+        request_fields.extend(pack_line_config(flags, values))
+        request_fields.extend([len(offsets), event_buffer_size] + [0] * 5 + [-1])
+
+        buffer = bytearray(GPIO_V2_LINE_REQUEST.pack(*request_fields))
+        self._ioctl(self._file_descriptor, GPIO_V2_GET_LINE_IOCTL, buffer, True)
+        file_descriptor = GPIO_V2_LINE_REQUEST.unpack(buffer)[-1]
+        return GpioLineRequest(file_descriptor, offsets, self._ioctl)
+
+    def close(self) -> None:
+        """Closes the chip, requested lines stay requested until their request is closed."""
+        os.close(self._file_descriptor)
+
+    @staticmethod
+    def __decode(name: bytes) -> str:
+        return name.split(b'\x00', 1)[0].decode(errors='replace')
@@ -0,0 +1,369 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import fcntl
+import os
+import select
+import threading
+import time
+from threading import RLock
+from types import MethodType
+from typing import Dict, Iterable, List, Optional, Union
+from weakref import WeakMethod, ref
+
+from gpiozero import Factory, Pin, PinError, PinFixedPull, PinInvalidEdges, PinInvalidFunction, PinInvalidPull, \
+    PinSetInput, PinUnsupported
+
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.utils.gpio_registers import GpioBank, FUNCTION_REGISTER_COUNT, GPIO_BANK_PIN_COUNT, GPIO_FUNCTION_INPUT, \
+    GPIO_FUNCTION_OUTPUT, GPIO_PULL_DOWN, GPIO_PULL_FLOATING, GPIO_PULL_UP, PULL_REGISTER_COUNT
+from endrpi.utils.gpiochip import GPIOCHIP_PATH, GPIO_V2_LINE_BIAS_FLAGS, GPIO_V2_LINE_DIRECTION_FLAGS, \
+    GPIO_V2_LINE_FLAG_BIAS_DISABLED, GPIO_V2_LINE_FLAG_BIAS_PULL_DOWN, GPIO_V2_LINE_FLAG_BIAS_PULL_UP, \
+    GPIO_V2_LINE_FLAG_EDGE_FALLING, GPIO_V2_LINE_FLAG_EDGE_RISING, GPIO_V2_LINE_FLAG_INPUT, GPIO_V2_LINE_FLAG_OUTPUT, \
+    GPIO_V2_LINE_FLAG_USED, GpioChip, GpioLineEvent, Ioctl
+
+# Number of edges the kernel queues for the event thread before dropping the oldest
+GPIOCHIP_EVENT_BUFFER_SIZE = 1024
+
+# Function select value reported for lines held by another consumer (i.e. a kernel driver using an alternate function)
+GPIO_FUNCTION_UNAVAILABLE = 0b100
+
+# Line flags of each gpiozero pull and edges value
+GPIOCHIP_PULL_FLAGS = {
+    'up': GPIO_V2_LINE_FLAG_BIAS_PULL_UP,
+    'down': GPIO_V2_LINE_FLAG_BIAS_PULL_DOWN,
+    'floating': GPIO_V2_LINE_FLAG_BIAS_DISABLED
+}
+GPIOCHIP_EDGE_FLAGS = {
+    'none': 0,
+    'rising': GPIO_V2_LINE_FLAG_EDGE_RISING,
+    'falling': GPIO_V2_LINE_FLAG_EDGE_FALLING,
+    'both': GPIO_V2_LINE_FLAG_EDGE_RISING | GPIO_V2_LINE_FLAG_EDGE_FALLING
+}
+
+# Register pull values of each line bias
+GPIOCHIP_REGISTER_PULLS = {
+    GPIO_V2_LINE_FLAG_BIAS_PULL_UP: GPIO_PULL_UP,
+    GPIO_V2_LINE_FLAG_BIAS_PULL_DOWN: GPIO_PULL_DOWN
+}
+
+
+class GpiochipPin(Pin):
+    """
+    Line of a :class:`GpiochipFactory` request exposed as a gpiozero pin.
+
+    .. note::
+        Pins switched to outputs keep their current level unless a level was latched with
+        :meth:`GpiochipFactory.write_levels` while they were inputs. Edges are only detected on inputs.
+    """
+
+    def __init__(self, factory: 'GpiochipFactory', number: int, index: int):
+        super().__init__()
+        self._factory = factory
+        self._number = number
+        self._index = index
+        self._edges = 'both'
+        self._latched_state: Optional[int] = None
+        self._when_changed = None
+        self._when_changed_lock = RLock()
+
+    @property
+    def number(self) -> int:
+        return self._number
+
+    @property
+    def factory(self) -> 'GpiochipFactory':
+        return self._factory
+
+    def __repr__(self):
+        return f'GPIO{self._number}'
+
+    def close(self):
+        self.when_changed = None
+
+    def _get_function(self):
+        return 'output' if self._factory.line_flags(self._index) & GPIO_V2_LINE_FLAG_OUTPUT else 'input'
+
+    def _set_function(self, value):
+        if value not in ('input', 'output'):
+            raise PinInvalidFunction(f'invalid function "{value}" for pin {self!r}')
+        with self._factory.lock:
+            flags = self._factory.line_flags(self._index)
+            if value == 'input':
+                self._factory.configure_line(self._index, GPIO_V2_LINE_FLAG_INPUT | (flags & GPIO_V2_LINE_BIAS_FLAGS)
+                                             | self._edge_flags())
+            elif not flags & GPIO_V2_LINE_FLAG_OUTPUT:
+                state = self._latched_state
+                if state is None:
+                    state = self._get_state()
+                self._factory.configure_line(self._index, GPIO_V2_LINE_FLAG_OUTPUT, state)
+            self._latched_state = None
+
+    def _get_state(self):
+        return self._factory.read_line(self._index)
+
+    def _set_state(self, value):
+        if self._get_function() != 'output':
+            raise PinSetInput(f'cannot set state of pin {self!r}')
+        self._factory.write_line(self._index, int(bool(value)))
+
+    def _get_pull(self):
+        flags = self._factory.line_flags(self._index)
+        for pull, pull_flag in GPIOCHIP_PULL_FLAGS.items():
+            if flags & pull_flag:
+                return pull
+        return 'floating'
+
+    def _set_pull(self, value):
+        if value not in GPIOCHIP_PULL_FLAGS:
+            raise PinInvalidPull(f'invalid pull "{value}" for pin {self!r}')
+        with self._factory.lock:
+            flags = self._factory.line_flags(self._index)
+            if not flags & GPIO_V2_LINE_FLAG_INPUT:
+                raise PinFixedPull(f'cannot set pull on non-input pin {self!r}')
+            self._factory.configure_line(self._index, (flags & ~GPIO_V2_LINE_BIAS_FLAGS) | GPIOCHIP_PULL_FLAGS[value])
+
+    def _get_edges(self):
+        return self._edges
+
+    def _set_edges(self, value):
+        if value not in GPIOCHIP_EDGE_FLAGS:
+            raise PinInvalidEdges(f'invalid edge specification "{value}" for pin {self!r}')
+        with self._factory.lock:
+            self._edges = value
+            self._update_edge_flags()
+
+    def _get_when_changed(self):
+        return None if self._when_changed is None else self._when_changed()
+
+    def _set_when_changed(self, value):
+        # Same weak references as gpiozero's own pins, so callbacks don't keep their owner alive
+        with self._when_changed_lock:
+            if value is None:
+                self._when_changed = None
+            elif isinstance(value, MethodType):
+                self._when_changed = WeakMethod(value)
+            else:
+                self._when_changed = ref(value)
+            with self._factory.lock:
+                self._update_edge_flags()
+
+    def _call_when_changed(self, ticks: float, state: int) -> None:
+        method = None if self._when_changed is None else self._when_changed()
+        if method is None:
+            self.when_changed = None
+        else:
+            method(ticks, state)
+
+    def _edge_flags(self) -> int:
+        return GPIOCHIP_EDGE_FLAGS[self._edges] if self._when_changed is not None else 0
+
+    def _update_edge_flags(self) -> None:
+        flags = self._factory.line_flags(self._index)
+        if flags & GPIO_V2_LINE_FLAG_INPUT:
+            edge_flags = GPIO_V2_LINE_FLAG_EDGE_RISING | GPIO_V2_LINE_FLAG_EDGE_FALLING
+            self._factory.configure_line(self._index, (flags & ~edge_flags) | self._edge_flags())
+
+
+class GpiochipFactory(Factory):
+    """
+    gpiozero pin factory of a GPIO chip of the Linux GPIO character device uAPI v2 (i.e. libgpiod's backend).
+
+    Every free line of the given pins is held by a single line request, so the levels of every pin are read or
+    written with a single ioctl and edges are timestamped by the kernel and read by a single thread.
+
+    .. note::
+        Lines are requested as-is so pins keep their direction, bias, and level until they are configured. Lines held
+        by another consumer (i.e. a kernel driver) are unsupported.
+
+    .. note::
+        The factory implements :class:`~endrpi.utils.gpio_registers.BulkPinAccess` for GPIO0 to GPIO31 so bulk
+        actions skip per pin calls.
+
+    :raises OSError: If the chip can't be opened or its lines can't be requested.
+    """
+
+    def __init__(self,
+                 path: str = GPIOCHIP_PATH,
+                 pin_ids: Optional[Iterable[RaspberryPiPinIds]] = None,
+                 ioctl: Ioctl = fcntl.ioctl):
+        super().__init__()
+        self.lock = RLock()
+        self.chip = GpioChip(path, ioctl)
+        self.pulls_readable = True
+
+        numbers = sorted({pin_id.bcm_number for pin_id in (pin_ids or RaspberryPiPinIds)})
+        line_infos = [self.chip.line_info(number) for number in numbers if number < self.chip.lines]
+        line_infos = [line_info for line_info in line_infos if not line_info.flags & GPIO_V2_LINE_FLAG_USED]
+        try:
+            self._request = self.chip.request_lines([line_info.offset for line_info in line_infos],
+                                                    [0] * len(line_infos),
+                                                    event_buffer_size=GPIOCHIP_EVENT_BUFFER_SIZE)
+        except Exception:
+            self.chip.close()
+            raise
+
+        # Direction and bias of each line as reported before the request, the request doesn't change them
+        self._flags: List[int] = [line_info.flags & (GPIO_V2_LINE_DIRECTION_FLAGS | GPIO_V2_LINE_BIAS_FLAGS)
+                                  for line_info in line_infos]
+        self._pins: Dict[int, GpiochipPin] = {line_info.offset: GpiochipPin(self, line_info.offset, index)
+                                              for index, line_info in enumerate(line_infos)}
+        self._bank_pins = [(number, pin._index) for number, pin in self._pins.items() if number < GPIO_BANK_PIN_COUNT]
+
+        self._closed = threading.Event()
+        self._wake_read, self._wake_write = os.pipe()
+        self._event_thread = threading.Thread(target=self._read_events, name='gpiochip-events', daemon=True)
+        self._event_thread.start()
+
+    def close(self) -> None:
+        """Stops the event thread and releases every line."""
+
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        os.write(self._wake_write, b'\x00')
+        self._event_thread.join()
+        for file_descriptor in (self._wake_read, self._wake_write):
+            os.close(file_descriptor)
+        self._request.close()
+        self.chip.close()
+        super().close()
+
+    def pin(self, spec: Union[int, str]) -> GpiochipPin:
+        """
+        Returns the pin of a BCM number or alias (i.e. 17, 'GPIO17', or 'BCM17').
+
+        :raises PinUnsupported: If the pin isn't a free line of the chip.
+        """
+
+        pin_id = spec if isinstance(spec, RaspberryPiPinIds) else RaspberryPiPinIds.from_bcm_id(str(spec))
+        gpiochip_pin = self._pins.get(pin_id.bcm_number) if pin_id else None
+        if gpiochip_pin is None:
+            raise PinUnsupported(f'{spec} is not a free line of {self.chip.path}')
+        return gpiochip_pin
+
+    @staticmethod
+    def ticks() -> float:
+        """Returns seconds of the monotonic clock, the clock the kernel timestamps edges with."""
+        return time.monotonic()
+
+    @staticmethod
+    def ticks_diff(later: float, earlier: float) -> float:
+        return later - earlier
+
+    def line_flags(self, index: int) -> int:
+        """Returns the line flags of the line at a given index of the request."""
+        return self._flags[index]
+
+    def configure_line(self, index: int, flags: int, value: int = 0) -> None:
+        """
+        Reconfigures the line at a given index of the request, the value is only used when the line is an output.
+
+        .. note::
+            Every line of a request is reconfigured at once, so other output lines are reconfigured with their
+            current levels.
+
+        :raises PinError: If the chip rejects the configuration (i.e. a bias it doesn't support).
+        """
+
+        with self.lock:
+            flags_by_index = list(self._flags)
+            flags_by_index[index] = flags
+            output_mask = sum(1 << line_index for line_index, line_flags in enumerate(self._flags)
+                              if line_flags & GPIO_V2_LINE_FLAG_OUTPUT and line_index != index)
+            try:
+                values = self._request.get_values(output_mask) if output_mask else 0
+                self._request.set_config(flags_by_index, (values & ~(1 << index)) | (value << index))
+            except (OSError, ValueError) as error:
+                raise PinError(f'failed to configure line {self._request.offsets[index]}: {error}') from error
+            self._flags = flags_by_index
+
+    def read_line(self, index: int) -> int:
+        """Returns the level of the line at a given index of the request."""
+        return int(bool(self._request.get_values(1 << index)))
+
+    def write_line(self, index: int, value: int) -> None:
+        """Drives the output line at a given index of the request."""
+        self._request.set_values(value << index, 1 << index)
+
+    def read_levels(self) -> int:
+        """Returns the levels of GPIO0 to GPIO31 as a bit mask (bit n is GPIOn) read with a single ioctl."""
+
+        values = self._request.get_values(sum(1 << index for _, index in self._bank_pins))
+        return sum(1 << number for number, index in self._bank_pins if values >> index & 1)
+
+    def write_levels(self, set_mask: int, clear_mask: int) -> None:
+        """
+        Drives every output pin in the set mask high and every output pin in the clear mask low with a single ioctl.
+
+        .. note::
+            Like the registers' output latches, the levels of input pins are latched until they become outputs.
+        """
+
+        with self.lock:
+            values = 0
+            mask = 0
+            for number, index in self._bank_pins:
+                if not (set_mask | clear_mask) >> number & 1:
+                    continue
+                state = set_mask >> number & 1
+                if self._flags[index] & GPIO_V2_LINE_FLAG_OUTPUT:
+                    values |= state << index
+                    mask |= 1 << index
+                else:
+                    self._pins[number]._latched_state = state
+            if mask:
+                self._request.set_values(values, mask)
+
+    def read_bank(self) -> GpioBank:
+        """
+        Returns a :class:`~endrpi.utils.gpio_registers.GpioBank` of GPIO0 to GPIO31 encoded from the line flags and
+        a single read of the levels.
+
+        .. note:: Lines that aren't requested are reported with an alternate function.
+        """
+
+        with self.lock:
+            functions = [0] * FUNCTION_REGISTER_COUNT
+            pulls = [0] * PULL_REGISTER_COUNT
+            indexes = dict(self._bank_pins)
+            for number in range(GPIO_BANK_PIN_COUNT):
+                index = indexes.get(number)
+                if index is None:
+                    function = GPIO_FUNCTION_UNAVAILABLE
+                    pull = GPIO_PULL_FLOATING
+                else:
+                    flags = self._flags[index]
+                    function = GPIO_FUNCTION_OUTPUT if flags & GPIO_V2_LINE_FLAG_OUTPUT else GPIO_FUNCTION_INPUT
+                    pull = GPIOCHIP_REGISTER_PULLS.get(flags & GPIO_V2_LINE_BIAS_FLAGS, GPIO_PULL_FLOATING)
+                functions[number // 10] |= function << ((number % 10) * 3)
+                pulls[number // 16] |= pull << ((number % 16) * 2)
+            levels = self.read_levels()
+
+        return GpioBank(functions=tuple(functions), levels=levels, pulls=tuple(pulls))
+
+    def _read_events(self) -> None:
+        while not self._closed.is_set():
+            readable, _, _ = select.select([self._request.file_descriptor, self._wake_read], [], [])
+            if self._closed.is_set():
+                return
+            if self._request.file_descriptor in readable:
+                for event in self._request.read_events():
+                    self._dispatch(event)
+
+    def _dispatch(self, event: GpioLineEvent) -> None:
+        gpiochip_pin = self._pins.get(event.offset)
+        if gpiochip_pin is not None:
+            gpiochip_pin._call_when_changed(event.timestamp / 1_000_000_000, int(event.rising))
@@ -0,0 +1,317 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import ctypes
+import errno
+import fcntl
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from endrpi.model.i2c import I2cBlock, I2cBlockRead, I2cBlockWrite, I2cPollConfiguration, I2cPollStatus
+
+# I2C character device of each bus (i.e. /dev/i2c-1), available once the i2c-dev module is loaded
+I2C_BUS_PATH = '/dev/i2c-{bus}'
+
+# Combined transfer ioctl and its limits (see: include/uapi/linux/i2c-dev.h and include/uapi/linux/i2c.h)
+I2C_RDWR = 0x0707
+I2C_RDWR_IOCTL_MAX_MSGS = 42
+I2C_M_RD = 0x0001
+
+# Message of a combined transfer, an address, flags, and a buffer
+I2cTransferMessage = Tuple[int, int, bytearray]
+
+
+class I2cMsg(ctypes.Structure):
+    """``struct i2c_msg`` of the kernel, a message of a combined transfer."""
+    _fields_ = [
+        ('addr', ctypes.c_uint16),
+        ('flags', ctypes.c_uint16),
+        ('len', ctypes.c_uint16),
+        ('buf', ctypes.POINTER(ctypes.c_uint8))
+    ]
+
+
+class I2cRdwrIoctlData(ctypes.Structure):
+    """``struct i2c_rdwr_ioctl_data`` of the kernel, the messages of a combined transfer."""
+    _fields_ = [
+        ('msgs', ctypes.POINTER(I2cMsg)),
+        ('nmsgs', ctypes.c_uint32)
+    ]
+
+
+class I2cTransferError(OSError):
+    """Raised when a device doesn't acknowledge a transfer (i.e. no device at its address)."""
+
+    def __init__(self, bus: int, address: int, error: OSError):
+        super().__init__(error.errno, f'I2C transfer with device 0x{address:02x} of bus {bus} failed: {error}')
+        self.bus = bus
+        self.address = address
+
+
+class I2cBusUnavailable(OSError):
+    """Raised when a bus can't be opened (i.e. the bus isn't enabled)."""
+
+    def __init__(self, bus: int, error: OSError):
+        super().__init__(error.errno, f'I2C bus {bus} can\'t be opened: {error}')
+        self.bus = bus
+
+
+class I2cBus:
+    """
+    I2C bus of the I2C character device, messages are sent as combined transfers (repeated starts between messages)
+    so a batch of register blocks is a single ioctl rather than a transfer per block.
+
+    .. note::
+        Controllers that only take a read as the last message of a transfer (i.e. i2c-bcm2835) refuse combined
+        transfers of several reads, once refused every transfer of the bus ends at its first read message.
+
+    .. note::
+        Any ioctl function with the signature of :func:`fcntl.ioctl` can be used in place of the kernel's (i.e. an
+        in-process fake in tests), in which case any file can be opened in place of the bus.
+
+    :raises OSError: If the bus can't be opened.
+    """
+
+    def __init__(self, bus: int, path_format: str = I2C_BUS_PATH, ioctl: Callable = fcntl.ioctl):
+        self.bus = bus
+        self._ioctl = ioctl
+        self._lock = threading.Lock()
+        self._last_message_reads = False
+        self._file_descriptor = os.open(path_format.format(bus=bus), os.O_RDWR | os.O_CLOEXEC)
+
+    def transfer(self, messages: Sequence[I2cTransferMessage]) -> None:
+        """
+        Transfers messages in order, read messages fill their buffer.
+
+        .. note::
+            Messages are split into ioctls of :data:`I2C_RDWR_IOCTL_MAX_MSGS` messages, a register address message
+            and its read message are never split since the limit is even.
+        """
+
+        with self._lock:
+            for chunk in self._chunks(messages):
+                try:
+                    self._transfer_chunk(chunk)
+                except OSError as error:
+                    if error.errno != errno.EOPNOTSUPP or self._last_message_reads:
+                        raise
+                    # The controller refuses reads before the last message, which it checks before any transfer
+                    self._last_message_reads = True
+                    for read_chunk in self._chunks(chunk):
+                        self._transfer_chunk(read_chunk)
+
+    def read_blocks(self, reads: Sequence[I2cBlockRead]) -> List[I2cBlock]:
+        """
+        Returns the blocks of every read, each read writes its register address and reads its block after a repeated
+        start.
+
+        :raises I2cTransferError: If a device doesn't acknowledge its read.
+        """
+
+        messages = []
+        for read in reads:
+            messages.append((read.address, 0, bytearray([read.startRegister])))
+            messages.append((read.address, I2C_M_RD, bytearray(read.length)))
+
+        self._transfer_or_isolate(messages, 2, [read.address for read in reads])
+        return [I2cBlock(bus=self.bus, address=read.address, startRegister=read.startRegister, data=list(buffer))
+                for read, (_, _, buffer) in zip(reads, messages[1::2])]
+
+    def write_blocks(self, writes: Sequence[I2cBlockWrite]) -> None:
+        """
+        Writes every block, each write is a single message of its register address followed by its data.
+
+        :raises I2cTransferError: If a device doesn't acknowledge its write.
+        """
+
+        messages = [(write.address, 0, bytearray([write.startRegister] + write.data)) for write in writes]
+        self._transfer_or_isolate(messages, 1, [write.address for write in writes])
+
+    def close(self) -> None:
+        """Closes the bus."""
+        os.close(self._file_descriptor)
+
+    def _chunks(self, messages: Sequence[I2cTransferMessage]) -> Iterator[Sequence[I2cTransferMessage]]:
+        if not self._last_message_reads:
+            for start in range(0, len(messages), I2C_RDWR_IOCTL_MAX_MSGS):
+                yield messages[start:start + I2C_RDWR_IOCTL_MAX_MSGS]
+            return
+
+        start = 0
+        for index, (_, flags, _) in enumerate(messages):
+            if flags & I2C_M_RD or index + 1 - start == I2C_RDWR_IOCTL_MAX_MSGS:
+                yield messages[start:index + 1]
+                start = index + 1
+        if start < len(messages):
+            yield messages[start:]
+
+    def _transfer_chunk(self, chunk: Sequence[I2cTransferMessage]) -> None:
+        msgs = (I2cMsg * len(chunk))()
+        # The ctypes views of the buffers are kept alive until the ioctl returns
+        buffers = [(ctypes.c_uint8 * len(buffer)).from_buffer(buffer) for _, _, buffer in chunk]
+        for msg, (address, flags, _), buffer in zip(msgs, chunk, buffers):
+            msg.addr = address
+            msg.flags = flags
+            msg.len = len(buffer)
+            msg.buf = ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8))
+        data = I2cRdwrIoctlData(msgs=ctypes.cast(msgs, ctypes.POINTER(I2cMsg)), nmsgs=len(chunk))
+        self._ioctl(self._file_descriptor, I2C_RDWR, data)
+
+    def _transfer_or_isolate(self, messages: List[I2cTransferMessage], group_size: int, addresses: List[int]) -> None:
+        # A failed combined transfer doesn't tell which device failed, so each block is retried alone to find it
+        try:
+            self.transfer(messages)
+            return
+        except OSError as error:
+            if len(addresses) == 1:
+                raise I2cTransferError(self.bus, addresses[0], error) from error
+
+        for index, address in enumerate(addresses):
+            try:
+                self.transfer(messages[index * group_size:(index + 1) * group_size])
+            except OSError as error:
+                raise I2cTransferError(self.bus, address, error) from error
+
+
+class I2cBuses:
+    """
+    I2C buses opened on first use and kept open, blocks of different buses are transferred bus by bus.
+
+    .. note::
+        Methods raise :class:`I2cBusUnavailable` when a bus can't be opened and :class:`I2cTransferError` when a
+        device doesn't respond.
+    """
+
+    def __init__(self, path_format: str = I2C_BUS_PATH, ioctl: Callable = fcntl.ioctl):
+        self.path_format = path_format
+        self._ioctl = ioctl
+        self._lock = threading.Lock()
+        self._buses: Dict[int, I2cBus] = {}
+
+    def bus(self, bus: int) -> I2cBus:
+        """Returns the open :class:`I2cBus` of a given bus number, opening it if needed."""
+        with self._lock:
+            if bus not in self._buses:
+                try:
+                    self._buses[bus] = I2cBus(bus, self.path_format, self._ioctl)
+                except OSError as error:
+                    raise I2cBusUnavailable(bus, error) from error
+            return self._buses[bus]
+
+    def read_blocks(self, reads: Sequence[I2cBlockRead]) -> List[I2cBlock]:
+        """Returns the blocks of every read in the order of the reads."""
+
+        blocks: List[Optional[I2cBlock]] = [None] * len(reads)
+        for bus, indexed_reads in self._group_by_bus(reads).items():
+            bus_blocks = self.bus(bus).read_blocks([read for _, read in indexed_reads])
+            for (index, _), block in zip(indexed_reads, bus_blocks):
+                blocks[index] = block
+        return blocks
+
+    def write_blocks(self, writes: Sequence[I2cBlockWrite]) -> None:
+        """Writes every block, in order within each bus."""
+        for bus, indexed_writes in self._group_by_bus(writes).items():
+            self.bus(bus).write_blocks([write for _, write in indexed_writes])
+
+    def close(self) -> None:
+        """Closes every open bus."""
+        with self._lock:
+            for bus in self._buses.values():
+                bus.close()
+            self._buses.clear()
+
+    @staticmethod
+    def _group_by_bus(blocks: Sequence) -> Dict[int, List[Tuple[int, any]]]:
+        groups: Dict[int, List[Tuple[int, any]]] = OrderedDict()
+        for index, block in enumerate(blocks):
+            groups.setdefault(block.bus, []).append((index, block))
+        return groups
+
+
+class I2cPoller:
+    """
+    Daemon thread reading the blocks of a :class:`~endrpi.model.i2c.I2cPollConfiguration` every interval and caching
+    the latest blocks, so clients read devices without a bus transfer per request.
+
+    .. note::
+        Polls are scheduled from the start of polling rather than from the previous poll so the interval doesn't
+        drift, a poll that overruns its interval skips ahead instead of bursting.
+    """
+
+    def __init__(self,
+                 configuration: I2cPollConfiguration,
+                 read_blocks: Callable[[List[I2cBlockRead]], List[I2cBlock]]):
+        self.configuration = configuration
+        self._read_blocks = read_blocks
+        self._lock = threading.Lock()
+        self._blocks: List[I2cBlock] = []
+        self._timestamp: Optional[float] = None
+        self._polls = 0
+        self._failed_polls = 0
+        self._error: Optional[str] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='i2c-poll', daemon=True)
+
+    def start(self) -> None:
+        """Starts polling, the first poll is an interval from now (see: :meth:`poll` for an immediate poll)."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops polling and waits for a running poll to finish."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def status(self) -> I2cPollStatus:
+        """Returns the :class:`~endrpi.model.i2c.I2cPollStatus` of the latest poll."""
+        with self._lock:
+            return I2cPollStatus(interval=self.configuration.interval,
+                                 reads=self.configuration.reads,
+                                 blocks=self._blocks,
+                                 timestamp=self._timestamp,
+                                 polls=self._polls,
+                                 failedPolls=self._failed_polls,
+                                 error=self._error)
+
+    def poll(self) -> None:
+        """Reads every block once and caches the result."""
+
+        try:
+            blocks = self._read_blocks(self.configuration.reads)
+        except OSError as error:
+            with self._lock:
+                self._polls += 1
+                self._failed_polls += 1
+                self._error = str(error)
+            return
+
+        with self._lock:
+            self._blocks = blocks
+            self._timestamp = time.time()
+            self._polls += 1
+            self._error = None
+
+    def _run(self) -> None:
+        interval = self.configuration.interval
+        poll_start = time.monotonic()
+        while not self._stopped.wait(max(0.0, poll_start + interval - time.monotonic())):
+            poll_start += interval
+            self.poll()
+            now = time.monotonic()
+            if now - poll_start > interval:
+                poll_start = now
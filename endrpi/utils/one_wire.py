@@ -0,0 +1,149 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from endrpi.model.measurement import Measurement, TemperatureUnit
+from endrpi.model.temperature import OneWireTemperature
+
+# Sysfs directory of the devices found on every 1-Wire bus (enabled with the 'w1-gpio' device tree overlay)
+ONE_WIRE_DEVICES_PATH = '/sys/bus/w1/devices'
+
+# Family codes of the 1-Wire temperature sensors read through the kernel's w1_therm driver (DS18S20, DS1822,
+# DS18B20, DS1825 and MAX31850)
+ONE_WIRE_TEMPERATURE_FAMILIES = ('10', '22', '28', '3b', '42')
+
+
+class OneWireReadError(Exception):
+    """Raised when a sensor doesn't return a temperature with a valid CRC."""
+
+
+def read_one_wire_temperature(device_path: str) -> float:
+    """
+    Returns the temperature (celsius) of a 1-Wire sensor, the read blocks for the conversion (~750ms at 12 bits).
+
+    .. note::
+        The w1_slave file is expected to resemble '72 01 4b 46 7f ff 0e 10 57 : crc=57 YES' followed by
+        '72 01 4b 46 7f ff 0e 10 57 t=23125'.
+
+    :raises OSError: If the sensor was removed.
+    :raises OneWireReadError: If the conversion failed.
+    """
+
+    with open(os.path.join(device_path, 'w1_slave')) as file:
+        crc_line = file.readline()
+        temperature_line = file.readline()
+
+    temperature_search = re.search(r't=(-?\d+)$', temperature_line.strip())
+    if not crc_line.strip().endswith('YES') or not temperature_search:
+        raise OneWireReadError(f'Failed conversion of `{os.path.basename(device_path)}`')
+
+    # Note: A sensor that lost power during the conversion reports its power on reset value of exactly 85C
+    return int(temperature_search.group(1)) / 1000
+
+
+class OneWirePoller:
+    """
+    Daemon thread reading every 1-Wire temperature sensor once per interval (seconds) into a cache.
+
+    .. note::
+        Each read blocks for a conversion, so reads are staggered evenly across the interval rather than burst at its
+        start. Sensors are discovered again every interval, a sensor that fails keeps its last temperature and
+        timestamp along with the error.
+    """
+
+    def __init__(self, devices_path: str = ONE_WIRE_DEVICES_PATH, interval: float = 5.0):
+        self.devices_path = devices_path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._temperatures: Dict[str, OneWireTemperature] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def discover(self) -> List[str]:
+        """Returns the ids (i.e. '28-0316a2799bff') of every connected temperature sensor."""
+
+        try:
+            device_ids = os.listdir(self.devices_path)
+        except OSError:
+            return []
+        return sorted(device_id for device_id in device_ids
+                      if device_id.split('-', 1)[0].lower() in ONE_WIRE_TEMPERATURE_FAMILIES)
+
+    def temperatures(self) -> List[OneWireTemperature]:
+        """Returns the cached temperature of every sensor ordered by id."""
+        with self._lock:
+            return [self._temperatures[sensor_id] for sensor_id in sorted(self._temperatures)]
+
+    def temperature(self, sensor_id: str) -> Optional[OneWireTemperature]:
+        """Returns the cached temperature of a given sensor or none if the sensor wasn't discovered."""
+        return self._temperatures.get(sensor_id)
+
+    def start(self) -> None:
+        """Starts polling."""
+        self._thread = threading.Thread(target=self._run, name='one-wire', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops polling, the cached temperatures stay readable."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def poll(self, cycle_start: Optional[float] = None) -> None:
+        """
+        Discovers the sensors and reads each of them once, forgetting sensors that were removed.
+
+        .. note:: Reads are spread across the interval following cycle_start when given and back to back otherwise.
+        """
+
+        sensor_ids = self.discover()
+        with self._lock:
+            self._temperatures = {sensor_id: self._temperatures.get(sensor_id, OneWireTemperature(id=sensor_id))
+                                  for sensor_id in sensor_ids}
+
+        for index, sensor_id in enumerate(sensor_ids):
+            if cycle_start is not None:
+                delay = cycle_start + index * self.interval / len(sensor_ids) - time.monotonic()
+                if delay > 0 and self._stopped.wait(delay):
+                    return
+            self._read(sensor_id)
+
+    def _read(self, sensor_id: str) -> None:
+        try:
+            celsius = read_one_wire_temperature(os.path.join(self.devices_path, sensor_id))
+            update = {
+                'temperature': Measurement(quantity=celsius, unitOfMeasurement=TemperatureUnit.CELSIUS),
+                'timestamp': time.time(),
+                'error': None
+            }
+        except (OSError, OneWireReadError) as error:
+            update = {'error': str(error)}
+
+        with self._lock:
+            if sensor_id in self._temperatures:
+                self._temperatures[sensor_id] = self._temperatures[sensor_id].copy(update=update)
+
+    def _run(self) -> None:
+        cycle_start = time.monotonic()
+        while not self._stopped.is_set():
+            self.poll(cycle_start)
+            # Cycles that overrun the interval start the next cycle right away instead of bursting to catch up
+            cycle_start = max(cycle_start + self.interval, time.monotonic())
+            self._stopped.wait(max(0.0, cycle_start - time.monotonic()))
@@ -0,0 +1,162 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import math
+import threading
+import time
+from typing import Callable, Optional
+
+from endrpi.model.pid import PidConfiguration, PidJitter, PidStatus, PidTuning
+from endrpi.utils.pulse_counter import MICROSECONDS_PER_SECOND, PulseStatistic
+
+
+class PidLoop:
+    """
+    Daemon thread running a PID loop of a :class:`~endrpi.model.pid.PidConfiguration` at a fixed rate.
+
+    .. note::
+        The process variable is read and the output written through callables so the loop doesn't depend on the
+        source or the pin backend. A failed read holds the output and skips the iteration, a failed write stops the
+        loop. Iterations are scheduled from the start of the loop so timing errors don't accumulate, a thread that
+        falls more than a period behind skips ahead and counts an overrun.
+    """
+
+    def __init__(self,
+                 loop_id: int,
+                 configuration: PidConfiguration,
+                 read_process_variable: Callable[[], float],
+                 write_output: Callable[[float], None]):
+        self.id = loop_id
+        self.configuration = configuration
+        self.process_variable: Optional[float] = None
+        self.output: Optional[float] = None
+        self.iterations = 0
+        self.overruns = 0
+        self.error: Optional[str] = None
+        self._read_process_variable = read_process_variable
+        self._write_output = write_output
+        self._integral = 0.0
+        self._previous_process_variable: Optional[float] = None
+        self._periods = PulseStatistic()
+        self._period_squares = 0.0
+        self._max_deviation = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'pid-{loop_id}', daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self) -> None:
+        """Starts the loop."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the loop, the last output keeps being driven."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def tune(self, tuning: PidTuning) -> None:
+        """Replaces the setpoint and gains from the next iteration on, the integral term is kept."""
+        self.configuration = self.configuration.copy(update=tuning.dict())
+
+    def status(self) -> PidStatus:
+        """Returns the :class:`~endrpi.model.pid.PidStatus` of the loop."""
+
+        count = self._periods.count
+        standard_deviation = None
+        max_deviation = None
+        if count:
+            mean = self._periods.total / count
+            variance = max(0.0, self._period_squares / count - mean * mean)
+            standard_deviation = math.sqrt(variance) * MICROSECONDS_PER_SECOND
+            max_deviation = self._max_deviation * MICROSECONDS_PER_SECOND
+
+        jitter = PidJitter(period=self._periods.statistics(),
+                           standardDeviation=standard_deviation,
+                           maxDeviation=max_deviation,
+                           overruns=self.overruns)
+        return PidStatus(id=self.id,
+                         configuration=self.configuration,
+                         running=self.running,
+                         processVariable=self.process_variable,
+                         output=self.output,
+                         iterations=self.iterations,
+                         jitter=jitter,
+                         error=self.error)
+
+    def control(self, process_variable: float, elapsed: float) -> float:
+        """Returns the output for a newly read process variable, elapsed seconds after the previous one."""
+
+        configuration = self.configuration
+        error = configuration.setpoint - process_variable
+
+        # The gain is applied before integrating so retuning ki doesn't step the output
+        self._integral += configuration.ki * error * elapsed
+        self._integral = min(max(self._integral, configuration.outputMin), configuration.outputMax)
+
+        derivative = 0.0
+        if self._previous_process_variable is not None and elapsed > 0:
+            derivative = -configuration.kd * (process_variable - self._previous_process_variable) / elapsed
+        self._previous_process_variable = process_variable
+
+        output = configuration.kp * error + self._integral + derivative
+        return min(max(output, configuration.outputMin), configuration.outputMax)
+
+    def _run(self) -> None:
+        start_time = time.monotonic()
+        previous_time: Optional[float] = None
+        iteration = 0
+
+        while not self._stopped.is_set():
+            period = 1 / self.configuration.rate
+            delay = start_time + iteration * period - time.monotonic()
+            if delay > 0:
+                if self._stopped.wait(delay):
+                    return
+            elif delay < -period:
+                # Skip the missed iterations rather than running them back to back
+                self.overruns += 1
+                start_time = time.monotonic()
+                iteration = 0
+
+            iteration_time = time.monotonic()
+            elapsed = period
+            if previous_time is not None:
+                elapsed = iteration_time - previous_time
+                self._periods.add(elapsed)
+                self._period_squares += elapsed * elapsed
+                self._max_deviation = max(self._max_deviation, abs(elapsed - period))
+            previous_time = iteration_time
+            iteration += 1
+
+            try:
+                process_variable = self._read_process_variable()
+            except Exception as error:
+                self.error = str(error)
+                continue
+
+            output = self.control(process_variable, elapsed)
+            try:
+                self._write_output(output)
+            except Exception as error:
+                self.error = str(error)
+                return
+
+            self.process_variable = process_variable
+            self.output = output
+            self.iterations += 1
+            self.error = None
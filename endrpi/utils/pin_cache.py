@@ -0,0 +1,91 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import threading
+from typing import Callable, Dict, Optional
+
+from gpiozero import Factory, Pin
+
+from endrpi.model.pin import PinConfiguration, RaspberryPiPinIds
+
+
+class PinCache:
+    """
+    Cache of gpiozero pin handles and a shadow of the last known :class:`~endrpi.model.pin.PinConfiguration` of
+    each pin.
+
+    .. note::
+        The cache is safe to use from any thread but doesn't serialize pin operations, hold the pin's
+        :class:`~endrpi.utils.pin_lock.PinLocks` lock while reading or updating a pin so a read never sees a partially
+        applied configuration. The cache is cleared whenever the gpiozero pin factory is replaced.
+
+    .. note::
+        Shadows only follow configurations written through endrpi, pins changed by other processes are stale until
+        :meth:`invalidate` is called.
+    """
+
+    def __init__(self, pin_factory: Callable[[], Factory]):
+        self._lock = threading.Lock()
+        self._pin_factory = pin_factory
+        self._factory = None
+        self._handles: Dict[RaspberryPiPinIds, Pin] = {}
+        self._shadows: Dict[RaspberryPiPinIds, PinConfiguration] = {}
+
+    def pin(self, pin_id: RaspberryPiPinIds) -> Pin:
+        """
+        Returns the cached gpiozero pin handle of a given pin.
+
+        :raises PinUnsupported: If the pin isn't supported by the pin factory.
+        """
+
+        with self._lock:
+            self._check_factory()
+            gpiozero_pin = self._handles.get(pin_id)
+            if gpiozero_pin is None:
+                gpiozero_pin = self._factory.pin(pin_id)
+                self._handles[pin_id] = gpiozero_pin
+            return gpiozero_pin
+
+    def shadow(self, pin_id: RaspberryPiPinIds) -> Optional[PinConfiguration]:
+        """Returns the last known configuration of a given pin or none if it isn't known."""
+        with self._lock:
+            self._check_factory()
+            return self._shadows.get(pin_id)
+
+    def update_shadow(self, pin_id: RaspberryPiPinIds, pin_configuration: PinConfiguration) -> None:
+        """Sets the last known configuration of a given pin."""
+        with self._lock:
+            self._check_factory()
+            self._shadows[pin_id] = pin_configuration
+
+    def invalidate(self, pin_id: Optional[RaspberryPiPinIds] = None) -> None:
+        """Forgets the last known configuration of a given pin, or of every pin when no pin is given."""
+        with self._lock:
+            if pin_id is None:
+                self._shadows.clear()
+            else:
+                self._shadows.pop(pin_id, None)
+
+    def clear(self) -> None:
+        """Forgets every pin handle and configuration (i.e. when pins are changed outside of endrpi)."""
+        with self._lock:
+            self._handles.clear()
+            self._shadows.clear()
+
+    def _check_factory(self) -> None:
+        pin_factory = self._pin_factory()
+        if self._factory is not pin_factory:
+            self._factory = pin_factory
+            self._handles.clear()
+            self._shadows.clear()
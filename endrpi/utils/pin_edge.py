@@ -0,0 +1,334 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import threading
+import time
+from collections import deque
+from functools import partial
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from gpiozero import Device
+
+from endrpi.model.pin import PinEdge, PinEdgeFilterConfiguration, PinEdgeFilterPolicy, PinEdgeFilterStatus, \
+    RaspberryPiPinIds
+from endrpi.utils.pin_lock import PinLocks
+
+
+class PinEdgeSample(NamedTuple):
+    """
+    Detected edge of a pin.
+
+    .. note::
+        The timestamp is the seconds since the epoch when the edge was dispatched, ticks are the pin factory's ticks
+        when the edge was detected and are only comparable through the pin factory's ``ticks_diff``.
+    """
+    timestamp: float
+    edge: PinEdge
+    state: float
+    ticks: Optional[float] = None
+
+
+class PinEdgeListener:
+    """
+    Bounded queue of the edges of a single pin that are detected on gpiozero's callback thread and consumed on the
+    event loop.
+
+    .. note::
+        When the queue is full the oldest edge is dropped, the event loop is woken at most once per batch of edges so
+        an edge flood can't grow the event loop's callback queue.
+    """
+
+    def __init__(self, edge: PinEdge, queue_size: int):
+        self.edge = edge
+        self._samples = deque(maxlen=queue_size)
+        self._dropped_samples = 0
+        self._lock = threading.Lock()
+        self._wake_pending = False
+        self._loop = asyncio.get_event_loop()
+        self._sample_queued = asyncio.Event()
+
+    def accepts(self, edge: PinEdge) -> bool:
+        """Returns true if the listener is interested in a detected rising or falling edge."""
+        return self.edge is PinEdge.BOTH or self.edge is edge
+
+    def notify(self, sample: PinEdgeSample) -> None:
+        """Queues a detected edge, safe to call from any thread."""
+
+        with self._lock:
+            if len(self._samples) == self._samples.maxlen:
+                self._dropped_samples += 1
+            self._samples.append(sample)
+            wake = not self._wake_pending
+            self._wake_pending = True
+
+        if wake:
+            self._loop.call_soon_threadsafe(self._sample_queued.set)
+
+    async def next_samples(self) -> Tuple[List[PinEdgeSample], int]:
+        """Waits for detected edges and returns every queued edge along with the number of dropped edges."""
+
+        await self._sample_queued.wait()
+        with self._lock:
+            self._sample_queued.clear()
+            self._wake_pending = False
+            samples = list(self._samples)
+            self._samples.clear()
+            dropped_samples = self._dropped_samples
+            self._dropped_samples = 0
+
+        return samples, dropped_samples
+
+
+class PinEdgeFilter:
+    """
+    Coalesces bursts of edges of a single pin (i.e. switch bounce) following a
+    :class:`~endrpi.model.pin.PinEdgeFilterConfiguration` and passes the remaining edges to a callback.
+
+    .. note::
+        Leading and rate limited edges are timed with the pin factory's ticks and passed on the callback thread.
+        Trailing edges are passed from a timer thread once the pin has been stable for the window, carrying the
+        timestamp and ticks of the last edge of the burst.
+    """
+
+    def __init__(self,
+                 configuration: PinEdgeFilterConfiguration,
+                 emit: Callable[[PinEdgeSample], None],
+                 ticks_diff: Callable[[float, float], float]):
+        self.configuration = configuration
+        self.passed_edges = 0
+        self.filtered_edges = 0
+        self._emit = emit
+        self._ticks_diff = ticks_diff
+        self._window = configuration.window / 1_000_000
+        self._lock = threading.Lock()
+        self._last_state: Optional[float] = None
+        self._last_ticks: Optional[float] = None
+        self._tokens = 1.0
+        self._pending: Optional[PinEdgeSample] = None
+        self._pending_time = 0.0
+        self._timer: Optional[threading.Timer] = None
+
+    def notify(self, sample: PinEdgeSample) -> None:
+        """Filters a detected edge, safe to call from any thread."""
+
+        with self._lock:
+            policy = self.configuration.policy
+            if policy is PinEdgeFilterPolicy.TRAILING:
+                self._defer(sample)
+                return
+            passed = self._lead(sample) if policy is PinEdgeFilterPolicy.LEADING else self._limit(sample)
+            if passed:
+                self.passed_edges += 1
+            else:
+                self.filtered_edges += 1
+
+        if passed:
+            self._emit(sample)
+
+    def status(self) -> PinEdgeFilterStatus:
+        """Returns the :class:`~endrpi.model.pin.PinEdgeFilterStatus` of the filter."""
+        return PinEdgeFilterStatus(**self.configuration.dict(),
+                                   passedEdges=self.passed_edges,
+                                   filteredEdges=self.filtered_edges)
+
+    def close(self) -> None:
+        """Stops the timer of a pending trailing edge, the pending edge is dropped."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = None
+            self._pending = None
+
+    def _lead(self, sample: PinEdgeSample) -> bool:
+        if self._last_ticks is not None and self._ticks_diff(sample.ticks, self._last_ticks) < self._window:
+            return False
+        # Bursts that settle in the state that was last passed aren't an edge
+        if sample.state == self._last_state:
+            return False
+        self._last_ticks = sample.ticks
+        self._last_state = sample.state
+        return True
+
+    def _limit(self, sample: PinEdgeSample) -> bool:
+        # Token bucket holding at most one edge, refilled at the configured rate
+        if self._last_ticks is not None:
+            elapsed = self._ticks_diff(sample.ticks, self._last_ticks)
+            self._tokens = min(1.0, self._tokens + elapsed * self.configuration.rate)
+        self._last_ticks = sample.ticks
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _defer(self, sample: PinEdgeSample) -> None:
+        # Every edge is filtered until the burst settles, the settled edge is then counted as passed
+        self.filtered_edges += 1
+        self._pending = sample
+        self._pending_time = time.monotonic()
+        if self._timer is None:
+            self._start_timer(self._window)
+
+    def _start_timer(self, delay: float) -> None:
+        self._timer = threading.Timer(delay, self._settle)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _settle(self) -> None:
+        with self._lock:
+            if self._timer is None:
+                return
+            remaining = self._pending_time + self._window - time.monotonic()
+            if remaining > 0:
+                self._start_timer(remaining)
+                return
+
+            self._timer = None
+            sample = self._pending
+            self._pending = None
+            if sample is None or sample.state == self._last_state:
+                return
+            self._last_state = sample.state
+            self.filtered_edges -= 1
+            self.passed_edges += 1
+
+        self._emit(sample)
+
+
+class PinEdgeMonitor:
+    """
+    Shares the single gpiozero edge callback of each pin between every :class:`PinEdgeListener` of the pin.
+
+    The pin detects the union of the edges its listeners are interested in and the callback is removed once the pin
+    has no listeners.
+
+    .. note::
+        Listeners are replaced rather than mutated so the callback thread can dispatch without locking.
+
+    .. note::
+        Edges of pins with a :class:`PinEdgeFilter` go through the filter before reaching any listener, filtered pins
+        detect both edges so the filter knows the state of the pin.
+
+    .. note::
+        The edges and callback of a pin are changed under the write lock of the pin, which is always taken before the
+        monitor lock so callers may already hold it.
+    """
+
+    def __init__(self, pin_locks: Optional[PinLocks] = None):
+        self._pin_locks = pin_locks or PinLocks()
+        self._lock = threading.Lock()
+        self._listeners: Dict[RaspberryPiPinIds, Tuple[PinEdgeListener, ...]] = {}
+        self._filters: Dict[RaspberryPiPinIds, PinEdgeFilter] = {}
+        # gpiozero only keeps weak references to callbacks
+        self._callbacks: Dict[RaspberryPiPinIds, Callable] = {}
+
+    def add_listener(self, pin_id: RaspberryPiPinIds, listener: PinEdgeListener) -> None:
+        """
+        Adds a listener of a pin and starts detecting its edges.
+
+        :raises PinUnsupported: If the pin isn't supported by the pin factory.
+        :raises PinError: If the pin factory can't detect edges of the pin.
+        """
+
+        with self._pin_locks.write(pin_id), self._lock:
+            self._listeners[pin_id] = self._listeners.get(pin_id, ()) + (listener,)
+            try:
+                self._watch(pin_id)
+            except Exception:
+                self._listeners[pin_id] = tuple(item for item in self._listeners[pin_id] if item is not listener)
+                if not self._listeners[pin_id]:
+                    del self._listeners[pin_id]
+                raise
+
+    def remove_listener(self, pin_id: RaspberryPiPinIds, listener: PinEdgeListener) -> None:
+        """Removes a listener of a pin and stops detecting edges the remaining listeners aren't interested in."""
+
+        with self._pin_locks.write(pin_id), self._lock:
+            listeners = tuple(item for item in self._listeners.get(pin_id, ()) if item is not listener)
+            if listeners:
+                self._listeners[pin_id] = listeners
+            else:
+                self._listeners.pop(pin_id, None)
+            self._watch(pin_id)
+
+    def listener_count(self, pin_id: RaspberryPiPinIds) -> int:
+        """Returns the number of listeners of a pin."""
+        return len(self._listeners.get(pin_id, ()))
+
+    def set_filter(self, pin_id: RaspberryPiPinIds, configuration: Optional[PinEdgeFilterConfiguration]) -> None:
+        """
+        Sets the edge filter of a pin, or removes it when the configuration is none.
+
+        :raises PinUnsupported: If the pin isn't supported by the pin factory.
+        :raises PinError: If the pin factory can't detect edges of the pin.
+        """
+
+        with self._pin_locks.write(pin_id), self._lock:
+            previous_filter = self._filters.pop(pin_id, None)
+            if previous_filter:
+                previous_filter.close()
+            if configuration:
+                self._filters[pin_id] = PinEdgeFilter(configuration, partial(self._emit, pin_id), self._ticks_diff)
+            try:
+                self._watch(pin_id)
+            except Exception:
+                self._filters.pop(pin_id, None)
+                raise
+
+    def filter_status(self, pin_id: RaspberryPiPinIds) -> Optional[PinEdgeFilterStatus]:
+        """Returns the status of the edge filter of a pin or none if the pin isn't filtered."""
+        edge_filter = self._filters.get(pin_id)
+        return edge_filter.status() if edge_filter else None
+
+    def filter_statuses(self) -> Dict[RaspberryPiPinIds, PinEdgeFilterStatus]:
+        """Returns the status of the edge filter of every filtered pin."""
+        return {pin_id: edge_filter.status() for pin_id, edge_filter in list(self._filters.items())}
+
+    def _watch(self, pin_id: RaspberryPiPinIds) -> None:
+        listeners = self._listeners.get(pin_id)
+        if not listeners and pin_id not in self._callbacks:
+            return
+
+        gpiozero_pin = Device.pin_factory.pin(pin_id)
+        if not listeners:
+            gpiozero_pin.when_changed = None
+            del self._callbacks[pin_id]
+            return
+
+        edges = {listener.edge for listener in listeners}
+        pin_edge = edges.pop() if len(edges) == 1 and pin_id not in self._filters else PinEdge.BOTH
+        gpiozero_pin.edges = pin_edge.lower()
+
+        if pin_id not in self._callbacks:
+            callback = partial(self._dispatch, pin_id)
+            gpiozero_pin.when_changed = callback
+            self._callbacks[pin_id] = callback
+
+    def _dispatch(self, pin_id: RaspberryPiPinIds, ticks: float, state: float) -> None:
+        edge = PinEdge.RISING if state else PinEdge.FALLING
+        sample = PinEdgeSample(time.time(), edge, float(state), ticks)
+        edge_filter = self._filters.get(pin_id)
+        if edge_filter:
+            edge_filter.notify(sample)
+        else:
+            self._emit(pin_id, sample)
+
+    def _emit(self, pin_id: RaspberryPiPinIds, sample: PinEdgeSample) -> None:
+        for listener in self._listeners.get(pin_id, ()):
+            if listener.accepts(sample.edge):
+                listener.notify(sample)
+
+    @staticmethod
+    def _ticks_diff(later: float, earlier: float) -> float:
+        return Device.pin_factory.ticks_diff(later, earlier)
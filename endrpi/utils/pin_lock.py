@@ -0,0 +1,139 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from endrpi.model.pin import RaspberryPiPinIds
+
+
+class ReadWriteLock:
+    """
+    Lock held by any number of readers or by a single writer.
+
+    .. note::
+        Waiting writers are preferred over new readers so a stream of reads can't starve a write. Both sides are
+        reentrant and a writer may also read, nested acquisitions never wait on a waiting writer.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """Waits until no writer holds or waits for the lock and holds it as a reader."""
+
+        thread_id = threading.get_ident()
+        with self._condition:
+            if thread_id not in self._readers and self._writer != thread_id:
+                self._condition.wait_for(lambda: self._writer is None and not self._waiting_writers)
+            self._readers[thread_id] = self._readers.get(thread_id, 0) + 1
+
+    def release_read(self) -> None:
+        """Releases the lock held as a reader."""
+
+        thread_id = threading.get_ident()
+        with self._condition:
+            if self._readers[thread_id] == 1:
+                del self._readers[thread_id]
+                if not self._readers:
+                    self._condition.notify_all()
+            else:
+                self._readers[thread_id] -= 1
+
+    def acquire_write(self) -> None:
+        """
+        Waits until no other thread holds the lock and holds it as the writer.
+
+        :raises RuntimeError: If the calling thread holds the lock as a reader only, which could never be upgraded.
+        """
+
+        thread_id = threading.get_ident()
+        with self._condition:
+            if self._writer == thread_id:
+                self._writer_depth += 1
+                return
+            if thread_id in self._readers:
+                raise RuntimeError('A read lock cannot be upgraded to a write lock')
+
+            self._waiting_writers += 1
+            try:
+                self._condition.wait_for(lambda: self._writer is None and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writer = thread_id
+            self._writer_depth = 1
+
+    def release_write(self) -> None:
+        """Releases the lock held as the writer."""
+
+        with self._condition:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+
+class PinLocks:
+    """
+    :class:`ReadWriteLock` of every pin, serializing the operations on a pin while different pins proceed in
+    parallel.
+
+    .. note::
+        Operations on several pins acquire the locks in BCM number order so they can't deadlock each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: Dict[RaspberryPiPinIds, ReadWriteLock] = {}
+
+    @contextmanager
+    def read(self, *pin_ids: RaspberryPiPinIds) -> Iterator[None]:
+        """Holds the lock of every given pin as a reader, for operations that only read the pins."""
+
+        locks = self._ordered_locks(pin_ids)
+        acquired: List[ReadWriteLock] = []
+        try:
+            for lock in locks:
+                lock.acquire_read()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release_read()
+
+    @contextmanager
+    def write(self, *pin_ids: RaspberryPiPinIds) -> Iterator[None]:
+        """Holds the lock of every given pin as the writer, for operations that change the pins."""
+
+        locks = self._ordered_locks(pin_ids)
+        acquired: List[ReadWriteLock] = []
+        try:
+            for lock in locks:
+                lock.acquire_write()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release_write()
+
+    def _ordered_locks(self, pin_ids) -> List[ReadWriteLock]:
+        with self._lock:
+            return [self._locks.setdefault(pin_id, ReadWriteLock())
+                    for pin_id in sorted(set(pin_ids), key=lambda pin_id: pin_id.bcm_number)]
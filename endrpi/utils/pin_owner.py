@@ -0,0 +1,101 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from endrpi.model.pin import RaspberryPiPinIds
+
+
+class PinInUse(Exception):
+    """Raised when a pin is driven by an owner other than the one operating on it."""
+
+    def __init__(self, pin_id: RaspberryPiPinIds, owner: str):
+        super().__init__(f'Pin {pin_id} is in use by {owner}')
+        self.pin_id = pin_id
+        self.owner = owner
+
+
+class PinOwners:
+    """
+    Owners of the pins that are driven from a background thread (i.e. a sequence, the fan controller or a PID loop),
+    every other operation that changes an owned pin is refused with :class:`PinInUse`.
+
+    .. note::
+        Owners are described by a name (i.e. 'sequence `1`') and are released once they're no longer active, so an
+        owner that ends on its own doesn't need to release its pins.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owners: Dict[RaspberryPiPinIds, Tuple[str, Callable[[], bool]]] = {}
+
+    def claim(self,
+              owner: str,
+              pin_ids: Iterable[RaspberryPiPinIds],
+              active: Callable[[], bool] = lambda: True) -> None:
+        """
+        Claims every given pin for an owner that holds them while it is active, either every pin is claimed or none.
+
+        :raises PinInUse: If a pin is owned by another active owner.
+        """
+
+        pin_ids = list(pin_ids)
+        with self._lock:
+            for pin_id in pin_ids:
+                current_owner = self._active_owner(pin_id)
+                if current_owner is not None and current_owner != owner:
+                    raise PinInUse(pin_id, current_owner)
+            for pin_id in pin_ids:
+                self._owners[pin_id] = (owner, active)
+
+    def release(self, owner: str, pin_ids: Iterable[RaspberryPiPinIds]) -> None:
+        """Releases every given pin that is owned by an owner."""
+
+        with self._lock:
+            for pin_id in pin_ids:
+                if pin_id in self._owners and self._owners[pin_id][0] == owner:
+                    del self._owners[pin_id]
+
+    def owner(self, pin_id: RaspberryPiPinIds) -> Optional[str]:
+        """Returns the active owner of a given pin or none if the pin isn't owned."""
+        with self._lock:
+            return self._active_owner(pin_id)
+
+    def check(self, pin_id: RaspberryPiPinIds, owner: Optional[str] = None) -> None:
+        """
+        Checks that a given pin can be changed by an owner, or by a client when the owner is none.
+
+        :raises PinInUse: If the pin is owned by another active owner.
+        """
+
+        current_owner = self.owner(pin_id)
+        if current_owner is not None and current_owner != owner:
+            raise PinInUse(pin_id, current_owner)
+
+    def clear(self) -> None:
+        """Releases every pin."""
+        with self._lock:
+            self._owners.clear()
+
+    def _active_owner(self, pin_id: RaspberryPiPinIds) -> Optional[str]:
+        entry = self._owners.get(pin_id)
+        if entry is None:
+            return None
+        owner, active = entry
+        if not active():
+            del self._owners[pin_id]
+            return None
+        return owner
@@ -0,0 +1,110 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+import tempfile
+import threading
+from typing import Dict
+
+from pydantic import parse_obj_as
+
+from endrpi.model.pin import PinConfiguration, PinConfigurationMap, PinIo, RaspberryPiPinIds
+
+
+class PinSnapshot:
+    """
+    On-disk snapshot of the last applied :class:`~endrpi.model.pin.PinConfiguration` of every pin, used to restore
+    the pins after a restart.
+
+    .. note::
+        The snapshot is rewritten through a temporary file that replaces it, so a crash mid write leaves either the
+        previous or the next snapshot on disk. Updates that don't change any pin aren't written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._configurations: Dict[RaspberryPiPinIds, PinConfiguration] = {}
+        self._unwritten = False
+
+    def load(self) -> PinConfigurationMap:
+        """
+        Reads the snapshot and returns its pin configurations, a missing snapshot has no pin configurations.
+
+        :raises ValueError: If the snapshot isn't a valid pin configuration map.
+        :raises OSError: If the snapshot can't be read.
+        """
+
+        with self._lock:
+            try:
+                with open(self.path) as file:
+                    data = json.load(file)
+            except FileNotFoundError:
+                data = {}
+            # Note: Pydantic's ValidationError is a ValueError
+            self._configurations = parse_obj_as(PinConfigurationMap, data)
+            return dict(self._configurations)
+
+    def update(self, pin_configuration_map: PinConfigurationMap) -> bool:
+        """
+        Stores the applied configurations of the given pins and returns true if the snapshot was rewritten.
+
+        .. note::
+            Output pins only keep their state and input pins only keep their pull, which is all a restore needs.
+
+        :raises OSError: If the snapshot can't be written, the stored configurations are written by the next update.
+        """
+
+        with self._lock:
+            changed = self._unwritten
+            for pin_id, pin_configuration in pin_configuration_map.items():
+                if pin_configuration.io is PinIo.INPUT:
+                    snapshot_configuration = PinConfiguration(io=PinIo.INPUT, pull=pin_configuration.pull)
+                else:
+                    snapshot_configuration = PinConfiguration(io=PinIo.OUTPUT, state=pin_configuration.state)
+                if self._configurations.get(pin_id) != snapshot_configuration:
+                    self._configurations[pin_id] = snapshot_configuration
+                    changed = True
+
+            if changed:
+                self._unwritten = True
+                self._write()
+                self._unwritten = False
+            return changed
+
+    def _write(self) -> None:
+        data = {pin_id.value: pin_configuration.dict(exclude_none=True)
+                for pin_id, pin_configuration in self._configurations.items()}
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.pins-', suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w') as file:
+                json.dump(data, file, separators=(',', ':'))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self.path)
+        except Exception:
+            os.unlink(temporary_path)
+            raise
+
+        # The rename is only durable once the directory entry is flushed
+        directory_descriptor = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
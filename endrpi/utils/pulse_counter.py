@@ -0,0 +1,199 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from endrpi.model.pin import PinEdge, PulseCounterStatus, PulseStatistics, RaspberryPiPinIds
+from endrpi.utils.pin_edge import PinEdgeMonitor, PinEdgeSample
+
+MICROSECONDS_PER_SECOND = 1_000_000
+
+# Seconds between two pin factory ticks (later, earlier)
+TicksDiff = Callable[[float, float], float]
+
+# Current pin factory ticks
+Ticks = Callable[[], float]
+
+
+class PulseStatistic:
+    """Running number, sum, minimum, and maximum of measured durations (seconds)."""
+
+    __slots__ = ('count', 'total', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets every measured duration."""
+        self.count = 0
+        self.total = 0.0
+        self.minimum = 0.0
+        self.maximum = 0.0
+
+    def add(self, duration: float) -> None:
+        """Adds a measured duration."""
+
+        if not self.count or duration < self.minimum:
+            self.minimum = duration
+        if not self.count or duration > self.maximum:
+            self.maximum = duration
+        self.count += 1
+        self.total += duration
+
+    def statistics(self) -> PulseStatistics:
+        """Returns the :class:`~endrpi.model.pin.PulseStatistics` (µs) of the measured durations."""
+
+        if not self.count:
+            return PulseStatistics()
+        return PulseStatistics(count=self.count,
+                               min=self.minimum * MICROSECONDS_PER_SECOND,
+                               mean=self.total / self.count * MICROSECONDS_PER_SECOND,
+                               max=self.maximum * MICROSECONDS_PER_SECOND)
+
+
+class PulseCounter:
+    """
+    Edge listener that counts the pulses of a single pin and measures their periods and high and low widths.
+
+    .. note::
+        Edges are timed with the pin factory's ticks rather than when they are dispatched. Widths are only measured
+        between alternating edges, so a missed edge skips a width instead of measuring a wrong one. The frequency
+        drops to none once no edge was counted for longer than the timeout, or the last period without a timeout.
+    """
+
+    # Both edges are listened to so the high and low widths are measured whatever edge is counted
+    edge = PinEdge.BOTH
+
+    def __init__(self, count_edge: PinEdge, ticks_diff: TicksDiff, ticks: Ticks, timeout: Optional[float] = None):
+        self.count_edge = count_edge
+        self.timeout = timeout
+        self._ticks_diff = ticks_diff
+        self._ticks = ticks
+        self._lock = threading.Lock()
+        self._count = 0
+        self._since = time.time()
+        self._period = PulseStatistic()
+        self._high_width = PulseStatistic()
+        self._low_width = PulseStatistic()
+        self._last_period: Optional[float] = None
+        self._last_edge: Optional[PinEdge] = None
+        self._last_edge_ticks: Optional[float] = None
+        self._last_count_ticks: Optional[float] = None
+
+    def accepts(self, edge: PinEdge) -> bool:
+        """Returns true for every edge."""
+        return True
+
+    def notify(self, sample: PinEdgeSample) -> None:
+        """Counts and times a detected edge, called from gpiozero's callback thread."""
+
+        with self._lock:
+            if self._last_edge is not None and self._last_edge is not sample.edge:
+                width = self._ticks_diff(sample.ticks, self._last_edge_ticks)
+                (self._high_width if sample.edge is PinEdge.FALLING else self._low_width).add(width)
+            self._last_edge = sample.edge
+            self._last_edge_ticks = sample.ticks
+
+            if self.count_edge is PinEdge.BOTH or self.count_edge is sample.edge:
+                self._count += 1
+                if self._last_count_ticks is not None:
+                    self._last_period = self._ticks_diff(sample.ticks, self._last_count_ticks)
+                    self._period.add(self._last_period)
+                self._last_count_ticks = sample.ticks
+
+    def status(self, reset: bool = False) -> PulseCounterStatus:
+        """
+        Returns the :class:`~endrpi.model.pin.PulseCounterStatus` of the counter, the count and statistics are reset
+        in the same step when requested so no edge is lost between the read and the reset.
+        """
+
+        with self._lock:
+            frequency = None
+            if self._last_period:
+                elapsed = self._ticks_diff(self._ticks(), self._last_count_ticks)
+                if elapsed <= (self.timeout if self.timeout is not None else self._last_period):
+                    frequency = 1 / self._last_period
+            mean_frequency = self._period.count / self._period.total if self._period.total else None
+            last_period = self._last_period * MICROSECONDS_PER_SECOND if self._last_period is not None else None
+            status = PulseCounterStatus(edge=self.count_edge,
+                                        timeout=self.timeout,
+                                        count=self._count,
+                                        frequency=frequency,
+                                        meanFrequency=mean_frequency,
+                                        lastPeriod=last_period,
+                                        period=self._period.statistics(),
+                                        highWidth=self._high_width.statistics(),
+                                        lowWidth=self._low_width.statistics(),
+                                        since=self._since)
+            if reset:
+                # The last edges are kept so the pulse in progress is still measured
+                self._count = 0
+                self._since = time.time()
+                self._period.reset()
+                self._high_width.reset()
+                self._low_width.reset()
+            return status
+
+
+class PulseCounters:
+    """Pulse counters of every pin, attached to the pins through the shared :class:`PinEdgeMonitor`."""
+
+    def __init__(self, pin_edge_monitor: PinEdgeMonitor, ticks_diff: TicksDiff, ticks: Ticks):
+        self.lock = threading.RLock()
+        self._pin_edge_monitor = pin_edge_monitor
+        self._ticks_diff = ticks_diff
+        self._ticks = ticks
+        self._counters: Dict[RaspberryPiPinIds, PulseCounter] = {}
+
+    def start(self, pin_id: RaspberryPiPinIds, count_edge: PinEdge,
+              timeout: Optional[float] = None) -> PulseCounterStatus:
+        """
+        Starts counting the pulses of a given pin and returns its status, a running counter is replaced.
+
+        :raises PinUnsupported: If the pin isn't supported by the pin factory.
+        :raises PinError: If the pin factory can't detect edges of the pin.
+        """
+
+        with self.lock:
+            counter = PulseCounter(count_edge, self._ticks_diff, self._ticks, timeout)
+            self._pin_edge_monitor.add_listener(pin_id, counter)
+            previous_counter = self._counters.get(pin_id)
+            if previous_counter:
+                self._pin_edge_monitor.remove_listener(pin_id, previous_counter)
+            self._counters[pin_id] = counter
+            return counter.status()
+
+    def status(self, pin_id: RaspberryPiPinIds, reset: bool = False) -> Optional[PulseCounterStatus]:
+        """Returns the status of the counter of a given pin (optionally resetting it) or none if it isn't running."""
+        counter = self._counters.get(pin_id)
+        return counter.status(reset) if counter else None
+
+    def statuses(self, reset: bool = False) -> Dict[RaspberryPiPinIds, PulseCounterStatus]:
+        """Returns the status of every running counter, optionally resetting every counter."""
+        with self.lock:
+            return {pin_id: counter.status(reset) for pin_id, counter in self._counters.items()}
+
+    def stop(self, pin_id: RaspberryPiPinIds) -> PulseCounterStatus:
+        """
+        Stops counting the pulses of a given pin and returns its final status.
+
+        :raises KeyError: If the pin has no running counter.
+        """
+
+        with self.lock:
+            counter = self._counters.pop(pin_id)
+            self._pin_edge_monitor.remove_listener(pin_id, counter)
+            return counter.status()
@@ -0,0 +1,329 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Union
+
+from gpiozero import Pin, PinPWMUnsupported
+
+from endrpi.model.pin import PwmMode, PwmStatus, RaspberryPiPinIds
+from endrpi.utils.gpio_registers import GpioRegisters, GPIO_FUNCTION_ALT0, GPIO_FUNCTION_ALT5, GPIO_FUNCTION_INPUT, \
+    GPIO_FUNCTION_OUTPUT
+
+# Sysfs PWM chip of the Raspberry Pi PWM peripheral (enabled with the 'pwm' or 'pwm-2chan' device tree overlay)
+PWM_CHIP_PATH = '/sys/class/pwm/pwmchip0'
+
+# Hardware PWM channel of each pin that can be routed to the PWM peripheral
+# Note: Pins sharing a channel always output the same signal, so only one of them is driven at a time
+HARDWARE_PWM_CHANNELS = {
+    RaspberryPiPinIds.GPIO12: 0,
+    RaspberryPiPinIds.GPIO18: 0,
+    RaspberryPiPinIds.GPIO13: 1,
+    RaspberryPiPinIds.GPIO19: 1
+}
+
+# Alternate function that routes each hardware PWM pin to its channel
+HARDWARE_PWM_FUNCTIONS = {
+    RaspberryPiPinIds.GPIO12: GPIO_FUNCTION_ALT0,
+    RaspberryPiPinIds.GPIO18: GPIO_FUNCTION_ALT5,
+    RaspberryPiPinIds.GPIO13: GPIO_FUNCTION_ALT0,
+    RaspberryPiPinIds.GPIO19: GPIO_FUNCTION_ALT5
+}
+
+# Highest frequency (Hz) of software PWM toggled by a thread, higher frequencies need hardware PWM
+SOFTWARE_PWM_MAX_FREQUENCY = 1000.0
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+
+
+class PwmChannelInUse(Exception):
+    """Raised when the hardware PWM channel of a pin is already driving another pin."""
+
+
+class HardwarePwmChannel:
+    """
+    Channel of the sysfs PWM chip, the channel is exported when it isn't already.
+
+    .. note::
+        The duty cycle file is kept open so a duty cycle change is a single write.
+
+    :raises OSError: If the channel can't be exported.
+    """
+
+    mode = PwmMode.HARDWARE
+
+    def __init__(self, chip_path: str, channel: int):
+        self.path = os.path.join(chip_path, f'pwm{channel}')
+        if not os.path.isdir(self.path):
+            self._write(os.path.join(chip_path, 'export'), channel)
+            if not os.path.isdir(self.path):
+                raise OSError(f'PWM channel {channel} of `{chip_path}` was not exported')
+
+        self._period = 0
+        self._duty_cycle_file = os.open(os.path.join(self.path, 'duty_cycle'), os.O_WRONLY)
+
+    def configure(self, frequency: float, duty_cycle: float) -> None:
+        """Sets the frequency (Hz) and duty cycle (0 to 1) and enables the channel."""
+
+        # The duty cycle can't exceed the period, so it is cleared before the period changes
+        os.pwrite(self._duty_cycle_file, b'0\n', 0)
+        self._period = round(NANOSECONDS_PER_SECOND / frequency)
+        self._write(os.path.join(self.path, 'period'), self._period)
+        self.write_duty_cycle(duty_cycle)
+        self._write(os.path.join(self.path, 'enable'), 1)
+
+    def write_duty_cycle(self, duty_cycle: float) -> None:
+        """Sets the duty cycle (0 to 1) without changing the frequency."""
+        os.pwrite(self._duty_cycle_file, b'%d\n' % round(self._period * duty_cycle), 0)
+
+    def close(self) -> None:
+        """Disables the channel."""
+        self._write(os.path.join(self.path, 'enable'), 0)
+        os.close(self._duty_cycle_file)
+
+    @staticmethod
+    def _write(path: str, value: int) -> None:
+        with open(path, 'w') as file:
+            file.write(f'{value}\n')
+
+
+class GpiozeroPwm:
+    """Software PWM of a gpiozero pin whose pin factory supports PWM (i.e. pigpio)."""
+
+    mode = PwmMode.SOFTWARE
+
+    def __init__(self, pin: Pin):
+        self._pin = pin
+
+    def configure(self, frequency: float, duty_cycle: float) -> None:
+        """
+        Sets the frequency (Hz) and duty cycle (0 to 1).
+
+        :raises PinPWMUnsupported: If the pin factory doesn't support PWM.
+        """
+        self._pin.function = 'output'
+        self._pin.frequency = frequency
+        self._pin.state = duty_cycle
+
+    def write_duty_cycle(self, duty_cycle: float) -> None:
+        """Sets the duty cycle (0 to 1) without changing the frequency."""
+        self._pin.state = duty_cycle
+
+    def close(self) -> None:
+        """Stops PWM and drives the pin low."""
+        self._pin.frequency = None
+
+
+class ThreadPwm:
+    """
+    Software PWM of a gpiozero pin toggled by a daemon thread, used when the pin factory doesn't support PWM (i.e. the
+    native pin factory).
+
+    .. note::
+        Edges are scheduled from the start of the signal rather than from the previous edge so timing errors don't
+        accumulate, a thread that falls more than a period behind skips ahead instead of bursting.
+    """
+
+    mode = PwmMode.SOFTWARE
+
+    def __init__(self, pin: Pin):
+        self._pin = pin
+        self._frequency = 1.0
+        self._duty_cycle = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, frequency: float, duty_cycle: float) -> None:
+        """
+        Sets the frequency (Hz) and duty cycle (0 to 1) and starts the thread.
+
+        :raises ValueError: If the frequency exceeds :data:`SOFTWARE_PWM_MAX_FREQUENCY`.
+        """
+
+        if frequency > SOFTWARE_PWM_MAX_FREQUENCY:
+            raise ValueError(f'Software PWM frequency exceeds {SOFTWARE_PWM_MAX_FREQUENCY}Hz')
+
+        self._frequency = frequency
+        self._duty_cycle = duty_cycle
+        if self._thread is None:
+            self._pin.function = 'output'
+            self._thread = threading.Thread(target=self._run, name=f'pwm-{self._pin}', daemon=True)
+            self._thread.start()
+
+    def write_duty_cycle(self, duty_cycle: float) -> None:
+        """Sets the duty cycle (0 to 1) from the next period on."""
+        self._duty_cycle = duty_cycle
+
+    def close(self) -> None:
+        """Stops the thread and drives the pin low."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._pin.state = 0
+
+    def _run(self) -> None:
+        period_start = time.monotonic()
+        while not self._stopped.is_set():
+            period = 1 / self._frequency
+            high_time = period * self._duty_cycle
+
+            if high_time > 0:
+                self._pin.state = 1
+                self._stopped.wait(max(0.0, period_start + high_time - time.monotonic()))
+            if high_time < period:
+                self._pin.state = 0
+
+            period_start += period
+            now = time.monotonic()
+            if now - period_start > period:
+                period_start = now
+            self._stopped.wait(max(0.0, period_start - now))
+
+
+PwmSignal = Union[HardwarePwmChannel, GpiozeroPwm, ThreadPwm]
+
+
+class PwmOutputs:
+    """
+    Running PWM signals of every pin, generated by the PWM peripheral on :data:`HARDWARE_PWM_CHANNELS` when the sysfs
+    PWM chip is available and in software everywhere else.
+
+    .. note::
+        Hardware PWM pins are routed to their channel through the function select registers, which are only mapped
+        alongside the native pin factory, so without them every pin uses software PWM. Once stopped, hardware PWM pins
+        are left as low outputs like software PWM pins.
+
+    .. note::
+        Methods raise the errors of the underlying signal (i.e. :class:`OSError` for hardware channels), an error
+        while starting a signal leaves the pin without PWM.
+    """
+
+    def __init__(self,
+                 pin: Callable[[RaspberryPiPinIds], Pin],
+                 chip_path: str = PWM_CHIP_PATH,
+                 gpio_registers: Callable[[], Optional[GpioRegisters]] = lambda: None):
+        self.chip_path = chip_path
+        self.lock = threading.RLock()
+        self._pin = pin
+        self._gpio_registers = gpio_registers
+        self._signals: Dict[RaspberryPiPinIds, PwmSignal] = {}
+        self._statuses: Dict[RaspberryPiPinIds, PwmStatus] = {}
+        # Registers that routed each hardware PWM pin to its channel
+        self._routed_pins: Dict[RaspberryPiPinIds, GpioRegisters] = {}
+
+    def status(self, pin_id: RaspberryPiPinIds) -> Optional[PwmStatus]:
+        """Returns the PWM status of a given pin or none if PWM isn't running on the pin."""
+        return self._statuses.get(pin_id)
+
+    def statuses(self) -> Dict[RaspberryPiPinIds, PwmStatus]:
+        """Returns the PWM status of every pin with PWM running."""
+        return dict(self._statuses)
+
+    def start(self, pin_id: RaspberryPiPinIds, frequency: float, duty_cycle: float) -> PwmStatus:
+        """
+        Starts (or reconfigures) PWM on a given pin and returns its status.
+
+        :raises PwmChannelInUse: If the hardware PWM channel of the pin is driving another pin.
+        :raises PinUnsupported: If the pin isn't supported by the pin factory.
+        """
+
+        with self.lock:
+            signal = self._signals.get(pin_id)
+            if signal is None:
+                self._signals[pin_id] = self._start_signal(pin_id, frequency, duty_cycle)
+            else:
+                signal.configure(frequency, duty_cycle)
+
+            status = PwmStatus(frequency=frequency, dutyCycle=duty_cycle, mode=self._signals[pin_id].mode)
+            self._statuses[pin_id] = status
+            return status
+
+    def write_duty_cycle(self, pin_id: RaspberryPiPinIds, duty_cycle: float) -> None:
+        """
+        Sets the duty cycle of a pin with PWM running.
+
+        :raises KeyError: If PWM isn't running on the pin.
+        """
+
+        with self.lock:
+            self._signals[pin_id].write_duty_cycle(duty_cycle)
+            self._statuses[pin_id] = self._statuses[pin_id].copy(update={'dutyCycle': duty_cycle})
+
+    def stop(self, pin_id: RaspberryPiPinIds) -> None:
+        """
+        Stops PWM on a given pin.
+
+        :raises KeyError: If PWM isn't running on the pin.
+        """
+
+        with self.lock:
+            signal = self._signals.pop(pin_id)
+            del self._statuses[pin_id]
+            signal.close()
+
+            gpio_registers = self._routed_pins.pop(pin_id, None)
+            if gpio_registers:
+                gpio_registers.write_levels(0, 1 << pin_id.bcm_number)
+                gpio_registers.write_function(pin_id.bcm_number, GPIO_FUNCTION_OUTPUT)
+
+    def stop_all(self) -> None:
+        """Stops PWM on every pin (i.e. when the pin factory is replaced)."""
+        with self.lock:
+            for pin_id in list(self._signals):
+                self.stop(pin_id)
+
+    def _start_signal(self, pin_id: RaspberryPiPinIds, frequency: float, duty_cycle: float) -> PwmSignal:
+        channel = HARDWARE_PWM_CHANNELS.get(pin_id)
+        gpio_registers = self._gpio_registers() if channel is not None else None
+        if gpio_registers and os.path.isdir(self.chip_path):
+            for running_pin_id in self._signals:
+                if HARDWARE_PWM_CHANNELS.get(running_pin_id) == channel:
+                    raise PwmChannelInUse(f'PWM channel {channel} is driving {running_pin_id}')
+            signal = HardwarePwmChannel(self.chip_path, channel)
+            try:
+                signal.configure(frequency, duty_cycle)
+                self._route_pin(gpio_registers, pin_id, channel)
+            except Exception:
+                signal.close()
+                raise
+            return signal
+
+        pin = self._pin(pin_id)
+        signal = GpiozeroPwm(pin)
+        try:
+            signal.configure(frequency, duty_cycle)
+            return signal
+        except PinPWMUnsupported:
+            signal = ThreadPwm(pin)
+
+        try:
+            signal.configure(frequency, duty_cycle)
+        except Exception:
+            signal.close()
+            raise
+        return signal
+
+    def _route_pin(self, gpio_registers: GpioRegisters, pin_id: RaspberryPiPinIds, channel: int) -> None:
+        # The other pin of the channel (i.e. routed by a device tree overlay) would output the same signal
+        gpio_bank = gpio_registers.read_bank()
+        for other_pin_id, other_channel in HARDWARE_PWM_CHANNELS.items():
+            other_number = other_pin_id.bcm_number
+            if other_channel == channel and other_pin_id != pin_id and \
+                    gpio_bank.function(other_number) == HARDWARE_PWM_FUNCTIONS[other_pin_id]:
+                gpio_registers.write_function(other_number, GPIO_FUNCTION_INPUT)
+
+        gpio_registers.write_function(pin_id.bcm_number, HARDWARE_PWM_FUNCTIONS[pin_id])
+        self._routed_pins[pin_id] = gpio_registers
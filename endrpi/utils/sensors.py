@@ -0,0 +1,179 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import re
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from endrpi.model.measurement import Measurement, SensorUnit
+from endrpi.model.sensors import Sensor, SensorKind, Sensors
+
+# Sysfs directories of the hardware monitoring devices and thermal zones, relative to the root
+HWMON_PATH = os.path.join('sys', 'class', 'hwmon')
+THERMAL_PATH = os.path.join('sys', 'class', 'thermal')
+
+# Kind, unit and scale (sysfs units per unit) of each hwmon input prefix
+# See: https://www.kernel.org/doc/Documentation/hwmon/sysfs-interface.rst
+HWMON_INPUTS: Dict[str, Tuple[SensorKind, SensorUnit, float]] = {
+    'temp': (SensorKind.TEMPERATURE, SensorUnit.CELSIUS, 1000),
+    'in': (SensorKind.VOLTAGE, SensorUnit.VOLT, 1000),
+    'curr': (SensorKind.CURRENT, SensorUnit.AMPERE, 1000),
+    'power': (SensorKind.POWER, SensorUnit.WATT, 1_000_000),
+    'fan': (SensorKind.FAN, SensorUnit.REVOLUTIONS_PER_MINUTE, 1)
+}
+
+HWMON_INPUT_PATTERN = re.compile(r'^(temp|in|curr|power|fan)(\d+)_input$')
+
+
+class SensorInput(NamedTuple):
+    """Sysfs file of a discovered sensor input holding an integer of scale units per unit."""
+    id: str
+    name: str
+    label: Optional[str]
+    kind: SensorKind
+    unit: SensorUnit
+    scale: float
+    path: str
+
+
+def read_sysfs_text(path: str) -> Optional[str]:
+    """Returns the stripped text of a sysfs file or none if it can't be read."""
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+def discover_sensor_inputs(root: str = '/') -> List[SensorInput]:
+    """
+    Returns every hwmon input and thermal zone under a given root, hwmon inputs are ordered by device and input
+    number followed by the thermal zones.
+    """
+
+    sensor_inputs = []
+
+    hwmon_path = os.path.join(root, HWMON_PATH)
+    for device in __numbered_entries(hwmon_path, 'hwmon'):
+        device_path = os.path.join(hwmon_path, device)
+        name = read_sysfs_text(os.path.join(device_path, 'name')) or device
+        inputs = []
+        for file_name in __entries(device_path):
+            input_match = HWMON_INPUT_PATTERN.match(file_name)
+            if input_match:
+                inputs.append((input_match.group(1), int(input_match.group(2))))
+
+        for prefix, number in sorted(inputs):
+            kind, unit, scale = HWMON_INPUTS[prefix]
+            label = read_sysfs_text(os.path.join(device_path, f'{prefix}{number}_label'))
+            sensor_inputs.append(SensorInput(id=f'{device}.{prefix}{number}', name=name, label=label, kind=kind,
+                                             unit=unit, scale=scale,
+                                             path=os.path.join(device_path, f'{prefix}{number}_input')))
+
+    thermal_path = os.path.join(root, THERMAL_PATH)
+    for zone in __numbered_entries(thermal_path, 'thermal_zone'):
+        zone_path = os.path.join(thermal_path, zone)
+        if os.path.exists(os.path.join(zone_path, 'temp')):
+            name = read_sysfs_text(os.path.join(zone_path, 'type')) or zone
+            sensor_inputs.append(SensorInput(id=zone, name=name, label=None, kind=SensorKind.TEMPERATURE,
+                                             unit=SensorUnit.CELSIUS, scale=1000,
+                                             path=os.path.join(zone_path, 'temp')))
+
+    return sensor_inputs
+
+
+def __entries(path: str) -> List[str]:
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def __numbered_entries(path: str, prefix: str) -> List[str]:
+    # Numbered entries are ordered by number so 'hwmon10' follows 'hwmon9'
+    entries = [entry for entry in __entries(path) if re.match(f'^{prefix}\\d+$', entry)]
+    return sorted(entries, key=lambda entry: int(entry[len(prefix):]))
+
+
+class SensorReader:
+    """
+    Reads every discovered :class:`SensorInput` in a single batch.
+
+    .. note::
+        The sysfs file of every input is opened once and kept open, so a batch is a single pread per input without
+        any path lookups. Inputs that can't be opened are reported with the error of every read.
+    """
+
+    def __init__(self, sensor_inputs: List[SensorInput]):
+        self.sensor_inputs = sensor_inputs
+        self._sensor_inputs = {sensor_input.id: sensor_input for sensor_input in sensor_inputs}
+        self._lock = threading.Lock()
+        self._files: Dict[str, int] = {}
+        self._open_errors: Dict[str, str] = {}
+        for sensor_input in sensor_inputs:
+            try:
+                self._files[sensor_input.id] = os.open(sensor_input.path, os.O_RDONLY)
+            except OSError as error:
+                self._open_errors[sensor_input.id] = error.strerror or str(error)
+
+    def read(self, kind: Optional[SensorKind] = None) -> Sensors:
+        """Returns the :class:`~endrpi.model.sensors.Sensors` of every input, or of every input of a given kind."""
+
+        sensors = []
+        with self._lock:
+            timestamp = time.time()
+            for sensor_input in self.sensor_inputs:
+                if kind is None or sensor_input.kind is kind:
+                    sensors.append(self._read_input(sensor_input))
+
+        return Sensors(timestamp=timestamp, sensors=sensors)
+
+    def read_sensor(self, sensor_id: str) -> Sensor:
+        """
+        Returns the :class:`~endrpi.model.sensors.Sensor` of a single input.
+
+        :raises KeyError: If the input wasn't discovered.
+        """
+
+        sensor_input = self._sensor_inputs[sensor_id]
+        with self._lock:
+            return self._read_input(sensor_input)
+
+    def close(self) -> None:
+        """Closes the file of every input."""
+        with self._lock:
+            for file in self._files.values():
+                os.close(file)
+            self._files = {}
+
+    def _read_input(self, sensor_input: SensorInput) -> Sensor:
+        value = None
+        error = self._open_errors.get(sensor_input.id)
+        file = self._files.get(sensor_input.id)
+        if file is not None:
+            try:
+                # Note: Sysfs attributes are regenerated by every read at offset 0
+                raw_value = int(os.pread(file, 32, 0))
+                value = Measurement(quantity=raw_value / sensor_input.scale, unitOfMeasurement=sensor_input.unit)
+            except OSError as read_error:
+                # i.e. ENODATA from a fan that isn't connected
+                error = read_error.strerror or str(read_error)
+            except ValueError:
+                error = f'Invalid value of `{sensor_input.path}`'
+
+        return Sensor(id=sensor_input.id, name=sensor_input.name, label=sensor_input.label, kind=sensor_input.kind,
+                      value=value, error=error)
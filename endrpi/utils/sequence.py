@@ -0,0 +1,187 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import math
+import os
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.model.sequence import SequenceState, SequenceStatus, SequenceTiming
+
+# Nanoseconds before a write that the playback thread stops sleeping and busy waits, covering the wake up latency
+SEQUENCE_SPIN_NANOSECONDS = 200_000
+
+# Realtime priority requested for playback threads, the policy is only applied when the process may use it
+SEQUENCE_THREAD_PRIORITY = 50
+
+# Seconds the playback thread sleeps between loops, so a realtime thread always yields the CPU (and the GIL) once per
+# loop instead of busy waiting from one loop into the next
+SEQUENCE_LOOP_YIELD_SECONDS = 0.000_05
+
+NANOSECONDS_PER_MICROSECOND = 1_000
+
+
+def wait_until(target: int, cancelled: threading.Event) -> bool:
+    """
+    Waits until a given :func:`time.monotonic_ns` deadline, sleeping until shortly before the deadline and busy
+    waiting the rest. Returns true when the event is set before the deadline.
+    """
+
+    remaining = target - time.monotonic_ns()
+    if remaining > SEQUENCE_SPIN_NANOSECONDS:
+        if cancelled.wait((remaining - SEQUENCE_SPIN_NANOSECONDS) / 1_000_000_000):
+            return True
+    while time.monotonic_ns() < target:
+        pass
+    return cancelled.is_set()
+
+
+def request_realtime_priority() -> bool:
+    """
+    Requests the SCHED_FIFO scheduling policy for the calling thread, returns false when the process may not use it.
+
+    .. note::
+        On Linux the scheduling policy of pid 0 applies to the calling thread only.
+    """
+
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(SEQUENCE_THREAD_PRIORITY))
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+class SequenceWrite(NamedTuple):
+    """Write of a sequence at a given offset (ns) from the start of its loop."""
+    offset: int
+    write: Callable[[], None]
+
+
+class SequencePlayer:
+    """
+    Plays sequence writes on a dedicated thread and records their actual timing.
+
+    .. note::
+        Writes are scheduled on absolute monotonic deadlines from the start of the playback rather than from the
+        previous write, so timing errors don't accumulate. The thread sleeps until shortly before each deadline and
+        busy waits the rest, late writes are written immediately instead of being skipped. The thread also sleeps
+        between loops, which may delay the first write of a loop by up to :data:`SEQUENCE_LOOP_YIELD_SECONDS`.
+    """
+
+    def __init__(self,
+                 sequence_id: int,
+                 pin_ids: List[RaspberryPiPinIds],
+                 writes: List[SequenceWrite],
+                 loop_duration: int,
+                 loops: int):
+        self.sequence_id = sequence_id
+        self.pin_ids = pin_ids
+        self.state = SequenceState.RUNNING
+        self.realtime = False
+        self.completed_loops = 0
+        self.error: Optional[str] = None
+        self._writes = writes
+        self._loop_duration = loop_duration
+        self._loops = loops
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'sequence-{sequence_id}', daemon=True)
+
+        # Latency statistics (ns) of every write
+        self._write_count = 0
+        self._latency_sum = 0
+        self._latency_square_sum = 0
+        self._latency_min: Optional[int] = None
+        self._latency_max: Optional[int] = None
+        self._first_target: Optional[int] = None
+        self._first_write: Optional[int] = None
+        self._last_target: Optional[int] = None
+        self._last_write: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        """Returns true while the sequence is playing."""
+        return self.state is SequenceState.RUNNING
+
+    def start(self) -> None:
+        """Starts the playback thread."""
+        self._thread.start()
+
+    def cancel(self, timeout: Optional[float] = None) -> None:
+        """Cancels the playback and waits for the thread to stop, pins keep their last written state."""
+        self._cancelled.set()
+        self._thread.join(timeout)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Waits for the playback to finish."""
+        self._thread.join(timeout)
+
+    def status(self) -> SequenceStatus:
+        """Returns the current :class:`~endrpi.model.sequence.SequenceStatus` of the playback."""
+
+        timing = SequenceTiming(writes=self._write_count)
+        if self._write_count:
+            mean = self._latency_sum / self._write_count
+            variance = max(0.0, self._latency_square_sum / self._write_count - mean ** 2)
+            timing.minLatency = self._latency_min / NANOSECONDS_PER_MICROSECOND
+            timing.meanLatency = mean / NANOSECONDS_PER_MICROSECOND
+            timing.maxLatency = self._latency_max / NANOSECONDS_PER_MICROSECOND
+            timing.jitter = math.sqrt(variance) / NANOSECONDS_PER_MICROSECOND
+            timing.requestedDuration = (self._last_target - self._first_target) / NANOSECONDS_PER_MICROSECOND
+            timing.actualDuration = (self._last_write - self._first_write) / NANOSECONDS_PER_MICROSECOND
+
+        return SequenceStatus(id=self.sequence_id,
+                              state=self.state,
+                              pins=self.pin_ids,
+                              loops=self._loops,
+                              completedLoops=self.completed_loops,
+                              realtime=self.realtime,
+                              timing=timing,
+                              error=self.error)
+
+    def _run(self) -> None:
+        self.realtime = request_realtime_priority()
+        start = time.monotonic_ns()
+        try:
+            while not self._loops or self.completed_loops < self._loops:
+                loop_start = start + self.completed_loops * self._loop_duration
+                for sequence_write in self._writes:
+                    target = loop_start + sequence_write.offset
+                    if wait_until(target, self._cancelled):
+                        self.state = SequenceState.CANCELLED
+                        return
+                    sequence_write.write()
+                    self._record_write(target, time.monotonic_ns())
+                self.completed_loops += 1
+                if self._loops != self.completed_loops and self._cancelled.wait(SEQUENCE_LOOP_YIELD_SECONDS):
+                    self.state = SequenceState.CANCELLED
+                    return
+            self.state = SequenceState.COMPLETED
+        except Exception as exception:
+            self.error = str(exception)
+            self.state = SequenceState.FAILED
+
+    def _record_write(self, target: int, written: int) -> None:
+        latency = written - target
+        self._write_count += 1
+        self._latency_sum += latency
+        self._latency_square_sum += latency * latency
+        self._latency_min = latency if self._latency_min is None else min(self._latency_min, latency)
+        self._latency_max = latency if self._latency_max is None else max(self._latency_max, latency)
+        if self._first_target is None:
+            self._first_target = target
+            self._first_write = written
+        self._last_target = target
+        self._last_write = written
@@ -0,0 +1,195 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import itertools
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Optional, Union
+
+from fastapi import status
+from starlette.websockets import WebSocket
+
+from endrpi.config.websocket import WebSocketSettings
+from endrpi.model.websocket import WebSocketOverflowPolicy, WebSocketConnectionStatus, WebSocketFrameFormat
+from endrpi.utils.broadcast import BroadcastHub
+
+# Sequential ids used to tell connections apart in connection statuses
+connection_ids = itertools.count(1)
+
+# Client host of connections whose client address is unknown
+UNKNOWN_CLIENT_HOST = 'unknown'
+
+
+class WebSocketConnection:
+    """
+    State of a single websocket connection that is shared with connection-aware websocket action handlers.
+
+    Every frame sent to the connection goes through a bounded outbound queue that is drained by a writer task, so a
+    client that stops reading can't grow server memory. When the queue is full the :class:`WebSocketOverflowPolicy`
+    decides which frame is lost.
+
+    .. note::
+        Connections are the subscribers of the :class:`~endrpi.utils.broadcast.BroadcastHub`.
+    """
+
+    def __init__(self,
+                 websocket: WebSocket,
+                 broadcast_hub: BroadcastHub,
+                 queue_size: int,
+                 overflow_policy: WebSocketOverflowPolicy,
+                 frame_format: WebSocketFrameFormat = WebSocketFrameFormat.JSON):
+        self.id = next(connection_ids)
+        self.websocket = websocket
+        self.broadcast_hub = broadcast_hub
+        self.frame_format = frame_format
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.sent_frames = 0
+        self.dropped_frames = 0
+        self.closed = False
+
+        # Queued frames keyed by their coalesce key, frames without a key are given a unique key
+        self._queue: OrderedDict = OrderedDict()
+        self._unique_keys = itertools.count()
+        self._frame_queued = asyncio.Event()
+        self._writer = asyncio.ensure_future(self._write())
+
+    @property
+    def client_host(self) -> str:
+        """Returns the host (i.e. IP address) of the websocket client, used to limit connections per client."""
+        client = self.websocket.client
+        return client.host if client and client.host else UNKNOWN_CLIENT_HOST
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns the number of frames waiting to be sent."""
+        return len(self._queue)
+
+    async def send_frame(self, frame: Union[str, bytes], coalesce_key: Optional[str] = None) -> None:
+        """
+        Queues an already encoded text or binary frame to be sent to the websocket.
+
+        .. note::
+            Frames with a coalesce key (i.e. broadcast topic frames) may be replaced by a newer frame with the same key
+            while they are queued.
+        """
+
+        if self.closed:
+            return
+
+        key = coalesce_key if coalesce_key is not None else ('frame', next(self._unique_keys))
+        coalesce = self.overflow_policy is WebSocketOverflowPolicy.COALESCE and key in self._queue
+
+        if coalesce:
+            # Replace the outdated frame in place so the newest state keeps its position in the queue
+            self._queue[key] = frame
+            self.dropped_frames += 1
+        elif len(self._queue) >= self.queue_size:
+            if self.overflow_policy is WebSocketOverflowPolicy.DISCONNECT:
+                self.dropped_frames += 1
+                await self.disconnect(status.WS_1008_POLICY_VIOLATION)
+                return
+            self._queue.popitem(last=False)
+            self._queue[key] = frame
+            self.dropped_frames += 1
+        else:
+            self._queue[key] = frame
+
+        self._frame_queued.set()
+
+    async def disconnect(self, code: int) -> None:
+        """Closes the websocket with a given close code and releases everything held on behalf of the connection."""
+
+        if self.closed:
+            return
+
+        self.close()
+        try:
+            await self.websocket.close(code=code)
+        except RuntimeError:
+            # The websocket was already closed by the client
+            pass
+
+    def close(self) -> None:
+        """Stops the writer task and releases everything held on behalf of the connection."""
+        self._writer.cancel()
+        self._release()
+
+    def status(self) -> WebSocketConnectionStatus:
+        """Returns the outbound queue status of the connection."""
+
+        client = self.websocket.client
+        return WebSocketConnectionStatus(
+            id=self.id,
+            client=f'{client.host}:{client.port}' if client else None,
+            frameFormat=self.frame_format,
+            overflowPolicy=self.overflow_policy,
+            queueCapacity=self.queue_size,
+            queueDepth=self.queue_depth,
+            sentFrames=self.sent_frames,
+            droppedFrames=self.dropped_frames
+        )
+
+    def _release(self) -> None:
+        self.closed = True
+        self._queue.clear()
+        self.broadcast_hub.unsubscribe_all(self)
+
+    async def _write(self) -> None:
+        while True:
+            await self._frame_queued.wait()
+            while self._queue:
+                _, frame = self._queue.popitem(last=False)
+                try:
+                    if isinstance(frame, bytes):
+                        await self.websocket.send_bytes(frame)
+                    else:
+                        await self.websocket.send_text(frame)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    # The client is gone, the receive loop will handle the disconnect
+                    self._release()
+                    return
+                self.sent_frames += 1
+            self._frame_queued.clear()
+
+
+def count_client_connections(connections: Iterable[WebSocketConnection]) -> Dict[str, int]:
+    """Returns the number of connections of each client host."""
+    return dict(Counter(connection.client_host for connection in connections))
+
+
+def connection_limit_close_code(connections: Iterable[WebSocketConnection],
+                                client_host: str,
+                                settings: WebSocketSettings) -> Optional[int]:
+    """
+    Returns the close code a new connection from a given client host is rejected with when it would exceed the
+    connection limits, otherwise returns none.
+
+    .. note::
+        Exceeding the global limit is temporary (1013 Try Again Later) while exceeding the per client limit is a
+        policy violation (1008 Policy Violation).
+    """
+
+    connections = list(connections)
+    if settings.max_connections is not None and len(connections) >= settings.max_connections:
+        return status.WS_1013_TRY_AGAIN_LATER
+
+    if settings.max_connections_per_client is not None:
+        client_connections = sum(1 for connection in connections if connection.client_host == client_host)
+        if client_connections >= settings.max_connections_per_client:
+            return status.WS_1008_POLICY_VIOLATION
+
+    return None
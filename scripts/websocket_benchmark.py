@@ -0,0 +1,64 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import timeit
+
+from endrpi.actions.websocket import WebSocketAction
+from endrpi.config.board import get_board
+from endrpi.model.action_result import success_action_result
+from endrpi.model.measurement import Measurement, TemperatureUnit
+from endrpi.model.pin import PinConfiguration, PinIo, PinPull
+from endrpi.model.temperature import Temperature
+from endrpi.model.websocket import WebSocketFrameFormat
+from endrpi.utils.api import websocket_frame, decode_websocket_message
+
+
+def benchmark_frame_formats(repetitions: int = 2000):
+    """
+    Prints the encode cost, decode cost, and size of typical websocket frames for every frame format
+
+    Run: python -m scripts.websocket_benchmark
+    """
+
+    # Frames carry the pins of the board, the 40 pin header when the board isn't configured
+    pin_configurations = {
+        pin_id: PinConfiguration(io=PinIo.INPUT, state=0, pull=PinPull.UP) for pin_id in get_board().pins
+    }
+    temperature = Temperature(systemOnChip=Measurement(quantity=45.622, unitOfMeasurement=TemperatureUnit.CELSIUS))
+    frames = {
+        'READ_TEMPERATURE': (WebSocketAction.READ_TEMPERATURE, success_action_result(temperature)),
+        f'READ_PIN_CONFIGURATIONS ({len(pin_configurations)} pins)': (WebSocketAction.READ_PIN_CONFIGURATIONS,
+                                                                      success_action_result(pin_configurations))
+    }
+
+    print(f'{"Frame":<36}{"Format":<14}{"Bytes":>8}{"Encode (us)":>14}{"Decode (us)":>14}')
+    for frame_name, (action, action_result) in frames.items():
+        for frame_format in WebSocketFrameFormat:
+            frame = websocket_frame(action, action_result, frame_format)
+            message = {'type': 'websocket.receive', 'bytes': frame} if isinstance(frame, bytes) else \
+                {'type': 'websocket.receive', 'text': frame}
+            size = len(frame if isinstance(frame, bytes) else frame.encode('utf-8'))
+
+            encode_seconds = timeit.timeit(lambda: websocket_frame(action, action_result, frame_format),
+                                           number=repetitions)
+            decode_seconds = timeit.timeit(lambda: decode_websocket_message(message, frame_format),
+                                           number=repetitions)
+
+            encode_micros = encode_seconds / repetitions * 1e6
+            decode_micros = decode_seconds / repetitions * 1e6
+            print(f'{frame_name:<36}{frame_format.value:<14}{size:>8}{encode_micros:>14.1f}{decode_micros:>14.1f}')
+
+
+if __name__ == '__main__':
+    benchmark_frame_formats()
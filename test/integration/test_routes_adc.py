@@ -0,0 +1,109 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import time
+import unittest
+import warnings
+from unittest import TestCase
+
+from fastapi.testclient import TestClient
+from gpiozero import Device
+from gpiozero.pins.mock import MockFactory
+
+from endrpi.actions.adc import stop_adc
+from endrpi.model.message import AdcMessage
+from endrpi.server import app
+from test.unit.test_utils_adc import MockMcp3008
+
+
+class TestAdcRoutes(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = TestClient(app)
+
+        Device.pin_factory = MockFactory()
+        Device.pin_factory.reset()
+        self.mock_mcp3008 = MockMcp3008()
+        self.mock_mcp3008.voltages[2] = 1.65
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        stop_adc()
+        self.mock_mcp3008.close()
+        Device.pin_factory.reset()
+
+    def wait_for_samples(self, samples: int, timeout: float = 5) -> dict:
+        deadline = time.monotonic() + timeout
+        adc_status = self.client.get('/adc').json()
+        while adc_status['samples'] < samples and time.monotonic() < deadline:
+            time.sleep(0.01)
+            adc_status = self.client.get('/adc').json()
+        return adc_status
+
+    def test_adc_routes(self):
+        # Ensure nothing is sampled until sampling starts
+        for response in (self.client.get('/adc'),
+                         self.client.delete('/adc'),
+                         self.client.get('/adc/channels/2/samples')):
+            self.assertEqual(404, response.status_code)
+            self.assertEqual(AdcMessage.ERROR_NOT_RUNNING, response.json()['message'])
+
+        # Ensure invalid configurations are rejected by validation
+        for adc_configuration in ({'channels': [], 'rate': 100},
+                                  {'channels': [1, 1], 'rate': 100},
+                                  {'chip': 'MCP3002', 'channels': [2], 'rate': 100},
+                                  {'channels': [0], 'rate': 1_000_000}):
+            response = self.client.put('/adc', json.dumps(adc_configuration))
+            self.assertEqual(400, response.status_code)
+
+        # Ensure channels are sampled in volts of the reference voltage
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            response = self.client.put('/adc', json.dumps({'channels': [0, 2], 'rate': 200, 'bufferSize': 50}))
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.json()['running'])
+        self.assertEqual([0, 2], response.json()['configuration']['channels'])
+        adc_status = self.wait_for_samples(10)
+        self.assertGreaterEqual(adc_status['samples'], 10)
+
+        response = self.client.get('/adc/channels/2/samples', params={'count': 5})
+        self.assertEqual(200, response.status_code)
+        adc_samples = response.json()
+        self.assertEqual(5, len(adc_samples['values']))
+        for value in adc_samples['values']:
+            self.assertAlmostEqual(1.65, value, delta=0.01)
+        response = self.client.get('/adc/channels/0/samples', params={'count': 5, 'since': 0})
+        self.assertEqual(0, response.json()['firstSample'])
+        for value in response.json()['values']:
+            self.assertAlmostEqual(0.0, value, delta=0.01)
+
+        # Ensure channels that aren't sampled are not found
+        response = self.client.get('/adc/channels/1/samples')
+        self.assertEqual(404, response.status_code)
+        expected_message = AdcMessage.ERROR_CHANNEL_NOT_SAMPLED__CHANNEL__.format(channel=1)
+        self.assertEqual(expected_message, response.json()['message'])
+
+        # Ensure stopping returns the final status and discards the samples
+        response = self.client.delete('/adc')
+        self.assertEqual(200, response.status_code)
+        self.assertFalse(response.json()['running'])
+        self.assertEqual(404, self.client.get('/adc').status_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import json
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from gpiozero import Device
+from gpiozero.pins.mock import MockFactory
+
+from endrpi.actions.capture import capture_sessions
+from endrpi.actions.pin import pin_cache
+from endrpi.model.capture import CaptureState
+from endrpi.model.message import CaptureMessage
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.server import app
+
+
+class TestCaptureRoutes(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = TestClient(app)
+
+        Device.pin_factory = MockFactory()
+        pin_cache.clear()
+        capture_sessions.clear()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        for session in capture_sessions.values():
+            session.cancel()
+        capture_sessions.clear()
+        pin_cache.clear()
+
+    @patch('endrpi.actions.capture.get_bulk_pin_access')
+    def test_capture_routes(self, get_bulk_pin_access_mock):
+        get_bulk_pin_access_mock.return_value.read_levels.return_value = 1 << 17
+        pins = [RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO27]
+
+        # Ensure invalid captures are rejected by validation
+        for capture_configuration in ({'pins': [], 'rate': 1000, 'samples': 8},
+                                      {'pins': pins, 'rate': 0, 'samples': 8},
+                                      {'pins': pins * 2, 'rate': 1000, 'samples': 8},
+                                      {'pins': pins, 'rate': 1000, 'samples': 8, 'preTrigger': 8}):
+            response = self.client.post('/captures', json.dumps(capture_configuration))
+            self.assertEqual(400, response.status_code)
+
+        # Ensure armed captures are listed, conflict with new captures, and can't be downloaded
+        trigger_configuration = {'pins': pins, 'rate': 100, 'samples': 8, 'timeout': 60,
+                                 'trigger': {'pin': RaspberryPiPinIds.GPIO27, 'condition': 'HIGH'}}
+        response = self.client.post('/captures', json.dumps(trigger_configuration))
+        self.assertEqual(200, response.status_code)
+        capture_id = response.json()['id']
+        self.assertEqual(CaptureState.ARMED, response.json()['state'])
+        self.assertEqual([capture_id], [status['id'] for status in self.client.get('/captures').json()])
+        response = self.client.post('/captures', json.dumps(trigger_configuration))
+        self.assertEqual(409, response.status_code)
+        self.assertEqual({'message': CaptureMessage.ERROR_RUNNING}, response.json())
+        response = self.client.get(f'/captures/{capture_id}/data')
+        self.assertEqual(409, response.status_code)
+
+        response = self.client.delete(f'/captures/{capture_id}')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(CaptureState.CANCELLED, response.json()['state'])
+
+        # Ensure finished captures are downloaded as packed bits or a value change dump
+        response = self.client.post('/captures', json.dumps({'pins': pins, 'rate': 10_000, 'samples': 4}))
+        capture_id = response.json()['id']
+        capture_sessions[capture_id].join(5)
+        self.assertEqual(CaptureState.COMPLETED, self.client.get(f'/captures/{capture_id}').json()['state'])
+
+        response = self.client.get(f'/captures/{capture_id}/data')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/octet-stream', response.headers['content-type'])
+        self.assertEqual('GPIO17,GPIO27', response.headers['x-capture-pins'])
+        self.assertEqual('4', response.headers['x-capture-samples'])
+        self.assertNotIn('x-capture-trigger-sample', response.headers)
+        self.assertEqual(bytes([0b01010101]), response.content)
+
+        response = self.client.get(f'/captures/{capture_id}/data', params={'format': 'VCD'})
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.text.startswith('$version'))
+        self.assertIn(f'capture-{capture_id}.vcd', response.headers['content-disposition'])
+
+        # Ensure unknown captures are not found
+        for path in ('/captures/999', '/captures/999/data'):
+            response = self.client.get(path)
+            self.assertEqual(404, response.status_code)
+            self.assertEqual({'message': CaptureMessage.ERROR_NOT_FOUND__CAPTURE_ID__.format(capture_id=999)},
+                             response.json())
+        self.assertEqual(404, self.client.delete('/captures/999').status_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import tempfile
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from gpiozero import Device
+from gpiozero.pins.mock import MockFactory, MockPWMPin
+
+import endrpi.actions.fan
+from endrpi.actions.fan import stop_fan
+from endrpi.actions.pin import pin_cache
+from endrpi.model.message import FanMessage, PinMessage
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.server import app
+from endrpi.utils.sensors import SensorReader, discover_sensor_inputs
+from test.unit.test_utils_sensors import create_sensor_root, create_sysfs_files
+
+
+class TestFanRoutes(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = TestClient(app)
+
+        # Note: Mock pins are shared between mock factories, PWM pins can't reuse pins created without PWM
+        Device.pin_factory = MockFactory(pin_class=MockPWMPin)
+        Device.pin_factory.reset()
+
+        self.root_directory = tempfile.TemporaryDirectory()
+        create_sensor_root(self.root_directory.name)
+        self.sensor_reader = SensorReader(discover_sensor_inputs(self.root_directory.name))
+        self.patches = [patch.object(endrpi.actions.fan, 'get_sensor_reader', lambda: self.sensor_reader),
+                        patch('endrpi.actions.pin.pwm_outputs.chip_path', '/missing/pwmchip0')]
+        for active_patch in self.patches:
+            active_patch.start()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        stop_fan()
+        for active_patch in self.patches:
+            active_patch.stop()
+        self.sensor_reader.close()
+        self.root_directory.cleanup()
+        Device.pin_factory.reset()
+        pin_cache.clear()
+
+    def test_fan_routes(self):
+        pin_id = RaspberryPiPinIds.GPIO16
+        fan_configuration = {
+            'pinId': pin_id,
+            'frequency': 100,
+            'curve': [{'temperature': 40, 'dutyCycle': 0.2}, {'temperature': 60, 'dutyCycle': 1}],
+            'interval': 60
+        }
+
+        # Ensure nothing is controlled until the controller starts
+        for response in (self.client.get('/fan'), self.client.delete('/fan')):
+            self.assertEqual(404, response.status_code)
+            self.assertEqual({'message': FanMessage.ERROR_NOT_RUNNING}, response.json())
+
+        # Ensure invalid curves are rejected by validation
+        response = self.client.put('/fan', json.dumps({**fan_configuration, 'curve': []}))
+        self.assertEqual(400, response.status_code)
+
+        # Ensure sensors must be discovered temperature sensors
+        response = self.client.put('/fan', json.dumps({**fan_configuration, 'sensorId': 'thermal_zone9'}))
+        self.assertEqual(500, response.status_code)
+        expected_message = FanMessage.ERROR_SENSOR_NOT_FOUND__SENSOR_ID__.format(sensor_id='thermal_zone9')
+        self.assertEqual({'message': expected_message}, response.json())
+        response = self.client.put('/fan', json.dumps({**fan_configuration, 'sensorId': 'hwmon10.fan1'}))
+        self.assertEqual(500, response.status_code)
+
+        # Ensure the pin is driven on the curve of the temperature (48.686C)
+        response = self.client.put('/fan', json.dumps(fan_configuration))
+        self.assertEqual(200, response.status_code)
+        fan_status = response.json()
+        self.assertTrue(fan_status['running'])
+        self.assertEqual(48.686, fan_status['temperature'])
+        self.assertAlmostEqual(0.54744, fan_status['dutyCycle'])
+        self.assertAlmostEqual(0.54744, self.client.get(f'/pins/{pin_id}/pwm').json()['dutyCycle'])
+        self.assertAlmostEqual(0.54744, Device.pin_factory.pin(pin_id).state)
+
+        # Ensure the fan pin can't be driven by PID loops or clients
+        in_use_message = PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=pin_id, owner='the fan controller')
+        pid_configuration = {'source': {'type': 'ADC', 'channel': 0}, 'output': {'pinId': pin_id}, 'setpoint': 1}
+        for response in (self.client.post('/pid', json.dumps(pid_configuration)),
+                         self.client.put(f'/pins/{pin_id}', json.dumps({'io': 'OUTPUT', 'state': 0})),
+                         self.client.put(f'/pins/{pin_id}/pwm', json.dumps({'frequency': 50, 'dutyCycle': 0})),
+                         self.client.delete(f'/pins/{pin_id}/pwm')):
+            self.assertEqual(409, response.status_code)
+            self.assertEqual({'message': in_use_message}, response.json())
+
+        # Ensure retuning the running controller keeps PWM and applies the new curve
+        create_sysfs_files(self.root_directory.name, {'sys/class/thermal/thermal_zone0/temp': '70000'})
+        curve = [{'temperature': 0, 'dutyCycle': 0.5}]
+        response = self.client.put('/fan', json.dumps({**fan_configuration, 'curve': curve}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(curve, self.client.get('/fan').json()['configuration']['curve'])
+
+        # Ensure stopping the controller stops PWM of its pin
+        response = self.client.delete('/fan')
+        self.assertEqual(200, response.status_code)
+        self.assertFalse(response.json()['running'])
+        response = self.client.get(f'/pins/{pin_id}/pwm')
+        expected_message = PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id)
+        self.assertEqual({'message': expected_message}, response.json())
+        self.assertEqual(404, self.client.get('/fan').status_code)
+        self.assertEqual(200, self.client.put(f'/pins/{pin_id}', json.dumps({'io': 'OUTPUT', 'state': 0})).status_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
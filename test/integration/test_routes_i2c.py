@@ -0,0 +1,121 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import endrpi.actions.i2c
+from endrpi.actions.i2c import stop_i2c_poll
+from endrpi.model.message import I2cMessage
+from endrpi.server import app
+from endrpi.utils.i2c import I2cBuses
+from test.unit.test_utils_i2c import FakeI2c
+
+
+class TestI2cRoutes(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = TestClient(app)
+
+        self.devices = {0x48: bytearray(range(256))}
+        self.fake_i2c = FakeI2c(self.devices)
+        self.i2c_buses = I2cBuses(self.fake_i2c.path_format, self.fake_i2c)
+        self.i2c_buses_patch = patch.object(endrpi.actions.i2c, 'i2c_buses', self.i2c_buses)
+        self.i2c_buses_patch.start()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        stop_i2c_poll()
+        self.i2c_buses_patch.stop()
+        self.i2c_buses.close()
+        self.fake_i2c.close()
+
+    def test_i2c_block_routes(self):
+        # Ensure invalid blocks are rejected by validation
+        for block_reads in ({'reads': []},
+                            {'reads': [{'address': 0x80, 'startRegister': 0, 'length': 1}]},
+                            {'reads': [{'address': 0x48, 'startRegister': 0, 'length': 0}]}):
+            response = self.client.post('/i2c/read', json.dumps(block_reads))
+            self.assertEqual(400, response.status_code)
+
+        # Ensure blocks are read in the order of the reads
+        response = self.client.post('/i2c/read', json.dumps({'reads': [
+            {'address': 0x48, 'startRegister': 0x20, 'length': 2},
+            {'address': 0x48, 'startRegister': 0x00, 'length': 1}
+        ]}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([[0x20, 0x21], [0x00]], [block['data'] for block in response.json()])
+        self.assertEqual([4], self.fake_i2c.transfers)
+
+        # Ensure writes reach the device
+        response = self.client.post('/i2c/write', json.dumps({'writes': [
+            {'address': 0x48, 'startRegister': 0x01, 'data': [0xFF, 0xFE]}
+        ]}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(bytearray([0xFF, 0xFE]), self.devices[0x48][1:3])
+
+        # Ensure devices that don't respond and unavailable buses are errors
+        response = self.client.post('/i2c/read', json.dumps({'reads': [
+            {'address': 0x50, 'startRegister': 0x00, 'length': 1}
+        ]}))
+        self.assertEqual(500, response.status_code)
+        expected_message = I2cMessage.ERROR_TRANSFER__BUS__ADDRESS__.format(bus=1, address='0x50')
+        self.assertEqual(expected_message, response.json()['message'])
+        response = self.client.post('/i2c/write', json.dumps({'writes': [
+            {'bus': 0, 'address': 0x48, 'startRegister': 0x00, 'data': [0]}
+        ]}))
+        self.assertEqual(500, response.status_code)
+        self.assertEqual(I2cMessage.ERROR_BUS__BUS__.format(bus=0), response.json()['message'])
+
+    def test_i2c_poll_routes(self):
+        # Ensure the poll set is not found until it is set
+        response = self.client.get('/i2c/poll')
+        self.assertEqual(404, response.status_code)
+        self.assertEqual(404, self.client.delete('/i2c/poll').status_code)
+
+        # Ensure the first poll is read before the poll set is returned
+        response = self.client.put('/i2c/poll', json.dumps({
+            'interval': 0.5,
+            'reads': [{'address': 0x48, 'startRegister': 0x10, 'length': 2}]
+        }))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([0x10, 0x11], response.json()['blocks'][0]['data'])
+
+        # Ensure cached blocks are read without a bus transfer
+        self.fake_i2c.transfers.clear()
+        response = self.client.get('/i2c/poll')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([0x10, 0x11], response.json()['blocks'][0]['data'])
+        self.assertEqual([], self.fake_i2c.transfers)
+
+        # Ensure intervals below the minimum are rejected
+        response = self.client.put('/i2c/poll', json.dumps({
+            'interval': 0,
+            'reads': [{'address': 0x48, 'startRegister': 0x10, 'length': 2}]
+        }))
+        self.assertEqual(400, response.status_code)
+
+        self.assertEqual(200, self.client.delete('/i2c/poll').status_code)
+        self.assertEqual(404, self.client.get('/i2c/poll').status_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import tempfile
+import time
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from gpiozero import Device
+from gpiozero.pins.mock import MockFactory, MockPWMPin
+
+import endrpi.actions.pid
+from endrpi.actions.pid import pid_loops, stop_pid_loop
+from endrpi.actions.pin import pin_cache
+from endrpi.model.message import PidMessage, PinMessage
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.server import app
+from endrpi.utils.sensors import SensorReader, discover_sensor_inputs
+from test.unit.test_utils_sensors import create_sensor_root
+
+
+class TestPidRoutes(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = TestClient(app)
+
+        # Note: Mock pins are shared between mock factories, PWM pins can't reuse pins created without PWM
+        Device.pin_factory = MockFactory(pin_class=MockPWMPin)
+        Device.pin_factory.reset()
+
+        self.root_directory = tempfile.TemporaryDirectory()
+        create_sensor_root(self.root_directory.name)
+        self.sensor_reader = SensorReader(discover_sensor_inputs(self.root_directory.name))
+        self.patches = [patch.object(endrpi.actions.pid, 'get_sensor_reader', lambda: self.sensor_reader),
+                        patch('endrpi.actions.pin.pwm_outputs.chip_path', '/missing/pwmchip0')]
+        for active_patch in self.patches:
+            active_patch.start()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        for loop_id in list(pid_loops):
+            stop_pid_loop(loop_id)
+        for active_patch in self.patches:
+            active_patch.stop()
+        self.sensor_reader.close()
+        self.root_directory.cleanup()
+        Device.pin_factory.reset()
+        pin_cache.clear()
+
+    def wait_for_iterations(self, loop_id: int, iterations: int, timeout: float = 5) -> dict:
+        deadline = time.monotonic() + timeout
+        pid_status = self.client.get(f'/pid/{loop_id}').json()
+        while pid_status['iterations'] < iterations and time.monotonic() < deadline:
+            time.sleep(0.01)
+            pid_status = self.client.get(f'/pid/{loop_id}').json()
+        return pid_status
+
+    def test_pid_routes(self):
+        pin_id = RaspberryPiPinIds.GPIO16
+        pid_configuration = {
+            'source': {'type': 'SENSOR', 'sensorId': 'thermal_zone0'},
+            'output': {'pinId': pin_id, 'frequency': 100},
+            'setpoint': 40,
+            'kp': -0.1,
+            'rate': 100
+        }
+
+        # Ensure unknown loops are not found
+        self.assertEqual([], self.client.get('/pid').json())
+        for response in (self.client.get('/pid/1000'),
+                         self.client.put('/pid/1000/tuning', json.dumps({'setpoint': 1})),
+                         self.client.delete('/pid/1000')):
+            self.assertEqual(404, response.status_code)
+            self.assertEqual({'message': PidMessage.ERROR_NOT_FOUND__LOOP_ID__.format(loop_id=1000)}, response.json())
+
+        # Ensure invalid configurations are rejected by validation
+        for invalid_configuration in ({**pid_configuration, 'source': {'type': 'ADC'}},
+                                      {**pid_configuration, 'outputMin': 0.5, 'outputMax': 0.5},
+                                      {**pid_configuration, 'rate': 1_000_000}):
+            response = self.client.post('/pid', json.dumps(invalid_configuration))
+            self.assertEqual(400, response.status_code)
+
+        # Ensure sensor sources must be discovered
+        response = self.client.post('/pid', json.dumps({**pid_configuration,
+                                                        'source': {'type': 'SENSOR', 'sensorId': 'thermal_zone9'}}))
+        self.assertEqual(500, response.status_code)
+        expected_message = PidMessage.ERROR_SENSOR_NOT_FOUND__SENSOR_ID__.format(sensor_id='thermal_zone9')
+        self.assertEqual({'message': expected_message}, response.json())
+
+        # Ensure the output pin is driven from the process variable (48.686C)
+        response = self.client.post('/pid', json.dumps(pid_configuration))
+        self.assertEqual(200, response.status_code)
+        loop_id = response.json()['id']
+        pid_status = self.wait_for_iterations(loop_id, 5)
+        self.assertEqual(48.686, pid_status['processVariable'])
+        self.assertAlmostEqual(0.8686, pid_status['output'])
+        self.assertGreater(pid_status['jitter']['period']['count'], 0)
+        self.assertAlmostEqual(0.8686, Device.pin_factory.pin(pin_id).state)
+        self.assertEqual([loop_id], [status['id'] for status in self.client.get('/pid').json()])
+
+        # Ensure output pins can't be driven by two loops, the fan controller or clients
+        in_use_message = PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=pin_id, owner=f'PID loop `{loop_id}`')
+        response = self.client.post('/pid', json.dumps(pid_configuration))
+        self.assertEqual(409, response.status_code)
+        self.assertEqual({'message': in_use_message}, response.json())
+        fan_configuration = {'pinId': pin_id, 'frequency': 100, 'curve': [{'temperature': 40, 'dutyCycle': 0.2}]}
+        for response in (self.client.put('/fan', json.dumps(fan_configuration)),
+                         self.client.put(f'/pins/{pin_id}', json.dumps({'io': 'OUTPUT', 'state': 0})),
+                         self.client.put(f'/pins/{pin_id}/pwm', json.dumps({'frequency': 50, 'dutyCycle': 0})),
+                         self.client.delete(f'/pins/{pin_id}/pwm')):
+            self.assertEqual(409, response.status_code)
+            self.assertEqual({'message': in_use_message}, response.json())
+
+        # Ensure tuning applies to the running loop
+        response = self.client.put(f'/pid/{loop_id}/tuning', json.dumps({'setpoint': 45, 'kp': -0.1}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(45, response.json()['configuration']['setpoint'])
+        deadline = time.monotonic() + 5
+        while abs(Device.pin_factory.pin(pin_id).state - 0.3686) > 1e-6 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertAlmostEqual(0.3686, Device.pin_factory.pin(pin_id).state)
+
+        # Ensure digital outputs are driven high at or above the middle of the output limits
+        digital_pin_id = RaspberryPiPinIds.GPIO20
+        response = self.client.post('/pid', json.dumps({**pid_configuration,
+                                                        'output': {'pinId': digital_pin_id, 'mode': 'DIGITAL'}}))
+        self.assertEqual(200, response.status_code)
+        digital_loop_id = response.json()['id']
+        self.wait_for_iterations(digital_loop_id, 5)
+        self.assertEqual(1, Device.pin_factory.pin(digital_pin_id).state)
+
+        # Ensure stopped loops are removed and their outputs released
+        response = self.client.delete(f'/pid/{digital_loop_id}')
+        self.assertEqual(200, response.status_code)
+        self.assertFalse(response.json()['running'])
+        self.assertEqual(0, Device.pin_factory.pin(digital_pin_id).state)
+        response = self.client.delete(f'/pid/{loop_id}')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(404, self.client.get(f'/pins/{pin_id}/pwm').status_code)
+        self.assertEqual([], self.client.get('/pid').json())
+        self.assertEqual(200, self.client.put(f'/pins/{pin_id}', json.dumps({'io': 'OUTPUT', 'state': 0})).status_code)
+
+
+if __name__ == '__main__':
+    unittest.main()
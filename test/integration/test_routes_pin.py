@@ -19,11 +19,13 @@ from unittest.mock import patch, MagicMock
 
 from fastapi.testclient import TestClient
 from gpiozero import Device
-from gpiozero.pins.mock import MockFactory
+from gpiozero.pins.mock import MockFactory, MockPWMPin
 from pydantic import ValidationError, BaseModel
 
+from endrpi.actions.pin import pin_cache
+from endrpi.config.board import get_board
 from endrpi.model.message import PinMessage
-from endrpi.model.pin import PinConfiguration, PinIo, PinPull, RaspberryPiPinIds
+from endrpi.model.pin import PinConfiguration, PinIo, PinPull, RaspberryPiPinIds, PinUpdateStatus, PwmMode, PinEdge
 from endrpi.server import app
 
 
@@ -44,6 +46,7 @@ class TestPinRoutes(TestCase):
             pin_mock.state = 1
             pin_mock.pull = PinPull.FLOATING
             gpiozero_device_mock.pin_factory.pin.return_value = pin_mock
+            pin_cache.clear()
             response = self.client.get('/pins')
             response_json = json.loads(response.content)
             self.assertEqual(500, response.status_code)
@@ -55,6 +58,7 @@ class TestPinRoutes(TestCase):
         pin_mock.state = 1
         pin_mock.pull = PinPull.FLOATING
         gpiozero_device_mock.pin_factory.pin.return_value = pin_mock
+        pin_cache.clear()
         response = self.client.get('/pins')
         response_json = json.loads(response.content)
         self.assertEqual(200, response.status_code)
@@ -76,6 +80,7 @@ class TestPinRoutes(TestCase):
         pin_mock.state = 1
         pin_mock.pull = PinPull.FLOATING
         gpiozero_device_mock.pin_factory.pin.return_value = pin_mock
+        pin_cache.clear()
         pin_id = '9999999'
         response = self.client.get(f'/pins/{pin_id}')
         response_json = json.loads(response.content)
@@ -89,6 +94,7 @@ class TestPinRoutes(TestCase):
             pin_mock.state = 1
             pin_mock.pull = PinPull.FLOATING
             gpiozero_device_mock.pin_factory.pin.return_value = pin_mock
+            pin_cache.clear()
             pin_id = RaspberryPiPinIds.GPIO17
             response = self.client.get(f'/pins/{pin_id}')
             response_json = json.loads(response.content)
@@ -101,6 +107,7 @@ class TestPinRoutes(TestCase):
         pin_mock.state = 1
         pin_mock.pull = PinPull.FLOATING
         gpiozero_device_mock.pin_factory.pin.return_value = pin_mock
+        pin_cache.clear()
         pin_id = RaspberryPiPinIds.GPIO17
         response = self.client.get(f'/pins/{pin_id}')
         response_json = json.loads(response.content)
@@ -141,6 +148,7 @@ class TestPinRoutes(TestCase):
         # Ensure successful pin actions respond with correct json
         pin_mock = MagicMock()
         gpiozero_device_mock.pin_factory.pin.return_value = pin_mock
+        pin_cache.clear()
         pin_id = RaspberryPiPinIds.GPIO17
         pin_configuration = PinConfiguration(io=PinIo.OUTPUT, state=1.0)
         response = self.client.put(f'/pins/{pin_id}', json.dumps(pin_configuration.__dict__))
@@ -153,6 +161,7 @@ class TestPinRoutes(TestCase):
 
         pin_mock = MagicMock()
         gpiozero_device_mock.pin_factory.pin.return_value = pin_mock
+        pin_cache.clear()
         pin_id = RaspberryPiPinIds.GPIO17
         pin_configuration = PinConfiguration(io=PinIo.INPUT, pull=PinPull.FLOATING)
         response = self.client.put(f'/pins/{pin_id}', json.dumps(pin_configuration.__dict__))
@@ -162,6 +171,198 @@ class TestPinRoutes(TestCase):
         self.assertIsInstance(pin_mock.state, MagicMock)
         self.assertEqual(PinPull.FLOATING.name.lower(), pin_mock.pull)
 
+    @patch('endrpi.actions.pin.get_bulk_pin_access', return_value=None)
+    def test_board_pin_routes(self, _get_bulk_pin_access_mock):
+        pin_cache.clear()
+
+        # Ensure only the pins of the board are read
+        response = self.client.get('/pins')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([pin_id.value for pin_id in get_board().pins], list(response.json()))
+
+        # Ensure pins are found by BCM and physical aliases while pins the board doesn't expose aren't
+        for alias in ('GPIO17', 'BCM17', '17', 'BOARD11', 'J8:11'):
+            self.assertEqual(200, self.client.get(f'/pins/{alias}').status_code)
+        for alias in (RaspberryPiPinIds.GPIO0, RaspberryPiPinIds.GPIO40, 'BOARD1'):
+            self.assertEqual(404, self.client.get(f'/pins/{alias}').status_code)
+
+        # Ensure updates of pins the board doesn't expose are invalid
+        response = self.client.put('/pins', json.dumps({RaspberryPiPinIds.GPIO40: {'io': PinIo.OUTPUT, 'state': 1}}))
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO40),
+                         response.json()['pins'][RaspberryPiPinIds.GPIO40]['message'])
+
+    @patch('endrpi.actions.pin.get_bulk_pin_access', return_value=None)
+    def test_put_pin_configurations_route(self, _get_bulk_pin_access_mock):
+        # Ensure invalid pin ids are rejected by validation
+        response = self.client.put('/pins', json.dumps({'INVALID_PIN_ID': {'io': PinIo.OUTPUT, 'state': 1}}))
+        self.assertEqual(400, response.status_code)
+        self.assertNotIn('pins', json.loads(response.content))
+
+        # Ensure invalid configurations are a client error and no pin is updated
+        response = self.client.put('/pins', json.dumps({
+            RaspberryPiPinIds.GPIO20: {'io': PinIo.OUTPUT, 'state': 1},
+            RaspberryPiPinIds.GPIO21: {'io': PinIo.INPUT}
+        }))
+        response_json = json.loads(response.content)
+        self.assertEqual(400, response.status_code)
+        self.assertEqual({
+            'message': PinMessage.ERROR_INVALID_CONFIGURATIONS,
+            'pins': {
+                RaspberryPiPinIds.GPIO20: {
+                    'status': PinUpdateStatus.SKIPPED,
+                    'message': PinMessage.SKIPPED_UPDATE__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO20)
+                },
+                RaspberryPiPinIds.GPIO21: {
+                    'status': PinUpdateStatus.INVALID,
+                    'message': PinMessage.ERROR_NO_INPUT_PULL
+                }
+            }
+        }, response_json)
+        self.assertEqual('input', Device.pin_factory.pin(RaspberryPiPinIds.GPIO20).function)
+
+        # Ensure update errors are a server error along with the outcome of every pin
+        # Note: GPIO3 has a fixed pull up
+        response = self.client.put('/pins', json.dumps({
+            RaspberryPiPinIds.GPIO3: {'io': PinIo.INPUT, 'pull': PinPull.FLOATING},
+            RaspberryPiPinIds.GPIO20: {'io': PinIo.OUTPUT, 'state': 0}
+        }))
+        response_json = json.loads(response.content)
+        self.assertEqual(500, response.status_code)
+        self.assertEqual(PinMessage.ERROR_UPDATES_FAILED, response_json['message'])
+        self.assertEqual(PinUpdateStatus.FAILED, response_json['pins'][RaspberryPiPinIds.GPIO3]['status'])
+        self.assertEqual(PinUpdateStatus.UPDATED, response_json['pins'][RaspberryPiPinIds.GPIO20]['status'])
+
+        # Ensure successful updates respond with the outcome of every pin
+        response = self.client.put('/pins', json.dumps({
+            RaspberryPiPinIds.GPIO20: {'io': PinIo.OUTPUT, 'state': 1},
+            RaspberryPiPinIds.GPIO21: {'io': PinIo.INPUT, 'pull': PinPull.DOWN}
+        }))
+        response_json = json.loads(response.content)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({
+            pin_id: {
+                'status': PinUpdateStatus.UPDATED,
+                'message': PinMessage.SUCCESS_UPDATED__PIN_ID__.format(pin_id=pin_id)
+            } for pin_id in (RaspberryPiPinIds.GPIO20, RaspberryPiPinIds.GPIO21)
+        }, response_json)
+        self.assertEqual('output', Device.pin_factory.pin(RaspberryPiPinIds.GPIO20).function)
+        self.assertEqual(1, Device.pin_factory.pin(RaspberryPiPinIds.GPIO20).state)
+        self.assertEqual('down', Device.pin_factory.pin(RaspberryPiPinIds.GPIO21).pull)
+
+        # Note: Mock pins are shared between mock factories
+        Device.pin_factory.pin(RaspberryPiPinIds.GPIO20).function = 'input'
+        pin_cache.clear()
+
+    @patch('endrpi.actions.pin.pwm_outputs.chip_path', '/missing/pwmchip0')
+    def test_pwm_routes(self):
+        # Note: Mock pins are shared between mock factories, PWM pins can't reuse pins created without PWM
+        Device.pin_factory = MockFactory(pin_class=MockPWMPin)
+        Device.pin_factory.reset()
+        pin_id = RaspberryPiPinIds.GPIO16
+
+        # Ensure unknown pins and pins without PWM are not found
+        for method in (self.client.get, self.client.delete):
+            response = method('/pins/INVALID_PIN_ID/pwm')
+            self.assertEqual(404, response.status_code)
+            response = method(f'/pins/{pin_id}/pwm')
+            self.assertEqual(404, response.status_code)
+            self.assertEqual({'message': PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id)},
+                             response.json())
+
+        # Ensure invalid PWM configurations are rejected by validation
+        response = self.client.put(f'/pins/{pin_id}/pwm', json.dumps({'frequency': 100, 'dutyCycle': 1.5}))
+        self.assertEqual(400, response.status_code)
+        response = self.client.put('/pins/INVALID_PIN_ID/pwm', json.dumps({'frequency': 100, 'dutyCycle': 0.5}))
+        self.assertEqual(404, response.status_code)
+
+        # Ensure PWM is started, read, and stopped
+        response = self.client.put(f'/pins/{pin_id}/pwm', json.dumps({'frequency': 100, 'dutyCycle': 0.5}))
+        self.assertEqual(200, response.status_code)
+        pwm_status = {'frequency': 100, 'dutyCycle': 0.5, 'mode': PwmMode.SOFTWARE}
+        self.assertEqual(pwm_status, response.json())
+        self.assertEqual(pwm_status, self.client.get(f'/pins/{pin_id}/pwm').json())
+        self.assertEqual({pin_id: pwm_status}, self.client.get('/pwm').json())
+        self.assertEqual({'io': PinIo.OUTPUT, 'state': 0.5, 'pull': None}, self.client.get(f'/pins/{pin_id}').json())
+
+        response = self.client.delete(f'/pins/{pin_id}/pwm')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'message': PinMessage.SUCCESS_PWM_STOPPED__PIN_ID__.format(pin_id=pin_id)}, response.json())
+        self.assertEqual({}, self.client.get('/pwm').json())
+
+        Device.pin_factory.reset()
+        pin_cache.clear()
+
+    def test_pulse_counter_routes(self):
+        pin_id = RaspberryPiPinIds.GPIO20
+        gpiozero_pin = Device.pin_factory.pin(pin_id)
+        gpiozero_pin.function = 'input'
+        gpiozero_pin.drive_low()
+
+        # Ensure unknown pins and pins without a running counter are not found
+        for method in (self.client.get, self.client.delete):
+            self.assertEqual(404, method('/pins/INVALID_PIN_ID/counter').status_code)
+            response = method(f'/pins/{pin_id}/counter')
+            self.assertEqual(404, response.status_code)
+            self.assertEqual({'message': PinMessage.ERROR_COUNTER_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id)},
+                             response.json())
+        self.assertEqual(404, self.client.put('/pins/INVALID_PIN_ID/counter', json.dumps({})).status_code)
+        self.assertEqual(400, self.client.put(f'/pins/{pin_id}/counter', json.dumps({'edge': 'UP'})).status_code)
+        self.assertEqual(400, self.client.put(f'/pins/{pin_id}/counter', json.dumps({'timeout': 0})).status_code)
+
+        # Ensure counters are started, read, reset, and stopped
+        # Note: Mock pulses are only microseconds apart, the timeout keeps their frequency once they stop
+        response = self.client.put(f'/pins/{pin_id}/counter', json.dumps({'timeout': 60}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(PinEdge.RISING, response.json()['edge'])
+        self.assertEqual(60, response.json()['timeout'])
+        for _ in range(3):
+            gpiozero_pin.drive_high()
+            gpiozero_pin.drive_low()
+
+        response = self.client.get(f'/pins/{pin_id}/counter', params={'reset': True})
+        self.assertEqual(3, response.json()['count'])
+        self.assertEqual(2, response.json()['period']['count'])
+        self.assertGreater(response.json()['frequency'], 0)
+        pulse_counter_statuses = self.client.get('/counters').json()
+        self.assertEqual({pin_id: 0}, {key: value['count'] for key, value in pulse_counter_statuses.items()})
+
+        gpiozero_pin.drive_high()
+        response = self.client.delete(f'/pins/{pin_id}/counter')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, response.json()['count'])
+        self.assertEqual({}, self.client.get('/counters').json())
+
+    def test_pin_edge_filter_routes(self):
+        pin_id = RaspberryPiPinIds.GPIO20
+
+        # Ensure unknown pins and pins without a filter are not found
+        for method in (self.client.get, self.client.delete):
+            self.assertEqual(404, method('/pins/INVALID_PIN_ID/filter').status_code)
+            response = method(f'/pins/{pin_id}/filter')
+            self.assertEqual(404, response.status_code)
+            self.assertEqual({'message': PinMessage.ERROR_FILTER_NOT_SET__PIN_ID__.format(pin_id=pin_id)},
+                             response.json())
+        response = self.client.put('/pins/INVALID_PIN_ID/filter', json.dumps({'policy': 'LEADING'}))
+        self.assertEqual(404, response.status_code)
+        for invalid_configuration in ({}, {'policy': 'LEADING', 'window': 0}, {'policy': 'RATE_LIMIT', 'rate': -1}):
+            response = self.client.put(f'/pins/{pin_id}/filter', json.dumps(invalid_configuration))
+            self.assertEqual(400, response.status_code)
+
+        # Ensure filters are set, replaced, read, and removed
+        response = self.client.put(f'/pins/{pin_id}/filter', json.dumps({'policy': 'LEADING'}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(5000, response.json()['window'])
+        response = self.client.put(f'/pins/{pin_id}/filter', json.dumps({'policy': 'RATE_LIMIT', 'rate': 20}))
+        self.assertEqual(20, response.json()['rate'])
+        self.assertEqual('RATE_LIMIT', self.client.get(f'/pins/{pin_id}/filter').json()['policy'])
+        self.assertEqual([pin_id], list(self.client.get('/filters').json()))
+
+        response = self.client.delete(f'/pins/{pin_id}/filter')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(0, response.json()['passedEdges'])
+        self.assertEqual({}, self.client.get('/filters').json())
+
 
 if __name__ == '__main__':
     unittest.main()
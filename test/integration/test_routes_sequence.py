@@ -0,0 +1,108 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import json
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from gpiozero import Device
+from gpiozero.pins.mock import MockFactory
+
+from endrpi.actions.pin import pin_cache
+from endrpi.actions.sequence import sequence_players
+from endrpi.model.message import PinMessage, SequenceMessage
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.model.sequence import SequenceState
+from endrpi.server import app
+
+
+class TestSequenceRoutes(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = TestClient(app)
+
+        Device.pin_factory = MockFactory()
+        pin_cache.clear()
+        sequence_players.clear()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        sequence_players.clear()
+        # Note: Mock pins are shared between mock factories
+        Device.pin_factory.pin(RaspberryPiPinIds.GPIO17).function = 'input'
+        pin_cache.clear()
+
+    @patch('endrpi.actions.sequence.get_bulk_pin_access', return_value=None)
+    def test_sequence_routes(self, _):
+        pin_id = RaspberryPiPinIds.GPIO17
+
+        # Ensure invalid sequences are rejected by validation
+        for sequence in ({'steps': []},
+                         {'steps': [{'pin': pin_id, 'state': 2, 'delay': 0}]},
+                         {'steps': [{'pin': pin_id, 'state': 1, 'delay': -1}]},
+                         {'steps': [{'pin': pin_id, 'state': 1, 'delay': 0}], 'loops': -1},
+                         {'steps': [{'pin': pin_id, 'state': 1, 'delay': 0},
+                                    {'pin': pin_id, 'state': 0, 'delay': 999}], 'loops': 0}):
+            response = self.client.post('/sequences', json.dumps(sequence))
+            self.assertEqual(400, response.status_code)
+
+        # Ensure sequences are started, read, and cancelled
+        sequence = {'steps': [{'pin': pin_id, 'state': 1, 'delay': 50_000},
+                              {'pin': pin_id, 'state': 0, 'delay': 50_000}],
+                    'loops': 0}
+        response = self.client.post('/sequences', json.dumps(sequence))
+        self.assertEqual(200, response.status_code)
+        sequence_id = response.json()['id']
+        self.assertEqual(SequenceState.RUNNING, response.json()['state'])
+        self.assertEqual([pin_id], response.json()['pins'])
+
+        response = self.client.get(f'/sequences/{sequence_id}')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(sequence_id, response.json()['id'])
+        self.assertEqual([sequence_id], [status['id'] for status in self.client.get('/sequences').json()])
+
+        # Ensure pins of a running sequence can't be changed by other requests
+        owner = f'sequence `{sequence_id}`'
+        in_use_message = PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=pin_id, owner=owner)
+        for response in (self.client.put(f'/pins/{pin_id}', json.dumps({'io': 'OUTPUT', 'state': 1})),
+                         self.client.put(f'/pins/{pin_id}/pwm', json.dumps({'frequency': 100, 'dutyCycle': 0.5}))):
+            self.assertEqual(409, response.status_code)
+            self.assertEqual({'message': in_use_message}, response.json())
+        response = self.client.put('/pins', json.dumps({pin_id: {'io': 'OUTPUT', 'state': 1}}))
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(in_use_message, response.json()['pins'][pin_id]['message'])
+
+        response = self.client.delete(f'/sequences/{sequence_id}')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(SequenceState.CANCELLED, response.json()['state'])
+        self.assertGreaterEqual(response.json()['timing']['writes'], 1)
+
+        # Ensure pins are released once the sequence is cancelled
+        response = self.client.put(f'/pins/{pin_id}', json.dumps({'io': 'OUTPUT', 'state': 0}))
+        self.assertEqual(200, response.status_code)
+
+        # Ensure unknown sequences are not found
+        for method in (self.client.get, self.client.delete):
+            response = method('/sequences/999')
+            self.assertEqual(404, response.status_code)
+            self.assertEqual({'message': SequenceMessage.ERROR_NOT_FOUND__SEQUENCE_ID__.format(sequence_id=999)},
+                             response.json())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,7 @@
 #  limitations under the License.
 
 import json
+import tempfile
 import unittest
 from unittest import TestCase
 from unittest.mock import patch
@@ -30,8 +31,12 @@ from endrpi.model.temperature import Temperature
 from endrpi.model.throttle import Throttle
 from endrpi.model.up_time import UpTime
 from endrpi.server import app
+from endrpi.utils.one_wire import OneWirePoller
+from endrpi.utils.sensors import SensorReader, discover_sensor_inputs
 from test.constants import get_valid_system, get_valid_platform, get_valid_temperature, get_valid_throttle, \
     get_valid_uptime, get_valid_frequency, get_valid_memory
+from test.unit.test_utils_one_wire import create_one_wire_sensor
+from test.unit.test_utils_sensors import create_sensor_root
 
 
 class TestSystemRoutes(TestCase):
@@ -315,6 +320,67 @@ class TestSystemRoutes(TestCase):
         self.assertEqual(200, response.status_code)
         self.assertEqual(memory, response_json)
 
+    @patch('endrpi.actions.system.get_one_wire_poller')
+    @patch('endrpi.actions.system.process_output')
+    def test_get_one_wire_temperature_routes(self, process_output_mock, get_one_wire_poller_mock):
+        # Ensure sensors can't be read while polling is disabled
+        get_one_wire_poller_mock.return_value = None
+        response = self.client.get('/system/temperature/one-wire')
+        self.assertEqual(404, response.status_code)
+        self.assertEqual({'message': TemperatureMessage.ERROR_ONE_WIRE_DISABLED}, response.json())
+        response = self.client.get('/system/temperature/one-wire/28-000000000001')
+        self.assertEqual(404, response.status_code)
+
+        with tempfile.TemporaryDirectory() as devices_path:
+            create_one_wire_sensor(devices_path, '28-000000000001', 23125)
+            one_wire_poller = OneWirePoller(devices_path)
+            one_wire_poller.poll()
+            get_one_wire_poller_mock.return_value = one_wire_poller
+
+            # Ensure cached temperatures are returned along with the system on chip temperature
+            process_output_mock.return_value = '20000'
+            response = self.client.get('/system/temperature')
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(['28-000000000001'], [sensor['id'] for sensor in response.json()['oneWire']])
+
+            response = self.client.get('/system/temperature/one-wire')
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(23.125, response.json()[0]['temperature']['quantity'])
+
+            response = self.client.get('/system/temperature/one-wire/28-000000000001')
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(23.125, response.json()['temperature']['quantity'])
+
+            # Ensure sensors that weren't discovered are not found
+            response = self.client.get('/system/temperature/one-wire/28-000000000002')
+            self.assertEqual(404, response.status_code)
+            expected_message = TemperatureMessage.ERROR_ONE_WIRE_NOT_FOUND__SENSOR_ID__
+            expected_message = expected_message.format(sensor_id='28-000000000002')
+            self.assertEqual({'message': expected_message}, response.json())
+
+    @patch('endrpi.actions.system.get_sensor_reader')
+    @patch('endrpi.actions.system.process_output')
+    def test_get_sensors_route(self, process_output_mock, get_sensor_reader_mock):
+        with tempfile.TemporaryDirectory() as root:
+            create_sensor_root(root)
+            sensor_reader = SensorReader(discover_sensor_inputs(root))
+            get_sensor_reader_mock.return_value = sensor_reader
+
+            # Ensure every discovered input is returned
+            response = self.client.get('/system/sensors')
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(7, len(response.json()['sensors']))
+            self.assertEqual({'quantity': 0.85, 'prefix': None, 'unitOfMeasurement': 'VOLT'},
+                             response.json()['sensors'][2]['value'])
+
+            # Ensure temperature inputs are returned along with the system on chip temperature
+            process_output_mock.return_value = '20000'
+            response = self.client.get('/system/temperature')
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(['hwmon0.temp1', 'thermal_zone0'],
+                             [sensor['id'] for sensor in response.json()['sensors']])
+            sensor_reader.close()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -12,19 +12,32 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import time
 import unittest
 from unittest import TestCase
 from unittest.mock import patch, MagicMock
 
+import msgpack
+from fastapi import status
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 from gpiozero import PinUnsupported, Device
-from gpiozero.pins.mock import MockFactory
-
+from gpiozero.pins.mock import MockFactory, MockPWMPin
+
+from endrpi.actions.pin import pin_edge_monitor, pin_cache
+from endrpi.actions.capture import capture_sessions
+from endrpi.actions.sequence import sequence_players
+from endrpi.actions.websocket import WebSocketAction, PIN_EDGE_EVENT
+from endrpi.config.board import get_board
+from endrpi.config.websocket import configure_websocket
 from endrpi.model.measurement import TemperatureUnit, FrequencyUnit, UnitPrefix, InformationUnit
 from endrpi.model.message import WebSocketMessage, TemperatureMessage, ThrottleMessage, UpTimeMessage, \
     FrequencyMessage, MemoryMessage, PinMessage
-from endrpi.model.pin import PinIo, PinPull, RaspberryPiPinIds
-from endrpi.model.websocket import WebSocketAction
+from endrpi.model.pin import PinIo, PinPull, RaspberryPiPinIds, PinEdge, PinUpdateStatus, PwmMode
+from endrpi.model.capture import CaptureState
+from endrpi.model.sequence import SequenceState
+from endrpi.model.websocket import WebSocketOverflowPolicy, WebSocketFrameFormat
+from endrpi.routes.websocket import action_result_cache, broadcast_hub, connection_counts
 from endrpi.server import app
 
 
@@ -43,6 +56,15 @@ class TestWebsocketRoutes(TestCase):
 
         Device.pin_factory = MockFactory()
 
+        # Ensure cached action results and connection counts don't leak between tests
+        action_result_cache.clear()
+        connection_counts.clear()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        configure_websocket()
+
     def test_message_decode(self):
         with self.client.websocket_connect("/") as websocket:
             websocket.send_text('not json')
@@ -143,6 +165,35 @@ class TestWebsocketRoutes(TestCase):
             # Ensure the websocket client is closed
             self.close_websocket_test_client(websocket)
 
+    @patch('endrpi.actions.system.process_output')
+    def test_cached_action(self, process_output_mock):
+        with self.client.websocket_connect("/") as websocket:
+            # Ensure successful results of cacheable actions are reused
+            process_output_mock.return_value = 'throttled=0xF000F'
+            websocket.send_json({'action': WebSocketAction.READ_THROTTLE})
+            response = websocket.receive_json()
+            self.assertTrue(response['success'])
+            self.assertTrue(response['data']['throttling'])
+
+            process_output_mock.return_value = 'throttled=0x0'
+            websocket.send_json({'action': WebSocketAction.READ_THROTTLE})
+            response = websocket.receive_json()
+            self.assertTrue(response['success'])
+            self.assertTrue(response['data']['throttling'])
+            self.assertEqual(1, process_output_mock.call_count)
+
+            # Ensure expired results are read again
+            cached_time, cached_result = action_result_cache[WebSocketAction.READ_THROTTLE.value]
+            action_result_cache[WebSocketAction.READ_THROTTLE.value] = (cached_time - 60, cached_result)
+            websocket.send_json({'action': WebSocketAction.READ_THROTTLE})
+            response = websocket.receive_json()
+            self.assertTrue(response['success'])
+            self.assertFalse(response['data']['throttling'])
+            self.assertEqual(2, process_output_mock.call_count)
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
     @patch('endrpi.actions.system.process_output')
     def test_read_uptime_action(self, process_output_mock):
         with self.client.websocket_connect("/") as websocket:
@@ -244,6 +295,14 @@ class TestWebsocketRoutes(TestCase):
             self.assertEqual({'message': WebSocketMessage.ERROR_INVALID_PARAMS_FIELD}, response['error'])
             self.assertIsNone(response['data'])
 
+            # Ensure pins the board doesn't expose are refused
+            websocket.send_json({'action': WebSocketAction.READ_PIN_CONFIGURATIONS,
+                                 'params': {'pins': [RaspberryPiPinIds.GPIO40]}})
+            response = websocket.receive_json()
+            self.assertFalse(response['success'])
+            self.assertEqual({'message': PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO40)},
+                             response['error'])
+
             # Ensure successful pin actions respond with correct json
             pin_mock = MagicMock()
             pin_mock.function = PinIo.OUTPUT
@@ -251,12 +310,12 @@ class TestWebsocketRoutes(TestCase):
             pin_mock.pull = PinPull.FLOATING
             gpiozero_device_mock.pin_factory.pin.return_value = pin_mock
             websocket.send_json({'action': WebSocketAction.READ_PIN_CONFIGURATIONS,
-                                 'params': {'pins': list(RaspberryPiPinIds)}})
+                                 'params': {'pins': list(get_board().pins)}})
             response = websocket.receive_json()
             self.assertEqual(WebSocketAction.READ_PIN_CONFIGURATIONS, response['action'])
             self.assertTrue(response['success'])
             self.assertIsNone(response['error'])
-            available_pin_ids = list(RaspberryPiPinIds)
+            available_pin_ids = list(get_board().pins)
             for pin_id, pin_configuration in response['data'].items():
                 valid_pin = RaspberryPiPinIds.from_bcm_id(pin_id)
                 self.assertIn(pin_id, available_pin_ids)
@@ -319,8 +378,13 @@ class TestWebsocketRoutes(TestCase):
             self.assertEqual(WebSocketAction.UPDATE_PIN_CONFIGURATIONS, response['action'])
             self.assertFalse(response['success'])
             self.assertEqual({
-                'message': PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO17)},
-                response['error'])
+                'message': PinMessage.ERROR_INVALID_CONFIGURATIONS,
+                'pins': {
+                    RaspberryPiPinIds.GPIO17: {
+                        'status': PinUpdateStatus.INVALID,
+                        'message': PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO17)
+                    }
+                }}, response['error'])
             self.assertIsNone(response['data'])
             gpiozero_device_mock.pin_factory.pin.side_effect = None
 
@@ -345,6 +409,431 @@ class TestWebsocketRoutes(TestCase):
             # Ensure the websocket client is closed
             self.close_websocket_test_client(websocket)
 
+    @patch('endrpi.actions.system.process_output')
+    def test_subscribe_action(self, process_output_mock):
+        configure_websocket(broadcast_interval=0.01)
+        process_output_mock.return_value = '1234 5'
+
+        with self.client.websocket_connect("/") as websocket:
+            # Ensure invalid topics are rejected without subscribing to any topic
+            websocket.send_json({'action': WebSocketAction.SUBSCRIBE,
+                                 'params': {'topics': [WebSocketAction.READ_UPTIME, 'INVALID_TOPIC']}})
+            response = websocket.receive_json()
+            self.assertEqual(WebSocketAction.SUBSCRIBE, response['action'])
+            self.assertFalse(response['success'])
+            self.assertEqual({'message': WebSocketMessage.ERROR_UNKNOWN_TOPIC__TOPIC__.format(topic='INVALID_TOPIC')},
+                             response['error'])
+            self.assertEqual(0, broadcast_hub.subscriber_count(WebSocketAction.READ_UPTIME))
+
+            websocket.send_json({'action': WebSocketAction.SUBSCRIBE, 'params': {'topics': []}})
+            response = websocket.receive_json()
+            self.assertFalse(response['success'])
+            self.assertEqual({'message': WebSocketMessage.ERROR_MISSING_TOPIC}, response['error'])
+
+            # Ensure subscribed topics are pushed as responses of their corresponding action
+            websocket.send_json({'action': WebSocketAction.SUBSCRIBE,
+                                 'params': {'topics': [WebSocketAction.READ_UPTIME, RaspberryPiPinIds.GPIO17]}})
+            response = websocket.receive_json()
+            self.assertEqual(WebSocketAction.SUBSCRIBE, response['action'])
+            self.assertTrue(response['success'])
+            self.assertEqual(WebSocketMessage.SUCCESS_SUBSCRIBED, response['data'])
+
+            pushed_actions = set()
+            while len(pushed_actions) < 2:
+                response = websocket.receive_json()
+                self.assertTrue(response['success'])
+                pushed_actions.add(response['action'])
+                if response['action'] == WebSocketAction.READ_UPTIME:
+                    self.assertEqual(1234, response['data']['seconds'])
+                else:
+                    self.assertEqual(WebSocketAction.READ_PIN_CONFIGURATIONS, response['action'])
+                    self.assertIn(RaspberryPiPinIds.GPIO17, response['data'])
+
+            # Ensure unsubscribed topics are no longer produced
+            websocket.send_json({'action': WebSocketAction.UNSUBSCRIBE,
+                                 'params': {'topics': [WebSocketAction.READ_UPTIME]}})
+            response = websocket.receive_json()
+            while response['action'] != WebSocketAction.UNSUBSCRIBE:
+                response = websocket.receive_json()
+            self.assertTrue(response['success'])
+            self.assertEqual(WebSocketMessage.SUCCESS_UNSUBSCRIBED, response['data'])
+            self.assertEqual(0, broadcast_hub.subscriber_count(WebSocketAction.READ_UPTIME))
+            self.assertEqual(1, broadcast_hub.subscriber_count(RaspberryPiPinIds.GPIO17))
+
+            websocket.send_json({'action': WebSocketAction.UNSUBSCRIBE, 'params': {'topics': []}})
+            response = websocket.receive_json()
+            while response['action'] != WebSocketAction.UNSUBSCRIBE:
+                response = websocket.receive_json()
+            self.assertEqual({'message': WebSocketMessage.ERROR_MISSING_TOPIC}, response['error'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+        # Ensure disconnected websockets are unsubscribed from every topic
+        self.assertEqual(0, broadcast_hub.subscriber_count(RaspberryPiPinIds.GPIO17))
+
+    def test_pin_edge_events(self):
+        # Note: Mock pins are shared between mock factories
+        gpiozero_pin = Device.pin_factory.pin(RaspberryPiPinIds.GPIO17)
+        gpiozero_pin.drive_low()
+
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.SUBSCRIBE,
+                                 'params': {'topics': [f'{RaspberryPiPinIds.GPIO17}.{PinEdge.RISING}']}})
+            response = websocket.receive_json()
+            self.assertTrue(response['success'])
+
+            # Wait for the topic stream to start detecting edges
+            for _ in range(100):
+                if pin_edge_monitor.listener_count(RaspberryPiPinIds.GPIO17):
+                    break
+                time.sleep(0.01)
+
+            # Ensure only subscribed edges of driven pins are pushed as they are detected
+            gpiozero_pin.drive_high()
+            gpiozero_pin.drive_low()
+            gpiozero_pin.drive_high()
+            for _ in range(2):
+                response = websocket.receive_json()
+                self.assertEqual(PIN_EDGE_EVENT, response['action'])
+                self.assertTrue(response['success'])
+                self.assertEqual(RaspberryPiPinIds.GPIO17, response['data']['pin'])
+                self.assertEqual(PinEdge.RISING, response['data']['edge'])
+                self.assertEqual(1, response['data']['state'])
+                self.assertEqual(0, response['data']['droppedEvents'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+        # Ensure edges are no longer detected once every subscriber is gone
+        for _ in range(100):
+            if not pin_edge_monitor.listener_count(RaspberryPiPinIds.GPIO17):
+                break
+            time.sleep(0.01)
+        self.assertEqual(0, pin_edge_monitor.listener_count(RaspberryPiPinIds.GPIO17))
+
+    @patch('endrpi.actions.pin.Device')
+    def test_messagepack_subprotocol(self, gpiozero_device_mock):
+        actions = list(WebSocketAction)
+        with self.client.websocket_connect("/", subprotocols=['unknown', 'endrpi.msgpack']) as websocket:
+            # Ensure the binary subprotocol is negotiated
+            self.assertEqual('endrpi.msgpack', websocket.accepted_subprotocol)
+
+            # Ensure binary requests using compact actions receive binary responses with compact enumerations
+            pin_mock = MagicMock()
+            pin_mock.function = PinIo.OUTPUT
+            pin_mock.state = 1
+            pin_mock.pull = PinPull.FLOATING
+            gpiozero_device_mock.pin_factory.pin.return_value = pin_mock
+            websocket.send_bytes(msgpack.packb({'action': actions.index(WebSocketAction.READ_PIN_CONFIGURATIONS),
+                                                'params': {'pins': [RaspberryPiPinIds.GPIO4.value]}}))
+            response = msgpack.unpackb(websocket.receive_bytes(), raw=False, strict_map_key=False)
+            self.assertEqual(actions.index(WebSocketAction.READ_PIN_CONFIGURATIONS), response['action'])
+            self.assertTrue(response['success'])
+            pin_index = list(RaspberryPiPinIds).index(RaspberryPiPinIds.GPIO4)
+            self.assertEqual({pin_index: {'io': 1, 'state': 1, 'pull': 0}}, response['data'])
+
+            # Ensure text messages are rejected
+            websocket.send_json({'action': WebSocketAction.READ_MEMORY})
+            response = msgpack.unpackb(websocket.receive_bytes(), raw=False)
+            self.assertIsNone(response['action'])
+            self.assertEqual({'message': WebSocketMessage.ERROR_INVALID_DATA}, response['error'])
+
+            # Ensure the connection reports its frame format
+            response = self.client.get('/websocket/connections')
+            self.assertEqual(WebSocketFrameFormat.MESSAGEPACK, response.json()[0]['frameFormat'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+        # Ensure connections without a known subprotocol use JSON
+        with self.client.websocket_connect("/", subprotocols=['unknown']) as websocket:
+            self.assertIsNone(websocket.accepted_subprotocol)
+            websocket.send_json({})
+            response = websocket.receive_json()
+            self.assertEqual({'message': WebSocketMessage.ERROR_MISSING_ACTION_FIELD}, response['error'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+    def test_get_websocket_connections_route(self):
+        configure_websocket(outbound_queue_size=16, overflow_policy=WebSocketOverflowPolicy.DROP_OLDEST)
+
+        # Ensure open connections are listed with their outbound queue status
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({})
+            websocket.receive_json()
+
+            response = self.client.get('/websocket/connections')
+            response_json = response.json()
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(1, len(response_json))
+            self.assertEqual(WebSocketOverflowPolicy.DROP_OLDEST, response_json[0]['overflowPolicy'])
+            self.assertEqual(16, response_json[0]['queueCapacity'])
+            self.assertEqual(0, response_json[0]['queueDepth'])
+            self.assertEqual(1, response_json[0]['sentFrames'])
+            self.assertEqual(0, response_json[0]['droppedFrames'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+        # Ensure closed connections are no longer listed
+        response = self.client.get('/websocket/connections')
+        self.assertEqual([], response.json())
+
+    def test_ping_action(self):
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.PING})
+            response = websocket.receive_json()
+            self.assertEqual(WebSocketAction.PING, response['action'])
+            self.assertTrue(response['success'])
+            self.assertEqual(WebSocketMessage.SUCCESS_PONG, response['data'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+    @patch('endrpi.actions.pin.pwm_outputs.chip_path', '/missing/pwmchip0')
+    def test_pwm_actions(self):
+        # Note: Mock pins are shared between mock factories, PWM pins can't reuse pins created without PWM
+        Device.pin_factory = MockFactory(pin_class=MockPWMPin)
+        Device.pin_factory.reset()
+        pin_id = RaspberryPiPinIds.GPIO16
+
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.UPDATE_PWM,
+                                 'params': {'pins': {pin_id: {'frequency': 50, 'dutyCycle': 0.05}}}})
+            response = websocket.receive_json()
+            self.assertTrue(response['success'])
+            self.assertEqual({pin_id: {'frequency': 50, 'dutyCycle': 0.05, 'mode': PwmMode.SOFTWARE}},
+                             response['data'])
+
+            # Ensure streamed duty cycles are only responded to on errors
+            for duty_cycle in (0.06, 0.07, 0.08):
+                websocket.send_json({'action': WebSocketAction.WRITE_PWM_DUTY_CYCLES,
+                                     'params': {'dutyCycles': {pin_id: duty_cycle}}})
+            websocket.send_json({'action': WebSocketAction.WRITE_PWM_DUTY_CYCLES,
+                                 'params': {'dutyCycles': {RaspberryPiPinIds.GPIO20: 0.5}}})
+            response = websocket.receive_json()
+            self.assertEqual(WebSocketAction.WRITE_PWM_DUTY_CYCLES, response['action'])
+            self.assertEqual(
+                {'message': PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO20)},
+                response['error'])
+
+            websocket.send_json({'action': WebSocketAction.READ_PWM, 'params': {'pins': [pin_id]}})
+            response = websocket.receive_json()
+            self.assertEqual(0.08, response['data'][pin_id]['dutyCycle'])
+            self.assertEqual(0.08, Device.pin_factory.pin(pin_id).state)
+
+            websocket.send_json({'action': WebSocketAction.STOP_PWM, 'params': {'pins': [pin_id]}})
+            response = websocket.receive_json()
+            self.assertTrue(response['success'])
+            self.assertEqual(WebSocketMessage.SUCCESS_PWM_STOPPED, response['data'])
+
+            websocket.send_json({'action': WebSocketAction.STOP_PWM, 'params': {'pins': []}})
+            response = websocket.receive_json()
+            self.assertEqual({'message': WebSocketMessage.ERROR_MISSING_PIN_ID}, response['error'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+        Device.pin_factory.reset()
+
+    @patch('endrpi.actions.sequence.get_bulk_pin_access', return_value=None)
+    def test_sequence_actions(self, _):
+        Device.pin_factory = MockFactory()
+        pin_cache.clear()
+        pin_id = RaspberryPiPinIds.GPIO17
+
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.START_SEQUENCE,
+                                 'params': {'steps': [{'pin': pin_id, 'state': 1, 'delay': 100_000}], 'loops': 0}})
+            response = websocket.receive_json()
+            self.assertTrue(response['success'])
+            sequence_id = response['data']['id']
+
+            websocket.send_json({'action': WebSocketAction.READ_SEQUENCES})
+            response = websocket.receive_json()
+            self.assertEqual([sequence_id], [status['id'] for status in response['data']])
+
+            websocket.send_json({'action': WebSocketAction.CANCEL_SEQUENCE, 'params': {'id': sequence_id}})
+            response = websocket.receive_json()
+            self.assertEqual(SequenceState.CANCELLED, response['data']['state'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+        sequence_players.clear()
+        Device.pin_factory.pin(pin_id).function = 'input'
+        pin_cache.clear()
+
+    @patch('endrpi.actions.capture.get_bulk_pin_access', return_value=None)
+    def test_capture_actions(self, _):
+        Device.pin_factory = MockFactory()
+        pin_cache.clear()
+        capture_configuration = {'pins': [RaspberryPiPinIds.GPIO17], 'rate': 100, 'samples': 8, 'timeout': 60,
+                                 'trigger': {'pin': RaspberryPiPinIds.GPIO17, 'condition': 'RISING'}}
+
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.START_CAPTURE, 'params': capture_configuration})
+            response = websocket.receive_json()
+            self.assertTrue(response['success'])
+            capture_id = response['data']['id']
+
+            websocket.send_json({'action': WebSocketAction.READ_CAPTURES})
+            response = websocket.receive_json()
+            self.assertEqual([CaptureState.ARMED], [status['state'] for status in response['data']])
+
+            websocket.send_json({'action': WebSocketAction.CANCEL_CAPTURE, 'params': {'id': capture_id}})
+            response = websocket.receive_json()
+            self.assertEqual(CaptureState.CANCELLED, response['data']['state'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+        capture_sessions.clear()
+        pin_cache.clear()
+
+    def test_pulse_counter_actions(self):
+        Device.pin_factory = MockFactory()
+        pin_id = RaspberryPiPinIds.GPIO19
+        gpiozero_pin = Device.pin_factory.pin(pin_id)
+        gpiozero_pin.function = 'input'
+        gpiozero_pin.drive_low()
+
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.START_PULSE_COUNTERS, 'params': {'pins': {pin_id: {}}}})
+            response = websocket.receive_json()
+            self.assertEqual(0, response['data'][pin_id]['count'])
+
+            gpiozero_pin.drive_high()
+            websocket.send_json({'action': WebSocketAction.READ_PULSE_COUNTERS,
+                                 'params': {'pins': [pin_id], 'reset': True}})
+            response = websocket.receive_json()
+            self.assertEqual(1, response['data'][pin_id]['count'])
+
+            websocket.send_json({'action': WebSocketAction.STOP_PULSE_COUNTERS, 'params': {'pins': [pin_id]}})
+            response = websocket.receive_json()
+            self.assertEqual(0, response['data'][pin_id]['count'])
+
+            # Ensure errors of a single pin are propagated
+            for action in (WebSocketAction.START_PULSE_COUNTERS, WebSocketAction.STOP_PULSE_COUNTERS):
+                websocket.send_json({'action': action, 'params': {'pins': []}})
+                self.assertEqual({'message': WebSocketMessage.ERROR_MISSING_PIN_ID}, websocket.receive_json()['error'])
+            websocket.send_json({'action': WebSocketAction.STOP_PULSE_COUNTERS, 'params': {'pins': [pin_id]}})
+            self.assertEqual({'message': PinMessage.ERROR_COUNTER_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id)},
+                             websocket.receive_json()['error'])
+            with patch('endrpi.actions.pin.pulse_counters.start', side_effect=PinUnsupported('Pin not supported')):
+                websocket.send_json({'action': WebSocketAction.START_PULSE_COUNTERS,
+                                     'params': {'pins': {pin_id: {}}}})
+                self.assertFalse(websocket.receive_json()['success'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+    def test_pin_edge_filter_actions(self):
+        pin_id = RaspberryPiPinIds.GPIO19
+        configuration = {'policy': 'TRAILING', 'window': 10_000}
+
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.UPDATE_PIN_EDGE_FILTERS,
+                                 'params': {'pins': {pin_id: configuration}}})
+            response = websocket.receive_json()
+            self.assertEqual('TRAILING', response['data'][pin_id]['policy'])
+
+            websocket.send_json({'action': WebSocketAction.READ_PIN_EDGE_FILTERS})
+            self.assertEqual([pin_id], list(websocket.receive_json()['data']))
+
+            websocket.send_json({'action': WebSocketAction.REMOVE_PIN_EDGE_FILTERS, 'params': {'pins': [pin_id]}})
+            self.assertEqual(0, websocket.receive_json()['data'][pin_id]['filteredEdges'])
+
+            # Ensure errors of a single pin are propagated
+            for action in (WebSocketAction.UPDATE_PIN_EDGE_FILTERS, WebSocketAction.REMOVE_PIN_EDGE_FILTERS):
+                websocket.send_json({'action': action, 'params': {'pins': []}})
+                self.assertEqual({'message': WebSocketMessage.ERROR_MISSING_PIN_ID}, websocket.receive_json()['error'])
+            websocket.send_json({'action': WebSocketAction.REMOVE_PIN_EDGE_FILTERS, 'params': {'pins': [pin_id]}})
+            self.assertEqual({'message': PinMessage.ERROR_FILTER_NOT_SET__PIN_ID__.format(pin_id=pin_id)},
+                             websocket.receive_json()['error'])
+            with patch('endrpi.actions.pin.pin_edge_monitor.set_filter', side_effect=RuntimeError('No edges')):
+                websocket.send_json({'action': WebSocketAction.UPDATE_PIN_EDGE_FILTERS,
+                                     'params': {'pins': {pin_id: configuration}}})
+                self.assertFalse(websocket.receive_json()['success'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+    def test_idle_timeout(self):
+        configure_websocket(idle_timeout=0.05)
+
+        # Ensure connections that keep sending messages stay open
+        with self.client.websocket_connect("/") as websocket:
+            for _ in range(3):
+                websocket.send_json({'action': WebSocketAction.PING})
+                self.assertTrue(websocket.receive_json()['success'])
+
+            # Ensure idle connections are evicted
+            with self.assertRaises(WebSocketDisconnect) as context:
+                websocket.receive_json()
+            self.assertEqual(status.WS_1001_GOING_AWAY, context.exception.code)
+
+        response = self.client.get('/websocket/capacity')
+        self.assertEqual(0, response.json()['connections'])
+        self.assertEqual(1, response.json()['evictedConnections'])
+
+    def test_connection_limits(self):
+        # Ensure connections beyond the per client limit are rejected with a policy violation
+        configure_websocket(max_connections_per_client=1)
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.PING})
+            websocket.receive_json()
+
+            with self.client.websocket_connect("/") as rejected_websocket:
+                with self.assertRaises(WebSocketDisconnect) as context:
+                    rejected_websocket.receive_json()
+                self.assertEqual(status.WS_1008_POLICY_VIOLATION, context.exception.code)
+
+            # Ensure the open connection is unaffected
+            websocket.send_json({'action': WebSocketAction.PING})
+            self.assertTrue(websocket.receive_json()['success'])
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+        # Ensure connections beyond the global limit are asked to try again later
+        configure_websocket(max_connections=1)
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.PING})
+            websocket.receive_json()
+
+            with self.client.websocket_connect("/") as rejected_websocket:
+                with self.assertRaises(WebSocketDisconnect) as context:
+                    rejected_websocket.receive_json()
+                self.assertEqual(status.WS_1013_TRY_AGAIN_LATER, context.exception.code)
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
+    def test_get_websocket_capacity_route(self):
+        configure_websocket(max_connections=4, max_connections_per_client=2)
+
+        # Ensure open connections are counted per client along with the limits
+        with self.client.websocket_connect("/") as websocket:
+            websocket.send_json({'action': WebSocketAction.PING})
+            websocket.receive_json()
+
+            response = self.client.get('/websocket/capacity')
+            self.assertEqual(200, response.status_code)
+            self.assertEqual({
+                'connections': 1,
+                'maxConnections': 4,
+                'maxConnectionsPerClient': 2,
+                'clients': {'testclient': 1},
+                'rejectedConnections': 0,
+                'evictedConnections': 0
+            }, response.json())
+
+            # Ensure the websocket client is closed
+            self.close_websocket_test_client(websocket)
+
 
 if __name__ == '__main__':
     unittest.main()
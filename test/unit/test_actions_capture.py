@@ -0,0 +1,126 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from gpiozero import Device, PinUnsupported
+from gpiozero.pins.mock import MockFactory
+
+from endrpi.actions.capture import start_capture, read_capture_statuses, read_capture_status, cancel_capture, \
+    read_capture_data, capture_sessions
+from endrpi.actions.pin import pin_cache
+from endrpi.model.capture import CaptureConfiguration, CaptureFormat, CaptureState, CaptureTrigger, \
+    CaptureTriggerCondition
+from endrpi.model.message import CaptureMessage, PinMessage
+from endrpi.model.pin import RaspberryPiPinIds
+
+
+class TestCaptureActions(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        Device.pin_factory = MockFactory()
+        pin_cache.clear()
+        capture_sessions.clear()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        for session in capture_sessions.values():
+            session.cancel()
+        capture_sessions.clear()
+        pin_cache.clear()
+
+    @patch('endrpi.actions.capture.get_bulk_pin_access', return_value=None)
+    def test_start_capture(self, _):
+        # Note: Mock pins are shared between mock factories, so captured pins start as low inputs
+        for pin_id in (RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO27):
+            Device.pin_factory.pin(pin_id).function = 'input'
+            Device.pin_factory.pin(pin_id).drive_low()
+
+        # Ensure pins are read through the pin factory without registers, including the trigger pin
+        Device.pin_factory.pin(RaspberryPiPinIds.GPIO4).drive_high()
+        trigger = CaptureTrigger(pin=RaspberryPiPinIds.GPIO4, condition=CaptureTriggerCondition.HIGH)
+        capture_configuration = CaptureConfiguration(pins=[RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO27],
+                                                     rate=10_000, samples=3, trigger=trigger)
+        action_result = start_capture(capture_configuration)
+        self.assertTrue(action_result.success)
+        capture_id = action_result.data.id
+        capture_sessions[capture_id].join(5)
+
+        capture_status = read_capture_status(capture_id).data
+        self.assertEqual(CaptureState.COMPLETED, capture_status.state)
+        self.assertEqual(0, capture_status.triggerSample)
+        self.assertEqual(bytes([0]), read_capture_data(capture_id, CaptureFormat.BINARY).data)
+        self.assertIn('$var wire 1 " GPIO27 $end', read_capture_data(capture_id, CaptureFormat.VCD).data)
+        self.assertEqual([capture_id], [status.id for status in read_capture_statuses().data])
+        Device.pin_factory.pin(RaspberryPiPinIds.GPIO4).drive_low()
+
+        # Ensure unknown captures are not found
+        for action in (read_capture_status, cancel_capture):
+            action_result = action(999)
+            self.assertEqual(CaptureMessage.ERROR_NOT_FOUND__CAPTURE_ID__.format(capture_id=999),
+                             action_result.error.message)
+        action_result = read_capture_data(999, CaptureFormat.BINARY)
+        self.assertEqual(CaptureMessage.ERROR_NOT_FOUND__CAPTURE_ID__.format(capture_id=999),
+                         action_result.error.message)
+
+        # Ensure unsupported pins are propagated to the result
+        with patch('endrpi.actions.capture.pin_cache.pin', side_effect=PinUnsupported('Pin not supported')):
+            action_result = start_capture(capture_configuration)
+            self.assertEqual(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO17),
+                             action_result.error.message)
+
+    @patch('endrpi.actions.capture.get_bulk_pin_access')
+    def test_start_register_capture(self, get_bulk_pin_access_mock):
+        get_bulk_pin_access_mock.return_value.read_levels.return_value = 1 << 27
+
+        # Ensure samples are read from the level register
+        capture_configuration = CaptureConfiguration(pins=[RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO27],
+                                                     rate=10_000, samples=4)
+        action_result = start_capture(capture_configuration)
+        capture_sessions[action_result.data.id].join(5)
+        self.assertEqual(bytes([0b10101010]), read_capture_data(action_result.data.id, CaptureFormat.BINARY).data)
+        self.assertEqual(4, get_bulk_pin_access_mock.return_value.read_levels.call_count)
+
+    @patch('endrpi.actions.capture.get_bulk_pin_access', return_value=None)
+    def test_cancel_capture(self, _):
+        trigger = CaptureTrigger(pin=RaspberryPiPinIds.GPIO4, condition=CaptureTriggerCondition.RISING)
+        capture_configuration = CaptureConfiguration(pins=[RaspberryPiPinIds.GPIO4], rate=100, samples=10,
+                                                     trigger=trigger, timeout=60)
+        action_result = start_capture(capture_configuration)
+        capture_id = action_result.data.id
+        self.assertEqual(CaptureState.ARMED, action_result.data.state)
+
+        # Ensure only one capture runs at a time and samples are only read once it finishes
+        self.assertEqual(CaptureMessage.ERROR_RUNNING, start_capture(capture_configuration).error.message)
+        self.assertEqual(CaptureMessage.ERROR_NOT_FINISHED__CAPTURE_ID__.format(capture_id=capture_id),
+                         read_capture_data(capture_id, CaptureFormat.BINARY).error.message)
+
+        action_result = cancel_capture(capture_id)
+        self.assertEqual(CaptureState.CANCELLED, action_result.data.state)
+        self.assertTrue(read_capture_data(capture_id, CaptureFormat.BINARY).success)
+
+        # Ensure only the newest finished captures are kept
+        with patch('endrpi.actions.capture.CAPTURE_HISTORY_SIZE', 0):
+            action_result = start_capture(capture_configuration)
+        self.assertNotIn(capture_id, capture_sessions)
+        self.assertIn(action_result.data.id, capture_sessions)
+
+
+if __name__ == '__main__':
+    unittest.main()
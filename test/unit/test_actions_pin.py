@@ -12,17 +12,31 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import asyncio
+import json
+import os
+import tempfile
+import threading
 import unittest
 from unittest import TestCase
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, PropertyMock
 
-from gpiozero import Device, PinUnsupported
-from gpiozero.pins.mock import MockFactory
+from gpiozero import Device, PinUnsupported, PinEdgeDetectUnsupported
+from gpiozero.pins.mock import MockFactory, MockPWMPin
 from pydantic import ValidationError, BaseModel
 
-from endrpi.actions.pin import read_pin_configurations, read_pin_configuration, update_pin_configuration
+from endrpi.actions.pin import read_pin_configurations, read_pin_configuration, update_pin_configuration, \
+    stream_pin_edge_events, pin_edge_monitor, update_pin_configurations, pin_cache, read_pwm_status, \
+    read_pwm_statuses, update_pwm, write_pwm_duty_cycles, stop_pwm, read_pulse_counters, read_pulse_counter, \
+    start_pulse_counter, stop_pulse_counter, read_pin_edge_filters, read_pin_edge_filter, update_pin_edge_filter, \
+    remove_pin_edge_filter, restore_pin_configurations, pin_locks
+from endrpi.config.pin_snapshot import configure_pin_snapshot
+from endrpi.utils.board import Board, COMPUTE_MODULE_PIN_TABLE, HEADER_40_PIN_TABLE
+from endrpi.utils.gpio_registers import GpioBank
 from endrpi.model.message import MessageData, PinMessage
-from endrpi.model.pin import PinIo, PinPull, RaspberryPiPinIds, PinConfiguration
+from endrpi.model.pin import PinIo, PinPull, RaspberryPiPinIds, PinConfiguration, PinEdge, PinUpdateOutcome, \
+    PinUpdateStatus, PwmConfiguration, PwmMode, PwmStatus, PulseCounterConfiguration, PinEdgeFilterConfiguration, \
+    PinEdgeFilterPolicy
 
 
 class TestPinActions(TestCase):
@@ -32,11 +46,21 @@ class TestPinActions(TestCase):
 
         Device.pin_factory = MockFactory()
 
+    @patch('endrpi.actions.pin.get_board', return_value=Board(None, COMPUTE_MODULE_PIN_TABLE))
     @patch('endrpi.actions.pin.Device.pin_factory.pin')
-    def test_read_pin_configurations(self, gpiozero_pin_mock):
+    def test_read_pin_configurations(self, gpiozero_pin_mock, get_board_mock):
+        # Ensure pins the board doesn't expose are refused before any pin is read
+        get_board_mock.return_value = Board(None, HEADER_40_PIN_TABLE)
+        action_result = read_pin_configurations([RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO40])
+        self.assertEqual({'message': PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO40)},
+                         action_result.error)
+        gpiozero_pin_mock.assert_not_called()
+        get_board_mock.return_value = Board(None, COMPUTE_MODULE_PIN_TABLE)
+
         # Ensure pin config read errors are propagated to the result
         pin_ids = list(RaspberryPiPinIds)
         gpiozero_pin_mock.side_effect = PinUnsupported('Pin not supported')
+        pin_cache.clear()
         action_result = read_pin_configurations(pin_ids)
         self.assertFalse(action_result.success)
         self.assertIsNone(action_result.data)
@@ -44,6 +68,7 @@ class TestPinActions(TestCase):
             'message': PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_ids[0])
         }, action_result.error)
         gpiozero_pin_mock.side_effect = None
+        pin_cache.clear()
 
         # Ensure validation errors are propagated
         with patch.object(PinConfiguration, '__init__', side_effect=ValidationError(['Failed validation'], BaseModel)):
@@ -53,6 +78,7 @@ class TestPinActions(TestCase):
             pin_mock.state = 1
             pin_mock.pull = PinPull.FLOATING
             gpiozero_pin_mock.return_value = pin_mock
+            pin_cache.clear()
             action_result = read_pin_configurations(pin_ids)
             self.assertFalse(action_result.success)
             self.assertIsNone(action_result.data)
@@ -65,6 +91,7 @@ class TestPinActions(TestCase):
         pin_mock.state = 1
         pin_mock.pull = PinPull.FLOATING
         gpiozero_pin_mock.return_value = pin_mock
+        pin_cache.clear()
         action_result = read_pin_configurations(pin_ids)
         self.assertTrue(action_result.success)
         self.assertEqual(len(list(RaspberryPiPinIds)), len(action_result.data.keys()))
@@ -82,6 +109,7 @@ class TestPinActions(TestCase):
         pin_mock.state = 0
         pin_mock.pull = PinPull.UP
         gpiozero_pin_mock.return_value = pin_mock
+        pin_cache.clear()
         action_result = read_pin_configurations(pin_ids)
         self.assertTrue(action_result.success)
         self.assertEqual(len(list(RaspberryPiPinIds)), len(action_result.data.keys()))
@@ -99,6 +127,7 @@ class TestPinActions(TestCase):
         pin_mock.state = 0
         pin_mock.pull = PinPull.UP
         gpiozero_pin_mock.return_value = pin_mock
+        pin_cache.clear()
         action_result = read_pin_configurations(pin_ids)
         self.assertTrue(action_result.success)
         self.assertEqual(0, len(action_result.data.keys()))
@@ -109,12 +138,14 @@ class TestPinActions(TestCase):
     def test_read_pin_configuration(self, gpiozero_pin_mock):
         # Ensure pin config read errors are propagated
         gpiozero_pin_mock.side_effect = PinUnsupported('Pin not supported')
+        pin_cache.clear()
         action_result = read_pin_configuration(RaspberryPiPinIds.GPIO17)
         self.assertFalse(action_result.success)
         self.assertIsNone(action_result.data)
         self.assertEqual({'message': PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO17)},
                          action_result.error)
         gpiozero_pin_mock.side_effect = None
+        pin_cache.clear()
 
         # Ensure validation errors are propagated
         with patch.object(PinConfiguration, '__init__', side_effect=ValidationError(['Failed validation'], BaseModel)):
@@ -123,6 +154,7 @@ class TestPinActions(TestCase):
             pin_mock.state = 1
             pin_mock.pull = PinPull.FLOATING
             gpiozero_pin_mock.return_value = pin_mock
+            pin_cache.clear()
             action_result = read_pin_configuration(RaspberryPiPinIds.GPIO2)
             self.assertFalse(action_result.success)
             self.assertIsNone(action_result.data)
@@ -134,6 +166,7 @@ class TestPinActions(TestCase):
         pin_mock.state = 1
         pin_mock.pull = PinPull.FLOATING
         gpiozero_pin_mock.return_value = pin_mock
+        pin_cache.clear()
         action_result = read_pin_configuration(RaspberryPiPinIds.GPIO2)
         self.assertTrue(action_result.success)
         self.assertEqual(PinIo.OUTPUT, action_result.data.io)
@@ -147,6 +180,7 @@ class TestPinActions(TestCase):
         pin_mock.state = 0
         pin_mock.pull = PinPull.DOWN
         gpiozero_pin_mock.return_value = pin_mock
+        pin_cache.clear()
         action_result = read_pin_configuration(RaspberryPiPinIds.GPIO27)
         self.assertTrue(action_result.success)
         self.assertEqual(PinIo.INPUT, action_result.data.io)
@@ -158,6 +192,7 @@ class TestPinActions(TestCase):
     def test_update_pin_configuration(self, gpiozero_pin_mock):
         # Ensure unknown pin errors are propagated
         gpiozero_pin_mock.side_effect = PinUnsupported('Pin not supported')
+        pin_cache.clear()
         pin_configuration = PinConfiguration(io=PinIo.INPUT, state=1, pull=PinPull.UP)
         action_result = update_pin_configuration(RaspberryPiPinIds.GPIO17, pin_configuration)
         self.assertFalse(action_result.success)
@@ -165,9 +200,11 @@ class TestPinActions(TestCase):
         self.assertEqual({'message': PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO17)},
                          action_result.error)
         gpiozero_pin_mock.side_effect = None
+        pin_cache.clear()
 
         # Ensure missing parameter errors are propagated
         gpiozero_pin_mock.return_value = MagicMock()
+        pin_cache.clear()
         pin_configuration = PinConfiguration(io=PinIo.INPUT)
         action_result = update_pin_configuration(RaspberryPiPinIds.GPIO17, pin_configuration)
         self.assertFalse(action_result.success)
@@ -178,6 +215,7 @@ class TestPinActions(TestCase):
         self.assertEqual({'message': PinMessage.ERROR_NO_INPUT_PULL}, action_result.error)
 
         gpiozero_pin_mock.return_value = MagicMock()
+        pin_cache.clear()
         pin_configuration = PinConfiguration(io=PinIo.OUTPUT)
         action_result = update_pin_configuration(RaspberryPiPinIds.GPIO17, pin_configuration)
         self.assertFalse(action_result.success)
@@ -189,6 +227,7 @@ class TestPinActions(TestCase):
 
         # Ensure valid parameters are correctly set
         gpiozero_pin_mock.return_value = MagicMock()
+        pin_cache.clear()
         pin_configuration = PinConfiguration(io=PinIo.INPUT, state=1, pull=PinPull.UP)
         action_result = update_pin_configuration(RaspberryPiPinIds.GPIO17, pin_configuration)
         self.assertTrue(action_result.success)
@@ -201,6 +240,7 @@ class TestPinActions(TestCase):
         self.assertIsNone(action_result.error)
 
         gpiozero_pin_mock.return_value = MagicMock()
+        pin_cache.clear()
         pin_configuration = PinConfiguration(io=PinIo.INPUT, state=0, pull=PinPull.DOWN)
         action_result = update_pin_configuration(RaspberryPiPinIds.GPIO17, pin_configuration)
         self.assertTrue(action_result.success)
@@ -213,6 +253,7 @@ class TestPinActions(TestCase):
         self.assertIsNone(action_result.error)
 
         gpiozero_pin_mock.return_value = MagicMock()
+        pin_cache.clear()
         pin_configuration = PinConfiguration(io=PinIo.OUTPUT, state=0, pull=PinPull.DOWN)
         action_result = update_pin_configuration(RaspberryPiPinIds.GPIO17, pin_configuration)
         self.assertTrue(action_result.success)
@@ -225,6 +266,7 @@ class TestPinActions(TestCase):
         self.assertIsNone(action_result.error)
 
         gpiozero_pin_mock.return_value = MagicMock()
+        pin_cache.clear()
         pin_configuration = PinConfiguration(io=PinIo.OUTPUT, state=1, pull=PinPull.FLOATING)
         action_result = update_pin_configuration(RaspberryPiPinIds.GPIO17, pin_configuration)
         self.assertTrue(action_result.success)
@@ -236,6 +278,461 @@ class TestPinActions(TestCase):
         self.assertIsInstance(gpiozero_pin_mock().pull, MagicMock)
         self.assertIsNone(action_result.error)
 
+    def test_pin_configuration_shadow(self):
+        gpiozero_pin = Device.pin_factory.pin(RaspberryPiPinIds.GPIO26)
+        gpiozero_pin.drive_low()
+
+        # Ensure input pins keep their shadowed pull while their state is read from the pin
+        pin_configuration = PinConfiguration(io=PinIo.INPUT, pull=PinPull.UP)
+        self.assertTrue(update_pin_configuration(RaspberryPiPinIds.GPIO26, pin_configuration).success)
+        self.assertEqual(PinConfiguration(io=PinIo.INPUT, pull=PinPull.UP), pin_cache.shadow(RaspberryPiPinIds.GPIO26))
+        gpiozero_pin.drive_high()
+        action_result = read_pin_configuration(RaspberryPiPinIds.GPIO26)
+        self.assertEqual(PinConfiguration(io=PinIo.INPUT, state=1, pull=PinPull.UP), action_result.data)
+        gpiozero_pin.drive_low()
+        action_result = read_pin_configuration(RaspberryPiPinIds.GPIO26)
+        self.assertEqual(PinConfiguration(io=PinIo.INPUT, state=0, pull=PinPull.UP), action_result.data)
+
+        # Ensure output pins are answered from the shadow without reading the pin
+        pin_configuration = PinConfiguration(io=PinIo.OUTPUT, state=1)
+        self.assertTrue(update_pin_configuration(RaspberryPiPinIds.GPIO26, pin_configuration).success)
+        with patch.object(type(gpiozero_pin), 'state', new_callable=PropertyMock) as state_mock:
+            action_result = read_pin_configuration(RaspberryPiPinIds.GPIO26)
+            state_mock.assert_not_called()
+        self.assertEqual(PinConfiguration(io=PinIo.OUTPUT, state=1, pull=PinPull.UP), action_result.data)
+
+        # Ensure pins without a shadow are read from the pin once and shadowed
+        pin_cache.invalidate(RaspberryPiPinIds.GPIO26)
+        action_result = read_pin_configuration(RaspberryPiPinIds.GPIO26)
+        self.assertEqual(PinIo.OUTPUT, action_result.data.io)
+        self.assertEqual(1, action_result.data.state)
+        self.assertEqual(action_result.data, pin_cache.shadow(RaspberryPiPinIds.GPIO26))
+
+        # Note: Mock pins are shared between mock factories
+        gpiozero_pin.function = 'input'
+        pin_cache.clear()
+
+    def test_stream_pin_edge_events(self):
+        loop = asyncio.new_event_loop()
+
+        async def read_events():
+            # Note: Mock pins are shared between mock factories
+            gpiozero_pin = Device.pin_factory.pin(RaspberryPiPinIds.GPIO17)
+            gpiozero_pin.drive_low()
+            stream = stream_pin_edge_events(RaspberryPiPinIds.GPIO17, PinEdge.BOTH, queue_size=2)
+
+            # Ensure detected edges are yielded as timestamped events
+            next_event = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0)
+            gpiozero_pin.drive_high()
+            action_result = await next_event
+            self.assertTrue(action_result.success)
+            self.assertEqual(RaspberryPiPinIds.GPIO17, action_result.data.pin)
+            self.assertEqual(PinEdge.RISING, action_result.data.edge)
+            self.assertEqual(1, action_result.data.state)
+            self.assertGreater(action_result.data.timestamp, 0)
+            self.assertEqual(0, action_result.data.droppedEvents)
+
+            # Ensure events beyond the queue size are dropped and counted by the next event
+            for _ in range(3):
+                gpiozero_pin.drive_low()
+                gpiozero_pin.drive_high()
+            first_event = (await stream.__anext__()).data
+            second_event = (await stream.__anext__()).data
+            self.assertEqual((PinEdge.FALLING, 4), (first_event.edge, first_event.droppedEvents))
+            self.assertEqual((PinEdge.RISING, 0), (second_event.edge, second_event.droppedEvents))
+
+            # Ensure closing the stream stops detecting edges
+            await stream.aclose()
+            self.assertEqual(0, pin_edge_monitor.listener_count(RaspberryPiPinIds.GPIO17))
+            self.assertIsNone(gpiozero_pin.when_changed)
+
+        async def read_errors(error: Exception, message: str):
+            with patch('endrpi.utils.pin_edge.Device.pin_factory.pin', side_effect=error):
+                action_results = [action_result async for action_result in
+                                  stream_pin_edge_events(RaspberryPiPinIds.GPIO17, PinEdge.BOTH, queue_size=2)]
+            self.assertEqual(1, len(action_results))
+            self.assertFalse(action_results[0].success)
+            self.assertEqual({'message': message.format(pin_id=RaspberryPiPinIds.GPIO17)}, action_results[0].error)
+
+        loop.run_until_complete(read_events())
+
+        # Ensure unsupported pins and pins without edge detection end the stream with an error
+        loop.run_until_complete(read_errors(PinUnsupported('Pin not supported'),
+                                            PinMessage.ERROR_UNSUPPORTED__PIN_ID__))
+        loop.run_until_complete(read_errors(PinEdgeDetectUnsupported('Edges not supported'),
+                                            PinMessage.ERROR_EDGE_DETECTION__PIN_ID__))
+        loop.close()
+
+    @patch('endrpi.actions.pin.get_board', return_value=Board(None, COMPUTE_MODULE_PIN_TABLE))
+    @patch('endrpi.actions.pin.get_bulk_pin_access')
+    def test_read_register_pin_configurations(self, get_bulk_pin_access_mock, _get_board_mock):
+        # GPIO17 and GPIO27 outputs with GPIO17 high, GPIO4 input pulled up, GPIO18 input pulled down
+        gpio_bank = GpioBank(functions=(0, 1 << 21, 1 << 21, 0), levels=(1 << 17) | (1 << 4),
+                             pulls=(0b01 << 8, 0b10 << 4))
+        get_bulk_pin_access_mock.return_value.read_bank.return_value = gpio_bank
+
+        # Ensure every pin is read from a single register snapshot
+        pin_ids = list(RaspberryPiPinIds)
+        action_result = read_pin_configurations(pin_ids)
+        self.assertTrue(action_result.success)
+        self.assertEqual(pin_ids, list(action_result.data.keys()))
+        get_bulk_pin_access_mock.return_value.read_bank.assert_called_once()
+        self.assertEqual(PinConfiguration(io=PinIo.OUTPUT, state=1, pull=PinPull.FLOATING),
+                         action_result.data[RaspberryPiPinIds.GPIO17])
+        self.assertEqual(PinConfiguration(io=PinIo.OUTPUT, state=0, pull=PinPull.FLOATING),
+                         action_result.data[RaspberryPiPinIds.GPIO27])
+        self.assertEqual(PinConfiguration(io=PinIo.INPUT, state=1, pull=PinPull.UP),
+                         action_result.data[RaspberryPiPinIds.GPIO4])
+        self.assertEqual(PinConfiguration(io=PinIo.INPUT, state=0, pull=PinPull.DOWN),
+                         action_result.data[RaspberryPiPinIds.GPIO18])
+
+        # Ensure pins beyond the first bank are read from gpiozero
+        Device.pin_factory.pin(RaspberryPiPinIds.GPIO40).function = 'output'
+        pin_cache.invalidate(RaspberryPiPinIds.GPIO40)
+        action_result = read_pin_configurations([RaspberryPiPinIds.GPIO40])
+        self.assertEqual(PinIo.OUTPUT, action_result.data[RaspberryPiPinIds.GPIO40].io)
+        Device.pin_factory.pin(RaspberryPiPinIds.GPIO40).function = 'input'
+
+        # Ensure pulls are read from gpiozero when the pull registers can't be read
+        get_bulk_pin_access_mock.return_value.read_bank.return_value = gpio_bank._replace(pulls=None)
+        Device.pin_factory.pin(RaspberryPiPinIds.GPIO18).pull = 'down'
+        action_result = read_pin_configurations([RaspberryPiPinIds.GPIO18])
+        self.assertTrue(action_result.success)
+        self.assertEqual(PinPull.DOWN, action_result.data[RaspberryPiPinIds.GPIO18].pull)
+        Device.pin_factory.pin(RaspberryPiPinIds.GPIO18).pull = 'floating'
+
+        # Ensure pins set to an alternate function cause an error result
+        alternate_function_bank = gpio_bank._replace(functions=(0b100 << 6, 0, 0, 0))
+        get_bulk_pin_access_mock.return_value.read_bank.return_value = alternate_function_bank
+        action_result = read_pin_configurations([RaspberryPiPinIds.GPIO4, RaspberryPiPinIds.GPIO2])
+        self.assertFalse(action_result.success)
+        error_message = PinMessage.ERROR_ALTERNATE_FUNCTION__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO2)
+        self.assertEqual({'message': error_message}, action_result.error)
+
+        # Ensure the snapshot waits until the read pins are no longer being updated
+        read_bank_mock = get_bulk_pin_access_mock.return_value.read_bank
+        read_bank_mock.reset_mock()
+        with pin_locks.write(RaspberryPiPinIds.GPIO4):
+            reader = threading.Thread(target=read_pin_configurations, args=([RaspberryPiPinIds.GPIO4],))
+            reader.start()
+            reader.join(0.05)
+            self.assertTrue(reader.is_alive())
+            read_bank_mock.assert_not_called()
+        reader.join(5)
+        read_bank_mock.assert_called_once()
+
+    @patch('endrpi.actions.pin.get_bulk_pin_access', return_value=None)
+    def test_update_pin_configurations(self, _get_bulk_pin_access_mock):
+        def outcome(status: PinUpdateStatus, message: PinMessage, pin_id: RaspberryPiPinIds) -> PinUpdateOutcome:
+            return PinUpdateOutcome(status=status, message=message.format(pin_id=pin_id))
+
+        # Ensure every pin is updated and the outcome of every pin is reported
+        pin_configuration_map = {
+            RaspberryPiPinIds.GPIO5: PinConfiguration(io=PinIo.OUTPUT, state=1),
+            RaspberryPiPinIds.GPIO6: PinConfiguration(io=PinIo.INPUT, pull=PinPull.UP)
+        }
+        action_result = update_pin_configurations(pin_configuration_map)
+        self.assertTrue(action_result.success)
+        self.assertEqual({
+            RaspberryPiPinIds.GPIO5: outcome(PinUpdateStatus.UPDATED, PinMessage.SUCCESS_UPDATED__PIN_ID__,
+                                             RaspberryPiPinIds.GPIO5),
+            RaspberryPiPinIds.GPIO6: outcome(PinUpdateStatus.UPDATED, PinMessage.SUCCESS_UPDATED__PIN_ID__,
+                                             RaspberryPiPinIds.GPIO6)
+        }, action_result.data)
+        self.assertEqual('output', Device.pin_factory.pin(RaspberryPiPinIds.GPIO5).function)
+        self.assertEqual('up', Device.pin_factory.pin(RaspberryPiPinIds.GPIO6).pull)
+
+        # Ensure no pin is updated when any configuration is invalid
+        pin_configuration_map = {
+            RaspberryPiPinIds.GPIO13: PinConfiguration(io=PinIo.OUTPUT, state=1),
+            RaspberryPiPinIds.GPIO19: PinConfiguration(io=PinIo.OUTPUT)
+        }
+        action_result = update_pin_configurations(pin_configuration_map)
+        self.assertFalse(action_result.success)
+        self.assertEqual(PinMessage.ERROR_INVALID_CONFIGURATIONS, action_result.error.message)
+        self.assertEqual({
+            RaspberryPiPinIds.GPIO13: outcome(PinUpdateStatus.SKIPPED, PinMessage.SKIPPED_UPDATE__PIN_ID__,
+                                              RaspberryPiPinIds.GPIO13),
+            RaspberryPiPinIds.GPIO19: PinUpdateOutcome(status=PinUpdateStatus.INVALID,
+                                                       message=PinMessage.ERROR_NO_OUTPUT_STATE)
+        }, action_result.error.pins)
+        self.assertEqual('input', Device.pin_factory.pin(RaspberryPiPinIds.GPIO13).function)
+
+        # Ensure an update error on a single pin doesn't stop the remaining updates
+        # Note: GPIO2 has a fixed pull up
+        pin_configuration_map = {
+            RaspberryPiPinIds.GPIO2: PinConfiguration(io=PinIo.INPUT, pull=PinPull.DOWN),
+            RaspberryPiPinIds.GPIO13: PinConfiguration(io=PinIo.OUTPUT, state=0)
+        }
+        action_result = update_pin_configurations(pin_configuration_map)
+        self.assertFalse(action_result.success)
+        self.assertEqual(PinMessage.ERROR_UPDATES_FAILED, action_result.error.message)
+        self.assertEqual({
+            RaspberryPiPinIds.GPIO2: outcome(PinUpdateStatus.FAILED, PinMessage.ERROR_UPDATE__PIN_ID__,
+                                             RaspberryPiPinIds.GPIO2),
+            RaspberryPiPinIds.GPIO13: outcome(PinUpdateStatus.UPDATED, PinMessage.SUCCESS_UPDATED__PIN_ID__,
+                                              RaspberryPiPinIds.GPIO13)
+        }, action_result.error.pins)
+        self.assertEqual('output', Device.pin_factory.pin(RaspberryPiPinIds.GPIO13).function)
+        self.assertIsNone(pin_cache.shadow(RaspberryPiPinIds.GPIO2))
+
+        # Note: Mock pins are shared between mock factories
+        for pin_id in (RaspberryPiPinIds.GPIO5, RaspberryPiPinIds.GPIO6, RaspberryPiPinIds.GPIO13):
+            Device.pin_factory.pin(pin_id).function = 'input'
+        pin_cache.clear()
+
+    @patch('endrpi.actions.pin.get_bulk_pin_access')
+    def test_update_register_pin_configurations(self, get_bulk_pin_access_mock):
+        gpio_registers_mock = get_bulk_pin_access_mock.return_value
+        pin_configuration_map = {
+            RaspberryPiPinIds.GPIO17: PinConfiguration(io=PinIo.OUTPUT, state=1),
+            RaspberryPiPinIds.GPIO27: PinConfiguration(io=PinIo.OUTPUT, state=0),
+            RaspberryPiPinIds.GPIO22: PinConfiguration(io=PinIo.OUTPUT, state=1),
+            RaspberryPiPinIds.GPIO4: PinConfiguration(io=PinIo.INPUT, pull=PinPull.DOWN)
+        }
+
+        # Ensure output states are written with a single set and clear register write
+        action_result = update_pin_configurations(pin_configuration_map)
+        self.assertTrue(action_result.success)
+        gpio_registers_mock.write_levels.assert_called_once_with((1 << 17) | (1 << 22), 1 << 27)
+
+        # Ensure functions and pulls are updated through gpiozero
+        for pin_id, pin_configuration in pin_configuration_map.items():
+            gpiozero_pin = Device.pin_factory.pin(pin_id)
+            self.assertEqual(pin_configuration.io.lower(), gpiozero_pin.function)
+        self.assertEqual('down', Device.pin_factory.pin(RaspberryPiPinIds.GPIO4).pull)
+
+        # Ensure no pin is updated when any configuration is invalid
+        invalid_configuration_maps = [
+            ({RaspberryPiPinIds.GPIO5: PinConfiguration(io=PinIo.OUTPUT, state=1),
+              RaspberryPiPinIds.GPIO6: PinConfiguration(io=PinIo.OUTPUT)}, PinMessage.ERROR_NO_OUTPUT_STATE),
+            ({RaspberryPiPinIds.GPIO5: PinConfiguration(io=PinIo.OUTPUT, state=1),
+              RaspberryPiPinIds.GPIO6: PinConfiguration(io=PinIo.INPUT)}, PinMessage.ERROR_NO_INPUT_PULL)
+        ]
+        for invalid_configuration_map, error_message in invalid_configuration_maps:
+            gpio_registers_mock.reset_mock()
+            action_result = update_pin_configurations(invalid_configuration_map)
+            self.assertFalse(action_result.success)
+            self.assertEqual(PinMessage.ERROR_INVALID_CONFIGURATIONS, action_result.error.message)
+            self.assertEqual(error_message, action_result.error.pins[RaspberryPiPinIds.GPIO6].message)
+            gpio_registers_mock.write_levels.assert_not_called()
+            self.assertEqual('input', Device.pin_factory.pin(RaspberryPiPinIds.GPIO5).function)
+
+        with patch('endrpi.actions.pin.Device.pin_factory.pin', side_effect=PinUnsupported('Pin not supported')):
+            pin_cache.clear()
+            action_result = update_pin_configurations(pin_configuration_map)
+            self.assertFalse(action_result.success)
+            error_message = PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO17)
+            self.assertEqual(error_message, action_result.error.pins[RaspberryPiPinIds.GPIO17].message)
+
+        # Note: Mock pins are shared between mock factories
+        for pin_id in pin_configuration_map:
+            Device.pin_factory.pin(pin_id).function = 'input'
+        pin_cache.clear()
+
+    @patch('endrpi.actions.pin.pwm_outputs.chip_path', '/missing/pwmchip0')
+    def test_pwm_actions(self):
+        # Note: Mock pins are shared between mock factories, PWM pins can't reuse pins created without PWM
+        Device.pin_factory = MockFactory(pin_class=MockPWMPin)
+        Device.pin_factory.reset()
+        pin_id = RaspberryPiPinIds.GPIO16
+
+        # Ensure pins without PWM are reported
+        action_result = read_pwm_status(pin_id)
+        self.assertFalse(action_result.success)
+        self.assertEqual({'message': PinMessage.ERROR_PWM_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id)},
+                         action_result.error)
+        self.assertFalse(stop_pwm(pin_id).success)
+
+        # Ensure PWM is started and read back as an output with its duty cycle as state
+        action_result = update_pwm(pin_id, PwmConfiguration(frequency=100, dutyCycle=0.25))
+        self.assertTrue(action_result.success)
+        self.assertEqual(PwmStatus(frequency=100, dutyCycle=0.25, mode=PwmMode.SOFTWARE), action_result.data)
+        self.assertEqual(action_result.data, read_pwm_status(pin_id).data)
+        self.assertEqual({pin_id: action_result.data}, read_pwm_statuses(list(RaspberryPiPinIds)).data)
+        self.assertEqual(PinConfiguration(io=PinIo.OUTPUT, state=0.25), read_pin_configuration(pin_id).data)
+
+        # Ensure pin configurations can't be updated while PWM is running
+        action_result = update_pin_configuration(pin_id, PinConfiguration(io=PinIo.OUTPUT, state=1))
+        self.assertFalse(action_result.success)
+        self.assertEqual({'message': PinMessage.ERROR_PWM_RUNNING__PIN_ID__.format(pin_id=pin_id)},
+                         action_result.error)
+        action_result = update_pin_configurations({pin_id: PinConfiguration(io=PinIo.OUTPUT, state=1)})
+        self.assertEqual(PinUpdateStatus.INVALID, action_result.error.pins[pin_id].status)
+
+        # Ensure no duty cycle is written when any pin doesn't have PWM running
+        action_result = write_pwm_duty_cycles({pin_id: 0.5, RaspberryPiPinIds.GPIO20: 0.5})
+        self.assertFalse(action_result.success)
+        self.assertEqual(0.25, Device.pin_factory.pin(pin_id).state)
+
+        action_result = write_pwm_duty_cycles({pin_id: 0.5})
+        self.assertTrue(action_result.success)
+        self.assertEqual(0.5, Device.pin_factory.pin(pin_id).state)
+        self.assertEqual(0.5, read_pwm_status(pin_id).data.dutyCycle)
+
+        # Ensure stopped pins are read from the pin again
+        action_result = stop_pwm(pin_id)
+        self.assertTrue(action_result.success)
+        self.assertEqual(MessageData(message=PinMessage.SUCCESS_PWM_STOPPED__PIN_ID__.format(pin_id=pin_id)),
+                         action_result.data)
+        self.assertEqual({}, read_pwm_statuses(list(RaspberryPiPinIds)).data)
+        self.assertEqual(PinConfiguration(io=PinIo.OUTPUT, state=0, pull=PinPull.FLOATING),
+                         read_pin_configuration(pin_id).data)
+
+        # Ensure unsupported pins are reported
+        with patch('endrpi.actions.pin.Device.pin_factory.pin', side_effect=PinUnsupported('Pin not supported')):
+            pin_cache.clear()
+            action_result = update_pwm(pin_id, PwmConfiguration(frequency=100, dutyCycle=0.25))
+            self.assertEqual({'message': PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id)},
+                             action_result.error)
+
+        Device.pin_factory.reset()
+        pin_cache.clear()
+
+    def test_pulse_counter_actions(self):
+        pin_id = RaspberryPiPinIds.GPIO21
+        gpiozero_pin = Device.pin_factory.pin(pin_id)
+        gpiozero_pin.function = 'input'
+        gpiozero_pin.drive_low()
+
+        # Ensure pins without a running counter are reported
+        for action in (read_pulse_counter, stop_pulse_counter):
+            action_result = action(pin_id)
+            self.assertFalse(action_result.success)
+            self.assertEqual({'message': PinMessage.ERROR_COUNTER_NOT_RUNNING__PIN_ID__.format(pin_id=pin_id)},
+                             action_result.error)
+        self.assertEqual({}, read_pulse_counters(list(RaspberryPiPinIds)).data)
+
+        # Ensure pulses are counted, read, and reset in the same step
+        action_result = start_pulse_counter(pin_id, PulseCounterConfiguration(edge=PinEdge.FALLING))
+        self.assertTrue(action_result.success)
+        self.assertEqual(PinEdge.FALLING, action_result.data.edge)
+        for _ in range(2):
+            gpiozero_pin.drive_high()
+            gpiozero_pin.drive_low()
+        self.assertEqual(2, read_pulse_counter(pin_id).data.count)
+        self.assertEqual(2, read_pulse_counters([pin_id], reset=True).data[pin_id].count)
+        self.assertEqual(0, read_pulse_counter(pin_id).data.count)
+
+        action_result = stop_pulse_counter(pin_id)
+        self.assertTrue(action_result.success)
+        self.assertEqual({}, read_pulse_counters([pin_id]).data)
+
+        # Ensure the counter waits until the pin is no longer being updated
+        with pin_locks.write(pin_id):
+            starter = threading.Thread(target=start_pulse_counter, args=(pin_id, PulseCounterConfiguration()))
+            starter.start()
+            starter.join(0.05)
+            self.assertTrue(starter.is_alive())
+            self.assertEqual({}, read_pulse_counters([pin_id]).data)
+        starter.join(5)
+        self.assertTrue(stop_pulse_counter(pin_id).success)
+
+        # Ensure edge detection errors are reported
+        with patch('endrpi.actions.pin.pulse_counters.start', side_effect=PinUnsupported('Pin not supported')):
+            action_result = start_pulse_counter(pin_id, PulseCounterConfiguration())
+            self.assertEqual({'message': PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id)},
+                             action_result.error)
+        with patch('endrpi.actions.pin.pulse_counters.start', side_effect=RuntimeError('No edge detection')):
+            action_result = start_pulse_counter(pin_id, PulseCounterConfiguration())
+            self.assertEqual({'message': PinMessage.ERROR_EDGE_DETECTION__PIN_ID__.format(pin_id=pin_id)},
+                             action_result.error)
+
+    def test_pin_edge_filter_actions(self):
+        pin_id = RaspberryPiPinIds.GPIO16
+        gpiozero_pin = Device.pin_factory.pin(pin_id)
+        gpiozero_pin.function = 'input'
+        gpiozero_pin.drive_low()
+        gpiozero_pin.when_changed = None
+
+        # Ensure pins without a filter are reported
+        for action in (read_pin_edge_filter, remove_pin_edge_filter):
+            action_result = action(pin_id)
+            self.assertFalse(action_result.success)
+            self.assertEqual({'message': PinMessage.ERROR_FILTER_NOT_SET__PIN_ID__.format(pin_id=pin_id)},
+                             action_result.error)
+        self.assertEqual({}, read_pin_edge_filters().data)
+
+        # Ensure filtered bounces never reach the pulse counter of the pin
+        configuration = PinEdgeFilterConfiguration(policy=PinEdgeFilterPolicy.LEADING, window=1_000_000)
+        action_result = update_pin_edge_filter(pin_id, configuration)
+        self.assertTrue(action_result.success)
+        self.assertEqual(0, action_result.data.passedEdges)
+        start_pulse_counter(pin_id, PulseCounterConfiguration(edge=PinEdge.RISING))
+        for _ in range(3):
+            gpiozero_pin.drive_high()
+            gpiozero_pin.drive_low()
+        self.assertEqual(1, read_pulse_counter(pin_id).data.count)
+        self.assertEqual(1, read_pin_edge_filter(pin_id).data.passedEdges)
+        self.assertEqual([pin_id], list(read_pin_edge_filters().data))
+        stop_pulse_counter(pin_id)
+
+        action_result = remove_pin_edge_filter(pin_id)
+        self.assertTrue(action_result.success)
+        self.assertEqual(5, action_result.data.filteredEdges)
+        self.assertEqual({}, read_pin_edge_filters().data)
+
+        # Ensure edge detection errors are reported
+        with patch('endrpi.actions.pin.pin_edge_monitor.set_filter', side_effect=PinUnsupported('Pin not supported')):
+            action_result = update_pin_edge_filter(pin_id, configuration)
+            self.assertEqual({'message': PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=pin_id)},
+                             action_result.error)
+        with patch('endrpi.actions.pin.pin_edge_monitor.set_filter', side_effect=RuntimeError('No edge detection')):
+            action_result = update_pin_edge_filter(pin_id, configuration)
+            self.assertEqual({'message': PinMessage.ERROR_EDGE_DETECTION__PIN_ID__.format(pin_id=pin_id)},
+                             action_result.error)
+
+    def test_pin_configuration_snapshot(self):
+        pin_cache.clear()
+        with tempfile.TemporaryDirectory() as snapshot_directory:
+            snapshot_path = os.path.join(snapshot_directory, 'pins.json')
+
+            # Ensure nothing is restored without a snapshot
+            configure_pin_snapshot(None)
+            self.assertEqual({}, restore_pin_configurations().data)
+            configure_pin_snapshot(snapshot_path)
+            self.assertEqual({}, restore_pin_configurations().data)
+
+            # Ensure applied pin configurations are persisted while failed ones aren't
+            update_pin_configuration(RaspberryPiPinIds.GPIO5, PinConfiguration(io=PinIo.OUTPUT, state=1))
+            update_pin_configurations({
+                RaspberryPiPinIds.GPIO6: PinConfiguration(io=PinIo.INPUT, pull=PinPull.UP),
+                RaspberryPiPinIds.GPIO7: PinConfiguration(io=PinIo.OUTPUT)
+            })
+            with open(snapshot_path) as file:
+                self.assertEqual({'GPIO5': {'io': 'OUTPUT', 'state': 1.0}}, json.load(file))
+
+            # Ensure snapshot write errors don't fail pin updates
+            with patch('endrpi.utils.pin_snapshot.os.replace', side_effect=OSError('Read-only file system')):
+                with self.assertLogs(level='WARNING'):
+                    action_result = update_pin_configuration(RaspberryPiPinIds.GPIO6,
+                                                             PinConfiguration(io=PinIo.INPUT, pull=PinPull.DOWN))
+                self.assertTrue(action_result.success)
+            update_pin_configuration(RaspberryPiPinIds.GPIO5, PinConfiguration(io=PinIo.OUTPUT, state=1))
+
+            # Ensure persisted pins are restored
+            Device.pin_factory.pin(RaspberryPiPinIds.GPIO5).state = 0
+            Device.pin_factory.pin(RaspberryPiPinIds.GPIO6).pull = 'up'
+            pin_cache.clear()
+            configure_pin_snapshot(snapshot_path)
+            action_result = restore_pin_configurations()
+            self.assertTrue(action_result.success)
+            self.assertEqual({RaspberryPiPinIds.GPIO5, RaspberryPiPinIds.GPIO6}, set(action_result.data))
+            self.assertEqual(1, Device.pin_factory.pin(RaspberryPiPinIds.GPIO5).state)
+            self.assertEqual('down', Device.pin_factory.pin(RaspberryPiPinIds.GPIO6).pull)
+
+            # Ensure unreadable snapshots are reported
+            with open(snapshot_path, 'w') as file:
+                file.write('not json')
+            action_result = restore_pin_configurations()
+            self.assertEqual({'message': PinMessage.ERROR_SNAPSHOT_READ__PATH__.format(path=snapshot_path)},
+                             action_result.error)
+
+            configure_pin_snapshot(None)
+            for pin_id in (RaspberryPiPinIds.GPIO5, RaspberryPiPinIds.GPIO6):
+                Device.pin_factory.pin(pin_id).function = 'input'
+
 
 if __name__ == '__main__':
     unittest.main()
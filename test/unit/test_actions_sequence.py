@@ -0,0 +1,166 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import unittest
+from unittest import TestCase
+from unittest.mock import patch, call
+
+from gpiozero import Device, PinUnsupported, PinError
+from gpiozero.pins.mock import MockFactory
+
+from endrpi.actions.pin import pin_cache, pin_owners, update_pin_configuration, update_pwm
+from endrpi.actions.sequence import start_sequence, read_sequence_statuses, read_sequence_status, cancel_sequence, \
+    sequence_players
+from endrpi.model.message import PinMessage, SequenceMessage
+from endrpi.model.pin import PinConfiguration, PinIo, PwmConfiguration, RaspberryPiPinIds
+from endrpi.model.sequence import Sequence, SequenceState, SequenceStep
+
+
+def create_sequence(steps, loops: int = 1) -> Sequence:
+    """Creates a sequence from (pin, state, delay) tuples."""
+    return Sequence(steps=[SequenceStep(pin=pin, state=state, delay=delay) for pin, state, delay in steps],
+                    loops=loops)
+
+
+class TestSequenceActions(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        Device.pin_factory = MockFactory()
+        pin_cache.clear()
+        sequence_players.clear()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        for player in sequence_players.values():
+            player.cancel()
+        sequence_players.clear()
+
+        # Note: Mock pins are shared between mock factories
+        for pin_id in (RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO27, RaspberryPiPinIds.GPIO22):
+            Device.pin_factory.pin(pin_id).function = 'input'
+        pin_cache.clear()
+
+    @patch('endrpi.actions.sequence.get_bulk_pin_access', return_value=None)
+    def test_start_sequence(self, _):
+        sequence = create_sequence([(RaspberryPiPinIds.GPIO17, 1, 0),
+                                    (RaspberryPiPinIds.GPIO27, 1, 1000),
+                                    (RaspberryPiPinIds.GPIO17, 0, 0),
+                                    (RaspberryPiPinIds.GPIO27, 0, 1000)], loops=2)
+
+        # Ensure every pin becomes an output and steps with a delay of 0 are written together
+        # Note: Mock pins only record state changes, so the pin starts low
+        gpiozero_pin = Device.pin_factory.pin(RaspberryPiPinIds.GPIO17)
+        gpiozero_pin.function = 'output'
+        gpiozero_pin.state = 0
+        gpiozero_pin.clear_states()
+        action_result = start_sequence(sequence)
+        self.assertTrue(action_result.success)
+        self.assertEqual([RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO27], action_result.data.pins)
+        sequence_players[action_result.data.id].join(5)
+
+        sequence_status = read_sequence_status(action_result.data.id).data
+        self.assertEqual(SequenceState.COMPLETED, sequence_status.state)
+        self.assertEqual(2, sequence_status.completedLoops)
+        self.assertEqual(4, sequence_status.timing.writes)
+        self.assertEqual(3000, sequence_status.timing.requestedDuration)
+        self.assertEqual('output', gpiozero_pin.function)
+        self.assertEqual([1, 0, 1, 0], [state.state for state in gpiozero_pin.states[1:]])
+        self.assertEqual(0, Device.pin_factory.pin(RaspberryPiPinIds.GPIO27).state)
+
+        # Ensure unknown sequences are not found
+        for action in (read_sequence_status, cancel_sequence):
+            action_result = action(999)
+            self.assertFalse(action_result.success)
+            self.assertEqual(SequenceMessage.ERROR_NOT_FOUND__SEQUENCE_ID__.format(sequence_id=999),
+                             action_result.error.message)
+
+    @patch('endrpi.actions.sequence.get_bulk_pin_access')
+    def test_start_register_sequence(self, get_bulk_pin_access_mock):
+        sequence = create_sequence([(RaspberryPiPinIds.GPIO17, 1, 0),
+                                    (RaspberryPiPinIds.GPIO27, 0, 100),
+                                    (RaspberryPiPinIds.GPIO17, 0, 100)])
+
+        # Ensure steps written together are a single register write
+        action_result = start_sequence(sequence)
+        sequence_players[action_result.data.id].join(5)
+        self.assertEqual([call(1 << 17, 1 << 27), call(0, 1 << 17)],
+                         get_bulk_pin_access_mock.return_value.write_levels.call_args_list)
+
+    @patch('endrpi.actions.sequence.get_bulk_pin_access', return_value=None)
+    def test_cancel_sequence(self, _):
+        endless_sequence = create_sequence([(RaspberryPiPinIds.GPIO22, 1, 100_000),
+                                            (RaspberryPiPinIds.GPIO22, 0, 100_000)], loops=0)
+        action_result = start_sequence(endless_sequence)
+        sequence_id = action_result.data.id
+        self.assertEqual(SequenceState.RUNNING, action_result.data.state)
+
+        # Ensure pins driven by a running sequence can't be used by another sequence
+        action_result = start_sequence(create_sequence([(RaspberryPiPinIds.GPIO22, 1, 0)]))
+        self.assertFalse(action_result.success)
+        owner = f'sequence `{sequence_id}`'
+        in_use_message = PinMessage.ERROR_IN_USE__PIN_ID__OWNER__.format(pin_id=RaspberryPiPinIds.GPIO22, owner=owner)
+        self.assertEqual(in_use_message, action_result.error.message)
+
+        # Ensure pins driven by a running sequence can't be updated or used for PWM
+        action_result = update_pin_configuration(RaspberryPiPinIds.GPIO22, PinConfiguration(io=PinIo.OUTPUT, state=0))
+        self.assertEqual(in_use_message, action_result.error.message)
+        action_result = update_pwm(RaspberryPiPinIds.GPIO22, PwmConfiguration(frequency=100, dutyCycle=0.5))
+        self.assertEqual(in_use_message, action_result.error.message)
+        self.assertEqual(owner, pin_owners.owner(RaspberryPiPinIds.GPIO22))
+
+        # Ensure cancelled sequences are kept with the other statuses
+        action_result = cancel_sequence(sequence_id)
+        self.assertTrue(action_result.success)
+        self.assertEqual(SequenceState.CANCELLED, action_result.data.state)
+        self.assertEqual([sequence_id], [status.id for status in read_sequence_statuses().data])
+        self.assertIsNone(pin_owners.owner(RaspberryPiPinIds.GPIO22))
+
+        # Ensure only the newest finished sequences are kept
+        with patch('endrpi.actions.sequence.SEQUENCE_HISTORY_SIZE', 1):
+            action_result = start_sequence(create_sequence([(RaspberryPiPinIds.GPIO22, 1, 0)]))
+            sequence_players[action_result.data.id].join(5)
+            start_sequence(create_sequence([(RaspberryPiPinIds.GPIO22, 0, 0)]))
+        self.assertNotIn(sequence_id, sequence_players)
+
+    def test_start_sequence_errors(self):
+        sequence = create_sequence([(RaspberryPiPinIds.GPIO17, 1, 0)])
+
+        # Ensure pins the board doesn't expose are refused
+        action_result = start_sequence(create_sequence([(RaspberryPiPinIds.GPIO40, 1, 0)]))
+        self.assertEqual(PinMessage.ERROR_NOT_FOUND__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO40),
+                         action_result.error.message)
+
+        # Ensure pins with PWM running are refused
+        with patch('endrpi.actions.sequence.pwm_outputs.status', return_value=True):
+            action_result = start_sequence(sequence)
+            self.assertEqual(PinMessage.ERROR_PWM_RUNNING__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO17),
+                             action_result.error.message)
+
+        # Ensure pin errors are propagated to the result
+        with patch('endrpi.actions.sequence.pin_cache.pin', side_effect=PinUnsupported('Pin not supported')):
+            action_result = start_sequence(sequence)
+            self.assertEqual(PinMessage.ERROR_UNSUPPORTED__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO17),
+                             action_result.error.message)
+        with patch('endrpi.actions.sequence.pin_cache.pin', side_effect=PinError('Pin error')):
+            action_result = start_sequence(sequence)
+            self.assertEqual(SequenceMessage.ERROR_OUTPUT__PIN_ID__.format(pin_id=RaspberryPiPinIds.GPIO17),
+                             action_result.error.message)
+        self.assertEqual({}, sequence_players)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import unittest
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from endrpi.actions.websocket import WEBSOCKET_ACTIONS, WebSocketAction, websocket_action_documentation, \
+    update_pin_configurations_action, read_pin_configurations_action, ping_action, read_websocket_capacity, \
+    broadcast_topics
+from endrpi.config.websocket import WebSocketSettings
+from endrpi.model.action_result import success_action_result, error_action_result
+from endrpi.model.message import WebSocketMessage
+from endrpi.model.pin import RaspberryPiPinIds, PinConfiguration, PinIo
+from endrpi.model.websocket import UpdatePinConfigurationsParams, ReadPinConfigurationsParams, \
+    WebSocketActionConcurrency
+
+
+class TestWebSocketActions(TestCase):
+
+    def test_websocket_action_enumeration(self):
+        # Ensure every registered action has a corresponding enumeration
+        self.assertEqual(list(WEBSOCKET_ACTIONS.keys()), [action.value for action in WebSocketAction])
+        for action_name in WEBSOCKET_ACTIONS:
+            self.assertEqual(action_name, WebSocketAction[action_name])
+
+    def test_websocket_action_concurrency(self):
+        # Ensure actions waiting on the pin locks or the PWM lock never run on the event loop
+        for action_name in ('READ_PIN_CONFIGURATIONS', 'UPDATE_PIN_CONFIGURATIONS', 'UPDATE_PWM', 'STOP_PWM',
+                            'WRITE_PWM_DUTY_CYCLES', 'START_SEQUENCE', 'START_PULSE_COUNTERS', 'STOP_PULSE_COUNTERS',
+                            'UPDATE_PIN_EDGE_FILTERS', 'REMOVE_PIN_EDGE_FILTERS'):
+            self.assertIs(WebSocketActionConcurrency.THREAD_POOL, WEBSOCKET_ACTIONS[action_name].concurrency)
+        self.assertTrue(broadcast_topics((RaspberryPiPinIds.GPIO17,))[RaspberryPiPinIds.GPIO17.value].blocking)
+
+    def test_broadcast_topics(self):
+        # Ensure only the given pins and their edges are published
+        topics = broadcast_topics((RaspberryPiPinIds.GPIO17,))
+        self.assertIn('GPIO17', topics)
+        self.assertIn('GPIO17.RISING', topics)
+        self.assertNotIn('GPIO40', topics)
+        self.assertNotIn('GPIO40.RISING', topics)
+        self.assertIn('READ_TEMPERATURE', topics)
+        self.assertIs(topics, broadcast_topics((RaspberryPiPinIds.GPIO17,)))
+
+    def test_websocket_action_documentation(self):
+        # Ensure every registered action is documented
+        documentation = websocket_action_documentation()
+        for action_name, action_definition in WEBSOCKET_ACTIONS.items():
+            self.assertIn(f'`{action_name}`', documentation)
+            self.assertIn(action_definition.description, documentation)
+        self.assertIn(ReadPinConfigurationsParams.__name__, documentation)
+
+    @patch('endrpi.actions.websocket.read_pin_configurations')
+    def test_read_pin_configurations_action(self, read_pin_configurations_mock):
+        # Ensure the requested pins are read
+        read_pin_configurations_mock.return_value = success_action_result({})
+        params = ReadPinConfigurationsParams(pins=[RaspberryPiPinIds.GPIO2])
+        action_result = read_pin_configurations_action(params)
+        self.assertTrue(action_result.success)
+        read_pin_configurations_mock.assert_called_once_with([RaspberryPiPinIds.GPIO2])
+
+    @patch('endrpi.actions.websocket.update_pin_configurations')
+    def test_update_pin_configurations_action(self, update_pin_configurations_mock):
+        # Ensure empty pin maps result in an error
+        action_result = update_pin_configurations_action(UpdatePinConfigurationsParams(pins={}))
+        self.assertFalse(action_result.success)
+        self.assertEqual({'message': WebSocketMessage.ERROR_MISSING_PIN_ID}, action_result.error)
+        update_pin_configurations_mock.assert_not_called()
+
+        # Ensure update errors are propagated
+        update_pin_configurations_mock.return_value = error_action_result('Failed')
+        pin_configuration = PinConfiguration(io=PinIo.OUTPUT, state=1)
+        pin_configuration_map = {
+            RaspberryPiPinIds.GPIO2: pin_configuration,
+            RaspberryPiPinIds.GPIO3: pin_configuration
+        }
+        action_result = update_pin_configurations_action(UpdatePinConfigurationsParams(pins=pin_configuration_map))
+        self.assertFalse(action_result.success)
+        self.assertEqual({'message': 'Failed'}, action_result.error)
+        update_pin_configurations_mock.assert_called_once_with(pin_configuration_map)
+
+        # Ensure successful updates respond with a message
+        update_pin_configurations_mock.return_value = success_action_result({})
+        action_result = update_pin_configurations_action(UpdatePinConfigurationsParams(pins=pin_configuration_map))
+        self.assertTrue(action_result.success)
+        self.assertEqual(WebSocketMessage.SUCCESS_PIN_CONFIGS_UPDATED, action_result.data)
+
+    def test_ping_action(self):
+        # Ensure pings are answered with a pong
+        action_result = ping_action()
+        self.assertTrue(action_result.success)
+        self.assertEqual(WebSocketMessage.SUCCESS_PONG, action_result.data)
+
+    def test_read_websocket_capacity(self):
+        # Ensure open connections are counted per client along with the connection limits
+        connections = [MagicMock(client_host='127.0.0.1'), MagicMock(client_host='127.0.0.1'),
+                       MagicMock(client_host='10.0.0.2')]
+        settings = WebSocketSettings(max_connections=8, max_connections_per_client=2)
+        action_result = read_websocket_capacity(connections, settings, rejected_connections=3, evicted_connections=1)
+        self.assertTrue(action_result.success)
+        self.assertEqual({
+            'connections': 3,
+            'maxConnections': 8,
+            'maxConnectionsPerClient': 2,
+            'clients': {'127.0.0.1': 2, '10.0.0.2': 1},
+            'rejectedConnections': 3,
+            'evictedConnections': 1
+        }, action_result.data.dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import time
+import unittest
+import warnings
+from unittest import TestCase
+
+from gpiozero.pins.mock import MockSPIDevice
+
+from endrpi.model.adc import AdcConfiguration
+from endrpi.utils.adc import AdcRingBuffer, AdcSampler
+
+
+class FakeAdcChannel:
+    """Channel whose nth read returns n volts, so every sample is equal to its sample index."""
+
+    def __init__(self, fail_after: int = None):
+        self.reads = 0
+        self.closed = False
+        self._fail_after = fail_after
+
+    @property
+    def voltage(self) -> float:
+        if self._fail_after is not None and self.reads >= self._fail_after:
+            raise OSError('SPI device disconnected')
+        self.reads += 1
+        return float(self.reads - 1)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class MockMcp3008(MockSPIDevice):
+    """
+    Mock MCP3008 on the software SPI pins of SPI0 that converts the voltages of its channels.
+
+    .. note:: Create the mock before the gpiozero device so the mock claims the pins first.
+    """
+
+    def __init__(self, select_pin: str = 'GPIO8', reference_voltage: float = 3.3):
+        with warnings.catch_warnings():
+            # Note: gpiozero warns that the mock factory falls back to software SPI
+            warnings.simplefilter('ignore')
+            super().__init__(clock_pin='GPIO11', mosi_pin='GPIO10', miso_pin='GPIO9', select_pin=select_pin)
+        self.reference_voltage = reference_voltage
+        self.voltages = [0.0] * 8
+        self.state = 'idle'
+
+    def on_start(self):
+        super().on_start()
+        self.state = 'idle'
+
+    def on_bit(self):
+        # Start bit, single ended/differential bit, then the 3 bit channel followed by the 12 bit result
+        if self.state == 'idle':
+            if self.rx_buf[-1]:
+                self.state = 'mode'
+                self.rx_buf = []
+        elif self.state == 'mode':
+            self.state = 'channel'
+            self.rx_buf = []
+        elif self.state == 'channel' and len(self.rx_buf) == 3:
+            voltage = min(max(self.voltages[self.rx_word()], 0.0), self.reference_voltage)
+            self.tx_word(int(voltage / self.reference_voltage * 1023), 12)
+            self.state = 'result'
+
+
+def wait_for_samples(adc_sampler: AdcSampler, samples: int, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while adc_sampler.samples < samples and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestAdcUtils(TestCase):
+
+    def test_adc_ring_buffer(self):
+        ring_buffer = AdcRingBuffer(4)
+        self.assertEqual([], ring_buffer.read(0, 0))
+
+        # Ensure samples are held in order until the buffer is full
+        for value in range(3):
+            ring_buffer.append(value)
+        self.assertEqual(0, ring_buffer.oldest())
+        self.assertEqual([0, 1, 2], ring_buffer.read(0, 3))
+        self.assertEqual([1, 2], ring_buffer.read(1, 3))
+
+        # Ensure the oldest samples are overwritten and reads wrap around the end of the buffer
+        for value in range(3, 7):
+            ring_buffer.append(value)
+        self.assertEqual(7, ring_buffer.written)
+        self.assertEqual(3, ring_buffer.oldest())
+        self.assertEqual([3, 4, 5, 6], ring_buffer.read(3, 7))
+        self.assertEqual([4, 5], ring_buffer.read(4, 6))
+
+    def test_adc_sampler(self):
+        configuration = AdcConfiguration(channels=[0, 3], rate=1000, bufferSize=100, decimation=4)
+        channels = {0: FakeAdcChannel(), 3: FakeAdcChannel()}
+        adc_sampler = AdcSampler(configuration, channels)
+        adc_sampler.start()
+        wait_for_samples(adc_sampler, 150)
+        adc_sampler.stop()
+
+        # Ensure channels are closed once stopped and samples stay readable
+        self.assertTrue(all(channel.closed for channel in channels.values()))
+        adc_status = adc_sampler.status()
+        self.assertFalse(adc_status.running)
+        self.assertGreaterEqual(adc_status.samples, 150)
+        self.assertIsNone(adc_status.error)
+        self.assertGreater(adc_status.actualRate, 0)
+        samples = adc_status.samples
+
+        # Ensure the latest samples are read by default
+        adc_samples = adc_sampler.read(3, count=10)
+        self.assertEqual(samples - 10, adc_samples.firstSample)
+        self.assertEqual(list(range(samples - 10, samples)), adc_samples.values)
+        self.assertEqual(1000, adc_samples.rate)
+
+        # Ensure overwritten samples are counted as dropped and reads start at the oldest held sample
+        adc_samples = adc_sampler.read(0, count=10, since=0)
+        self.assertEqual(samples - 100, adc_samples.firstSample)
+        self.assertEqual(samples - 100, adc_samples.droppedSamples)
+        self.assertEqual(list(range(samples - 100, samples - 90)), adc_samples.values)
+
+        # Ensure consecutive blocks can be fetched with the index after the last sample
+        adc_samples = adc_sampler.read(0, since=samples - 5)
+        self.assertEqual(list(range(samples - 5, samples)), adc_samples.values)
+        self.assertEqual([], adc_sampler.read(0, since=samples).values)
+
+        # Ensure decimated samples average complete groups of samples
+        adc_samples = adc_sampler.read_decimated(0)
+        self.assertEqual(samples // 4 - 1, adc_samples.firstSample)
+        self.assertEqual(250, adc_samples.rate)
+        self.assertEqual([adc_samples.firstSample * 4 + 1.5], adc_samples.values)
+        adc_samples = adc_sampler.read_decimated(0, since=0)
+        first_sample = -(-(samples - 100) // 4)
+        self.assertEqual(first_sample, adc_samples.firstSample)
+        self.assertEqual(first_sample, adc_samples.droppedSamples)
+        self.assertEqual([index * 4 + 1.5 for index in range(first_sample, samples // 4)], adc_samples.values)
+
+        # Ensure channels that aren't sampled are an error
+        with self.assertRaises(KeyError):
+            adc_sampler.read(1)
+        with self.assertRaises(KeyError):
+            adc_sampler.read_decimated(1)
+
+    def test_adc_sampler_errors(self):
+        # Ensure failed reads end sampling and keep the samples taken
+        configuration = AdcConfiguration(channels=[0], rate=1000)
+        adc_sampler = AdcSampler(configuration, {0: FakeAdcChannel(fail_after=5)})
+        adc_sampler.start()
+        wait_for_samples(adc_sampler, 5)
+        adc_sampler.stop()
+        adc_status = adc_sampler.status()
+        self.assertEqual(5, adc_status.samples)
+        self.assertEqual('SPI device disconnected', adc_status.error)
+        self.assertEqual([0, 1, 2, 3, 4], adc_sampler.read(0).values)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,17 +12,26 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import json
 import unittest
+from typing import Optional
 from unittest import TestCase
 
+import msgpack
+
 from fastapi import status
 from fastapi.responses import JSONResponse
 
+from endrpi.actions.websocket import WebSocketAction
 from endrpi.model.action_result import success_action_result, error_action_result
-from endrpi.model.message import MessageData
-from endrpi.model.websocket import WebSocketAction
-from endrpi.utils.api import websocket_response, http_response, parse_websocket_action, parse_websocket_params, \
-    validate_websocket_action, validate_websocket_params
+from endrpi.model.measurement import Measurement, TemperatureUnit
+from endrpi.model.message import MessageData, PinMessage
+from endrpi.model.pid import PidSourceType
+from endrpi.model.pin import PinConfiguration, PinIo, PinPull, RaspberryPiPinIds
+from endrpi.model.websocket import WebSocketFrameFormat, UpdatePinConfigurationsParams
+from endrpi.utils.api import websocket_response, websocket_frame, http_response, parse_websocket_action, \
+    parse_websocket_params, validate_websocket_action, validate_websocket_params, compact_encodable, \
+    compact_decodable, decode_websocket_message
 
 
 class TestApiUtils(TestCase):
@@ -41,6 +50,99 @@ class TestApiUtils(TestCase):
         response = websocket_response('Action', error_action_result('Error'))
         self.assertEqual({'action': 'Action', 'success': False, 'data': None, 'error': {'message': 'Error'}}, response)
 
+    def test_websocket_frame(self):
+        # Ensure websocket frames are the JSON text of websocket responses
+        frame = websocket_frame('Action', success_action_result({'sample': 'data'}))
+        self.assertEqual('{"action": "Action", "success": true, "data": {"sample": "data"}, "error": null}', frame)
+
+    def test_compact_encodable(self):
+        # Ensure compact enumerations are converted to their index and other enumerations to their value
+        self.assertEqual(1, compact_encodable(PinIo.OUTPUT))
+        self.assertEqual(0, compact_encodable(WebSocketAction.READ_TEMPERATURE))
+        self.assertEqual(PinMessage.ERROR_VALIDATION.value, compact_encodable(PinMessage.ERROR_VALIDATION))
+
+        # Ensure models and collections are converted recursively
+        pin_configuration_map = {RaspberryPiPinIds.GPIO3: PinConfiguration(io=PinIo.INPUT, pull=PinPull.UP)}
+        self.assertEqual({1: {'io': 0, 'state': None, 'pull': 1}}, compact_encodable(pin_configuration_map))
+        measurement = Measurement(quantity=1.5, unitOfMeasurement=TemperatureUnit.FAHRENHEIT)
+        self.assertEqual([{'quantity': 1.5, 'prefix': None, 'unitOfMeasurement': 1}],
+                         compact_encodable((measurement,)))
+        self.assertEqual('text', compact_encodable('text'))
+
+    def test_messagepack_websocket_frame(self):
+        # Ensure MessagePack frames carry the same response structure with compact enumerations
+        pin_configuration_map = {RaspberryPiPinIds.GPIO2: PinConfiguration(io=PinIo.OUTPUT, state=1)}
+        frame = websocket_frame(WebSocketAction.READ_PIN_CONFIGURATIONS,
+                                success_action_result(pin_configuration_map),
+                                WebSocketFrameFormat.MESSAGEPACK)
+        self.assertIsInstance(frame, bytes)
+        self.assertEqual({
+            'action': list(WebSocketAction).index(WebSocketAction.READ_PIN_CONFIGURATIONS),
+            'success': True,
+            'data': {0: {'io': 1, 'state': 1, 'pull': None}},
+            'error': None
+        }, msgpack.unpackb(frame, raw=False, strict_map_key=False))
+
+        frame = websocket_frame(None, error_action_result('Error'), WebSocketFrameFormat.MESSAGEPACK)
+        self.assertEqual({'action': None, 'success': False, 'data': None, 'error': {'message': 'Error'}},
+                         msgpack.unpackb(frame, raw=False))
+
+    def test_decode_websocket_message(self):
+        # Ensure JSON messages are decoded from text or bytes
+        message = decode_websocket_message({'type': 'websocket.receive', 'text': '{"action": "READ_MEMORY"}'},
+                                           WebSocketFrameFormat.JSON)
+        self.assertEqual({'action': 'READ_MEMORY'}, message)
+        message = decode_websocket_message({'type': 'websocket.receive', 'bytes': b'{"action": "READ_MEMORY"}'},
+                                           WebSocketFrameFormat.JSON)
+        self.assertEqual({'action': 'READ_MEMORY'}, message)
+        with self.assertRaises(ValueError):
+            decode_websocket_message({'type': 'websocket.receive', 'text': 'not json'}, WebSocketFrameFormat.JSON)
+
+        # Ensure MessagePack messages are decoded and compact actions are converted to action names
+        action_index = list(WebSocketAction).index(WebSocketAction.READ_MEMORY)
+        data = msgpack.packb({'action': action_index, 'params': {'pins': ['GPIO2']}})
+        message = decode_websocket_message({'type': 'websocket.receive', 'bytes': data},
+                                           WebSocketFrameFormat.MESSAGEPACK)
+        self.assertEqual({'action': WebSocketAction.READ_MEMORY, 'params': {'pins': ['GPIO2']}}, message)
+
+        # Ensure compact enumerations in params (including pin keys) are converted back to their values
+        action_index = list(WebSocketAction).index(WebSocketAction.UPDATE_PIN_CONFIGURATIONS)
+        pin_index = list(RaspberryPiPinIds).index(RaspberryPiPinIds.GPIO2)
+        data = msgpack.packb({'action': action_index, 'params': {'pins': {pin_index: {'io': 1, 'state': 1}}}})
+        message = decode_websocket_message({'type': 'websocket.receive', 'bytes': data},
+                                           WebSocketFrameFormat.MESSAGEPACK)
+        self.assertEqual({'pins': {'GPIO2': {'io': 'OUTPUT', 'state': 1}}}, message['params'])
+        params = validate_websocket_params(message['params'], UpdatePinConfigurationsParams)
+        self.assertEqual(PinIo.OUTPUT, params.pins[RaspberryPiPinIds.GPIO2].io)
+
+        # Ensure values, unknown indexes and nested lists of models are left to params validation
+        data = msgpack.packb({'action': 'START_SEQUENCE', 'params': {'steps': [{'pin': 'GPIO3', 'state': 1, 'delay': 1},
+                                                                               {'pin': pin_index, 'state': 0,
+                                                                                'delay': 1}],
+                                                                     'loops': 9999}})
+        message = decode_websocket_message({'type': 'websocket.receive', 'bytes': data},
+                                           WebSocketFrameFormat.MESSAGEPACK)
+        self.assertEqual(['GPIO3', 'GPIO2'], [step['pin'] for step in message['params']['steps']])
+        self.assertEqual(9999, message['params']['loops'])
+        self.assertEqual(9999, compact_decodable(9999, RaspberryPiPinIds))
+        self.assertEqual('ADC', compact_decodable(1, Optional[PidSourceType]))
+
+        data = msgpack.packb({'action': 9999})
+        message = decode_websocket_message({'type': 'websocket.receive', 'bytes': data},
+                                           WebSocketFrameFormat.MESSAGEPACK)
+        self.assertEqual({'action': 9999}, message)
+
+        data = msgpack.packb(['not', 'a', 'map'])
+        message = decode_websocket_message({'type': 'websocket.receive', 'bytes': data},
+                                           WebSocketFrameFormat.MESSAGEPACK)
+        self.assertEqual(['not', 'a', 'map'], message)
+
+        with self.assertRaises(ValueError):
+            decode_websocket_message({'type': 'websocket.receive', 'text': json.dumps({'action': 'READ_MEMORY'})},
+                                     WebSocketFrameFormat.MESSAGEPACK)
+        with self.assertRaises(ValueError):
+            decode_websocket_message({'type': 'websocket.receive', 'bytes': b'\xc1'}, WebSocketFrameFormat.MESSAGEPACK)
+
     def test_http_response(self):
         # Ensure http status codes are defaulted correctly
         response = http_response(success_action_result('Message'))
@@ -0,0 +1,102 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.utils.board import detect_board, find_pin_table, DEVICE_TREE_MODEL_PATH, HEADER_40_PIN_TABLE, \
+    HEADER_26_REVISION_1_PIN_TABLE, HEADER_26_REVISION_2_PIN_TABLE, COMPUTE_MODULE_PIN_TABLE, \
+    COMPUTE_MODULE_4_PIN_TABLE
+
+
+class TestBoardUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.root_directory = tempfile.TemporaryDirectory()
+        self.root_path = self.root_directory.name
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.root_directory.cleanup()
+
+    def write_model(self, model: bytes) -> None:
+        model_path = os.path.join(self.root_path, DEVICE_TREE_MODEL_PATH)
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        with open(model_path, 'wb') as file:
+            file.write(model)
+
+    def test_pin_id_aliases(self):
+        # Ensure BCM aliases are found case insensitively and unknown aliases aren't
+        for alias in ('GPIO17', 'gpio17', 'BCM17', '17'):
+            self.assertIs(RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.from_bcm_id(alias))
+        for alias in ('GPIO46', 'BOARD11', '', 'GPIO'):
+            self.assertIsNone(RaspberryPiPinIds.from_bcm_id(alias))
+        self.assertEqual(45, RaspberryPiPinIds.GPIO45.bcm_number)
+
+    def test_find_pin_table(self):
+        # Ensure each model uses the pins of its header or connector
+        self.assertIs(HEADER_40_PIN_TABLE, find_pin_table('Raspberry Pi 4 Model B Rev 1.4'))
+        self.assertIs(HEADER_40_PIN_TABLE, find_pin_table('Raspberry Pi 5 Model B Rev 1.0'))
+        self.assertIs(HEADER_40_PIN_TABLE, find_pin_table('Raspberry Pi Model B Plus Rev 1.2'))
+        self.assertIs(HEADER_26_REVISION_1_PIN_TABLE, find_pin_table('Raspberry Pi Model B Rev 1'))
+        self.assertIs(HEADER_26_REVISION_2_PIN_TABLE, find_pin_table('Raspberry Pi Model A Rev 2'))
+        self.assertIs(COMPUTE_MODULE_PIN_TABLE, find_pin_table('Raspberry Pi Compute Module 3 Plus Rev 1.0'))
+        self.assertIs(COMPUTE_MODULE_4_PIN_TABLE, find_pin_table('Raspberry Pi Compute Module 4 Rev 1.1'))
+        self.assertIs(HEADER_40_PIN_TABLE, find_pin_table(None))
+        self.assertIs(HEADER_40_PIN_TABLE, find_pin_table('Unknown board'))
+
+        self.assertEqual(26, len(HEADER_40_PIN_TABLE.pins))
+        self.assertEqual(17, len(HEADER_26_REVISION_2_PIN_TABLE.pins))
+        self.assertEqual(46, len(COMPUTE_MODULE_PIN_TABLE.pins))
+
+    def test_detect_board(self):
+        # Ensure boards without a device tree model use the 40 pin header
+        board = detect_board(self.root_path)
+        self.assertIsNone(board.model)
+        self.assertIs(HEADER_40_PIN_TABLE, board.pin_table)
+
+        # Ensure the null terminated model is read and physical aliases are found
+        self.write_model(b'Raspberry Pi 3 Model B Rev 1.2\x00')
+        board = detect_board(self.root_path)
+        self.assertEqual('Raspberry Pi 3 Model B Rev 1.2', board.model)
+        for alias in ('GPIO17', 'BCM17', '17', 'BOARD11', 'board11', 'J8:11'):
+            self.assertIs(RaspberryPiPinIds.GPIO17, board.find_pin(alias))
+        self.assertIs(RaspberryPiPinIds.GPIO8, board.find_pin('BOARD24'))
+
+        # Ensure pins and physical pins the board doesn't expose aren't found
+        for alias in ('GPIO0', 'GPIO40', 'BOARD1', 'BOARD27', 'P1:11', 'INVALID_PIN_ID'):
+            self.assertIsNone(board.find_pin(alias))
+
+        # Ensure every pin of a Compute Module is exposed without physical aliases
+        self.write_model(b'Raspberry Pi Compute Module 3 Rev 1.0\x00')
+        board = detect_board(self.root_path)
+        self.assertIs(RaspberryPiPinIds.GPIO40, board.find_pin('GPIO40'))
+        self.assertIsNone(board.find_pin('BOARD11'))
+
+        # Ensure the first revision header maps physical pins to its own BCM pins
+        self.write_model(b'Raspberry Pi Model B Rev 1\x00')
+        board = detect_board(self.root_path)
+        self.assertIs(RaspberryPiPinIds.GPIO0, board.find_pin('P1:3'))
+        self.assertIsNone(board.find_pin('GPIO2'))
+
+
+if __name__ == '__main__':
+    unittest.main()
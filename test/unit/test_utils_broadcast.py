@@ -0,0 +1,205 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from endrpi.model.action_result import success_action_result
+from endrpi.model.websocket import WebSocketFrameFormat
+from endrpi.utils.api import websocket_frame
+from endrpi.utils.broadcast import BroadcastHub, BroadcastTopic
+
+
+class FakeSubscriber:
+    """Simulated websocket client that records every frame it is sent."""
+
+    def __init__(self, fail: bool = False, frame_format: WebSocketFrameFormat = WebSocketFrameFormat.JSON):
+        self.frames = []
+        self.fail = fail
+        self.frame_format = frame_format
+
+    async def send_frame(self, frame: str, coalesce_key: str) -> None:
+        if self.fail:
+            raise ConnectionError('Disconnected')
+        self.frames.append(frame)
+
+
+class TestBroadcastUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.loop = asyncio.new_event_loop()
+
+        self.temperature_producer = MagicMock(return_value=success_action_result({'temperature': 1}))
+        self.memory_producer = MagicMock(return_value=success_action_result({'memory': 2}))
+        self.encode = MagicMock(side_effect=websocket_frame)
+        self.topics = {
+            'TEMPERATURE': BroadcastTopic(action='READ_TEMPERATURE', producer=self.temperature_producer),
+            'MEMORY': BroadcastTopic(action='READ_MEMORY', producer=self.memory_producer, blocking=True)
+        }
+        self.hub = BroadcastHub(lambda: self.topics, interval=lambda: 0.001, encode=self.encode)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.loop.close()
+
+    def test_publish(self):
+        # Ensure every subscriber is sent the same frame which is sampled and encoded once
+        subscribers = [FakeSubscriber() for _ in range(3)]
+        for subscriber in subscribers:
+            self.hub._subscribers.setdefault('TEMPERATURE', set()).add(subscriber)
+        frames = self.loop.run_until_complete(self.hub.publish('TEMPERATURE'))
+        frame = frames[WebSocketFrameFormat.JSON]
+        self.assertEqual(websocket_frame('READ_TEMPERATURE', success_action_result({'temperature': 1})), frame)
+        self.assertEqual(1, self.temperature_producer.call_count)
+        self.assertEqual(1, self.encode.call_count)
+        for subscriber in subscribers:
+            self.assertEqual(1, len(subscriber.frames))
+            self.assertIs(frame, subscriber.frames[0])
+
+        # Ensure blocking producers are sampled
+        self.loop.run_until_complete(self.hub.publish('MEMORY'))
+        self.assertEqual(1, self.memory_producer.call_count)
+
+        # Ensure subscribers that fail to send are unsubscribed
+        failing_subscriber = FakeSubscriber(fail=True)
+        self.hub._subscribers['TEMPERATURE'].add(failing_subscriber)
+        self.loop.run_until_complete(self.hub.publish('TEMPERATURE'))
+        self.assertEqual(3, self.hub.subscriber_count('TEMPERATURE'))
+        for subscriber in subscribers:
+            self.assertEqual(2, len(subscriber.frames))
+
+        # Ensure frames are encoded once per frame format
+        self.encode.reset_mock()
+        binary_subscribers = [FakeSubscriber(frame_format=WebSocketFrameFormat.MESSAGEPACK) for _ in range(3)]
+        for subscriber in binary_subscribers:
+            self.hub._subscribers['TEMPERATURE'].add(subscriber)
+        frames = self.loop.run_until_complete(self.hub.publish('TEMPERATURE'))
+        self.assertEqual(2, self.encode.call_count)
+        self.assertIsInstance(frames[WebSocketFrameFormat.MESSAGEPACK], bytes)
+        for subscriber in binary_subscribers:
+            self.assertIs(frames[WebSocketFrameFormat.MESSAGEPACK], subscriber.frames[0])
+        for subscriber in subscribers:
+            self.assertIs(frames[WebSocketFrameFormat.JSON], subscriber.frames[2])
+
+    def test_subscribe(self):
+        async def subscribe_and_wait():
+            subscriber = FakeSubscriber()
+            self.hub.subscribe('TEMPERATURE', subscriber)
+            self.hub.subscribe('MEMORY', subscriber)
+            self.assertEqual(1, self.hub.subscriber_count('TEMPERATURE'))
+            self.assertEqual(2, len(self.hub._producers))
+
+            # Ensure frames are pushed without any request from the subscriber
+            for _ in range(100):
+                await asyncio.sleep(0.001)
+                if len(subscriber.frames) >= 4:
+                    break
+            self.assertGreaterEqual(len(subscriber.frames), 4)
+
+            # Ensure unsubscribing stops the producers of topics without subscribers
+            producers = list(self.hub._producers.values())
+            self.hub.unsubscribe('TEMPERATURE', subscriber)
+            self.assertEqual(0, self.hub.subscriber_count('TEMPERATURE'))
+            self.assertEqual(1, len(self.hub._producers))
+            self.hub.unsubscribe_all(subscriber)
+            self.hub.unsubscribe('MEMORY', subscriber)
+            self.assertEqual(0, len(self.hub._producers))
+            await asyncio.sleep(0.01)
+            for producer in producers:
+                self.assertTrue(producer.cancelled())
+
+        self.loop.run_until_complete(subscribe_and_wait())
+
+    @patch('endrpi.utils.broadcast.get_logger')
+    def test_producer_error(self, get_logger_mock):
+        async def subscribe_and_wait():
+            subscriber = FakeSubscriber()
+            self.hub.subscribe('TEMPERATURE', subscriber)
+            for _ in range(100):
+                await asyncio.sleep(0.001)
+                if self.temperature_producer.call_count >= 2:
+                    break
+            self.hub.unsubscribe_all(subscriber)
+
+        # Ensure producer errors don't stop the topic
+        self.temperature_producer.side_effect = RuntimeError('Failed')
+        self.loop.run_until_complete(subscribe_and_wait())
+        self.assertGreaterEqual(self.temperature_producer.call_count, 2)
+        get_logger_mock().exception.assert_called()
+
+    def test_stream(self):
+        stream_closes = []
+
+        async def count_stream():
+            try:
+                for count in range(3):
+                    yield success_action_result({'count': count})
+                await asyncio.sleep(60)
+            finally:
+                stream_closes.append(count)
+
+        async def subscribe_and_wait():
+            self.topics['COUNT'] = BroadcastTopic(action='COUNT', stream=count_stream)
+            subscriber = FakeSubscriber()
+            self.hub.subscribe('COUNT', subscriber)
+            for _ in range(100):
+                await asyncio.sleep(0.001)
+                if len(subscriber.frames) >= 3:
+                    break
+
+            # Ensure every streamed result is pushed as soon as it is yielded
+            self.assertEqual([websocket_frame('COUNT', success_action_result({'count': count})) for count in range(3)],
+                             subscriber.frames)
+
+            # Ensure unsubscribing closes the stream
+            self.hub.unsubscribe('COUNT', subscriber)
+            await asyncio.sleep(0.01)
+            self.assertEqual([2], stream_closes)
+
+        self.loop.run_until_complete(subscribe_and_wait())
+
+    def test_load(self):
+        subscriber_count = 500
+        tick_count = 20
+
+        async def run_clients():
+            subscribers = [FakeSubscriber() for _ in range(subscriber_count)]
+            for subscriber in subscribers:
+                self.hub.subscribe('TEMPERATURE', subscriber)
+                self.hub.subscribe('MEMORY', subscriber)
+
+            while min(len(subscriber.frames) for subscriber in subscribers) < tick_count * 2:
+                await asyncio.sleep(0.001)
+
+            for subscriber in subscribers:
+                self.hub.unsubscribe_all(subscriber)
+            return subscribers
+
+        # Ensure hundreds of clients cost one sample and one encode per topic per tick
+        subscribers = self.loop.run_until_complete(asyncio.wait_for(run_clients(), timeout=30))
+        ticks = self.temperature_producer.call_count + self.memory_producer.call_count
+        self.assertGreaterEqual(ticks, tick_count * 2)
+        self.assertLess(ticks, subscriber_count)
+        self.assertEqual(ticks, self.encode.call_count)
+        frames_sent = sum(len(subscriber.frames) for subscriber in subscribers)
+        self.assertGreaterEqual(frames_sent, subscriber_count * tick_count * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import itertools
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from endrpi.model.capture import CaptureConfiguration, CaptureState, CaptureTrigger, CaptureTriggerCondition
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.utils.capture import PackedSamples, CaptureSession, capture_vcd, is_triggered
+
+
+def levels_reader(levels):
+    """Returns a levels reader that cycles through the given level masks."""
+    cycle = itertools.cycle(levels)
+    return lambda: next(cycle)
+
+
+class TestCaptureUtils(TestCase):
+
+    def test_packed_samples(self):
+        # Ensure samples of pins that don't divide a byte are packed across bytes
+        packed_samples = PackedSamples(pin_count=3, capacity=4)
+        for sample in (0b101, 0b011, 0b110):
+            packed_samples.append(sample)
+        self.assertEqual(3, len(packed_samples))
+        self.assertEqual([0b101, 0b011, 0b110], list(packed_samples.samples()))
+        self.assertEqual(bytes([0b10011101, 0b1]), packed_samples.to_bytes())
+
+        # Ensure the oldest samples are overwritten once the ring is full and bytes stay ordered
+        for sample in (0b111, 0b000, 0b001):
+            packed_samples.append(sample)
+        self.assertEqual(4, len(packed_samples))
+        self.assertEqual(6, packed_samples.count)
+        self.assertEqual([0b110, 0b111, 0b000, 0b001], list(packed_samples.samples()))
+        self.assertEqual(bytes([0b00111110, 0b10]), packed_samples.to_bytes())
+
+    def test_is_triggered(self):
+        # Ensure levels trigger immediately while edges need a previous level
+        self.assertTrue(is_triggered(CaptureTriggerCondition.HIGH, 1, None))
+        self.assertFalse(is_triggered(CaptureTriggerCondition.HIGH, 0, 1))
+        self.assertTrue(is_triggered(CaptureTriggerCondition.LOW, 0, None))
+        self.assertFalse(is_triggered(CaptureTriggerCondition.RISING, 1, None))
+        self.assertTrue(is_triggered(CaptureTriggerCondition.RISING, 1, 0))
+        self.assertFalse(is_triggered(CaptureTriggerCondition.RISING, 0, 1))
+        self.assertFalse(is_triggered(CaptureTriggerCondition.RISING, 1, 1))
+        self.assertTrue(is_triggered(CaptureTriggerCondition.FALLING, 0, 1))
+        self.assertFalse(is_triggered(CaptureTriggerCondition.FALLING, 1, 0))
+
+    def test_capture_session(self):
+        pins = [RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO4]
+
+        # Ensure untriggered captures take every sample from the levels of their pins
+        configuration = CaptureConfiguration(pins=pins, rate=20_000, samples=4)
+        session = CaptureSession(1, configuration, levels_reader([1 << 17, 1 << 4, 0, (1 << 17) | (1 << 4)]))
+        self.assertEqual(CaptureState.CAPTURING, session.status().state)
+        session.start()
+        session.join(5)
+        capture_status = session.status()
+        self.assertEqual(CaptureState.COMPLETED, capture_status.state)
+        self.assertEqual([0b01, 0b10, 0b00, 0b11], list(session.samples.samples()))
+        self.assertEqual(4, capture_status.capturedSamples)
+        self.assertIsNone(capture_status.triggerSample)
+        self.assertGreater(capture_status.actualRate, 0)
+        self.assertFalse(session.running)
+
+        # Ensure triggered captures keep the pre-trigger samples before the triggering sample
+        trigger = CaptureTrigger(pin=RaspberryPiPinIds.GPIO4, condition=CaptureTriggerCondition.RISING)
+        configuration = CaptureConfiguration(pins=pins, rate=20_000, samples=5, trigger=trigger, preTrigger=2)
+        levels = [0, 1 << 17, 0, 1 << 17, (1 << 4), 1 << 17, 0, 1 << 17, 0]
+        session = CaptureSession(2, configuration, levels_reader(levels))
+        self.assertEqual(CaptureState.ARMED, session.status().state)
+        session.start()
+        session.join(5)
+        self.assertEqual(CaptureState.COMPLETED, session.status().state)
+        self.assertEqual(2, session.status().triggerSample)
+        self.assertEqual([0b00, 0b01, 0b10, 0b01, 0b00], list(session.samples.samples()))
+
+        # Ensure early triggers keep every earlier sample and fill the rest with samples after the trigger
+        configuration = CaptureConfiguration(pins=pins, rate=20_000, samples=5, trigger=trigger, preTrigger=3)
+        session = CaptureSession(3, configuration, levels_reader([0, 1 << 4, 0]))
+        session.start()
+        session.join(5)
+        self.assertEqual(1, session.status().triggerSample)
+        self.assertEqual(5, session.status().capturedSamples)
+
+    def test_capture_session_stops(self):
+        trigger = CaptureTrigger(pin=RaspberryPiPinIds.GPIO4, condition=CaptureTriggerCondition.HIGH)
+
+        # Ensure captures without a trigger give up once they time out
+        configuration = CaptureConfiguration(pins=[RaspberryPiPinIds.GPIO4], rate=10_000, samples=10,
+                                             trigger=trigger, timeout=0.01)
+        session = CaptureSession(1, configuration, levels_reader([0]))
+        session.start()
+        session.join(5)
+        self.assertEqual(CaptureState.TIMED_OUT, session.status().state)
+
+        # Ensure armed captures can be cancelled
+        configuration = configuration.copy(update={'timeout': 60, 'rate': 100})
+        session = CaptureSession(2, configuration, levels_reader([0]))
+        session.start()
+        session.cancel(5)
+        self.assertEqual(CaptureState.CANCELLED, session.status().state)
+
+        # Ensure read errors fail the capture
+        def failing_reader():
+            raise OSError('Read failed')
+
+        session = CaptureSession(3, configuration, failing_reader)
+        session.start()
+        session.join(5)
+        self.assertEqual(CaptureState.FAILED, session.status().state)
+        self.assertEqual('Read failed', session.status().error)
+
+    @patch('endrpi.utils.capture.request_realtime_priority', return_value=True)
+    def test_capture_session_priority(self, request_realtime_priority):
+        # Ensure captures sleeping between samples run with realtime priority
+        configuration = CaptureConfiguration(pins=[RaspberryPiPinIds.GPIO4], rate=1_000, samples=2)
+        session = CaptureSession(1, configuration, levels_reader([0]))
+        session.start()
+        session.join(5)
+        self.assertTrue(session.realtime)
+        request_realtime_priority.assert_called_once()
+
+        # Ensure captures busy waiting between every sample never take realtime priority
+        request_realtime_priority.reset_mock()
+        configuration = configuration.copy(update={'rate': 20_000})
+        session = CaptureSession(2, configuration, levels_reader([0]))
+        session.start()
+        session.join(5)
+        self.assertFalse(session.realtime)
+        request_realtime_priority.assert_not_called()
+
+    def test_capture_vcd(self):
+        packed_samples = PackedSamples(pin_count=2, capacity=4)
+        for sample in (0b00, 0b01, 0b01, 0b11):
+            packed_samples.append(sample)
+
+        # Ensure only level changes are dumped at their sample time
+        vcd = capture_vcd([RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO4], 1000, packed_samples, 1)
+        lines = vcd.splitlines()
+        self.assertIn('$timescale 1 ns $end', lines)
+        self.assertIn('$comment Triggered at sample 1 $end', lines)
+        self.assertIn('$var wire 1 ! GPIO17 $end', lines)
+        self.assertIn('$var wire 1 " GPIO4 $end', lines)
+        self.assertEqual(['#0', '0!', '0"', '#1000000', '1!', '#3000000', '1"'],
+                         lines[lines.index('$enddefinitions $end') + 1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import time
+import unittest
+from typing import List
+from unittest import TestCase
+
+from endrpi.model.fan import FanConfiguration, FanCurvePoint
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.utils.fan import FanController, fan_curve_duty_cycle
+
+
+def create_fan_configuration(**kwargs) -> FanConfiguration:
+    kwargs.setdefault('curve', [FanCurvePoint(temperature=40, dutyCycle=0.2),
+                                FanCurvePoint(temperature=60, dutyCycle=1)])
+    return FanConfiguration(pinId=RaspberryPiPinIds.GPIO18, **kwargs)
+
+
+class TestFanUtils(TestCase):
+
+    def test_fan_curve_duty_cycle(self):
+        curve = create_fan_configuration().curve
+
+        # Ensure duty cycles are held outside of the curve and interpolated within it
+        self.assertEqual(0.2, fan_curve_duty_cycle(curve, 20))
+        self.assertEqual(0.2, fan_curve_duty_cycle(curve, 40))
+        self.assertAlmostEqual(0.6, fan_curve_duty_cycle(curve, 50))
+        self.assertEqual(1, fan_curve_duty_cycle(curve, 80))
+
+        # Ensure single point curves are constant
+        self.assertEqual(0.5, fan_curve_duty_cycle([FanCurvePoint(temperature=50, dutyCycle=0.5)], 80))
+
+        # Ensure curves must be ascending
+        with self.assertRaises(ValueError):
+            FanConfiguration(pinId=RaspberryPiPinIds.GPIO18, curve=[{'temperature': 50, 'dutyCycle': 0.5},
+                                                                    {'temperature': 50, 'dutyCycle': 1}])
+
+    def test_fan_controller_hysteresis(self):
+        fan_controller = FanController(create_fan_configuration(hysteresis=2), lambda _: 0, lambda _: None)
+
+        # Ensure rising temperatures speed the fan up right away
+        self.assertAlmostEqual(0.6, fan_controller.control(50))
+        self.assertAlmostEqual(0.68, fan_controller.control(52))
+
+        # Ensure falling temperatures within the hysteresis hold the speed
+        self.assertAlmostEqual(0.68, fan_controller.control(51))
+        self.assertAlmostEqual(0.68, fan_controller.control(50))
+
+        # Ensure falling temperatures beyond the hysteresis slow the fan down, trailing by the hysteresis
+        self.assertAlmostEqual(0.6, fan_controller.control(48))
+        self.assertAlmostEqual(0.6, fan_controller.control(49))
+
+    def test_fan_controller(self):
+        temperatures = [50.0]
+        duty_cycles: List[float] = []
+
+        def read_temperature(sensor_id: str) -> float:
+            self.assertEqual('thermal_zone0', sensor_id)
+            if temperatures[0] is None:
+                raise OSError('Sensor unavailable')
+            return temperatures[0]
+
+        # Ensure the first duty cycle is written when started
+        fan_controller = FanController(create_fan_configuration(interval=0.01), read_temperature, duty_cycles.append)
+        fan_controller.start()
+        self.assertAlmostEqual(0.6, duty_cycles[0])
+
+        # Ensure unchanged duty cycles aren't written again
+        time.sleep(0.05)
+        self.assertEqual(1, len(duty_cycles))
+        self.assertGreater(fan_controller.status().updates, 1)
+
+        # Ensure failed reads drive the failsafe duty cycle
+        temperatures[0] = None
+        deadline = time.monotonic() + 5
+        while duty_cycles[-1] != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        fan_status = fan_controller.status()
+        self.assertEqual(1, fan_status.dutyCycle)
+        self.assertIsNone(fan_status.temperature)
+        self.assertEqual('Sensor unavailable', fan_status.error)
+        fan_controller.stop()
+        self.assertFalse(fan_controller.running)
+
+        # Ensure failed writes stop the controller
+        def write_duty_cycle(_: float) -> None:
+            if duty_cycles:
+                raise KeyError(RaspberryPiPinIds.GPIO18)
+            duty_cycles.append(0.6)
+
+        temperatures[0] = 50.0
+        duty_cycles.clear()
+        fan_controller = FanController(create_fan_configuration(interval=0.01), read_temperature, write_duty_cycle)
+        fan_controller.start()
+        # Note: The retuned curve changes the duty cycle, so the next evaluation writes
+        curve = [FanCurvePoint(temperature=0, dutyCycle=0.1)]
+        fan_controller.configuration = create_fan_configuration(interval=0.01, curve=curve)
+        deadline = time.monotonic() + 5
+        while fan_controller.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(fan_controller.running)
+        self.assertIsNotNone(fan_controller.status().error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import os
+import struct
+import tempfile
+import threading
+import unittest
+from typing import Dict
+from unittest import TestCase
+
+from endrpi.utils.gpio_registers import BulkPinAccess, GpioRegisters, GPIO_REGISTERS_SIZE, GPFSEL0, GPLEV0, GPSET0, \
+    GPCLR0, GPIO_PUP_PDN_CNTRL_REG0, LEGACY_PULL_REGISTER_VALUE, GPIO_FUNCTION_INPUT, GPIO_FUNCTION_OUTPUT, \
+    GPIO_PULL_UP, GPIO_PULL_DOWN, GPIO_PULL_FLOATING
+
+
+def create_register_file(words: Dict[int, int]) -> str:
+    """Returns the path of a fake GPIO register map containing the given register words."""
+
+    register_words = [0] * (GPIO_REGISTERS_SIZE // 4)
+    for index, word in words.items():
+        register_words[index] = word
+
+    file_descriptor, path = tempfile.mkstemp()
+    with os.fdopen(file_descriptor, 'wb') as register_file:
+        register_file.write(struct.pack(f'<{len(register_words)}I', *register_words))
+    return path
+
+
+class TestGpioRegisterUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.paths = []
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        for path in self.paths:
+            os.remove(path)
+
+    def create_registers(self, words: Dict[int, int]) -> GpioRegisters:
+        path = create_register_file(words)
+        self.paths.append(path)
+        return GpioRegisters(path)
+
+    def test_read_bank(self):
+        # GPIO17 output (GPFSEL1 bits 21-23), GPIO2 alternate function 0 (GPFSEL0 bits 6-8), GPIO27 output
+        # (GPFSEL2 bits 21-23), GPIO17 and GPIO4 high, GPIO4 pulled up, GPIO18 pulled down (second pull register)
+        gpio_registers = self.create_registers({
+            GPFSEL0: 0b100 << 6,
+            GPFSEL0 + 1: GPIO_FUNCTION_OUTPUT << 21,
+            GPFSEL0 + 2: GPIO_FUNCTION_OUTPUT << 21,
+            GPLEV0: (1 << 17) | (1 << 4),
+            GPIO_PUP_PDN_CNTRL_REG0: GPIO_PULL_UP << 8,
+            GPIO_PUP_PDN_CNTRL_REG0 + 1: GPIO_PULL_DOWN << 4
+        })
+        self.assertTrue(gpio_registers.pulls_readable)
+
+        # Ensure the function, level, and pull of each pin are decoded from the snapshot
+        gpio_bank = gpio_registers.read_bank()
+        self.assertEqual(GPIO_FUNCTION_OUTPUT, gpio_bank.function(17))
+        self.assertEqual(GPIO_FUNCTION_OUTPUT, gpio_bank.function(27))
+        self.assertEqual(GPIO_FUNCTION_INPUT, gpio_bank.function(4))
+        self.assertEqual(0b100, gpio_bank.function(2))
+        self.assertEqual(1, gpio_bank.level(17))
+        self.assertEqual(1, gpio_bank.level(4))
+        self.assertEqual(0, gpio_bank.level(27))
+        self.assertEqual(GPIO_PULL_UP, gpio_bank.pull(4))
+        self.assertEqual(GPIO_PULL_DOWN, gpio_bank.pull(18))
+        self.assertEqual(GPIO_PULL_FLOATING, gpio_bank.pull(17))
+
+        # Ensure levels can be read on their own
+        self.assertEqual((1 << 17) | (1 << 4), gpio_registers.read_levels())
+
+        # Ensure the registers provide bulk pin access
+        self.assertIsInstance(gpio_registers, BulkPinAccess)
+
+        gpio_registers.close()
+
+    def test_legacy_pulls(self):
+        # Ensure pulls aren't read from chips whose pull registers are write only
+        gpio_registers = self.create_registers({GPIO_PUP_PDN_CNTRL_REG0 + 3: LEGACY_PULL_REGISTER_VALUE})
+        self.assertFalse(gpio_registers.pulls_readable)
+        gpio_bank = gpio_registers.read_bank()
+        self.assertIsNone(gpio_bank.pulls)
+        self.assertIsNone(gpio_bank.pull(4))
+
+        gpio_registers.close()
+
+    def test_write_levels(self):
+        path = create_register_file({})
+        self.paths.append(path)
+        gpio_registers = GpioRegisters(path)
+
+        # Ensure each mask is written to its register and empty masks aren't written
+        gpio_registers.write_levels((1 << 17) | (1 << 22), 1 << 27)
+        gpio_registers.close()
+        with open(path, 'rb') as register_file:
+            register_words = struct.unpack(f'<{GPIO_REGISTERS_SIZE // 4}I', register_file.read())
+        self.assertEqual((1 << 17) | (1 << 22), register_words[GPSET0])
+        self.assertEqual(1 << 27, register_words[GPCLR0])
+
+        gpio_registers = GpioRegisters(path)
+        gpio_registers.write_levels(0, 1 << 4)
+        gpio_registers.close()
+        with open(path, 'rb') as register_file:
+            register_words = struct.unpack(f'<{GPIO_REGISTERS_SIZE // 4}I', register_file.read())
+        self.assertEqual((1 << 17) | (1 << 22), register_words[GPSET0])
+        self.assertEqual(1 << 4, register_words[GPCLR0])
+
+    def test_write_function(self):
+        gpio_registers = self.create_registers({GPFSEL0 + 1: 0b111_111_111})
+
+        # Ensure only the function of the given pin changes within its shared register
+        gpio_registers.write_function(11, GPIO_FUNCTION_OUTPUT)
+        gpio_bank = gpio_registers.read_bank()
+        self.assertEqual(GPIO_FUNCTION_OUTPUT, gpio_bank.function(11))
+        self.assertEqual(0b111, gpio_bank.function(10))
+        self.assertEqual(0b111, gpio_bank.function(12))
+
+        # Ensure pins sharing a register can change their functions from different threads
+        def write_functions(number: int) -> None:
+            for function in (GPIO_FUNCTION_INPUT, GPIO_FUNCTION_OUTPUT) * 500:
+                gpio_registers.write_function(number, function)
+
+        threads = [threading.Thread(target=write_functions, args=(number,)) for number in range(20, 30)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        gpio_bank = gpio_registers.read_bank()
+        self.assertEqual([GPIO_FUNCTION_OUTPUT] * 10, [gpio_bank.function(number) for number in range(20, 30)])
+
+        gpio_registers.close()
+
+    def test_missing_registers(self):
+        # Ensure registers that can't be mapped raise an error
+        with self.assertRaises(OSError):
+            GpioRegisters('/nonexistent/gpiomem')
+
+
+if __name__ == '__main__':
+    unittest.main()
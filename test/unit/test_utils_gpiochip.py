@@ -0,0 +1,242 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import errno
+import os
+import tempfile
+import unittest
+from typing import Dict, List, Tuple
+from unittest import TestCase
+
+from endrpi.utils.gpiochip import GpioChip, GPIOCHIP_INFO, GPIO_GET_CHIPINFO_IOCTL, GPIO_V2_GET_LINEINFO_IOCTL, \
+    GPIO_V2_GET_LINE_IOCTL, GPIO_V2_LINE_ATTR_ID_FLAGS, GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES, GPIO_V2_LINE_BIAS_FLAGS, \
+    GPIO_V2_LINE_CONFIG, GPIO_V2_LINE_DIRECTION_FLAGS, GPIO_V2_LINE_EDGE_FLAGS, GPIO_V2_LINE_EVENT, \
+    GPIO_V2_LINE_EVENT_FALLING_EDGE, GPIO_V2_LINE_EVENT_RISING_EDGE, GPIO_V2_LINE_FLAG_BIAS_PULL_DOWN, \
+    GPIO_V2_LINE_FLAG_BIAS_PULL_UP, GPIO_V2_LINE_FLAG_EDGE_FALLING, GPIO_V2_LINE_FLAG_EDGE_RISING, \
+    GPIO_V2_LINE_FLAG_INPUT, GPIO_V2_LINE_FLAG_OUTPUT, GPIO_V2_LINE_FLAG_USED, GPIO_V2_LINE_GET_VALUES_IOCTL, \
+    GPIO_V2_LINE_INFO, GPIO_V2_LINE_REQUEST, GPIO_V2_LINE_SET_CONFIG_IOCTL, GPIO_V2_LINE_SET_VALUES_IOCTL, \
+    GPIO_V2_LINE_VALUES, GPIO_V2_LINES_MAX, GPIO_V2_LINE_NUM_ATTRS_MAX, pack_line_config
+
+
+class FakeGpiochipLine:
+    """Line of a :class:`FakeGpiochip`."""
+
+    def __init__(self, flags: int = GPIO_V2_LINE_FLAG_INPUT, value: int = 0, consumer: str = ''):
+        self.flags = flags
+        self.value = value
+        self.consumer = consumer
+
+
+class FakeGpiochip:
+    """
+    In-process fake of the kernel side of the GPIO character device uAPI v2, used in place of :func:`fcntl.ioctl`.
+
+    .. note::
+        Line requests are backed by pipes so edges can be injected with :meth:`drive`, every ioctl is recorded.
+    """
+
+    def __init__(self, line_count: int = 58):
+        self.lines = [FakeGpiochipLine() for _ in range(line_count)]
+        self.calls: List[int] = []
+        self.requests: Dict[int, Tuple[List[int], int]] = {}
+        self.sequence_number = 0
+        directory = tempfile.mkdtemp()
+        self.path = os.path.join(directory, 'gpiochip0')
+        open(self.path, 'w').close()
+
+    def close(self) -> None:
+        for read_descriptor, (_, write_descriptor) in list(self.requests.items()):
+            for file_descriptor in (read_descriptor, write_descriptor):
+                try:
+                    os.close(file_descriptor)
+                except OSError:
+                    pass
+        os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+    def drive(self, offset: int, value: int, timestamp: int) -> None:
+        """Drives a line from outside the chip, queueing an edge event when the line detects the edge."""
+
+        line = self.lines[offset]
+        if line.value == value:
+            return
+        line.value = value
+        edge_flag = GPIO_V2_LINE_FLAG_EDGE_RISING if value else GPIO_V2_LINE_FLAG_EDGE_FALLING
+        for offsets, write_descriptor in self.requests.values():
+            if offset in offsets and line.flags & edge_flag:
+                self.sequence_number += 1
+                event_id = GPIO_V2_LINE_EVENT_RISING_EDGE if value else GPIO_V2_LINE_EVENT_FALLING_EDGE
+                os.write(write_descriptor, GPIO_V2_LINE_EVENT.pack(timestamp, event_id, offset, self.sequence_number,
+                                                                   self.sequence_number, *[0] * 6))
+
+    def __call__(self, file_descriptor: int, request: int, buffer: bytearray, mutate: bool = True) -> int:
+        self.calls.append(request)
+        if request == GPIO_GET_CHIPINFO_IOCTL:
+            GPIOCHIP_INFO.pack_into(buffer, 0, b'gpiochip0', b'pinctrl-bcm2711', len(self.lines))
+        elif request == GPIO_V2_GET_LINEINFO_IOCTL:
+            offset = GPIO_V2_LINE_INFO.unpack(buffer)[2]
+            line = self.lines[offset]
+            fields = list(GPIO_V2_LINE_INFO.unpack(buffer))
+            fields[:5] = [f'GPIO{offset}'.encode(), line.consumer.encode(), offset, 0, line.flags]
+            GPIO_V2_LINE_INFO.pack_into(buffer, 0, *fields)
+        elif request == GPIO_V2_GET_LINE_IOCTL:
+            fields = list(GPIO_V2_LINE_REQUEST.unpack(buffer))
+            line_count = fields[-8]
+            offsets = fields[:line_count]
+            if any(self.lines[offset].flags & GPIO_V2_LINE_FLAG_USED for offset in offsets):
+                raise OSError(errno.EBUSY, 'Device or resource busy')
+            self._configure(offsets, fields[GPIO_V2_LINES_MAX + 1:-8])
+            read_descriptor, write_descriptor = os.pipe()
+            for offset in offsets:
+                self.lines[offset].flags |= GPIO_V2_LINE_FLAG_USED
+            self.requests[read_descriptor] = (offsets, write_descriptor)
+            fields[-1] = read_descriptor
+            GPIO_V2_LINE_REQUEST.pack_into(buffer, 0, *fields)
+        elif request == GPIO_V2_LINE_SET_CONFIG_IOCTL:
+            self._configure(self.requests[file_descriptor][0], GPIO_V2_LINE_CONFIG.unpack(buffer))
+        elif request == GPIO_V2_LINE_GET_VALUES_IOCTL:
+            offsets = self.requests[file_descriptor][0]
+            _, mask = GPIO_V2_LINE_VALUES.unpack(buffer)
+            values = sum(self.lines[offset].value << index for index, offset in enumerate(offsets) if mask >> index & 1)
+            GPIO_V2_LINE_VALUES.pack_into(buffer, 0, values, mask)
+        elif request == GPIO_V2_LINE_SET_VALUES_IOCTL:
+            offsets = self.requests[file_descriptor][0]
+            values, mask = GPIO_V2_LINE_VALUES.unpack(buffer)
+            masked_offsets = [(index, offset) for index, offset in enumerate(offsets) if mask >> index & 1]
+            if any(not self.lines[offset].flags & GPIO_V2_LINE_FLAG_OUTPUT for _, offset in masked_offsets):
+                raise OSError(errno.EPERM, 'Operation not permitted')
+            for index, offset in masked_offsets:
+                self.lines[offset].value = values >> index & 1
+        else:
+            raise OSError(errno.ENOTTY, 'Inappropriate ioctl for device')
+        return 0
+
+    def _configure(self, offsets: List[int], config_fields: Tuple[int, ...]) -> None:
+        default_flags, attribute_count = config_fields[:2]
+        attributes = [config_fields[7 + index * 4:11 + index * 4] for index in range(attribute_count)]
+        for index, offset in enumerate(offsets):
+            flags = default_flags
+            for attribute_id, _, value, mask in attributes:
+                if attribute_id == GPIO_V2_LINE_ATTR_ID_FLAGS and mask >> index & 1:
+                    flags = value
+            # Lines without a direction are left as-is
+            if not flags & GPIO_V2_LINE_DIRECTION_FLAGS:
+                continue
+            line = self.lines[offset]
+            line.flags = (line.flags & GPIO_V2_LINE_FLAG_USED) | flags
+            for attribute_id, _, value, mask in attributes:
+                if attribute_id == GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES and mask >> index & 1 and \
+                        flags & GPIO_V2_LINE_FLAG_OUTPUT:
+                    line.value = value >> index & 1
+
+
+class TestGpiochipUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.fake_gpiochip = FakeGpiochip()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.fake_gpiochip.close()
+
+    def test_struct_sizes(self):
+        # Ensure structs match the sizes of the kernel's uAPI structs
+        self.assertEqual(68, GPIOCHIP_INFO.size)
+        self.assertEqual(272, GPIO_V2_LINE_CONFIG.size)
+        self.assertEqual(592, GPIO_V2_LINE_REQUEST.size)
+        self.assertEqual(256, GPIO_V2_LINE_INFO.size)
+        self.assertEqual(16, GPIO_V2_LINE_VALUES.size)
+        self.assertEqual(48, GPIO_V2_LINE_EVENT.size)
+
+    def test_pack_line_config(self):
+        # Ensure the most common flags are the default and every other set of flags is an attribute of its lines
+        pull_up_input_flags = GPIO_V2_LINE_FLAG_INPUT | GPIO_V2_LINE_FLAG_BIAS_PULL_UP
+        flags = [GPIO_V2_LINE_FLAG_INPUT, GPIO_V2_LINE_FLAG_OUTPUT, GPIO_V2_LINE_FLAG_INPUT, pull_up_input_flags]
+        fields = pack_line_config(flags, 0b1111)
+        self.assertEqual(GPIO_V2_LINE_CONFIG.size, len(GPIO_V2_LINE_CONFIG.pack(*fields)))
+        self.assertEqual(GPIO_V2_LINE_FLAG_INPUT, fields[0])
+        self.assertEqual(3, fields[1])
+        self.assertEqual((GPIO_V2_LINE_ATTR_ID_FLAGS, 0, GPIO_V2_LINE_FLAG_OUTPUT, 0b0010), tuple(fields[7:11]))
+        self.assertEqual((GPIO_V2_LINE_ATTR_ID_FLAGS, 0, pull_up_input_flags, 0b1000), tuple(fields[11:15]))
+
+        # Ensure output values are only given for output lines
+        self.assertEqual((GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES, 0, 0b0010, 0b0010), tuple(fields[15:19]))
+
+        # Ensure line configs that don't fit are rejected
+        with self.assertRaises(ValueError):
+            attribute_count = GPIO_V2_LINE_NUM_ATTRS_MAX + 2
+            pack_line_config([GPIO_V2_LINE_FLAG_INPUT | (index << 12) for index in range(attribute_count)], 0)
+
+    def test_gpiochip(self):
+        self.fake_gpiochip.lines[4].flags = GPIO_V2_LINE_FLAG_INPUT | GPIO_V2_LINE_FLAG_BIAS_PULL_DOWN
+        self.fake_gpiochip.lines[14].flags = GPIO_V2_LINE_FLAG_OUTPUT | GPIO_V2_LINE_FLAG_USED
+        self.fake_gpiochip.lines[14].consumer = 'serial'
+        gpiochip = GpioChip(self.fake_gpiochip.path, self.fake_gpiochip)
+
+        # Ensure the chip and its lines are described by the kernel
+        self.assertEqual('gpiochip0', gpiochip.name)
+        self.assertEqual('pinctrl-bcm2711', gpiochip.label)
+        self.assertEqual(58, gpiochip.lines)
+        line_info = gpiochip.line_info(14)
+        self.assertEqual(('GPIO14', 'serial', 14), (line_info.name, line_info.consumer, line_info.offset))
+        self.assertTrue(line_info.flags & GPIO_V2_LINE_FLAG_USED)
+        self.assertEqual(GPIO_V2_LINE_FLAG_BIAS_PULL_DOWN, gpiochip.line_info(4).flags & GPIO_V2_LINE_BIAS_FLAGS)
+
+        # Ensure lines held by another consumer can't be requested
+        with self.assertRaises(OSError):
+            gpiochip.request_lines([14, 15], [0, 0])
+
+        # Ensure requested lines are configured together and values are read and written with a single ioctl
+        line_request = gpiochip.request_lines([17, 27, 22],
+                                              [GPIO_V2_LINE_FLAG_OUTPUT, GPIO_V2_LINE_FLAG_OUTPUT,
+                                               GPIO_V2_LINE_FLAG_INPUT | GPIO_V2_LINE_FLAG_EDGE_RISING],
+                                              values=0b011)
+        self.assertEqual(1, self.fake_gpiochip.lines[17].value)
+        self.assertEqual(1, self.fake_gpiochip.lines[27].value)
+        self.fake_gpiochip.calls.clear()
+        line_request.set_values(0b000, 0b001)
+        self.assertEqual(0b010, line_request.get_values(0b111))
+        self.assertEqual([GPIO_V2_LINE_SET_VALUES_IOCTL, GPIO_V2_LINE_GET_VALUES_IOCTL], self.fake_gpiochip.calls)
+
+        # Ensure input lines can't be driven
+        with self.assertRaises(OSError):
+            line_request.set_values(0b100, 0b100)
+
+        # Ensure edges carry the kernel timestamp and the index of their line within the request
+        self.fake_gpiochip.drive(22, 1, timestamp=1_500_000_000)
+        self.fake_gpiochip.drive(22, 0, timestamp=1_600_000_000)
+        self.fake_gpiochip.drive(22, 1, timestamp=1_700_000_000)
+        events = line_request.read_events()
+        self.assertEqual([(1_500_000_000, True, 2, 22), (1_700_000_000, True, 2, 22)],
+                         [(event.timestamp, event.rising, event.index, event.offset) for event in events])
+
+        # Ensure reconfiguring keeps the lines requested
+        line_request.set_config([GPIO_V2_LINE_FLAG_INPUT] * 3, 0)
+        self.assertEqual(0, self.fake_gpiochip.lines[22].flags & GPIO_V2_LINE_EDGE_FLAGS)
+        self.assertTrue(self.fake_gpiochip.lines[17].flags & GPIO_V2_LINE_FLAG_INPUT)
+
+        line_request.close()
+        gpiochip.close()
+
+        # Ensure files that aren't GPIO chips are rejected
+        with self.assertRaises(OSError):
+            GpioChip(self.fake_gpiochip.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
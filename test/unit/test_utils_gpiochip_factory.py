@@ -0,0 +1,188 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import threading
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from gpiozero import Device, PinFixedPull, PinInvalidFunction, PinSetInput, PinUnsupported
+from gpiozero.pins.mock import MockFactory
+
+from endrpi.actions.pin import pin_cache, read_pin_configurations, update_pin_configurations
+from endrpi.config.pin_factory import configure_pin_factory, get_bulk_pin_access, PinFactoryType
+from endrpi.model.pin import PinConfiguration, PinIo, PinPull, RaspberryPiPinIds
+from endrpi.utils.gpio_registers import BulkPinAccess, GPIO_FUNCTION_INPUT, GPIO_FUNCTION_OUTPUT, GPIO_PULL_UP
+from endrpi.utils.gpiochip import GPIO_V2_LINE_FLAG_BIAS_PULL_UP, GPIO_V2_LINE_FLAG_EDGE_FALLING, \
+    GPIO_V2_LINE_FLAG_EDGE_RISING, GPIO_V2_LINE_FLAG_INPUT, GPIO_V2_LINE_FLAG_OUTPUT, GPIO_V2_LINE_FLAG_USED, \
+    GPIO_V2_LINE_GET_VALUES_IOCTL, GPIO_V2_LINE_SET_VALUES_IOCTL
+from endrpi.utils.gpiochip_factory import GpiochipFactory, GPIO_FUNCTION_UNAVAILABLE
+from test.unit.test_utils_gpiochip import FakeGpiochip
+
+
+class TestGpiochipFactoryUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.fake_gpiochip = FakeGpiochip()
+        self.fake_gpiochip.lines[14].flags = GPIO_V2_LINE_FLAG_OUTPUT | GPIO_V2_LINE_FLAG_USED
+        self.fake_gpiochip.lines[17].flags = GPIO_V2_LINE_FLAG_OUTPUT
+        self.fake_gpiochip.lines[17].value = 1
+        self.fake_gpiochip.lines[4].flags = GPIO_V2_LINE_FLAG_INPUT | GPIO_V2_LINE_FLAG_BIAS_PULL_UP
+        self.pin_factory = GpiochipFactory(self.fake_gpiochip.path, ioctl=self.fake_gpiochip)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.pin_factory.close()
+        self.fake_gpiochip.close()
+        configure_pin_factory(PinFactoryType.MOCK)
+        pin_cache.clear()
+
+    def test_pins(self):
+        # Ensure lines are requested as-is and pins report the direction, bias, and level they had
+        self.assertEqual(1, self.fake_gpiochip.lines[17].value)
+        gpiozero_pin = self.pin_factory.pin(RaspberryPiPinIds.GPIO17)
+        self.assertIs(gpiozero_pin, self.pin_factory.pin(17))
+        self.assertEqual(('output', 1), (gpiozero_pin.function, gpiozero_pin.state))
+        self.assertEqual(('input', 'up'), (self.pin_factory.pin('GPIO4').function, self.pin_factory.pin('GPIO4').pull))
+
+        # Ensure lines held by another consumer and lines beyond the chip are unsupported
+        for spec in (RaspberryPiPinIds.GPIO14, 'GPIO99', 'INVALID'):
+            with self.assertRaises(PinUnsupported):
+                self.pin_factory.pin(spec)
+
+        # Ensure outputs are driven and keep their level when switched from inputs
+        gpiozero_pin.state = 0
+        self.assertEqual(0, self.fake_gpiochip.lines[17].value)
+        gpiozero_pin.input_with_pull('down')
+        self.assertEqual(('input', 'down'), (gpiozero_pin.function, gpiozero_pin.pull))
+        with self.assertRaises(PinSetInput):
+            gpiozero_pin.state = 1
+        self.fake_gpiochip.lines[17].value = 1
+        gpiozero_pin.function = 'output'
+        self.assertEqual(1, gpiozero_pin.state)
+        with self.assertRaises(PinFixedPull):
+            gpiozero_pin.pull = 'up'
+        with self.assertRaises(PinInvalidFunction):
+            gpiozero_pin.function = 'alt0'
+
+        # Ensure reconfiguring a pin doesn't glitch other outputs
+        other_pin = self.pin_factory.pin(RaspberryPiPinIds.GPIO27)
+        other_pin.output_with_state(1)
+        gpiozero_pin.function = 'input'
+        self.assertEqual(1, self.fake_gpiochip.lines[27].value)
+
+        # Ensure PWM is left to software
+        self.assertIsNone(gpiozero_pin.frequency)
+
+    def test_edges(self):
+        gpiozero_pin = self.pin_factory.pin(RaspberryPiPinIds.GPIO4)
+        edges = []
+        edges_received = threading.Event()
+
+        def when_changed(ticks: float, state: int) -> None:
+            edges.append((ticks, state))
+            if len(edges) == 2:
+                edges_received.set()
+
+        # Ensure edges are only detected while a callback is set
+        self.pin_factory.pin(RaspberryPiPinIds.GPIO4).edges = 'falling'
+        self.assertFalse(self.fake_gpiochip.lines[4].flags & GPIO_V2_LINE_FLAG_EDGE_FALLING)
+        gpiozero_pin.when_changed = when_changed
+        self.assertTrue(self.fake_gpiochip.lines[4].flags & GPIO_V2_LINE_FLAG_EDGE_FALLING)
+        self.assertFalse(self.fake_gpiochip.lines[4].flags & GPIO_V2_LINE_FLAG_EDGE_RISING)
+
+        # Ensure callbacks get the kernel timestamp in ticks of the factory
+        gpiozero_pin.edges = 'both'
+        self.fake_gpiochip.drive(4, 1, timestamp=2_000_000_000)
+        self.fake_gpiochip.drive(4, 0, timestamp=2_250_000_000)
+        self.assertTrue(edges_received.wait(1))
+        self.assertEqual([(2.0, 1), (2.25, 0)], edges)
+        self.assertEqual(0.25, self.pin_factory.ticks_diff(edges[1][0], edges[0][0]))
+
+        gpiozero_pin.when_changed = None
+        self.assertFalse(self.fake_gpiochip.lines[4].flags & GPIO_V2_LINE_FLAG_EDGE_RISING)
+
+    def test_levels(self):
+        gpiozero_pin = self.pin_factory.pin(RaspberryPiPinIds.GPIO22)
+
+        # Ensure every level is read with a single ioctl
+        self.fake_gpiochip.calls.clear()
+        self.assertEqual(1 << 17, self.pin_factory.read_levels())
+        self.assertEqual([GPIO_V2_LINE_GET_VALUES_IOCTL], self.fake_gpiochip.calls)
+
+        # Ensure outputs are written with a single ioctl and inputs latch their level until they become outputs
+        self.fake_gpiochip.calls.clear()
+        self.pin_factory.write_levels(1 << 22, 1 << 17)
+        self.assertEqual([GPIO_V2_LINE_SET_VALUES_IOCTL], self.fake_gpiochip.calls)
+        self.assertEqual(0, self.fake_gpiochip.lines[17].value)
+        self.assertEqual(0, self.fake_gpiochip.lines[22].value)
+        gpiozero_pin.function = 'output'
+        self.assertEqual(1, self.fake_gpiochip.lines[22].value)
+
+        # Ensure banks are encoded like the GPIO registers
+        gpio_bank = self.pin_factory.read_bank()
+        self.assertEqual(GPIO_FUNCTION_OUTPUT, gpio_bank.function(22))
+        self.assertEqual(GPIO_FUNCTION_INPUT, gpio_bank.function(4))
+        self.assertEqual(GPIO_FUNCTION_UNAVAILABLE, gpio_bank.function(14))
+        self.assertEqual(GPIO_PULL_UP, gpio_bank.pull(4))
+        self.assertEqual(1, gpio_bank.level(22))
+
+    def test_pin_actions(self):
+        Device.pin_factory = self.pin_factory
+        pin_cache.clear()
+
+        # Ensure pin actions read and write every pin through the factory in bulk
+        with patch('endrpi.actions.pin.get_bulk_pin_access', return_value=self.pin_factory):
+            update_action_result = update_pin_configurations({
+                RaspberryPiPinIds.GPIO20: PinConfiguration(io=PinIo.OUTPUT, state=1),
+                RaspberryPiPinIds.GPIO21: PinConfiguration(io=PinIo.INPUT, pull=PinPull.DOWN)
+            })
+            self.assertTrue(update_action_result.success)
+            self.assertEqual(1, self.fake_gpiochip.lines[20].value)
+            pin_cache.clear()
+            read_action_result = read_pin_configurations([RaspberryPiPinIds.GPIO20, RaspberryPiPinIds.GPIO21])
+            self.assertTrue(read_action_result.success)
+            self.assertEqual(PinConfiguration(io=PinIo.OUTPUT, state=1, pull=PinPull.FLOATING),
+                             read_action_result.data[RaspberryPiPinIds.GPIO20])
+            self.assertEqual(PinPull.DOWN, read_action_result.data[RaspberryPiPinIds.GPIO21].pull)
+
+    def test_configure_pin_factory(self):
+        # Ensure explicitly selected backends that fail are an error
+        with self.assertRaises(OSError):
+            configure_pin_factory(PinFactoryType.GPIOCHIP, self.fake_gpiochip.path + '.missing')
+
+        # Ensure automatic selection falls back to mocked pins
+        with patch('endrpi.config.pin_factory.NativeFactory', side_effect=OSError):
+            configure_pin_factory(PinFactoryType.AUTO, self.fake_gpiochip.path + '.missing')
+        self.assertIsInstance(Device.pin_factory, MockFactory)
+        self.assertIsNone(get_bulk_pin_access())
+
+        # Ensure the gpiochip backend reads in bulk
+        with patch('endrpi.config.pin_factory.NativeFactory', side_effect=OSError), \
+                patch('endrpi.config.pin_factory.GpiochipFactory',
+                      side_effect=lambda path, pin_ids: GpiochipFactory(path, pin_ids, self.fake_gpiochip)):
+            self.pin_factory.close()
+            configure_pin_factory(PinFactoryType.AUTO, self.fake_gpiochip.path)
+        self.pin_factory = Device.pin_factory
+        self.assertIsInstance(self.pin_factory, GpiochipFactory)
+        self.assertIs(self.pin_factory, get_bulk_pin_access())
+        self.assertIsInstance(get_bulk_pin_access(), BulkPinAccess)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import errno
+import os
+import tempfile
+import time
+import unittest
+from typing import Dict, List
+from unittest import TestCase
+
+from endrpi.model.i2c import I2cBlockRead, I2cBlockWrite, I2cPollConfiguration
+from endrpi.utils.i2c import I2C_M_RD, I2C_RDWR, I2C_RDWR_IOCTL_MAX_MSGS, I2cBus, I2cBusUnavailable, I2cBuses, \
+    I2cPoller, I2cRdwrIoctlData, I2cTransferError
+
+
+class FakeI2c:
+    """
+    In-process fake of the kernel side of the I2C character device, used in place of :func:`fcntl.ioctl`.
+
+    .. note::
+        Devices are 256 byte register maps with an auto-incrementing register pointer, addresses without a device
+        don't acknowledge. Every combined transfer is recorded as its number of messages. Controllers that only take
+        a read as the last message (i.e. i2c-bcm2835) are faked with ``last_message_reads``.
+    """
+
+    def __init__(self, devices: Dict[int, bytearray], last_message_reads: bool = False):
+        self.devices = devices
+        self.last_message_reads = last_message_reads
+        self.transfers: List[int] = []
+        self.directory = tempfile.TemporaryDirectory()
+        self.path_format = os.path.join(self.directory.name, 'i2c-{bus}')
+        open(self.path_format.format(bus=1), 'w').close()
+
+    def close(self) -> None:
+        self.directory.cleanup()
+
+    def __call__(self, file_descriptor: int, request: int, data: I2cRdwrIoctlData, mutate: bool = True) -> int:
+        if request != I2C_RDWR or data.nmsgs > I2C_RDWR_IOCTL_MAX_MSGS:
+            raise OSError(errno.EINVAL, 'Invalid argument')
+        if self.last_message_reads and any(data.msgs[index].flags & I2C_M_RD for index in range(data.nmsgs - 1)):
+            raise OSError(errno.EOPNOTSUPP, 'Operation not supported')
+        self.transfers.append(data.nmsgs)
+
+        pointers: Dict[int, int] = {}
+        for index in range(data.nmsgs):
+            msg = data.msgs[index]
+            registers = self.devices.get(msg.addr)
+            if registers is None:
+                raise OSError(errno.EREMOTEIO, 'Remote I/O error')
+            if msg.flags & I2C_M_RD:
+                for offset in range(msg.len):
+                    msg.buf[offset] = registers[(pointers.get(msg.addr, 0) + offset) % len(registers)]
+            else:
+                pointers[msg.addr] = msg.buf[0]
+                for offset in range(1, msg.len):
+                    registers[(msg.buf[0] + offset - 1) % len(registers)] = msg.buf[offset]
+        return 0
+
+
+class TestI2cUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.devices = {0x48: bytearray(range(256)), 0x76: bytearray(256)}
+        self.fake_i2c = FakeI2c(self.devices)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.fake_i2c.close()
+
+    def test_i2c_bus(self):
+        i2c_bus = I2cBus(1, self.fake_i2c.path_format, self.fake_i2c)
+
+        # Ensure every block of a batch is read with a single combined transfer
+        blocks = i2c_bus.read_blocks([I2cBlockRead(address=0x48, startRegister=0x10, length=4),
+                                      I2cBlockRead(address=0x76, startRegister=0x00, length=2)])
+        self.assertEqual([4], self.fake_i2c.transfers)
+        self.assertEqual([0x10, 0x11, 0x12, 0x13], blocks[0].data)
+        self.assertEqual((1, 0x76, 0x00, [0, 0]), (blocks[1].bus, blocks[1].address, blocks[1].startRegister,
+                                                   blocks[1].data))
+
+        # Ensure writes start at their register
+        i2c_bus.write_blocks([I2cBlockWrite(address=0x76, startRegister=0xF4, data=[0x27, 0xA0])])
+        self.assertEqual(bytearray([0x27, 0xA0]), self.devices[0x76][0xF4:0xF6])
+
+        # Ensure batches beyond the message limit are split without splitting a read
+        self.fake_i2c.transfers.clear()
+        i2c_bus.read_blocks([I2cBlockRead(address=0x48, startRegister=register, length=1) for register in range(30)])
+        self.assertEqual([I2C_RDWR_IOCTL_MAX_MSGS, 60 - I2C_RDWR_IOCTL_MAX_MSGS], self.fake_i2c.transfers)
+
+        # Ensure devices that don't respond are identified
+        with self.assertRaises(I2cTransferError) as context:
+            i2c_bus.read_blocks([I2cBlockRead(address=0x48, startRegister=0, length=1),
+                                 I2cBlockRead(address=0x50, startRegister=0, length=1)])
+        self.assertEqual(0x50, context.exception.address)
+
+        i2c_bus.close()
+
+    def test_i2c_bus_last_message_reads(self):
+        self.fake_i2c.last_message_reads = True
+        i2c_bus = I2cBus(1, self.fake_i2c.path_format, self.fake_i2c)
+
+        # Ensure refused combined reads are sent as a register address and read pair per transfer
+        reads = [I2cBlockRead(address=0x48, startRegister=register, length=2) for register in (0x10, 0x20, 0x30)]
+        blocks = i2c_bus.read_blocks(reads)
+        self.assertEqual([[0x10, 0x11], [0x20, 0x21], [0x30, 0x31]], [block.data for block in blocks])
+        self.assertEqual([2, 2, 2], self.fake_i2c.transfers)
+
+        # Ensure later batches aren't sent combined again and writes are still combined
+        self.fake_i2c.transfers.clear()
+        i2c_bus.read_blocks(reads[:2])
+        i2c_bus.write_blocks([I2cBlockWrite(address=0x76, startRegister=register, data=[1]) for register in range(3)])
+        self.assertEqual([2, 2, 3], self.fake_i2c.transfers)
+        self.assertEqual(bytearray([1, 1, 1]), self.devices[0x76][0:3])
+
+        # Ensure devices that don't respond are still identified
+        with self.assertRaises(I2cTransferError) as context:
+            i2c_bus.read_blocks([I2cBlockRead(address=0x48, startRegister=0, length=1),
+                                 I2cBlockRead(address=0x50, startRegister=0, length=1)])
+        self.assertEqual(0x50, context.exception.address)
+
+        i2c_bus.close()
+
+    def test_i2c_buses(self):
+        i2c_buses = I2cBuses(self.fake_i2c.path_format, self.fake_i2c)
+
+        # Ensure buses are opened once and unavailable buses are identified
+        self.assertIs(i2c_buses.bus(1), i2c_buses.bus(1))
+        with self.assertRaises(I2cBusUnavailable) as context:
+            i2c_buses.read_blocks([I2cBlockRead(bus=3, address=0x48, startRegister=0, length=1)])
+        self.assertEqual(3, context.exception.bus)
+
+        # Ensure blocks keep the order of the reads
+        blocks = i2c_buses.read_blocks([I2cBlockRead(address=0x76, startRegister=0, length=1),
+                                        I2cBlockRead(address=0x48, startRegister=7, length=1)])
+        self.assertEqual([0x76, 0x48], [block.address for block in blocks])
+        self.assertEqual([7], blocks[1].data)
+
+        i2c_buses.close()
+
+    def test_i2c_poller(self):
+        i2c_buses = I2cBuses(self.fake_i2c.path_format, self.fake_i2c)
+        poll_configuration = I2cPollConfiguration(interval=0.01,
+                                                  reads=[I2cBlockRead(address=0x76, startRegister=0xFA, length=2)])
+        poller = I2cPoller(poll_configuration, i2c_buses.read_blocks)
+
+        # Ensure the blocks of every poll are cached
+        self.assertEqual([], poller.status().blocks)
+        poller.start()
+        self.devices[0x76][0xFA] = 0x80
+        time.sleep(0.1)
+        poller.stop()
+        poll_status = poller.status()
+        self.assertGreater(poll_status.polls, 2)
+        self.assertEqual([0x80, 0x00], poll_status.blocks[0].data)
+        self.assertIsNotNone(poll_status.timestamp)
+
+        # Ensure failed polls keep the blocks of the last successful poll
+        del self.devices[0x76]
+        poller.poll()
+        poll_status = poller.status()
+        self.assertEqual(1, poll_status.failedPolls)
+        self.assertIsNotNone(poll_status.error)
+        self.assertEqual([0x80, 0x00], poll_status.blocks[0].data)
+
+        i2c_buses.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
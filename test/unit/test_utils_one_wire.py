@@ -0,0 +1,109 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import TestCase
+
+from endrpi.utils.one_wire import OneWirePoller, OneWireReadError, read_one_wire_temperature
+
+
+def create_one_wire_sensor(devices_path: str, sensor_id: str, millidegrees: int, crc_valid: bool = True) -> None:
+    """Creates (or rewrites) a fake sysfs 1-Wire temperature sensor."""
+
+    sensor_path = os.path.join(devices_path, sensor_id)
+    os.makedirs(sensor_path, exist_ok=True)
+    with open(os.path.join(sensor_path, 'w1_slave'), 'w') as file:
+        file.write(f'72 01 4b 46 7f ff 0e 10 57 : crc=57 {"YES" if crc_valid else "NO"}\n')
+        file.write(f'72 01 4b 46 7f ff 0e 10 57 t={millidegrees}\n')
+
+
+class TestOneWireUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.devices_directory = tempfile.TemporaryDirectory()
+        self.devices_path = self.devices_directory.name
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.devices_directory.cleanup()
+
+    def test_read_one_wire_temperature(self):
+        # Ensure temperatures are converted from millidegrees, including negative temperatures
+        create_one_wire_sensor(self.devices_path, '28-000000000001', 23125)
+        self.assertEqual(23.125, read_one_wire_temperature(os.path.join(self.devices_path, '28-000000000001')))
+        create_one_wire_sensor(self.devices_path, '28-000000000001', -1062)
+        self.assertEqual(-1.062, read_one_wire_temperature(os.path.join(self.devices_path, '28-000000000001')))
+
+        # Ensure failed conversions and removed sensors are errors
+        create_one_wire_sensor(self.devices_path, '28-000000000001', 23125, crc_valid=False)
+        with self.assertRaises(OneWireReadError):
+            read_one_wire_temperature(os.path.join(self.devices_path, '28-000000000001'))
+        with self.assertRaises(OSError):
+            read_one_wire_temperature(os.path.join(self.devices_path, '28-000000000002'))
+
+    def test_one_wire_poller(self):
+        one_wire_poller = OneWirePoller(self.devices_path, interval=0.05)
+
+        # Ensure missing bus directories have no sensors
+        self.assertEqual([], OneWirePoller(os.path.join(self.devices_path, 'missing')).discover())
+
+        # Ensure only temperature sensors are discovered
+        create_one_wire_sensor(self.devices_path, '28-000000000002', 21000)
+        create_one_wire_sensor(self.devices_path, '10-000000000001', 19500)
+        os.mkdir(os.path.join(self.devices_path, 'w1_bus_master1'))
+        os.mkdir(os.path.join(self.devices_path, '2d-000000000003'))
+        self.assertEqual(['10-000000000001', '28-000000000002'], one_wire_poller.discover())
+
+        # Ensure polled temperatures are cached with timestamps
+        self.assertEqual([], one_wire_poller.temperatures())
+        one_wire_poller.poll()
+        one_wire_temperatures = one_wire_poller.temperatures()
+        self.assertEqual(['10-000000000001', '28-000000000002'], [sensor.id for sensor in one_wire_temperatures])
+        self.assertEqual([19.5, 21.0], [sensor.temperature.quantity for sensor in one_wire_temperatures])
+        self.assertTrue(all(sensor.timestamp and sensor.error is None for sensor in one_wire_temperatures))
+
+        # Ensure failed reads keep the last temperature and its timestamp along with the error
+        create_one_wire_sensor(self.devices_path, '28-000000000002', 85000, crc_valid=False)
+        one_wire_poller.poll()
+        one_wire_temperature = one_wire_poller.temperature('28-000000000002')
+        self.assertEqual(21.0, one_wire_temperature.temperature.quantity)
+        self.assertEqual(one_wire_temperatures[1].timestamp, one_wire_temperature.timestamp)
+        self.assertEqual('Failed conversion of `28-000000000002`', one_wire_temperature.error)
+
+        # Ensure removed sensors are forgotten
+        shutil.rmtree(os.path.join(self.devices_path, '10-000000000001'))
+        one_wire_poller.poll()
+        self.assertIsNone(one_wire_poller.temperature('10-000000000001'))
+        self.assertEqual(['28-000000000002'], [sensor.id for sensor in one_wire_poller.temperatures()])
+
+        # Ensure the thread keeps reading sensors until stopped
+        create_one_wire_sensor(self.devices_path, '28-000000000002', 22500)
+        one_wire_poller.start()
+        deadline = time.monotonic() + 5
+        while one_wire_poller.temperature('28-000000000002').error and time.monotonic() < deadline:
+            time.sleep(0.01)
+        one_wire_poller.stop()
+        self.assertEqual(22.5, one_wire_poller.temperature('28-000000000002').temperature.quantity)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import time
+import unittest
+from typing import List
+from unittest import TestCase
+
+from endrpi.model.pid import PidConfiguration, PidTuning
+from endrpi.utils.pid import PidLoop
+
+
+def create_pid_configuration(**kwargs) -> PidConfiguration:
+    return PidConfiguration(source={'type': 'SENSOR', 'sensorId': 'thermal_zone0'},
+                            output={'pinId': 'GPIO18'},
+                            **kwargs)
+
+
+def wait_for_iterations(pid_loop: PidLoop, iterations: int, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while pid_loop.iterations < iterations and pid_loop.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class TestPidUtils(TestCase):
+
+    def test_pid_control(self):
+        # Ensure the proportional term is clamped to the output limits
+        pid_loop = PidLoop(1, create_pid_configuration(setpoint=50, kp=0.1, outputMax=0.8), float, float)
+        self.assertAlmostEqual(0.5, pid_loop.control(45, 0.1))
+        self.assertEqual(0.8, pid_loop.control(30, 0.1))
+        self.assertEqual(0, pid_loop.control(60, 0.1))
+
+        # Ensure the integral term accumulates and doesn't wind up beyond the output limits
+        pid_loop = PidLoop(1, create_pid_configuration(setpoint=50, ki=0.1), float, float)
+        self.assertAlmostEqual(0.1, pid_loop.control(49, 1))
+        self.assertAlmostEqual(0.2, pid_loop.control(49, 1))
+        for _ in range(100):
+            pid_loop.control(0, 1)
+        self.assertAlmostEqual(0.9, pid_loop.control(51, 1))
+
+        # Ensure the derivative term acts on the process variable so setpoint changes don't kick the output
+        pid_loop = PidLoop(1, create_pid_configuration(setpoint=50, kd=0.5), float, float)
+        self.assertEqual(0, pid_loop.control(50, 0.1))
+        self.assertAlmostEqual(0.5, pid_loop.control(49.9, 0.1))
+        pid_loop.tune(PidTuning(setpoint=100, kd=0.5))
+        self.assertEqual(0, pid_loop.control(49.9, 0.1))
+        self.assertEqual(100, pid_loop.configuration.setpoint)
+
+    def test_pid_loop(self):
+        process_variables: List[float] = [40.0]
+        outputs: List[float] = []
+
+        def read_process_variable() -> float:
+            if process_variables[0] is None:
+                raise OSError('Sensor unavailable')
+            return process_variables[0]
+
+        # Ensure the loop runs at its rate and measures the jitter of its period
+        pid_loop = PidLoop(1, create_pid_configuration(setpoint=50, kp=0.05, rate=200), read_process_variable,
+                           outputs.append)
+        pid_loop.start()
+        wait_for_iterations(pid_loop, 20)
+        pid_status = pid_loop.status()
+        self.assertTrue(pid_status.running)
+        self.assertEqual(40, pid_status.processVariable)
+        self.assertAlmostEqual(0.5, pid_status.output)
+        self.assertAlmostEqual(0.5, outputs[-1])
+        self.assertGreaterEqual(pid_status.jitter.period.count, 19)
+        self.assertGreater(pid_status.jitter.period.mean, 0)
+        self.assertIsNotNone(pid_status.jitter.standardDeviation)
+        self.assertIsNotNone(pid_status.jitter.maxDeviation)
+
+        # Ensure failed reads hold the output and are reported
+        process_variables[0] = None
+        time.sleep(0.05)
+        output_count = len(outputs)
+        time.sleep(0.05)
+        self.assertEqual(output_count, len(outputs))
+        self.assertEqual('Sensor unavailable', pid_loop.status().error)
+        pid_loop.stop()
+        self.assertFalse(pid_loop.running)
+
+        # Ensure failed writes stop the loop
+        def write_output(_: float) -> None:
+            raise KeyError('GPIO18')
+
+        process_variables[0] = 40.0
+        pid_loop = PidLoop(2, create_pid_configuration(setpoint=50, rate=200), read_process_variable, write_output)
+        pid_loop.start()
+        wait_for_iterations(pid_loop, 1)
+        pid_loop.stop()
+        self.assertEqual(0, pid_loop.iterations)
+        self.assertIsNotNone(pid_loop.status().error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from gpiozero import PinUnsupported
+
+from endrpi.model.pin import PinConfiguration, PinIo, PinPull, RaspberryPiPinIds
+from endrpi.utils.pin_cache import PinCache
+
+
+class TestPinCacheUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.pin_factory = MagicMock()
+        self.pin_factory.pin.side_effect = lambda pin_id: MagicMock()
+        self.pin_cache = PinCache(lambda: self.pin_factory)
+
+    def test_pin(self):
+        # Ensure pin handles are only requested from the pin factory once
+        gpiozero_pin = self.pin_cache.pin(RaspberryPiPinIds.GPIO2)
+        self.assertIs(gpiozero_pin, self.pin_cache.pin(RaspberryPiPinIds.GPIO2))
+        self.assertIsNot(gpiozero_pin, self.pin_cache.pin(RaspberryPiPinIds.GPIO3))
+        self.assertEqual(2, self.pin_factory.pin.call_count)
+
+        # Ensure unsupported pins aren't cached
+        self.pin_factory.pin.side_effect = PinUnsupported('Pin not supported')
+        for _ in range(2):
+            with self.assertRaises(PinUnsupported):
+                self.pin_cache.pin(RaspberryPiPinIds.GPIO4)
+        self.assertEqual(4, self.pin_factory.pin.call_count)
+
+        # Ensure pin handles and shadows are forgotten once the pin factory is replaced
+        self.pin_cache.update_shadow(RaspberryPiPinIds.GPIO2, PinConfiguration(io=PinIo.INPUT, pull=PinPull.UP))
+        self.pin_factory = MagicMock()
+        self.assertIsNone(self.pin_cache.shadow(RaspberryPiPinIds.GPIO2))
+        self.assertIs(self.pin_factory.pin.return_value, self.pin_cache.pin(RaspberryPiPinIds.GPIO2))
+
+    def test_shadow(self):
+        input_configuration = PinConfiguration(io=PinIo.INPUT, pull=PinPull.DOWN)
+        output_configuration = PinConfiguration(io=PinIo.OUTPUT, state=1)
+
+        # Ensure shadows are stored per pin
+        self.assertIsNone(self.pin_cache.shadow(RaspberryPiPinIds.GPIO2))
+        self.pin_cache.update_shadow(RaspberryPiPinIds.GPIO2, input_configuration)
+        self.pin_cache.update_shadow(RaspberryPiPinIds.GPIO3, output_configuration)
+        self.assertEqual(input_configuration, self.pin_cache.shadow(RaspberryPiPinIds.GPIO2))
+        self.assertEqual(output_configuration, self.pin_cache.shadow(RaspberryPiPinIds.GPIO3))
+
+        # Ensure shadows are invalidated per pin or all at once while pin handles are kept
+        gpiozero_pin = self.pin_cache.pin(RaspberryPiPinIds.GPIO2)
+        self.pin_cache.invalidate(RaspberryPiPinIds.GPIO2)
+        self.assertIsNone(self.pin_cache.shadow(RaspberryPiPinIds.GPIO2))
+        self.assertEqual(output_configuration, self.pin_cache.shadow(RaspberryPiPinIds.GPIO3))
+        self.pin_cache.invalidate()
+        self.assertIsNone(self.pin_cache.shadow(RaspberryPiPinIds.GPIO3))
+        self.assertIs(gpiozero_pin, self.pin_cache.pin(RaspberryPiPinIds.GPIO2))
+
+        # Ensure clearing forgets both shadows and pin handles
+        self.pin_cache.update_shadow(RaspberryPiPinIds.GPIO2, input_configuration)
+        self.pin_cache.clear()
+        self.assertIsNone(self.pin_cache.shadow(RaspberryPiPinIds.GPIO2))
+        self.assertIsNot(gpiozero_pin, self.pin_cache.pin(RaspberryPiPinIds.GPIO2))
+
+
+if __name__ == '__main__':
+    unittest.main()
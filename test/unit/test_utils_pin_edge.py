@@ -0,0 +1,220 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from gpiozero import Device, PinUnsupported
+from gpiozero.pins.mock import MockFactory
+
+from endrpi.model.pin import PinEdge, RaspberryPiPinIds, PinEdgeFilterConfiguration, PinEdgeFilterPolicy
+from endrpi.utils.pin_edge import PinEdgeListener, PinEdgeMonitor, PinEdgeFilter, PinEdgeSample
+from endrpi.utils.pin_lock import PinLocks
+
+
+def create_sample(ticks: float, state: float) -> PinEdgeSample:
+    return PinEdgeSample(ticks, PinEdge.RISING if state else PinEdge.FALLING, state, ticks)
+
+
+def subtract_ticks(later: float, earlier: float) -> float:
+    return later - earlier
+
+
+class TestPinEdgeUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        Device.pin_factory = MockFactory()
+        self.loop = asyncio.new_event_loop()
+        self.pin_locks = PinLocks()
+        self.monitor = PinEdgeMonitor(self.pin_locks)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.loop.close()
+
+    def test_listener(self):
+        async def notify_and_read():
+            listener = PinEdgeListener(PinEdge.RISING, queue_size=3)
+            self.assertTrue(listener.accepts(PinEdge.RISING))
+            self.assertFalse(listener.accepts(PinEdge.FALLING))
+            self.assertTrue(PinEdgeListener(PinEdge.BOTH, queue_size=1).accepts(PinEdge.FALLING))
+
+            # Ensure a flood of edges from another thread never holds more than the queue size
+            def flood():
+                for sample_number in range(10):
+                    listener.notify((float(sample_number), PinEdge.RISING, 1.0))
+
+            thread = threading.Thread(target=flood)
+            thread.start()
+            thread.join()
+
+            # Ensure the newest edges are kept and the dropped edges are counted
+            samples, dropped_samples = await listener.next_samples()
+            self.assertEqual([7.0, 8.0, 9.0], [sample[0] for sample in samples])
+            self.assertEqual(7, dropped_samples)
+
+            listener.notify((10.0, PinEdge.RISING, 1.0))
+            samples, dropped_samples = await listener.next_samples()
+            self.assertEqual([(10.0, PinEdge.RISING, 1.0)], samples)
+            self.assertEqual(0, dropped_samples)
+
+        self.loop.run_until_complete(notify_and_read())
+
+    def test_monitor(self):
+        async def drive_pin():
+            # Note: Mock pins are shared between mock factories
+            gpiozero_pin = Device.pin_factory.pin(RaspberryPiPinIds.GPIO17)
+            gpiozero_pin.drive_low()
+            rising_listener = PinEdgeListener(PinEdge.RISING, queue_size=8)
+            falling_listener = PinEdgeListener(PinEdge.FALLING, queue_size=8)
+
+            # Ensure the pin only detects the edges its listeners are interested in
+            self.monitor.add_listener(RaspberryPiPinIds.GPIO17, rising_listener)
+            self.assertEqual('rising', gpiozero_pin.edges)
+            self.assertIsNotNone(gpiozero_pin.when_changed)
+            self.monitor.add_listener(RaspberryPiPinIds.GPIO17, falling_listener)
+            self.assertEqual('both', gpiozero_pin.edges)
+            self.assertEqual(2, self.monitor.listener_count(RaspberryPiPinIds.GPIO17))
+
+            # Ensure each listener only receives its edges with the state after the edge
+            gpiozero_pin.drive_high()
+            gpiozero_pin.drive_low()
+            gpiozero_pin.drive_high()
+            rising_samples, _ = await rising_listener.next_samples()
+            falling_samples, _ = await falling_listener.next_samples()
+            self.assertEqual([(PinEdge.RISING, 1.0), (PinEdge.RISING, 1.0)],
+                             [(sample.edge, sample.state) for sample in rising_samples])
+            self.assertEqual([(PinEdge.FALLING, 0.0)], [(sample.edge, sample.state) for sample in falling_samples])
+            self.assertLessEqual(rising_samples[0][0], falling_samples[0][0])
+
+            # Ensure the callback is removed once the pin has no listeners
+            self.monitor.remove_listener(RaspberryPiPinIds.GPIO17, rising_listener)
+            self.assertEqual('falling', gpiozero_pin.edges)
+            self.monitor.remove_listener(RaspberryPiPinIds.GPIO17, falling_listener)
+            self.assertEqual(0, self.monitor.listener_count(RaspberryPiPinIds.GPIO17))
+            self.assertIsNone(gpiozero_pin.when_changed)
+            self.monitor.remove_listener(RaspberryPiPinIds.GPIO17, falling_listener)
+
+            # Ensure the callback waits until the pin is no longer being updated
+            with self.pin_locks.write(RaspberryPiPinIds.GPIO17):
+                thread = threading.Thread(target=self.monitor.add_listener,
+                                          args=(RaspberryPiPinIds.GPIO17, rising_listener))
+                thread.start()
+                thread.join(0.05)
+                self.assertTrue(thread.is_alive())
+                self.assertIsNone(gpiozero_pin.when_changed)
+            thread.join(5)
+            self.assertEqual('rising', gpiozero_pin.edges)
+            self.monitor.remove_listener(RaspberryPiPinIds.GPIO17, rising_listener)
+
+        self.loop.run_until_complete(drive_pin())
+
+    def test_filter(self):
+        emitted_samples = []
+
+        # Ensure leading edges pass and bounces within the window are filtered
+        configuration = PinEdgeFilterConfiguration(policy=PinEdgeFilterPolicy.LEADING, window=5000)
+        pin_edge_filter = PinEdgeFilter(configuration, emitted_samples.append, subtract_ticks)
+        for ticks, state in ((0.0, 1.0), (0.001, 0.0), (0.002, 1.0), (0.010, 0.0), (0.020, 0.0)):
+            pin_edge_filter.notify(create_sample(ticks, state))
+        self.assertEqual([0.0, 0.010], [sample.ticks for sample in emitted_samples])
+        pin_edge_filter_status = pin_edge_filter.status()
+        self.assertEqual((2, 3), (pin_edge_filter_status.passedEdges, pin_edge_filter_status.filteredEdges))
+        self.assertEqual(PinEdgeFilterPolicy.LEADING, pin_edge_filter_status.policy)
+
+        # Ensure rate limited edges pass at most at the configured rate
+        emitted_samples.clear()
+        configuration = PinEdgeFilterConfiguration(policy=PinEdgeFilterPolicy.RATE_LIMIT, rate=10)
+        pin_edge_filter = PinEdgeFilter(configuration, emitted_samples.append, subtract_ticks)
+        for edge_number in range(50):
+            pin_edge_filter.notify(create_sample(edge_number * 0.01, float(edge_number % 2)))
+        self.assertEqual(5, len(emitted_samples))
+        self.assertEqual((5, 45), (pin_edge_filter.passed_edges, pin_edge_filter.filtered_edges))
+
+        # Ensure trailing edges pass once the pin is stable and bursts ending in the passed state are dropped
+        emitted_samples.clear()
+        configuration = PinEdgeFilterConfiguration(policy=PinEdgeFilterPolicy.TRAILING, window=20_000)
+        pin_edge_filter = PinEdgeFilter(configuration, emitted_samples.append, subtract_ticks)
+        for ticks, state in ((0.0, 1.0), (0.001, 0.0), (0.002, 1.0)):
+            pin_edge_filter.notify(create_sample(ticks, state))
+        self.assertEqual([], emitted_samples)
+        time.sleep(0.1)
+        self.assertEqual([(0.002, 1.0)], [(sample.ticks, sample.state) for sample in emitted_samples])
+        for ticks, state in ((0.2, 0.0), (0.201, 1.0)):
+            pin_edge_filter.notify(create_sample(ticks, state))
+        time.sleep(0.1)
+        self.assertEqual(1, len(emitted_samples))
+        self.assertEqual((1, 4), (pin_edge_filter.passed_edges, pin_edge_filter.filtered_edges))
+
+        # Ensure pending trailing edges are dropped once the filter is closed
+        pin_edge_filter.notify(create_sample(0.4, 0.0))
+        pin_edge_filter.close()
+        time.sleep(0.05)
+        self.assertEqual(1, len(emitted_samples))
+
+    def test_monitor_filter(self):
+        async def drive_pin():
+            # Note: Mock pins are shared between mock factories
+            gpiozero_pin = Device.pin_factory.pin(RaspberryPiPinIds.GPIO16)
+            gpiozero_pin.function = 'input'
+            gpiozero_pin.drive_low()
+            gpiozero_pin.when_changed = None
+            rising_listener = PinEdgeListener(PinEdge.RISING, queue_size=8)
+
+            # Ensure filtered pins detect both edges so the filter knows the state of the pin
+            self.monitor.add_listener(RaspberryPiPinIds.GPIO16, rising_listener)
+            self.assertEqual('rising', gpiozero_pin.edges)
+            configuration = PinEdgeFilterConfiguration(policy=PinEdgeFilterPolicy.LEADING, window=1_000_000)
+            self.monitor.set_filter(RaspberryPiPinIds.GPIO16, configuration)
+            self.assertEqual('both', gpiozero_pin.edges)
+
+            # Ensure listeners only receive the edges passed by the filter
+            for _ in range(3):
+                gpiozero_pin.drive_high()
+                gpiozero_pin.drive_low()
+            rising_samples, _ = await rising_listener.next_samples()
+            self.assertEqual(1, len(rising_samples))
+            filter_status = self.monitor.filter_status(RaspberryPiPinIds.GPIO16)
+            self.assertEqual((1, 5), (filter_status.passedEdges, filter_status.filteredEdges))
+            self.assertEqual({RaspberryPiPinIds.GPIO16: filter_status}, self.monitor.filter_statuses())
+
+            # Ensure removing the filter restores the edges of the listeners
+            self.monitor.set_filter(RaspberryPiPinIds.GPIO16, None)
+            self.assertIsNone(self.monitor.filter_status(RaspberryPiPinIds.GPIO16))
+            self.assertEqual('rising', gpiozero_pin.edges)
+            self.monitor.remove_listener(RaspberryPiPinIds.GPIO16, rising_listener)
+
+        self.loop.run_until_complete(drive_pin())
+
+    @patch('endrpi.utils.pin_edge.Device.pin_factory.pin')
+    def test_monitor_unsupported_pin(self, gpiozero_pin_mock):
+        async def add_listener():
+            # Ensure listeners of unsupported pins aren't kept
+            gpiozero_pin_mock.side_effect = PinUnsupported('Pin not supported')
+            with self.assertRaises(PinUnsupported):
+                self.monitor.add_listener(RaspberryPiPinIds.GPIO17, PinEdgeListener(PinEdge.BOTH, queue_size=1))
+            self.assertEqual(0, self.monitor.listener_count(RaspberryPiPinIds.GPIO17))
+
+        self.loop.run_until_complete(add_listener())
+
+
+if __name__ == '__main__':
+    unittest.main()
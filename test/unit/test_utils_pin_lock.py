@@ -0,0 +1,116 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import threading
+import time
+import unittest
+from unittest import TestCase
+
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.utils.pin_lock import PinLocks, ReadWriteLock
+
+
+def start_thread(target) -> threading.Thread:
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestPinLockUtils(TestCase):
+
+    def test_read_write_lock(self):
+        lock = ReadWriteLock()
+        events = []
+
+        # Ensure readers share the lock while a writer waits for every reader
+        lock.acquire_read()
+        reader = start_thread(lambda: (lock.acquire_read(), events.append('read'), lock.release_read()))
+        reader.join(1)
+        self.assertEqual(['read'], events)
+
+        def write():
+            lock.acquire_write()
+            events.append('write')
+            lock.release_write()
+
+        writer = start_thread(write)
+        time.sleep(0.05)
+        self.assertEqual(['read'], events)
+
+        # Ensure new readers wait behind a waiting writer while nested reads don't
+        late_reader = start_thread(lambda: (lock.acquire_read(), events.append('late read'), lock.release_read()))
+        time.sleep(0.05)
+        lock.acquire_read()
+        lock.release_read()
+        self.assertEqual(['read'], events)
+
+        lock.release_read()
+        writer.join(1)
+        late_reader.join(1)
+        self.assertEqual(['read', 'write', 'late read'], events)
+
+        # Ensure writers are reentrant, may read, and can't upgrade a read
+        lock.acquire_write()
+        lock.acquire_write()
+        lock.acquire_read()
+        lock.release_read()
+        lock.release_write()
+        lock.release_write()
+        lock.acquire_read()
+        with self.assertRaises(RuntimeError):
+            lock.acquire_write()
+        lock.release_read()
+
+    def test_pin_locks(self):
+        pin_locks = PinLocks()
+        events = []
+
+        def write(pin_id: RaspberryPiPinIds):
+            with pin_locks.write(pin_id):
+                events.append(pin_id)
+
+        # Ensure operations on the same pin are serialized while other pins proceed
+        with pin_locks.write(RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO4, RaspberryPiPinIds.GPIO17):
+            same_pin_writer = start_thread(lambda: write(RaspberryPiPinIds.GPIO17))
+            start_thread(lambda: write(RaspberryPiPinIds.GPIO27)).join(1)
+            time.sleep(0.05)
+            self.assertEqual([RaspberryPiPinIds.GPIO27], events)
+        same_pin_writer.join(1)
+        self.assertEqual([RaspberryPiPinIds.GPIO27, RaspberryPiPinIds.GPIO17], events)
+
+        # Ensure pins are locked in the same order whatever order they're given in
+        def write_pins(*pin_ids: RaspberryPiPinIds):
+            for _ in range(200):
+                with pin_locks.write(*pin_ids):
+                    pass
+
+        threads = [start_thread(lambda: write_pins(RaspberryPiPinIds.GPIO2, RaspberryPiPinIds.GPIO3)),
+                   start_thread(lambda: write_pins(RaspberryPiPinIds.GPIO3, RaspberryPiPinIds.GPIO2))]
+        for thread in threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+
+        # Ensure readers of a pin don't wait on each other
+        def read():
+            with pin_locks.read(RaspberryPiPinIds.GPIO17):
+                events.append('read')
+
+        with pin_locks.read(RaspberryPiPinIds.GPIO17):
+            start_thread(read).join(1)
+            self.assertEqual('read', events[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import unittest
+from unittest import TestCase
+
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.utils.pin_owner import PinInUse, PinOwners
+
+
+class TestPinOwnerUtils(TestCase):
+
+    def test_pin_owners(self):
+        pin_owners = PinOwners()
+        active = True
+
+        # Ensure claimed pins are owned until released and can't be claimed or changed by anyone else
+        pin_owners.claim('sequence `1`', [RaspberryPiPinIds.GPIO17, RaspberryPiPinIds.GPIO27], lambda: active)
+        self.assertEqual('sequence `1`', pin_owners.owner(RaspberryPiPinIds.GPIO17))
+        pin_owners.check(RaspberryPiPinIds.GPIO17, 'sequence `1`')
+        with self.assertRaises(PinInUse) as context:
+            pin_owners.check(RaspberryPiPinIds.GPIO17)
+        self.assertEqual('sequence `1`', context.exception.owner)
+
+        # Ensure claims are all or nothing
+        with self.assertRaises(PinInUse):
+            pin_owners.claim('sequence `2`', [RaspberryPiPinIds.GPIO22, RaspberryPiPinIds.GPIO27])
+        self.assertIsNone(pin_owners.owner(RaspberryPiPinIds.GPIO22))
+
+        pin_owners.release('sequence `1`', [RaspberryPiPinIds.GPIO27])
+        self.assertIsNone(pin_owners.owner(RaspberryPiPinIds.GPIO27))
+
+        # Ensure pins of owners that are no longer active are released
+        active = False
+        self.assertIsNone(pin_owners.owner(RaspberryPiPinIds.GPIO17))
+        pin_owners.claim('sequence `2`', [RaspberryPiPinIds.GPIO17])
+        pin_owners.release('sequence `1`', [RaspberryPiPinIds.GPIO17])
+        self.assertEqual('sequence `2`', pin_owners.owner(RaspberryPiPinIds.GPIO17))
+
+        pin_owners.clear()
+        pin_owners.check(RaspberryPiPinIds.GPIO17)
+
+
+if __name__ == '__main__':
+    unittest.main()
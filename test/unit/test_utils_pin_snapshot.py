@@ -0,0 +1,88 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from endrpi.model.pin import PinConfiguration, PinIo, PinPull, RaspberryPiPinIds
+from endrpi.utils.pin_snapshot import PinSnapshot
+
+
+class TestPinSnapshotUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.snapshot_directory = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.snapshot_directory.name, 'endrpi', 'pins.json')
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.snapshot_directory.cleanup()
+
+    def test_pin_snapshot(self):
+        pin_snapshot = PinSnapshot(self.snapshot_path)
+
+        # Ensure a missing snapshot has no pin configurations
+        self.assertEqual({}, pin_snapshot.load())
+
+        # Ensure only what a restore needs is written and the directory is created
+        self.assertTrue(pin_snapshot.update({
+            RaspberryPiPinIds.GPIO2: PinConfiguration(io=PinIo.OUTPUT, state=1, pull=PinPull.UP),
+            RaspberryPiPinIds.GPIO3: PinConfiguration(io=PinIo.INPUT, state=1, pull=PinPull.DOWN)
+        }))
+        with open(self.snapshot_path) as file:
+            self.assertEqual({'GPIO2': {'io': 'OUTPUT', 'state': 1.0}, 'GPIO3': {'io': 'INPUT', 'pull': 'DOWN'}},
+                             json.load(file))
+
+        # Ensure updates that don't change any pin aren't written
+        with patch.object(pin_snapshot, '_write') as write_mock:
+            self.assertFalse(pin_snapshot.update({RaspberryPiPinIds.GPIO2: PinConfiguration(io=PinIo.OUTPUT,
+                                                                                            state=1)}))
+            write_mock.assert_not_called()
+
+        # Ensure a new snapshot reads every persisted pin and merges later updates
+        pin_snapshot = PinSnapshot(self.snapshot_path)
+        self.assertEqual(PinConfiguration(io=PinIo.OUTPUT, state=1), pin_snapshot.load()[RaspberryPiPinIds.GPIO2])
+        pin_snapshot.update({RaspberryPiPinIds.GPIO2: PinConfiguration(io=PinIo.OUTPUT, state=0)})
+        pin_configuration_map = PinSnapshot(self.snapshot_path).load()
+        self.assertEqual({RaspberryPiPinIds.GPIO2, RaspberryPiPinIds.GPIO3}, set(pin_configuration_map))
+        self.assertEqual(0, pin_configuration_map[RaspberryPiPinIds.GPIO2].state)
+
+        # Ensure failed writes keep the previous snapshot without leaving temporary files behind
+        with patch('endrpi.utils.pin_snapshot.os.replace', side_effect=OSError('Read-only file system')):
+            with self.assertRaises(OSError):
+                pin_snapshot.update({RaspberryPiPinIds.GPIO2: PinConfiguration(io=PinIo.OUTPUT, state=1)})
+        self.assertEqual(['pins.json'], os.listdir(os.path.dirname(self.snapshot_path)))
+        self.assertEqual(0, PinSnapshot(self.snapshot_path).load()[RaspberryPiPinIds.GPIO2].state)
+
+        # Ensure the configurations of a failed write are written by the next update
+        self.assertTrue(pin_snapshot.update({}))
+        self.assertEqual(1, PinSnapshot(self.snapshot_path).load()[RaspberryPiPinIds.GPIO2].state)
+
+        # Ensure invalid snapshots are an error
+        with open(self.snapshot_path, 'w') as file:
+            file.write('{"GPIO2": {"io": "SIDEWAYS"}}')
+        with self.assertRaises(ValueError):
+            pin_snapshot.load()
+
+
+if __name__ == '__main__':
+    unittest.main()
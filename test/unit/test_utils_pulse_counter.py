@@ -0,0 +1,172 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import unittest
+from unittest import TestCase
+
+from gpiozero import Device
+from gpiozero.pins.mock import MockFactory
+
+from endrpi.model.pin import PinEdge, RaspberryPiPinIds
+from endrpi.utils.pin_edge import PinEdgeMonitor, PinEdgeSample
+from endrpi.utils.pulse_counter import PulseCounter, PulseCounters, PulseStatistic
+
+
+def edge_sample(edge: PinEdge, ticks: float) -> PinEdgeSample:
+    return PinEdgeSample(timestamp=0.0, edge=edge, state=float(edge is PinEdge.RISING), ticks=ticks)
+
+
+def ticks_diff(later: float, earlier: float) -> float:
+    return later - earlier
+
+
+class Ticks:
+    """Pin factory ticks that only move when told to."""
+
+    def __init__(self, ticks: float = 0.0):
+        self.ticks = ticks
+
+    def __call__(self) -> float:
+        return self.ticks
+
+
+class TestPulseCounterUtils(TestCase):
+
+    def test_pulse_statistic(self):
+        # Ensure empty statistics have no values and durations are reported in microseconds
+        pulse_statistic = PulseStatistic()
+        self.assertEqual(0, pulse_statistic.statistics().count)
+        self.assertIsNone(pulse_statistic.statistics().mean)
+        for duration in (0.002, 0.001, 0.003):
+            pulse_statistic.add(duration)
+        pulse_statistics = pulse_statistic.statistics()
+        self.assertEqual(3, pulse_statistics.count)
+        self.assertAlmostEqual(1000, pulse_statistics.min)
+        self.assertAlmostEqual(2000, pulse_statistics.mean)
+        self.assertAlmostEqual(3000, pulse_statistics.max)
+
+    def test_pulse_counter(self):
+        # 10ms periods with 2.5ms high pulses
+        ticks = Ticks(0.025)
+        pulse_counter = PulseCounter(PinEdge.RISING, ticks_diff, ticks)
+        for period in range(3):
+            pulse_counter.notify(edge_sample(PinEdge.RISING, period * 0.01))
+            pulse_counter.notify(edge_sample(PinEdge.FALLING, period * 0.01 + 0.0025))
+
+        # Ensure counted edges measure periods and alternating edges measure widths
+        pulse_counter_status = pulse_counter.status()
+        self.assertEqual(3, pulse_counter_status.count)
+        self.assertAlmostEqual(100, pulse_counter_status.frequency)
+        self.assertAlmostEqual(100, pulse_counter_status.meanFrequency)
+        self.assertAlmostEqual(10_000, pulse_counter_status.lastPeriod)
+        self.assertEqual(2, pulse_counter_status.period.count)
+        self.assertEqual(3, pulse_counter_status.highWidth.count)
+        self.assertAlmostEqual(2500, pulse_counter_status.highWidth.mean)
+        self.assertEqual(2, pulse_counter_status.lowWidth.count)
+        self.assertAlmostEqual(7500, pulse_counter_status.lowWidth.max)
+
+        # Ensure repeated edges don't measure widths
+        pulse_counter.notify(edge_sample(PinEdge.FALLING, 0.0300))
+        self.assertEqual(2, pulse_counter.status().lowWidth.count)
+
+        # Ensure reads can reset the counter in the same step while the pulse in progress is still measured
+        self.assertEqual(3, pulse_counter.status(reset=True).count)
+        pulse_counter_status = pulse_counter.status()
+        self.assertEqual(0, pulse_counter_status.count)
+        self.assertEqual(0, pulse_counter_status.period.count)
+        pulse_counter.notify(edge_sample(PinEdge.RISING, 0.0325))
+        ticks.ticks = 0.0325
+        pulse_counter_status = pulse_counter.status()
+        self.assertEqual(1, pulse_counter_status.count)
+        self.assertAlmostEqual(12_500, pulse_counter_status.lastPeriod)
+        self.assertAlmostEqual(2500, pulse_counter_status.lowWidth.mean)
+
+        # Ensure counting both edges counts every edge
+        pulse_counter = PulseCounter(PinEdge.BOTH, ticks_diff, ticks)
+        pulse_counter.notify(edge_sample(PinEdge.RISING, 0.0))
+        pulse_counter.notify(edge_sample(PinEdge.FALLING, 0.005))
+        self.assertEqual(2, pulse_counter.status().count)
+        self.assertAlmostEqual(5000, pulse_counter.status().lastPeriod)
+        self.assertTrue(pulse_counter.accepts(PinEdge.FALLING))
+
+    def test_pulse_counter_stopped(self):
+        # 10ms periods
+        ticks = Ticks()
+        pulse_counter = PulseCounter(PinEdge.RISING, ticks_diff, ticks)
+        for period in range(2):
+            pulse_counter.notify(edge_sample(PinEdge.RISING, period * 0.01))
+
+        # Ensure the frequency holds until no edge was counted for longer than the last period
+        ticks.ticks = 0.02
+        self.assertAlmostEqual(100, pulse_counter.status().frequency)
+        ticks.ticks = 0.0201
+        pulse_counter_status = pulse_counter.status()
+        self.assertIsNone(pulse_counter_status.frequency)
+        self.assertAlmostEqual(10_000, pulse_counter_status.lastPeriod)
+        self.assertAlmostEqual(100, pulse_counter_status.meanFrequency)
+
+        # Ensure a new edge reports the frequency again
+        pulse_counter.notify(edge_sample(PinEdge.RISING, 0.05))
+        self.assertAlmostEqual(25, pulse_counter.status().frequency)
+
+        # Ensure timeouts replace the last period
+        pulse_counter = PulseCounter(PinEdge.RISING, ticks_diff, ticks, timeout=1.0)
+        pulse_counter.notify(edge_sample(PinEdge.RISING, 0.0))
+        pulse_counter.notify(edge_sample(PinEdge.RISING, 0.01))
+        ticks.ticks = 1.01
+        self.assertAlmostEqual(100, pulse_counter.status().frequency)
+        self.assertEqual(1.0, pulse_counter.status().timeout)
+        ticks.ticks = 1.02
+        self.assertIsNone(pulse_counter.status().frequency)
+
+    def test_pulse_counters(self):
+        Device.pin_factory = MockFactory()
+        pin_edge_monitor = PinEdgeMonitor()
+        pulse_counters = PulseCounters(pin_edge_monitor, ticks_diff, Device.pin_factory.ticks)
+
+        # Note: Mock pins are shared between mock factories, along with the edge callbacks of other monitors
+        gpiozero_pin = Device.pin_factory.pin(RaspberryPiPinIds.GPIO17)
+        gpiozero_pin.when_changed = None
+        gpiozero_pin.function = 'input'
+        gpiozero_pin.drive_low()
+
+        # Ensure counters are attached to the pin edges
+        pulse_counter_status = pulse_counters.start(RaspberryPiPinIds.GPIO17, PinEdge.RISING)
+        self.assertEqual(0, pulse_counter_status.count)
+        self.assertEqual(1, pin_edge_monitor.listener_count(RaspberryPiPinIds.GPIO17))
+        for _ in range(3):
+            gpiozero_pin.drive_high()
+            gpiozero_pin.drive_low()
+        self.assertEqual(3, pulse_counters.status(RaspberryPiPinIds.GPIO17).count)
+        self.assertIsNone(pulse_counters.status(RaspberryPiPinIds.GPIO27))
+
+        # Ensure restarted counters replace the running counter
+        pulse_counters.start(RaspberryPiPinIds.GPIO17, PinEdge.BOTH, timeout=5.0)
+        self.assertEqual(5.0, pulse_counters.status(RaspberryPiPinIds.GPIO17).timeout)
+        self.assertEqual(1, pin_edge_monitor.listener_count(RaspberryPiPinIds.GPIO17))
+        gpiozero_pin.drive_high()
+        self.assertEqual({RaspberryPiPinIds.GPIO17: 1},
+                         {pin_id: status.count for pin_id, status in pulse_counters.statuses(reset=True).items()})
+        self.assertEqual(0, pulse_counters.statuses()[RaspberryPiPinIds.GPIO17].count)
+
+        # Ensure stopped counters are detached
+        gpiozero_pin.drive_low()
+        self.assertEqual(1, pulse_counters.stop(RaspberryPiPinIds.GPIO17).count)
+        self.assertEqual(0, pin_edge_monitor.listener_count(RaspberryPiPinIds.GPIO17))
+        with self.assertRaises(KeyError):
+            pulse_counters.stop(RaspberryPiPinIds.GPIO17)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import os
+import struct
+import tempfile
+import time
+import unittest
+from unittest import TestCase
+
+from gpiozero.pins.mock import MockFactory, MockPWMPin
+
+from endrpi.model.pin import PwmMode, RaspberryPiPinIds
+from endrpi.utils.gpio_registers import GpioRegisters, GPFSEL0, GPCLR0, GPIO_FUNCTION_ALT0, GPIO_FUNCTION_ALT5, \
+    GPIO_FUNCTION_INPUT, GPIO_FUNCTION_OUTPUT, GPIO_REGISTERS_SIZE
+from endrpi.utils.pwm import HardwarePwmChannel, ThreadPwm, PwmOutputs, PwmChannelInUse, SOFTWARE_PWM_MAX_FREQUENCY
+from test.unit.test_utils_gpio_registers import create_register_file
+
+
+def create_pwm_chip(path: str, channels: int = 2) -> None:
+    """Creates a fake sysfs PWM chip with every channel already exported."""
+
+    with open(os.path.join(path, 'export'), 'w'):
+        pass
+    for channel in range(channels):
+        os.mkdir(os.path.join(path, f'pwm{channel}'))
+        for file_name in ('period', 'duty_cycle', 'enable'):
+            with open(os.path.join(path, f'pwm{channel}', file_name), 'w') as file:
+                file.write('0\n')
+
+
+def read_pwm_file(path: str) -> int:
+    # Note: Sysfs files are rewritten in place, so only the first line of the fake files holds the value
+    with open(path) as file:
+        return int(file.readline())
+
+
+class TestPwmUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.chip_directory = tempfile.TemporaryDirectory()
+        self.chip_path = self.chip_directory.name
+
+        # GPIO18 is routed to PWM channel 0 (i.e. by the 'pwm' device tree overlay)
+        self.register_path = create_register_file({GPFSEL0 + 1: GPIO_FUNCTION_ALT5 << 24})
+        self.gpio_registers = GpioRegisters(self.register_path)
+
+        # Note: Mock pins are shared between mock factories, PWM pins can't reuse pins created without PWM
+        self.pin_factory = MockFactory(pin_class=MockPWMPin)
+        self.pin_factory.reset()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.pin_factory.reset()
+        self.gpio_registers.close()
+        os.remove(self.register_path)
+        self.chip_directory.cleanup()
+
+    def test_hardware_pwm_channel(self):
+        # Ensure unexported channels that never appear are an error
+        with self.assertRaises(OSError):
+            HardwarePwmChannel(self.chip_path, 0)
+
+        # Ensure the period and duty cycle are written in nanoseconds and the channel is enabled
+        create_pwm_chip(self.chip_path)
+        channel_path = os.path.join(self.chip_path, 'pwm1')
+        channel = HardwarePwmChannel(self.chip_path, 1)
+        channel.configure(frequency=50, duty_cycle=0.075)
+        self.assertEqual(20_000_000, read_pwm_file(os.path.join(channel_path, 'period')))
+        self.assertEqual(1_500_000, read_pwm_file(os.path.join(channel_path, 'duty_cycle')))
+        self.assertEqual(1, read_pwm_file(os.path.join(channel_path, 'enable')))
+
+        # Ensure duty cycle changes keep the period
+        channel.write_duty_cycle(0.1)
+        self.assertEqual(2_000_000, read_pwm_file(os.path.join(channel_path, 'duty_cycle')))
+        self.assertEqual(20_000_000, read_pwm_file(os.path.join(channel_path, 'period')))
+
+        channel.close()
+        self.assertEqual(0, read_pwm_file(os.path.join(channel_path, 'enable')))
+
+    def test_thread_pwm(self):
+        gpiozero_pin = MockFactory().pin(RaspberryPiPinIds.GPIO26)
+        thread_pwm = ThreadPwm(gpiozero_pin)
+
+        # Ensure frequencies above the software limit are rejected before the thread starts
+        with self.assertRaises(ValueError):
+            thread_pwm.configure(frequency=SOFTWARE_PWM_MAX_FREQUENCY * 2, duty_cycle=0.5)
+        self.assertEqual('input', gpiozero_pin.function)
+
+        # Ensure the pin is toggled by the thread and left low once stopped
+        gpiozero_pin.clear_states()
+        thread_pwm.configure(frequency=200, duty_cycle=0.5)
+        time.sleep(0.05)
+        thread_pwm.close()
+        high_states = [state for state in gpiozero_pin.states if state.state == 1]
+        low_states = [state for state in gpiozero_pin.states if state.state == 0]
+        self.assertGreater(len(high_states), 2)
+        self.assertGreater(len(low_states), 2)
+        self.assertEqual(0, gpiozero_pin.state)
+
+        # Note: Mock pins are shared between mock factories
+        gpiozero_pin.function = 'input'
+
+    def test_pwm_outputs(self):
+        create_pwm_chip(self.chip_path)
+        pwm_outputs = PwmOutputs(self.pin_factory.pin, chip_path=self.chip_path, gpio_registers=lambda: None)
+
+        # Ensure hardware PWM pins use software PWM when they can't be routed to their channel
+        pwm_status = pwm_outputs.start(RaspberryPiPinIds.GPIO12, frequency=1000, duty_cycle=0.25)
+        self.assertEqual(PwmMode.SOFTWARE, pwm_status.mode)
+        pwm_outputs.stop(RaspberryPiPinIds.GPIO12)
+
+        # Ensure hardware channels are used for hardware PWM pins while the chip is available, the pin is routed to
+        # its channel and the other pin of the channel is released
+        pwm_outputs = PwmOutputs(self.pin_factory.pin, chip_path=self.chip_path,
+                                 gpio_registers=lambda: self.gpio_registers)
+        pwm_status = pwm_outputs.start(RaspberryPiPinIds.GPIO12, frequency=1000, duty_cycle=0.25)
+        self.assertEqual(PwmMode.HARDWARE, pwm_status.mode)
+        self.assertEqual(250_000, read_pwm_file(os.path.join(self.chip_path, 'pwm0', 'duty_cycle')))
+        gpio_bank = self.gpio_registers.read_bank()
+        self.assertEqual(GPIO_FUNCTION_ALT0, gpio_bank.function(12))
+        self.assertEqual(GPIO_FUNCTION_INPUT, gpio_bank.function(18))
+
+        # Ensure stopped hardware PWM pins are left as low outputs
+        pwm_outputs.stop(RaspberryPiPinIds.GPIO12)
+        self.assertEqual(GPIO_FUNCTION_OUTPUT, self.gpio_registers.read_bank().function(12))
+        with open(self.register_path, 'rb') as register_file:
+            register_words = struct.unpack(f'<{GPIO_REGISTERS_SIZE // 4}I', register_file.read())
+        self.assertEqual(1 << 12, register_words[GPCLR0])
+
+        pwm_status = pwm_outputs.start(RaspberryPiPinIds.GPIO18, frequency=1000, duty_cycle=0.25)
+        self.assertEqual(PwmMode.HARDWARE, pwm_status.mode)
+        self.assertEqual(GPIO_FUNCTION_ALT5, self.gpio_registers.read_bank().function(18))
+
+        # Ensure pins sharing a hardware channel can't be driven together
+        with self.assertRaises(PwmChannelInUse):
+            pwm_outputs.start(RaspberryPiPinIds.GPIO12, frequency=1000, duty_cycle=0.5)
+        self.assertIsNone(pwm_outputs.status(RaspberryPiPinIds.GPIO12))
+
+        # Ensure every other pin uses software PWM of the pin factory
+        pwm_status = pwm_outputs.start(RaspberryPiPinIds.GPIO17, frequency=100, duty_cycle=0.5)
+        self.assertEqual(PwmMode.SOFTWARE, pwm_status.mode)
+        gpiozero_pin = self.pin_factory.pin(RaspberryPiPinIds.GPIO17)
+        self.assertEqual(100, gpiozero_pin.frequency)
+        self.assertEqual(0.5, gpiozero_pin.state)
+
+        # Ensure duty cycle writes update the signal and the status
+        pwm_outputs.write_duty_cycle(RaspberryPiPinIds.GPIO17, 0.75)
+        self.assertEqual(0.75, gpiozero_pin.state)
+        self.assertEqual(0.75, pwm_outputs.status(RaspberryPiPinIds.GPIO17).dutyCycle)
+        self.assertEqual({RaspberryPiPinIds.GPIO18, RaspberryPiPinIds.GPIO17}, set(pwm_outputs.statuses()))
+
+        # Ensure reconfiguring keeps the running signal
+        pwm_status = pwm_outputs.start(RaspberryPiPinIds.GPIO17, frequency=200, duty_cycle=0.1)
+        self.assertEqual(200, pwm_status.frequency)
+        self.assertEqual(200, gpiozero_pin.frequency)
+
+        # Ensure stopped pins are forgotten
+        pwm_outputs.stop(RaspberryPiPinIds.GPIO17)
+        self.assertIsNone(gpiozero_pin.frequency)
+        with self.assertRaises(KeyError):
+            pwm_outputs.stop(RaspberryPiPinIds.GPIO17)
+        with self.assertRaises(KeyError):
+            pwm_outputs.write_duty_cycle(RaspberryPiPinIds.GPIO17, 0.5)
+
+        pwm_outputs.stop_all()
+        self.assertEqual({}, pwm_outputs.statuses())
+        self.assertEqual(0, read_pwm_file(os.path.join(self.chip_path, 'pwm0', 'enable')))
+
+        # Ensure software PWM is used on hardware PWM pins without the chip and threads toggle pins without PWM
+        pwm_outputs = PwmOutputs(MockFactory().pin, chip_path=os.path.join(self.chip_path, 'missing'))
+        pwm_status = pwm_outputs.start(RaspberryPiPinIds.GPIO5, frequency=50, duty_cycle=0.5)
+        self.assertEqual(PwmMode.SOFTWARE, pwm_status.mode)
+        pwm_outputs.stop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
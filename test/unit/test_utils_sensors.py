@@ -0,0 +1,130 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import tempfile
+import unittest
+from typing import Dict
+from unittest import TestCase
+
+from endrpi.model.measurement import SensorUnit
+from endrpi.model.sensors import SensorKind
+from endrpi.utils.sensors import SensorReader, discover_sensor_inputs
+
+
+def create_sysfs_files(path: str, files: Dict[str, str]) -> None:
+    """Creates fake sysfs files under a given path, a none content creates a directory instead."""
+
+    for file_name, content in files.items():
+        file_path = os.path.join(path, file_name)
+        if content is None:
+            os.makedirs(file_path, exist_ok=True)
+            continue
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as file:
+            file.write(f'{content}\n')
+
+
+def create_sensor_root(root: str) -> None:
+    """Creates the hwmon devices and thermal zones of a Raspberry Pi 4 with a PoE HAT under a fake root."""
+
+    create_sysfs_files(root, {
+        'sys/class/hwmon/hwmon0/name': 'cpu_thermal',
+        'sys/class/hwmon/hwmon0/temp1_input': '48686',
+        'sys/class/hwmon/hwmon1/name': 'rpi_volt',
+        'sys/class/hwmon/hwmon1/in0_lcrit_alarm': '0',
+        'sys/class/hwmon/hwmon10/name': 'pwmfan',
+        'sys/class/hwmon/hwmon10/fan1_input': '4800',
+        'sys/class/hwmon/hwmon10/fan2_input': None,
+        'sys/class/hwmon/hwmon2/name': 'pmic',
+        'sys/class/hwmon/hwmon2/in1_input': '850',
+        'sys/class/hwmon/hwmon2/in1_label': 'VDD_CORE',
+        'sys/class/hwmon/hwmon2/curr1_input': '1250',
+        'sys/class/hwmon/hwmon2/power1_input': '1062500',
+        'sys/class/thermal/thermal_zone0/type': 'cpu-thermal',
+        'sys/class/thermal/thermal_zone0/temp': '48686',
+        'sys/class/thermal/cooling_device0/type': 'pwm-fan'
+    })
+
+
+class TestSensorsUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.root_directory = tempfile.TemporaryDirectory()
+        self.root = self.root_directory.name
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.root_directory.cleanup()
+
+    def test_discover_sensor_inputs(self):
+        # Ensure roots without hwmon devices or thermal zones have no inputs
+        self.assertEqual([], discover_sensor_inputs(self.root))
+
+        # Ensure every input is discovered in device and input number order with its scale and label
+        create_sensor_root(self.root)
+        sensor_inputs = discover_sensor_inputs(self.root)
+        self.assertEqual(['hwmon0.temp1', 'hwmon2.curr1', 'hwmon2.in1', 'hwmon2.power1', 'hwmon10.fan1',
+                          'hwmon10.fan2', 'thermal_zone0'], [sensor_input.id for sensor_input in sensor_inputs])
+        self.assertEqual(['cpu_thermal', 'pmic', 'pmic', 'pmic', 'pwmfan', 'pwmfan', 'cpu-thermal'],
+                         [sensor_input.name for sensor_input in sensor_inputs])
+        self.assertEqual('VDD_CORE', sensor_inputs[2].label)
+        self.assertIsNone(sensor_inputs[0].label)
+        self.assertEqual((SensorKind.POWER, SensorUnit.WATT, 1_000_000),
+                         (sensor_inputs[3].kind, sensor_inputs[3].unit, sensor_inputs[3].scale))
+
+    def test_sensor_reader(self):
+        create_sensor_root(self.root)
+        sensor_reader = SensorReader(discover_sensor_inputs(self.root))
+
+        # Ensure every input is read and scaled to its unit
+        sensors = sensor_reader.read()
+        values = {sensor.id: sensor.value.quantity for sensor in sensors.sensors if sensor.value}
+        self.assertEqual({'hwmon0.temp1': 48.686, 'hwmon2.curr1': 1.25, 'hwmon2.in1': 0.85, 'hwmon2.power1': 1.0625,
+                          'hwmon10.fan1': 4800, 'thermal_zone0': 48.686}, values)
+        self.assertGreater(sensors.timestamp, 0)
+
+        # Ensure inputs that can't be read are reported with an error
+        fan_sensor = sensors.sensors[5]
+        self.assertEqual('hwmon10.fan2', fan_sensor.id)
+        self.assertIsNone(fan_sensor.value)
+        self.assertIsNotNone(fan_sensor.error)
+
+        # Ensure the kept open files are read again on every batch
+        create_sysfs_files(self.root, {'sys/class/thermal/thermal_zone0/temp': '51000'})
+        sensors = sensor_reader.read(SensorKind.TEMPERATURE)
+        self.assertEqual(['hwmon0.temp1', 'thermal_zone0'], [sensor.id for sensor in sensors.sensors])
+        self.assertEqual(51.0, sensors.sensors[1].value.quantity)
+
+        # Ensure invalid values are an error
+        create_sysfs_files(self.root, {'sys/class/hwmon/hwmon0/temp1_input': 'qwerty'})
+        self.assertIsNotNone(sensor_reader.read(SensorKind.TEMPERATURE).sensors[0].error)
+        sensor_reader.close()
+
+        # Ensure inputs removed after discovery are reported with an error
+        sensor_inputs = discover_sensor_inputs(self.root)
+        os.remove(os.path.join(self.root, 'sys/class/hwmon/hwmon0/temp1_input'))
+        sensor_reader = SensorReader(sensor_inputs)
+        sensor = sensor_reader.read().sensors[0]
+        self.assertIsNone(sensor.value)
+        self.assertIsNotNone(sensor.error)
+        sensor_reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
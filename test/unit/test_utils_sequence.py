@@ -0,0 +1,99 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import time
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+
+from endrpi.model.pin import RaspberryPiPinIds
+from endrpi.model.sequence import SequenceState
+from endrpi.utils.sequence import SequencePlayer, SequenceWrite
+
+
+class TestSequenceUtils(TestCase):
+
+    def test_sequence_player(self):
+        written_states = []
+        writes = [SequenceWrite(0, lambda: written_states.append(1)),
+                  SequenceWrite(1_000_000, lambda: written_states.append(0))]
+
+        # Ensure every write is played once per loop and timed against its requested offset
+        player = SequencePlayer(1, [RaspberryPiPinIds.GPIO17], writes, loop_duration=2_000_000, loops=3)
+        self.assertEqual(0, player.status().timing.writes)
+        self.assertIsNone(player.status().timing.meanLatency)
+        player.start()
+        player.join(5)
+        sequence_status = player.status()
+        self.assertEqual(SequenceState.COMPLETED, sequence_status.state)
+        self.assertEqual([1, 0, 1, 0, 1, 0], written_states)
+        self.assertEqual(3, sequence_status.completedLoops)
+        self.assertEqual(6, sequence_status.timing.writes)
+        self.assertEqual(5_000, sequence_status.timing.requestedDuration)
+        self.assertGreaterEqual(sequence_status.timing.minLatency, 0)
+        self.assertLessEqual(sequence_status.timing.minLatency, sequence_status.timing.meanLatency)
+        self.assertLessEqual(sequence_status.timing.meanLatency, sequence_status.timing.maxLatency)
+        self.assertGreaterEqual(sequence_status.timing.jitter, 0)
+        self.assertGreater(sequence_status.timing.actualDuration, 0)
+        self.assertFalse(player.running)
+
+    def test_sequence_player_cancel(self):
+        written_states = []
+        writes = [SequenceWrite(0, lambda: written_states.append(1)),
+                  SequenceWrite(500_000_000, lambda: written_states.append(0))]
+
+        # Ensure endless sequences play until they are cancelled
+        player = SequencePlayer(2, [RaspberryPiPinIds.GPIO17], writes, loop_duration=1_000_000_000, loops=0)
+        player.start()
+        self.assertTrue(player.running)
+        player.cancel(5)
+        self.assertEqual(SequenceState.CANCELLED, player.status().state)
+        self.assertEqual([1], written_states)
+        self.assertEqual(0, player.status().completedLoops)
+
+    @patch('endrpi.utils.sequence.SEQUENCE_LOOP_YIELD_SECONDS', 0.01)
+    def test_sequence_player_yield(self):
+        # Ensure the playback thread sleeps between loops of sequences without any delay
+        player = SequencePlayer(5, [RaspberryPiPinIds.GPIO17], [SequenceWrite(0, lambda: None)], 0, 0)
+        player.start()
+        time.sleep(0.1)
+        player.cancel(5)
+        self.assertEqual(SequenceState.CANCELLED, player.status().state)
+        self.assertGreater(player.status().completedLoops, 0)
+        self.assertLessEqual(player.status().completedLoops, 11)
+
+    def test_sequence_player_failure(self):
+        def failing_write():
+            raise OSError('Write failed')
+
+        # Ensure write errors fail the playback
+        player = SequencePlayer(3, [RaspberryPiPinIds.GPIO17], [SequenceWrite(0, failing_write)], 0, 1)
+        player.start()
+        player.join(5)
+        self.assertEqual(SequenceState.FAILED, player.status().state)
+        self.assertEqual('Write failed', player.status().error)
+
+    @patch('endrpi.utils.sequence.os.sched_setscheduler', side_effect=PermissionError('Not permitted'))
+    def test_sequence_player_priority(self, sched_setscheduler_mock):
+        # Ensure playback runs without realtime priority when the scheduling policy can't be set
+        player = SequencePlayer(4, [RaspberryPiPinIds.GPIO17], [SequenceWrite(0, lambda: None)], 0, 1)
+        player.start()
+        player.join(5)
+        self.assertFalse(player.status().realtime)
+        self.assertEqual(SequenceState.COMPLETED, player.status().state)
+        sched_setscheduler_mock.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
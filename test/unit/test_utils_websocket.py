@@ -0,0 +1,227 @@
+#  Copyright (c) 2020 - 2021 Persanix LLC. All rights reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from fastapi import status
+
+from endrpi.config.websocket import WebSocketSettings
+from endrpi.model.websocket import WebSocketOverflowPolicy
+from endrpi.utils.websocket import WebSocketConnection, count_client_connections, connection_limit_close_code, \
+    UNKNOWN_CLIENT_HOST
+
+
+class FakeWebSocket:
+    """Simulated websocket whose client only reads frames while reading is enabled."""
+
+    def __init__(self):
+        self.frames = []
+        self.reading = asyncio.Event()
+        self.close_code = None
+        self.client = MagicMock(host='127.0.0.1', port=5000)
+
+    async def send_text(self, frame: str) -> None:
+        await self.reading.wait()
+        self.frames.append(frame)
+
+    async def send_bytes(self, frame: bytes) -> None:
+        await self.reading.wait()
+        self.frames.append(frame)
+
+    async def close(self, code: int) -> None:
+        self.close_code = code
+
+
+class TestWebSocketUtils(TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.loop = asyncio.new_event_loop()
+        self.broadcast_hub = MagicMock()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        self.loop.close()
+
+    def create_connection(self, overflow_policy: WebSocketOverflowPolicy, queue_size: int = 3):
+        websocket = FakeWebSocket()
+        connection = WebSocketConnection(websocket, self.broadcast_hub, queue_size, overflow_policy)
+        return websocket, connection
+
+    def test_drop_oldest_policy(self):
+        async def send_frames():
+            websocket, connection = self.create_connection(WebSocketOverflowPolicy.DROP_OLDEST)
+
+            # Ensure a stalled client never holds more frames than the queue size
+            for frame_number in range(10):
+                await connection.send_frame(str(frame_number))
+                await asyncio.sleep(0)
+            self.assertEqual(3, connection.queue_depth)
+
+            # Ensure the oldest frames are the ones dropped
+            websocket.reading.set()
+            await asyncio.sleep(0.01)
+            self.assertEqual(0, connection.queue_depth)
+            self.assertEqual(['0', '7', '8', '9'], websocket.frames)
+            self.assertEqual(4, connection.sent_frames)
+            self.assertEqual(6, connection.dropped_frames)
+            connection.close()
+
+        self.loop.run_until_complete(send_frames())
+
+    def test_coalesce_policy(self):
+        async def send_frames():
+            websocket, connection = self.create_connection(WebSocketOverflowPolicy.COALESCE)
+
+            # Ensure queued frames of the same topic are replaced by the latest frame
+            await connection.send_frame('response')
+            await asyncio.sleep(0)
+            for frame_number in range(10):
+                await connection.send_frame(f'temperature {frame_number}', 'TEMPERATURE')
+                await connection.send_frame(f'memory {frame_number}', 'MEMORY')
+            self.assertEqual(2, connection.queue_depth)
+            self.assertEqual(18, connection.dropped_frames)
+
+            websocket.reading.set()
+            await asyncio.sleep(0.01)
+            self.assertEqual(['response', 'temperature 9', 'memory 9'], websocket.frames)
+
+            # Ensure frames without a topic fall back to dropping the oldest frame
+            websocket.reading.clear()
+            for frame_number in range(5):
+                await connection.send_frame(str(frame_number))
+                await asyncio.sleep(0)
+            self.assertEqual(3, connection.queue_depth)
+            self.assertEqual(19, connection.dropped_frames)
+            connection.close()
+
+        self.loop.run_until_complete(send_frames())
+
+    def test_disconnect_policy(self):
+        async def send_frames():
+            websocket, connection = self.create_connection(WebSocketOverflowPolicy.DISCONNECT)
+
+            # Ensure the connection is closed once the queue overflows
+            for frame_number in range(5):
+                await connection.send_frame(str(frame_number))
+                await asyncio.sleep(0)
+            self.assertTrue(connection.closed)
+            self.assertEqual(status.WS_1008_POLICY_VIOLATION, websocket.close_code)
+            self.assertEqual(0, connection.queue_depth)
+            self.assertEqual(1, connection.dropped_frames)
+            self.broadcast_hub.unsubscribe_all.assert_called_with(connection)
+
+            # Ensure closed connections ignore frames
+            await connection.send_frame('ignored')
+            self.assertEqual(0, connection.queue_depth)
+            await connection.disconnect(status.WS_1000_NORMAL_CLOSURE)
+            self.assertEqual(status.WS_1008_POLICY_VIOLATION, websocket.close_code)
+
+        self.loop.run_until_complete(send_frames())
+
+    def test_send_error(self):
+        async def send_frames():
+            websocket, connection = self.create_connection(WebSocketOverflowPolicy.DROP_OLDEST)
+            websocket.reading.set()
+            websocket.send_text = MagicMock(side_effect=RuntimeError('Disconnected'))
+
+            # Ensure failed sends release the connection
+            await connection.send_frame('frame')
+            await asyncio.sleep(0.01)
+            self.assertTrue(connection.closed)
+            self.assertEqual(0, connection.sent_frames)
+
+        self.loop.run_until_complete(send_frames())
+
+    def test_binary_frames(self):
+        async def send_frames():
+            websocket, connection = self.create_connection(WebSocketOverflowPolicy.DROP_OLDEST)
+            websocket.reading.set()
+            websocket.send_text = MagicMock(side_effect=RuntimeError('Text frames are not expected'))
+
+            # Ensure binary frames are sent as bytes
+            await connection.send_frame(b'frame')
+            await asyncio.sleep(0.01)
+            self.assertEqual([b'frame'], websocket.frames)
+            self.assertFalse(connection.closed)
+            connection.close()
+
+        self.loop.run_until_complete(send_frames())
+
+    def test_status(self):
+        async def read_status():
+            websocket, connection = self.create_connection(WebSocketOverflowPolicy.COALESCE, queue_size=8)
+            await connection.send_frame('frame')
+            await asyncio.sleep(0)
+            await connection.send_frame('frame')
+
+            # Ensure the status reflects the outbound queue
+            connection_status = connection.status()
+            self.assertEqual(connection.id, connection_status.id)
+            self.assertEqual('127.0.0.1:5000', connection_status.client)
+            self.assertEqual(WebSocketOverflowPolicy.COALESCE, connection_status.overflowPolicy)
+            self.assertEqual(8, connection_status.queueCapacity)
+            self.assertEqual(1, connection_status.queueDepth)
+            self.assertEqual(0, connection_status.sentFrames)
+            self.assertEqual(0, connection_status.droppedFrames)
+
+            websocket.client = None
+            self.assertIsNone(connection.status().client)
+            connection.close()
+
+        self.loop.run_until_complete(read_status())
+
+    def test_connection_limits(self):
+        async def check_limits():
+            first_websocket, first_connection = self.create_connection(WebSocketOverflowPolicy.COALESCE)
+            _, second_connection = self.create_connection(WebSocketOverflowPolicy.COALESCE)
+            other_websocket, other_connection = self.create_connection(WebSocketOverflowPolicy.COALESCE)
+            other_websocket.client = MagicMock(host='10.0.0.2', port=5000)
+            connections = [first_connection, second_connection, other_connection]
+
+            # Ensure connections are counted per client host
+            self.assertEqual('127.0.0.1', first_connection.client_host)
+            self.assertEqual({'127.0.0.1': 2, '10.0.0.2': 1}, count_client_connections(connections))
+            first_websocket.client = None
+            self.assertEqual(UNKNOWN_CLIENT_HOST, first_connection.client_host)
+            first_websocket.client = MagicMock(host='127.0.0.1', port=5000)
+
+            # Ensure connections are never rejected without limits
+            self.assertIsNone(connection_limit_close_code(connections, '127.0.0.1', WebSocketSettings()))
+
+            # Ensure exceeding the global limit asks the client to try again later
+            settings = WebSocketSettings(max_connections=3)
+            self.assertEqual(status.WS_1013_TRY_AGAIN_LATER,
+                             connection_limit_close_code(connections, '10.0.0.3', settings))
+            self.assertIsNone(connection_limit_close_code(connections[:2], '10.0.0.3', settings))
+
+            # Ensure exceeding the per client limit is a policy violation that only affects that client
+            settings = WebSocketSettings(max_connections_per_client=2)
+            self.assertEqual(status.WS_1008_POLICY_VIOLATION,
+                             connection_limit_close_code(connections, '127.0.0.1', settings))
+            self.assertIsNone(connection_limit_close_code(connections, '10.0.0.2', settings))
+
+            for connection in connections:
+                connection.close()
+
+        self.loop.run_until_complete(check_limits())
+
+
+if __name__ == '__main__':
+    unittest.main()